@@ -98,6 +98,17 @@ if getattr(sys, 'frozen', None):
 #:     * pulse, the PulseAudio module (Linux only)
 #:     * openal, the OpenAL audio module
 #:     * silent, no audio
+#: audio_mixer
+#:     If True, all players are mixed in software and played through a
+#:     single player on the audio driver.  See `pyglet.media.mixer`.
+#:
+#:     **Since:** pyglet 1.2
+#: audio_resampler
+#:     Method used to convert the sample rate of audio queued on a player
+#:     whose format differs from the sources already queued: ``'linear'``
+#:     (the default) or ``'sinc'``, which is slower but gives less aliasing.
+#:
+#:     **Since:** pyglet 1.2
 #: debug_lib
 #:     If True, prints the path of each dynamic library loaded.
 #: debug_gl
@@ -146,6 +157,8 @@ if getattr(sys, 'frozen', None):
 #:
 options = {
     'audio': ('directsound', 'pulse', 'openal', 'silent'),
+    'audio_mixer': False,
+    'audio_resampler': 'linear',
     'font': ('gdiplus', 'win32'),  # ignored outside win32; win32 is deprecated
     'debug_font': False,
     'debug_gl': not _enable_optimisations,
@@ -172,6 +185,8 @@ options = {
 
 _option_types = {
     'audio': tuple,
+    'audio_mixer': bool,
+    'audio_resampler': str,
     'font': tuple,
     'debug_font': bool,
     'debug_gl': bool,
@@ -227,6 +242,8 @@ def _read_environment():
                 options[key] = value in ('true', 'TRUE', 'True', '1')
             elif _option_types[key] is int:
                 options[key] = int(value)
+            elif _option_types[key] is str:
+                options[key] = value
         except KeyError:
             pass
 _read_environment()
@@ -386,6 +403,7 @@ if True:
     input = _ModuleProxy('input')
     lib = _ModuleProxy('lib')
     media = _ModuleProxy('media')
+    profiler = _ModuleProxy('profiler')
     resource = _ModuleProxy('resource')
     sprite = _ModuleProxy('sprite')
     text = _ModuleProxy('text')
@@ -406,6 +424,7 @@ if False:
     from . import image
     from . import lib
     from . import media
+    from . import profiler
     from . import resource
     from . import sprite
     from . import text
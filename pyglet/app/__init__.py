@@ -124,7 +124,7 @@ def exit():
     """
     event_loop.exit()
 
-from pyglet.app.base import EventLoop
+from pyglet.app.base import EventLoop, FramePacer
 from pyglet import compat_platform
 if compat_platform == 'darwin':
     from pyglet.app.cocoa import CocoaEventLoop as PlatformEventLoop
@@ -1,10 +1,12 @@
 import threading
 import queue
 import platform
+import time
 
 from pyglet import app
 from pyglet import clock
 from pyglet import event
+from pyglet import profiler
 
 
 class PlatformEventLoop:
@@ -87,6 +89,135 @@ class PlatformEventLoop:
         pass
 
 
+class FramePacer:
+
+    """Waits for frame deadlines, sleeping for most of the wait and spinning
+    for the remainder.
+
+    Sleeping usually overshoots the requested duration, by an amount that
+    varies with the platform and system load.  The pacer keeps the most
+    recent overshoots in a ring buffer, and before each deadline sleeps for
+    the time remaining less a high percentile of them; the rest of the wait
+    is spent spinning until the deadline.  The spin is limited to
+    `max_spin` seconds, so that a system with very erratic sleeps misses
+    some deadlines instead of busy-waiting through most of each frame.
+
+    Set `EventLoop.pacer` to a `FramePacer` to have the event loop wait with
+    it::
+
+        pyglet.app.event_loop.pacer = pyglet.app.FramePacer()
+        pyglet.app.run()
+
+    :Ivariables:
+        `frames` : int
+            Number of deadlines waited for.
+        `missed_frames` : int
+            Number of deadlines the wait ended more than `tolerance`
+            seconds after.
+        `sleeps` : int
+            Number of sleeps that lasted the duration requested, and whose
+            overshoot was recorded.
+        `spin_time` : float
+            Total time spent spinning, in seconds.
+        `overshoot` : `pyglet.profiler.SpanStats`
+            The most recent sleep overshoots.
+
+    :since: pyglet 1.2
+    """
+
+    def __init__(self, time_function=time.perf_counter,
+                 sleep_function=time.sleep, history=64, percentile=95.,
+                 max_spin=0.004, tolerance=0.001):
+        """Create a frame pacer.
+
+        :Parameters:
+            `time_function` : function
+                Function returning the current time in seconds.
+            `sleep_function` : function
+                Function sleeping for a duration in seconds.  It may return
+                True to indicate that it returned early because of events,
+                as `PlatformEventLoop.step` does.
+            `history` : int
+                Number of sleep overshoots kept.
+            `percentile` : float
+                Percentile of the overshoots subtracted from each sleep.
+            `max_spin` : float
+                Longest time, in seconds, spent spinning before a deadline.
+            `tolerance` : float
+                Time after a deadline, in seconds, at which it is counted as
+                missed.
+
+        """
+        self.time_function = time_function
+        self.sleep_function = sleep_function
+        self.percentile = percentile
+        self.max_spin = max_spin
+        self.tolerance = tolerance
+        self.overshoot = profiler.SpanStats('sleep overshoot', 'app', history)
+        self.frames = 0
+        self.missed_frames = 0
+        self.sleeps = 0
+        self.spin_time = 0.
+
+    def get_sleep_margin(self):
+        """Get the time to spin for at the end of each wait.
+
+        :rtype: float
+        """
+        return min(self.overshoot.get_percentile(self.percentile),
+                   self.max_spin)
+
+    def wait(self, timeout, sleep_function=None):
+        """Wait until `timeout` seconds from now.
+
+        :Parameters:
+            `timeout` : float
+                Time until the deadline, in seconds.
+            `sleep_function` : function
+                Function to sleep with, instead of `sleep_function` given
+                to the constructor.
+
+        :rtype: bool
+        :return: True if the deadline was reached, or False if the sleep
+            returned early because of events.
+        """
+        time = self.time_function
+        sleep = sleep_function or self.sleep_function
+        start = time()
+        deadline = start + timeout
+
+        duration = timeout - self.get_sleep_margin()
+        if duration > 0.:
+            if sleep(duration):
+                return False
+            now = time()
+            self.overshoot.add(max(now - start - duration, 0.))
+            self.sleeps += 1
+        else:
+            now = start
+
+        spin_start = now
+        while now < deadline:
+            sleep(0.)
+            now = time()
+        self.spin_time += now - spin_start
+
+        self.frames += 1
+        if now - deadline > self.tolerance:
+            self.missed_frames += 1
+        return True
+
+    def reset(self):
+        """Discard the recorded overshoots and reset the counters."""
+        self.overshoot = profiler.SpanStats(
+            self.overshoot.name, self.overshoot.category,
+            self.overshoot._history)
+        self.frames = 0
+        self.missed_frames = 0
+        self.sleeps = 0
+        self.spin_time = 0.
+
+
 class EventLoop(event.EventDispatcher):
 
     """The main run loop of the application.
@@ -101,10 +232,18 @@ class EventLoop(event.EventDispatcher):
     in some other way.  You should not in general override `run`, as
     this method contains platform-specific code that ensures the application
     remains responsive to the user while keeping CPU usage to a minimum.
+
+    :Ivariables:
+        `pacer` : `FramePacer`
+            If set before calling `run`, the run loop waits for each
+            deadline returned by `idle` with this pacer, for more accurate
+            frame timing at the cost of some spinning.
+
     """
 
     _has_exit_condition = None
     _has_exit = False
+    pacer = None
 
     def __init__(self):
         self._has_exit_condition = threading.Condition()
@@ -127,7 +266,9 @@ class EventLoop(event.EventDispatcher):
         self.dispatch_event('on_enter')
 
         self.is_running = True
-        if int(platform.win32_ver()[0]) <= 5:
+        if self.pacer is not None:
+            self._run_paced()
+        elif int(platform.win32_ver()[0]) <= 5:
             self._run_estimated()
         else:
             self._run()
@@ -146,6 +287,21 @@ class EventLoop(event.EventDispatcher):
         while not self.has_exit:
             step(idle())
 
+    def _run_paced(self):
+        """Run-loop that waits for each timeout with `pacer`, sleeping on
+        the platform event loop and spinning to the deadline.
+        """
+        platform_event_loop = app.platform_event_loop
+        idle = self.idle
+        step = platform_event_loop.step
+        wait = self.pacer.wait
+        while not self.has_exit:
+            timeout = idle()
+            if timeout is None:
+                step(None)
+            else:
+                wait(timeout, step)
+
     def _run_estimated(self):
         """Run-loop that continually estimates function mapping requested
         timeout to measured timeout using a least-squares linear regression.
@@ -269,16 +425,17 @@ class EventLoop(event.EventDispatcher):
         :return: The number of seconds before the idle method
                  should be called again, or `None` to block for user input.
         """
-        self.clock.tick()
-        redraw_all = True
-
-        # Redraw all windows
-        for window in app.windows:
-            if redraw_all or (window._legacy_invalid and window.invalid):
-                window.switch_to()
-                window.dispatch_event('on_draw')
-                window.flip()
-                window._legacy_invalid = False
+        with profiler.get_default().span('EventLoop.idle', 'app'):
+            self.clock.tick()
+            redraw_all = True
+
+            # Redraw all windows
+            for window in app.windows:
+                if redraw_all or (window._legacy_invalid and window.invalid):
+                    window.switch_to()
+                    window.dispatch_event('on_draw')
+                    window.flip()
+                    window._legacy_invalid = False
 
         sleep_time = self.clock.get_sleep_time()
         #app.platform_event_loop.sleep(sleep_time)
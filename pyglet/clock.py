@@ -79,6 +79,37 @@ to write a short function that does accept dt. For Example::
     Clock.schedule_once(lambda dt: no_args_func(), 0.5)
 
 
+Fixed timesteps
+===============
+
+Simulations such as physics are usually stepped by a constant amount of time,
+however irregularly the clock is ticked.  `schedule_fixed` accumulates the
+elapsed time and calls a function once for each whole step, always passing the
+step as ``dt``::
+
+    def update_physics(dt):
+        world.step(dt)              # dt is always exactly 1/120
+
+    physics = clock.schedule_fixed(update_physics, 1/120.)
+
+When the clock falls far behind, at most `Scheduler.max_fixed_steps` steps are
+run per tick and the rest of the time is dropped, so that a slow frame cannot
+cause ever more steps in the following ones.  The fraction of a step left
+over is available as the ``alpha`` of the returned item, for interpolating
+between the last two simulated states when rendering::
+
+    def on_draw():
+        x = previous_x + (current_x - previous_x) * physics.alpha
+
+`schedule_fixed_batch` instead calls the function once per tick with the
+number of steps due, for simulations that can advance several steps at once
+more cheaply than in as many Python calls::
+
+    def update_particles(dt, count):
+        particles.advance(dt * count)
+
+    clock.schedule_fixed_batch(update_particles, 1/120.)
+
 Using multiple clocks
 =====================
 
@@ -94,6 +125,10 @@ import time
 from operator import attrgetter
 from heapq import heappush, heapify, heappop, heappushpop
 
+from pyglet import profiler
+
+_profiler = profiler.get_default()
+
 
 class ScheduledItem:
     """ A class that describes a scheduled callback.
@@ -123,10 +158,84 @@ class ScheduledItem:
             return self.next_ts < other
 
 
+class FixedStepItem:
+    """A callback scheduled with a fixed timestep.
+
+    This class is never created by the user; pyglet creates and returns an
+    instance of this class from `Scheduler.schedule_fixed` and
+    `Scheduler.schedule_fixed_batch`.
+
+    :Ivariables:
+        `step` : float
+            Duration of each step, in seconds.
+        `max_steps` : int
+            Greatest number of steps run in one tick.
+        `accumulator` : float
+            Elapsed time not yet simulated, in seconds; always less than
+            `step` after a tick.
+        `steps` : int
+            Number of steps run since the item was scheduled.
+        `dropped_steps` : int
+            Number of steps skipped because more than `max_steps` were due
+            in one tick.
+
+    """
+    __slots__ = ['func', 'step', 'args', 'kwargs', 'batch', 'max_steps',
+                 'last_ts', 'accumulator', 'steps', 'dropped_steps', 'active']
+
+    def __init__(self, func, step, args, kwargs, batch, max_steps, last_ts):
+        self.func = func
+        self.step = step
+        self.args = args
+        self.kwargs = kwargs
+        self.batch = batch
+        self.max_steps = max_steps
+        self.last_ts = last_ts
+        self.accumulator = 0.
+        self.steps = 0
+        self.dropped_steps = 0
+        self.active = True
+
+    @property
+    def alpha(self):
+        """Fraction of a step elapsed since the last step, between 0 and 1.
+
+        Rendering can interpolate between the states before and after the
+        last step by this amount.
+
+        :type: float
+        """
+        return self.accumulator / self.step
+
+    def advance(self, now):
+        """Accumulate the time elapsed until `now` and return the number of
+        steps due.
+
+        :rtype: int
+        """
+        accumulator = self.accumulator + now - self.last_ts
+        self.last_ts = now
+        step = self.step
+        # Allow for rounding error, so that elapsed time of exactly a
+        # whole number of steps is not short by one step.
+        count = int(accumulator / step + 1e-6)
+        accumulator = max(accumulator - count * step, 0.)
+        if count > self.max_steps:
+            self.dropped_steps += count - self.max_steps
+            count = self.max_steps
+        self.accumulator = accumulator
+        self.steps += count
+        return count
+
+
 class Scheduler:
     """Class for scheduling functions.
     """
 
+    #: Greatest number of steps run in one tick for each function scheduled
+    #: with `schedule_fixed` or `schedule_fixed_batch`.
+    max_fixed_steps = 5
+
     def __init__(self, time_function=time.perf_counter):
         """Initialise a Clock, with optional custom time function.
 
@@ -144,6 +253,7 @@ class Scheduler:
         self._times = collections.deque(maxlen=10)
         self._scheduled_items = list()
         self._every_tick_items = list()
+        self._fixed_items = list()
         self.cumulative_time = 0
 
     def _get_nearest_ts(self):
@@ -304,6 +414,61 @@ class Scheduler:
         item = ScheduledItem(func, args, kwargs, last_ts, next_ts, interval)
         heappush(self._scheduled_items, item)
 
+    def schedule_fixed(self, func, step, *args, **kwargs):
+        """Schedule a function to be called once for each `step` seconds
+        elapsed.
+
+        Elapsed time is accumulated across ticks, and the function is called
+        as many times in each tick as there are whole steps due, up to
+        `max_fixed_steps`.  The function is always passed `step` as ``dt``,
+        so that simulations advance deterministically.
+
+        The callback function prototype is the same as for `schedule`.
+
+        :since: pyglet 1.2
+
+        :Parameters:
+            `func` : function
+                The function to call each step.
+            `step` : float
+                The number of seconds simulated by each call.
+
+        :rtype: `FixedStepItem`
+        :return: The scheduled item, whose `FixedStepItem.alpha` gives the
+            fraction of a step left over after each tick.
+        """
+        item = FixedStepItem(func, step, args, kwargs, False,
+                             self.max_fixed_steps, self._time())
+        self._fixed_items.append(item)
+        return item
+
+    def schedule_fixed_batch(self, func, step, *args, **kwargs):
+        """Schedule a function to be called once per tick with the number of
+        `step` second steps elapsed.
+
+        This is the same as `schedule_fixed`, except that the steps due in a
+        tick are passed to a single call, after ``dt``::
+
+            def callback(dt, count, *args, **kwargs):
+                pass
+
+        The function is not called in ticks with no steps due.
+
+        :since: pyglet 1.2
+
+        :Parameters:
+            `func` : function
+                The function to call each tick with steps due.
+            `step` : float
+                The number of seconds simulated by each step.
+
+        :rtype: `FixedStepItem`
+        """
+        item = FixedStepItem(func, step, args, kwargs, True,
+                             self.max_fixed_steps, self._time())
+        self._fixed_items.append(item)
+        return item
+
     def tick(self):
         """Cause clock to update self and call scheduled functions.
 
@@ -379,13 +544,43 @@ class Scheduler:
         scheduled_items = self._scheduled_items
         now = self._last_ts
         result = False  # flag indicates if any function was called
+        profile = _profiler.enabled
 
         # handle items scheduled for every tick
         if self._every_tick_items:
             result = True
             # duplicate list in case event unschedules itself
             for item in list(self._every_tick_items):
-                item.func(dt, *item.args, **item.kwargs)
+                if profile:
+                    _profiler.call(item.func, (dt,) + item.args, item.kwargs,
+                                   'clock')
+                else:
+                    item.func(dt, *item.args, **item.kwargs)
+
+        # handle items scheduled with a fixed timestep
+        if self._fixed_items:
+            for item in list(self._fixed_items):
+                count = item.advance(now)
+                if not count:
+                    continue
+                result = True
+                if item.batch:
+                    if profile:
+                        _profiler.call(item.func,
+                                       (item.step, count) + item.args,
+                                       item.kwargs, 'clock')
+                    else:
+                        item.func(item.step, count, *item.args, **item.kwargs)
+                    continue
+                for _ in range(count):
+                    # stop if unscheduled by a previous step
+                    if not item.active:
+                        break
+                    if profile:
+                        _profiler.call(item.func, (item.step,) + item.args,
+                                       item.kwargs, 'clock')
+                    else:
+                        item.func(item.step, *item.args, **item.kwargs)
 
         # check the next scheduled item that is not called each tick
         # if it is scheduled in the future, then exit
@@ -421,7 +616,11 @@ class Scheduler:
                 break
 
             # execute the callback
-            item.func(now - item.last_ts, *item.args, **item.kwargs)
+            if profile:
+                _profiler.call(item.func, (now - item.last_ts,) + item.args,
+                               item.kwargs, 'clock')
+            else:
+                item.func(now - item.last_ts, *item.args, **item.kwargs)
 
             if item.interval:
                 # this item needs to be pushed back onto the heap
@@ -469,11 +668,17 @@ class Scheduler:
         if self._every_tick_items:
             return 0
 
-        try:
+        next_ts = None
+        if self._scheduled_items:
             next_ts = self._scheduled_items[0].next_ts
-            return max(next_ts - self._time(), 0.)
-        except IndexError:
+        for item in self._fixed_items:
+            ts = item.last_ts + item.step - item.accumulator
+            if next_ts is None or ts < next_ts:
+                next_ts = ts
+
+        if next_ts is None:
             return None
+        return max(next_ts - self._time(), 0.)
 
     def unschedule(self, func):
         """Remove a function from the schedule.
@@ -494,6 +699,11 @@ class Scheduler:
 
         self._every_tick_items = [i for i in self._every_tick_items if i.func is not func]
 
+        for item in self._fixed_items:
+            if item.func is func:
+                item.active = False
+        self._fixed_items = [i for i in self._fixed_items if i.active]
+
 
 class Clock(Scheduler):
     """Schedules stuff like a Scheduler, and includes time limiting functions
@@ -135,8 +135,13 @@ Not all event dispatchers require the call to ``dispatch_events``; check with
 the particular class documentation.
 
 """
+import functools
 import inspect
 
+from pyglet import profiler
+
+_profiler = profiler.get_default()
+
 EVENT_HANDLED = True
 EVENT_UNHANDLED = None
 
@@ -469,3 +474,27 @@ class EventDispatcher:
                 self.set_handler(name, func)
                 return func
             return decorator
+
+
+# While profiling is enabled, each event dispatched is timed by swapping in
+# an instrumented `EventDispatcher.dispatch_event`, so that the method costs
+# nothing extra otherwise.  Platform windows call it through the class.
+_dispatch_event = EventDispatcher.dispatch_event
+
+
+@functools.wraps(_dispatch_event)
+def _profiled_dispatch_event(self, event_type, *args):
+    start = _profiler.begin()
+    try:
+        return _dispatch_event(self, event_type, *args)
+    finally:
+        _profiler.end(event_type, 'event', start)
+
+
+def _instrument_dispatch_event(enabled):
+    if enabled:
+        EventDispatcher.dispatch_event = _profiled_dispatch_event
+    else:
+        EventDispatcher.dispatch_event = _dispatch_event
+
+_profiler.add_toggle_handler(_instrument_dispatch_event)
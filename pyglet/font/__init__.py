@@ -102,9 +102,56 @@ else:
     _font_class = FreeTypeFont
 
 
+#: Number of most recently used fonts kept alive by `load`, in each OpenGL
+#: object space, even when the application holds no reference to them.  Fonts
+#: are otherwise created again the next time they are loaded.
+hold_size = 3
+
+# Results of `have_font`, for all fonts in the process.  Cleared when font
+# data is added.
+_have_font_cache = dict()
+
+
 def have_font(name):
     """Check if specified system font name is available."""
-    return _font_class.have_font(name)
+    try:
+        return _have_font_cache[name]
+    except KeyError:
+        result = _have_font_cache[name] = _font_class.have_font(name)
+        return result
+
+
+def _find_name(name):
+    # Find first matching name
+    if type(name) in (tuple, list):
+        for n in name:
+            if have_font(n):
+                return n
+        return None
+    return name
+
+
+def preload(descriptors):
+    """Look up fonts ahead of time, for example at startup.
+
+    The fonts are matched to the fonts on the system, and the result kept
+    for the whole process, so that loading them later, in any OpenGL
+    context, is faster.  No OpenGL context is required.  Not all platforms
+    benefit from this.
+
+    :Parameters:
+        `descriptors` : iterable of tuple
+            Fonts to look up, each given as a tuple ``(name, size, bold,
+            italic)`` of arguments to `load`.  Trailing items can be
+            omitted.
+
+    """
+    for descriptor in descriptors:
+        name, size, bold, italic = tuple(descriptor) + \
+            (None, None, False, False)[len(descriptor):]
+        if size is None:
+            size = 12
+        _font_class.preload(_find_name(name), size, bold, italic)
 
 
 def load(name=None, size=None, bold=False, italic=False, dpi=None):
@@ -139,14 +186,7 @@ def load(name=None, size=None, bold=False, italic=False, dpi=None):
     if dpi is None:
         dpi = 96
 
-    # Find first matching name
-    if type(name) in (tuple, list):
-        for n in name:
-            if _font_class.have_font(n):
-                name = n
-                break
-        else:
-            name = None
+    name = _find_name(name)
 
     # Locate or create font cache
     shared_object_space = gl.current_context.object_space
@@ -159,26 +199,28 @@ def load(name=None, size=None, bold=False, italic=False, dpi=None):
 
     # Look for font name in font cache
     descriptor = (name, size, bold, italic, dpi)
-    if descriptor in font_cache:
-        return font_cache[descriptor]
-
-    # Not in cache, create from scratch
-    font = _font_class(name, size, bold=bold, italic=italic, dpi=dpi)
-
-    # Save parameters for new-style layout classes to recover
-    font.name = name
-    font.size = size
-    font.bold = bold
-    font.italic = italic
-    font.dpi = dpi
-
-    # Cache font in weak-ref dictionary to avoid reloading while still in use
-    font_cache[descriptor] = font
-
-    # Hold onto refs of last three loaded fonts to prevent them being
+    font = font_cache.get(descriptor)
+    if font is None:
+        # Not in cache, create from scratch
+        font = _font_class(name, size, bold=bold, italic=italic, dpi=dpi)
+
+        # Save parameters for new-style layout classes to recover
+        font.name = name
+        font.size = size
+        font.bold = bold
+        font.italic = italic
+        font.dpi = dpi
+
+        # Cache font in weak-ref dictionary to avoid reloading while still in
+        # use
+        font_cache[descriptor] = font
+
+    # Hold onto refs of the most recently used fonts to prevent them being
     # collected if momentarily dropped.
-    del font_hold[3:]
+    if font in font_hold:
+        font_hold.remove(font)
     font_hold.insert(0, font)
+    del font_hold[hold_size:]
 
     return font
 
@@ -204,6 +246,7 @@ def add_file(font):
     if hasattr(font, 'read'):
         font = font.read()
     _font_class.add_font_data(font)
+    _have_font_cache.clear()
 
 
 def add_directory(dir):
@@ -39,102 +39,173 @@ in `pyglet.font` to obtain platform-specific instances.  You can use these
 classes as a documented interface to the concrete classes.
 """
 
+import bisect
 import unicodedata
+import weakref
+from array import array
+from collections import OrderedDict
 
 from pyglet.gl import *
 from pyglet import image
-
-_other_grapheme_extend = \
-    list(map(chr, [0x09be, 0x09d7, 0x0be3, 0x0b57, 0x0bbe, 0x0bd7, 0x0cc2,
-                   0x0cd5, 0x0cd6, 0x0d3e, 0x0d57, 0x0dcf, 0x0ddf, 0x200c,
-                   0x200d, 0xff9e, 0xff9f]))  # skip codepoints above U+10000
-_logical_order_exception = \
-    list(map(chr, list(range(0xe40, 0xe45)) + list(range(0xec0, 0xec4))))
-
-_grapheme_extend = lambda c, cc: \
-    cc in ('Me', 'Mn') or c in _other_grapheme_extend
-
-_CR = '\u000d'
-_LF = '\u000a'
-_control = lambda c, cc: cc in ('ZI', 'Zp', 'Cc', 'Cf') and not \
-    c in list(map(chr, [0x000d, 0x000a, 0x200c, 0x200d]))
-_extend = lambda c, cc: _grapheme_extend(c, cc) or \
-    c in list(map(chr, [0xe30, 0xe32, 0xe33, 0xe45, 0xeb0, 0xeb2, 0xeb3]))
-_prepend = lambda c, cc: c in _logical_order_exception
-_spacing_mark = lambda c, cc: cc == 'Mc' and c not in _other_grapheme_extend
+from pyglet.image import atlas
+
+# Grapheme cluster break properties of UAX #29, as used by
+# get_grapheme_clusters.
+(_OTHER, _CR, _LF, _CONTROL, _EXTEND, _SPACING_MARK, _PREPEND,
+ _L, _V, _T, _LV, _LVT) = range(12)
+
+_other_grapheme_extend = frozenset(
+    [0x09be, 0x09d7, 0x0be3, 0x0b57, 0x0bbe, 0x0bd7, 0x0cc2, 0x0cd5, 0x0cd6,
+     0x0d3e, 0x0d57, 0x0dcf, 0x0ddf, 0x200c, 0x200d, 0xff9e, 0xff9f])
+_thai_lao_extend = frozenset([0xe30, 0xe32, 0xe33, 0xe45, 0xeb0, 0xeb2, 0xeb3])
+
+# Sorted, non-overlapping (first, last, property) codepoint ranges of the
+# properties not derived from the general category.
+_property_ranges = [
+    (0x0e40, 0x0e44, _PREPEND),
+    (0x0ec0, 0x0ec3, _PREPEND),
+    (0x1100, 0x115f, _L),
+    (0x1160, 0x11a7, _V),
+    (0x11a8, 0x11ff, _T),
+    (0xa960, 0xa97c, _L),
+    (0xac00, 0xd7a3, _LV),  # LV or LVT; see _get_property
+    (0xd7b0, 0xd7c6, _V),
+    (0xd7cb, 0xd7fb, _T),
+]
+_property_range_starts = [r[0] for r in _property_ranges]
+
+
+def _get_property(c):
+    """Return the grapheme cluster break property of character `c`."""
+    if c == '\r':
+        return _CR
+    if c == '\n':
+        return _LF
+
+    codepoint = ord(c)
+    i = bisect.bisect_right(_property_range_starts, codepoint) - 1
+    if i >= 0:
+        first, last, prop = _property_ranges[i]
+        if codepoint <= last:
+            if prop == _LV and (codepoint - first) % 28:
+                return _LVT
+            return prop
+
+    category = unicodedata.category(c)
+    if category in ('Zl', 'Zp', 'Cc', 'Cf') and \
+            codepoint not in (0x200c, 0x200d):
+        return _CONTROL
+    if category in ('Me', 'Mn') or codepoint in _other_grapheme_extend or \
+            codepoint in _thai_lao_extend:
+        return _EXTEND
+    if category == 'Mc':
+        return _SPACING_MARK
+    return _OTHER
+
+
+class _PropertyTable(dict):
+    """Map from codepoint to the character whose ordinal is its grapheme
+    cluster break property, for use with `str.translate`.  Entries are
+    computed the first time each character is seen."""
+
+    def __missing__(self, codepoint):
+        prop = self[codepoint] = chr(_get_property(chr(codepoint)))
+        return prop
+
+_property_table = _PropertyTable()
+
+
+def _create_join_table(hangul):
+    """Return a table, indexed by ``left * 16 + right``, that is true where
+    there is no grapheme cluster boundary between characters with the left
+    and right properties."""
+    table = bytearray(16 * 16)
+    for left in range(12):
+        for right in range(12):
+            if left == _CR and right == _LF:                      # GB3
+                join = True
+            elif left == _CONTROL or right == _CONTROL:           # GB4, GB5
+                join = False
+            elif hangul and (
+                    (left == _L and right in (_L, _V, _LV, _LVT)) or  # GB6
+                    (left in (_LV, _V) and right in (_V, _T)) or     # GB7
+                    (left in (_LVT, _T) and right == _T)):           # GB8
+                join = True
+            elif right in (_EXTEND, _SPACING_MARK):               # GB9, GB9a
+                join = True
+            elif left == _PREPEND:                                # GB9b
+                join = True
+            else:                                                 # GB10
+                join = False
+            table[left * 16 + right] = join
+    return bytes(table)
+
+_join_table = _create_join_table(False)
+_hangul_join_table = _create_join_table(True)
 
 
 def _grapheme_break(left, right):
+    """Return True if there is a grapheme cluster boundary between the
+    characters `left` and `right`.  `left` is None at the start of text."""
     # GB1
     if left is None:
         return True
+    left_prop = ord(_property_table[ord(left)])
+    right_prop = ord(_property_table[ord(right)])
+    return not _join_table[left_prop * 16 + right_prop]
 
-    # GB2 not required, see end of get_grapheme_clusters
-
-    # GB3
-    if left == _CR and right == _LF:
-        return False
-
-    left_cc = unicodedata.category(left)
-
-    # GB4
-    if _control(left, left_cc):
-        return True
-
-    right_cc = unicodedata.category(right)
-
-    # GB5
-    if _control(right, right_cc):
-        return True
-
-    # GB6, GB7, GB8 not implemented
 
-    # GB9
-    if _extend(right, right_cc):
-        return False
-
-    # GB9a
-    if _spacing_mark(right, right_cc):
-        return False
-
-    # GB9b
-    if _prepend(left, left_cc):
-        return False
-
-    # GB10
-    return True
-
-
-def get_grapheme_clusters(text):
+def get_grapheme_clusters(text, hangul=False):
     """Implements Table 2 of UAX #29: Grapheme Cluster Boundaries.
 
-    Does not currently implement Hangul syllable rules.
+    Hangul syllable rules (GB6 to GB8) are applied only if `hangul` is
+    True.
+
+    Each character of `text` is classified by a table built up as new
+    characters are seen.  Text consisting only of characters below U+0300,
+    none of which combine, is split without classifying it.
 
     :Parameters:
         `text` : unicode
             String to cluster.
+        `hangul` : bool
+            If True, Hangul jamo are clustered into syllables.
 
     :since: pyglet 1.1.2
 
     :rtype: List of `unicode`
     :return: List of Unicode grapheme clusters
     """
+    if not text or max(text) < '\u0300':
+        # Only GB3 applies: every character is its own cluster, except
+        # that CR LF is kept together.
+        clusters = list(text)
+        if '\r\n' in text:
+            for i in range(len(clusters) - 1):
+                if clusters[i] == '\r' and clusters[i + 1] == '\n':
+                    clusters[i] = '\u200b'
+                    clusters[i + 1] = '\r\n'
+        return clusters
+
+    props = text.translate(_property_table).encode('latin-1')
+    join_table = _hangul_join_table if hangul else _join_table
+
+    # A cluster of n characters is returned as n - 1 zero-width spaces
+    # followed by the cluster, to keep len(clusters) == len(text).
     clusters = list()
-    cluster = ''
-    left = None
-    for right in text:
-        if cluster and _grapheme_break(left, right):
-            clusters.append(cluster)
-            cluster = ''
-        elif cluster:
-            # Add a zero-width space to keep len(clusters) == len(text)
-            clusters.append('\u200b')
-        cluster += right
-        left = right
-
-    # GB2
-    if cluster:
-        clusters.append(cluster)
+    start = 0
+    left = props[0] * 16
+    for i in range(1, len(text)):
+        right = props[i]
+        if not join_table[left + right]:
+            if i - start > 1:
+                clusters.extend('\u200b' * (i - start - 1))
+            clusters.append(text[start:i])
+            start = i
+        left = right * 16
+    if len(text) - start > 1:
+        clusters.extend('\u200b' * (len(text) - start - 1))
+    clusters.append(text[start:])
     return clusters
 
 
@@ -151,11 +222,27 @@ class Glyph(image.TextureRegion):
         `vertices` : (int, int, int, int)
             The vertices of this glyph, with (0,0) originating at the
             left-side bearing at the baseline.
+        `quad` : tuple of int
+            The x and y of the four corners of this glyph, counter-clockwise
+            from the bottom-left, relative to the same origin as `vertices`.
+        `tex_coords_data` : bytes
+            `tex_coords` as 32-bit floats, ready to be copied into a vertex
+            buffer.
 
     """
 
     advance = 0
     vertices = (0, 0, 0, 0)
+    quad = (0, 0, 0, 0, 0, 0, 0, 0)
+
+    @property
+    def tex_coords(self):
+        return self._tex_coords
+
+    @tex_coords.setter
+    def tex_coords(self, tex_coords):
+        self._tex_coords = tex_coords
+        self.tex_coords_data = array('f', tex_coords).tobytes()
 
     def set_bearings(self, baseline, left_side_bearing, advance):
         """Set metrics for this glyph.
@@ -176,6 +263,8 @@ class Glyph(image.TextureRegion):
             -baseline,
             left_side_bearing + self.width,
             -baseline + self.height)
+        v0, v1, v2, v3 = self.vertices
+        self.quad = (v0, v1, v2, v1, v2, v3, v0, v3)
 
     def draw(self):
         """Debug method.
@@ -210,11 +299,12 @@ class Glyph(image.TextureRegion):
 class GlyphTextureAtlas(image.Texture):
 
     """A texture within which glyphs can be drawn.
+
+    Glyphs are packed with a `SkylineAllocator`, leaving a one pixel gap
+    between neighbouring glyphs.
     """
     region_class = Glyph
-    x = 0
-    y = 0
-    line_height = 0
+    allocator = None
 
     def apply_blend_state(self):
         """Set the OpenGL blend state for the glyphs in this texture.
@@ -233,21 +323,147 @@ class GlyphTextureAtlas(image.Texture):
         :return: The glyph representing the image from this texture, or None
             if the image doesn't fit.
         """
-        if self.x + image.width > self.width:
-            self.x = 0
-            self.y += self.line_height + 1
-            self.line_height = 0
-        if self.y + image.height > self.height:
+        if self.allocator is None:
+            self.allocator = atlas.SkylineAllocator(self.width, self.height)
+        if image.width == 0 or image.height == 0:
+            return self.get_region(0, 0, image.width, image.height)
+
+        try:
+            x, y = self.allocator.alloc(image.width + 1, image.height + 1)
+        except atlas.AllocatorException:
             return None
-
-        self.line_height = max(self.line_height, image.height)
-        region = self.get_region(
-            self.x, self.y, image.width, image.height)
-        if image.width > 0:
-            region.blit_into(image, 0, 0, 0)
-            self.x += image.width + 1
+        region = self.get_region(x, y, image.width, image.height)
+        region.blit_into(image, 0, 0, 0)
         return region
 
+    def clear(self):
+        """Free the whole texture for new glyphs.
+
+        Glyphs already placed in the texture are overwritten as new glyphs
+        are fit, so they must no longer be drawn.
+        """
+        if self.allocator is not None:
+            self.allocator.clear()
+
+    def get_usage(self):
+        """Get the fraction of the texture's area occupied by glyphs.
+
+        :rtype: float
+        """
+        if self.allocator is None:
+            return 0.
+        return self.allocator.get_usage()
+
+
+class GlyphCache:
+
+    """The glyphs rendered by a font, keyed by the text they represent.
+
+    Glyphs are kept in order of use.  When `max_size` is set, the least
+    recently used glyphs are evicted to keep the cache within that many
+    glyphs.  Glyphs already returned to
+    layouts remain valid after they are evicted; an evicted glyph is simply
+    rendered again the next time it is needed.
+
+    :Ivariables:
+        `max_size` : int
+            Maximum number of glyphs to keep, or None for no limit.
+        `hits` : int
+            Number of lookups that found a cached glyph.
+        `misses` : int
+            Number of lookups that had to render a glyph.
+        `evictions` : int
+            Number of glyphs evicted to stay within `max_size`, or because
+            the texture holding them was reused.
+
+    """
+
+    def __init__(self, font, max_size=None):
+        # Don't keep the font alive, so that fonts no longer used are freed
+        # promptly; see `pyglet.font.load`.
+        self.font = weakref.proxy(font)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._glyphs = OrderedDict()
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    def __contains__(self, text):
+        return text in self._glyphs
+
+    def __getitem__(self, text):
+        glyph = self._glyphs[text]
+        self._glyphs.move_to_end(text)
+        return glyph
+
+    def __setitem__(self, text, glyph):
+        old_glyph = self._glyphs.pop(text, None)
+        if old_glyph is not None:
+            self.font._release_glyph(old_glyph)
+        self._glyphs[text] = glyph
+        self.font._retain_glyph(glyph)
+        if self.max_size is not None:
+            while len(self._glyphs) > self.max_size:
+                _, evicted = self._glyphs.popitem(last=False)
+                self.evictions += 1
+                self.font._release_glyph(evicted)
+
+    def get(self, text):
+        """Get the glyph for `text`, or None if it is not cached.  Counts
+        as a hit or a miss."""
+        glyph = self._glyphs.get(text)
+        if glyph is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._glyphs.move_to_end(text)
+        return glyph
+
+    def get_least_recently_used(self, textures):
+        """Get the one of `textures` whose glyphs were least recently used.
+
+        A texture holding no cached glyph is always the least recently used.
+
+        :rtype: `GlyphTextureAtlas`
+        """
+        remaining = set(textures)
+        for glyph in reversed(self._glyphs.values()):
+            if len(remaining) == 1:
+                break
+            remaining.discard(getattr(glyph, 'owner', None))
+        for texture in textures:
+            if texture in remaining:
+                return texture
+
+    def evict_texture(self, texture):
+        """Evict all glyphs drawn in `texture`.
+
+        :rtype: int
+        :return: The number of glyphs evicted.
+        """
+        evicted = [(text, glyph) for text, glyph in self._glyphs.items()
+                   if getattr(glyph, 'owner', None) is texture]
+        for text, glyph in evicted:
+            del self._glyphs[text]
+            self.font._release_glyph(glyph)
+        self.evictions += len(evicted)
+        return len(evicted)
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups that found a cached glyph, or None if there
+        have been no lookups.
+
+        :type: float
+        """
+        lookups = self.hits + self.misses
+        if not lookups:
+            return None
+        return self.hits / float(lookups)
+
 
 class GlyphRenderer:
 
@@ -261,6 +477,14 @@ class GlyphRenderer:
         raise NotImplementedError('Subclass must override')
 
 
+def _get_handler(ref):
+    # Eviction handlers are held as weak references to bound methods, or as
+    # plain functions.
+    if isinstance(ref, weakref.WeakMethod):
+        return ref()
+    return ref
+
+
 class FontException(Exception):
 
     """Generic exception related to errors from the font module.  Typically
@@ -283,6 +507,9 @@ class Font:
             Maximum ascent above the baseline, in pixels.
         `descent` : int
             Maximum descent below the baseline, in pixels. Usually negative.
+        `texture_evictions` : int
+            Number of times a texture was cleared to make room for new
+            glyphs.  See `max_textures`.
     """
     texture_width = 256
     texture_height = 256
@@ -295,9 +522,29 @@ class Font:
     glyph_renderer_class = GlyphRenderer
     texture_class = GlyphTextureAtlas
 
+    #: Maximum number of glyphs each font keeps rendered, or None for no
+    #: limit.  See `GlyphCache`.
+    max_glyphs = None
+
+    #: Maximum number of textures each font packs glyphs into, or None for
+    #: no limit.  Once reached, the texture whose glyphs were least recently
+    #: used is cleared and reused, and the eviction handlers are notified so
+    #: that layouts drawing those glyphs can get them again.  Textures
+    #: holding glyphs returned by the current `get_glyphs` call are never
+    #: reused; if every texture does, another is added beyond the limit.
+    max_textures = None
+
+    # Textures holding glyphs of the current `get_glyphs` or
+    # `get_glyphs_for_width` call.
+    _pinned_textures = ()
+
     def __init__(self):
         self.textures = list()
-        self.glyphs = dict()
+        self.glyphs = GlyphCache(self, self.max_glyphs)
+        self.texture_evictions = 0
+        # Number of cached glyphs on each texture.
+        self._texture_glyphs = dict()
+        self._eviction_handlers = list()
 
     @classmethod
     def add_font_data(cls, data):
@@ -313,6 +560,28 @@ class Font:
         """
         pass
 
+    @classmethod
+    def preload(cls, name, size, bold=False, italic=False):
+        """Look up a font ahead of time.
+
+        This is a class method, and does not require an OpenGL context.
+        Subclasses can override this method to cache, for the whole process,
+        the result of matching the font description to a font on the
+        system, so that creating the font later is faster.
+
+        :Parameters:
+            `name` : str
+                Font family, or None for the default font.
+            `size` : float
+                Size of the font, in points.
+            `bold` : bool
+                If True, look up the bold variant.
+            `italic` : bool
+                If True, look up the italic variant.
+
+        """
+        pass
+
     @classmethod
     def have_font(cls, name):
         """Determine if a font with the given name is installed.
@@ -347,6 +616,11 @@ class Font:
             glyph = texture.fit(image)
             if glyph:
                 break
+        if not glyph and self.max_textures is not None and \
+                len(self.textures) >= self.max_textures:
+            texture = self._evict_texture()
+            if texture:
+                glyph = texture.fit(image)
         if not glyph:
             if image.width > self.texture_width or \
                image.height > self.texture_height:
@@ -361,6 +635,9 @@ class Font:
                 texture = self.texture_class.create_for_size(GL_TEXTURE_2D,
                                                              self.texture_width, self.texture_height,
                                                              self.texture_internalformat)
+            # Drop textures that no cached glyph uses any more.
+            self.textures = [t for t in self.textures
+                             if t in self._texture_glyphs]
             self.textures.insert(0, texture)
             glyph = texture.fit(image)
         return glyph
@@ -379,18 +656,137 @@ class Font:
         """
         glyph_renderer = None
         glyphs = list()         # glyphs that are committed.
+        cache = self.glyphs
+        # Don't let rendering a glyph reuse the texture of one already
+        # returned.
+        pinned = self._pinned_textures = set()
         for c in get_grapheme_clusters(str(text)):
             # Get the glyph for 'c'.  Hide tabs (Windows and Linux render
             # boxes)
             if c == '\t':
                 c = ' '
-            if c not in self.glyphs:
+            glyph = cache.get(c)
+            if glyph is None:
                 if not glyph_renderer:
                     glyph_renderer = self.glyph_renderer_class(self)
-                self.glyphs[c] = glyph_renderer.render(c)
-            glyphs.append(self.glyphs[c])
+                glyph = cache[c] = glyph_renderer.render(c)
+            pinned.add(getattr(glyph, 'owner', None))
+            glyphs.append(glyph)
+        self._pinned_textures = ()
         return glyphs
 
+    def prepare(self, text):
+        """Render the glyphs for `text` ahead of time.
+
+        All glyphs not yet rendered are rendered together, so that text
+        using them can later be laid out without stalling.  This is useful
+        for large character sets, such as CJK text, that would otherwise be
+        rendered a few glyphs at a time as they are first displayed.
+
+        :Parameters:
+            `text` : str or iterable of str
+                Text whose glyphs to render, or a collection of characters
+                (for example, a set).
+
+        :rtype: int
+        :return: The number of glyphs rendered.
+        """
+        if isinstance(text, str):
+            clusters = set(get_grapheme_clusters(text))
+        else:
+            clusters = set(text)
+        clusters.discard('\t')
+        clusters.discard('\u200b')
+        missing = [c for c in clusters if c not in self.glyphs]
+        if missing:
+            glyph_renderer = self.glyph_renderer_class(self)
+            for c in missing:
+                self.glyphs[c] = glyph_renderer.render(c)
+        return len(missing)
+
+    def get_texture_usage(self):
+        """Get the fraction of the area of this font's textures occupied by
+        glyphs.
+
+        :rtype: float
+        """
+        area = sum(texture.width * texture.height for texture in self.textures)
+        if not area:
+            return 0.
+        used_area = sum(texture.get_usage() * texture.width * texture.height
+                        for texture in self.textures)
+        return used_area / area
+
+    def add_eviction_handler(self, handler):
+        """Call `handler` when glyphs are evicted from one of this font's
+        textures.
+
+        The handler is called as ``handler(font, texture)`` after `texture`
+        is cleared; any glyph of this font whose ``owner`` is `texture` must
+        be replaced, for example by calling `get_glyphs` again.  Bound
+        methods are only weakly referenced.
+
+        :Parameters:
+            `handler` : callable
+                Function to call.
+
+        """
+        if hasattr(handler, '__func__'):
+            handler = weakref.WeakMethod(handler)
+        if handler not in self._eviction_handlers:
+            self._eviction_handlers.append(handler)
+
+    def remove_eviction_handler(self, handler):
+        """Stop calling a handler added with `add_eviction_handler`.
+
+        :Parameters:
+            `handler` : callable
+                Function to stop calling.
+
+        """
+        self._eviction_handlers = [
+            ref for ref in self._eviction_handlers
+            if _get_handler(ref) not in (None, handler)]
+
+    def _evict_texture(self):
+        pinned = self._pinned_textures
+        textures = [t for t in self.textures if t not in pinned]
+        if not textures:
+            return None
+        texture = self.glyphs.get_least_recently_used(textures)
+        self.textures.remove(texture)
+        self.glyphs.evict_texture(texture)
+        texture.clear()
+        self.textures.insert(0, texture)
+        self.texture_evictions += 1
+
+        for ref in list(self._eviction_handlers):
+            handler = _get_handler(ref)
+            if handler is None:
+                self._eviction_handlers.remove(ref)
+            else:
+                handler(self, texture)
+        return texture
+
+    def _retain_glyph(self, glyph):
+        texture = getattr(glyph, 'owner', None)
+        self._texture_glyphs[texture] = \
+            self._texture_glyphs.get(texture, 0) + 1
+
+    def _release_glyph(self, glyph):
+        texture = getattr(glyph, 'owner', None)
+        count = self._texture_glyphs[texture] - 1
+        if count:
+            self._texture_glyphs[texture] = count
+            return
+
+        del self._texture_glyphs[texture]
+        # No cached glyph uses this texture any more: stop packing new
+        # glyphs into it, so it is released once layouts no longer use
+        # the glyphs they hold.  The newest texture is kept for reuse.
+        if texture in self.textures[1:]:
+            self.textures.remove(texture)
+
     def get_glyphs_for_width(self, text, width):
         """Return a list of glyphs for `text` that fit within the given width.
 
@@ -420,17 +816,21 @@ class Font:
         # next glyphs to be added, as soon as a BP is found
         glyph_buffer = list()
         glyphs = list()         # glyphs that are committed.
+        # Don't let rendering a glyph reuse the texture of one already
+        # returned.
+        pinned = self._pinned_textures = set()
         for c in text:
             if c == '\n':
                 glyphs += glyph_buffer
                 break
 
             # Get the glyph for 'c'
-            if c not in self.glyphs:
+            glyph = self.glyphs.get(c)
+            if glyph is None:
                 if not glyph_renderer:
                     glyph_renderer = self.glyph_renderer_class(self)
-                self.glyphs[c] = glyph_renderer.render(c)
-            glyph = self.glyphs[c]
+                glyph = self.glyphs[c] = glyph_renderer.render(c)
+            pinned.add(getattr(glyph, 'owner', None))
 
             # Add to holding buffer and measure
             glyph_buffer.append(glyph)
@@ -449,4 +849,5 @@ class Font:
         if len(glyphs) == 0:
             glyphs = glyph_buffer
 
+        self._pinned_textures = ()
         return glyphs
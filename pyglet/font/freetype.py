@@ -266,6 +266,10 @@ class FreeTypeFont(base.Font):
     # Map font (name, bold, italic) to FreeTypeMemoryFont
     _memory_fonts = dict()
 
+    # Map font (name, size, bold, italic) to the filename fontconfig matched,
+    # for all fonts in the process.
+    _font_files = dict()
+
     def __init__(self, name, size, bold=False, italic=False, dpi=None):
         super().__init__()
 
@@ -282,25 +286,41 @@ class FreeTypeFont(base.Font):
         # Use fontconfig to match the font (or substitute a default).
         ft_library = ft_get_library()
 
-        match = self.get_fontconfig_match(name, size, bold, italic)
+        f = FT_Face()
+        filename = self._font_files.get((name, size, bold, italic))
+        if filename is None:
+            filename = self._match_font_file(name, size, bold, italic, f)
+
+        if filename is not None:
+            result = FT_New_Face(ft_library, filename, 0, byref(f))
+            if result:
+                raise base.FontException('Could not load "%s": %d' %
+                                         (name, result))
+
+        self._set_face(f, size, dpi)
+
+    @classmethod
+    def _match_font_file(cls, name, size, bold, italic, face):
+        # Return the filename of the font fontconfig matches, remembering it
+        # for next time; or None if fontconfig matched an FT face, which is
+        # returned in `face` instead.
+        match = cls.get_fontconfig_match(name, size, bold, italic)
         if not match:
             raise base.FontException('Could not match font "%s"' % name)
 
-        f = FT_Face()
-        if fontconfig.FcPatternGetFTFace(match, FC_FT_FACE, 0, byref(f)) != 0:
+        filename = None
+        if fontconfig.FcPatternGetFTFace(match, FC_FT_FACE, 0,
+                                         byref(face)) != 0:
             value = FcValue()
             result = fontconfig.FcPatternGet(match, FC_FILE, 0, byref(value))
             if result != 0:
                 raise base.FontException('No filename or FT face for "%s"' %
                                          name)
-            result = FT_New_Face(ft_library, value.u.s, 0, byref(f))
-            if result:
-                raise base.FontException('Could not load "%s": %d' %
-                                         (name, result))
+            filename = value.u.s
+            cls._font_files[name, size, bold, italic] = filename
 
         fontconfig.FcPatternDestroy(match)
-
-        self._set_face(f, size, dpi)
+        return filename
 
     def _set_face(self, face, size, dpi):
         self.face = face.contents
@@ -356,6 +376,14 @@ class FreeTypeFont(base.Font):
 
         return match
 
+    @classmethod
+    def preload(cls, name, size, bold=False, italic=False):
+        lname = name and name.lower() or ''
+        if (lname, bold, italic) in cls._memory_fonts or \
+                (name, size, bold, italic) in cls._font_files:
+            return
+        cls._match_font_file(name, size, bold, italic, FT_Face())
+
     @classmethod
     def have_font(cls, name):
         value = FcValue()
@@ -44,6 +44,7 @@ References:
  * http://www.microsoft.com/typography/otspec
 """
 
+import bisect
 import codecs
 import os
 import mmap
@@ -58,6 +59,12 @@ class TruetypeInfo:
     it is vital that you call the `close` method to avoid large memory
     leaks.  Once closed, you cannot call any of the ``get_*`` methods.
 
+    Tables are read on demand.  The methods returning a single value, such
+    as `get_glyph_index` and `get_glyph_kerning`, look the value up in the
+    mapped file without reading the whole table, which is much faster than
+    building the dictionaries returned by `get_character_map` and
+    `get_glyph_kernings` for fonts with many glyphs.
+
     Not all tables have been implemented yet (or likely ever will).
     Currently only the name and metric tables are read; in particular
     there is no glyph or hinting information.
@@ -132,7 +139,7 @@ class TruetypeInfo:
         for table in _read_table_directory_entry.array(self._data,
                                                        offsets.size,
                                                        offsets.num_tables):
-            self._tables[table.tag] = table
+            self._tables[table.tag.decode('latin-1')] = table
 
         self._names = None
         self._horizontal_metrics = None
@@ -141,6 +148,8 @@ class TruetypeInfo:
         self._glyph_kernings = None
         self._character_map = None
         self._glyph_map = None
+        self._character_map_segments = None
+        self._kerning_subtables = None
         self._font_selection_flags = None
 
         self.header = \
@@ -285,6 +294,29 @@ class TruetypeInfo:
             self._horizontal_metrics = ar
         return self._horizontal_metrics
 
+    def get_glyph_advance(self, glyph):
+        """Return the horizontal advance of a glyph, in em.
+
+        :Parameters:
+            `glyph` : int
+                Glyph index.
+
+        """
+        index = min(glyph, self.horizontal_header.number_of_h_metrics - 1)
+        advance_width, = struct.unpack_from(
+            '>H', self._data, self._tables['hmtx'].offset + 4 * index)
+        return float(advance_width) / self.header.units_per_em
+
+    def get_character_advance(self, character):
+        """Return the horizontal advance of a character, in em.
+
+        :Parameters:
+            `character` : str
+                Unit-length unicode string.
+
+        """
+        return self.get_glyph_advance(self.get_glyph_index(character))
+
     def get_character_advances(self):
         """Return a dictionary of character->advance.
 
@@ -340,25 +372,102 @@ class TruetypeInfo:
         """
         if self._glyph_kernings:
             return self._glyph_kernings
+        kernings = dict()
+        for offset, n_pairs, _ in self._get_kerning_subtables():
+            self._add_kernings_format0(kernings, offset, n_pairs)
+        self._glyph_kernings = kernings
+        return kernings
+
+    def get_glyph_kerning(self, left, right):
+        """Return the horizontal pairwise kerning of two glyphs, in em.
+
+        The kerning pairs are searched in the mapped file.
+
+        :Parameters:
+            `left` : int
+                Glyph index of the left glyph.
+            `right` : int
+                Glyph index of the right glyph.
+
+        """
+        # Format 0 pairs are sorted by the left and right glyph indices,
+        # which read together are a big-endian unsigned int.
+        key = left << 16 | right
+        value = 0
+        data = self._data
+        for offset, n_pairs, unsorted_pairs in self._get_kerning_subtables():
+            if unsorted_pairs is not None:
+                value += unsorted_pairs.get(key, 0)
+                continue
+            low = 0
+            high = n_pairs
+            while low < high:
+                middle = (low + high) // 2
+                if struct.unpack_from('>I', data,
+                                      offset + 6 * middle)[0] < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < n_pairs and \
+                    struct.unpack_from('>I', data, offset + 6 * low)[0] == key:
+                value += struct.unpack_from('>h', data, offset + 6 * low + 4)[0]
+        return value / float(self.header.units_per_em)
+
+    def get_character_kerning(self, left, right):
+        """Return the horizontal pairwise kerning of two characters, in em.
+
+        :Parameters:
+            `left` : str
+                Unit-length unicode string of the left character.
+            `right` : str
+                Unit-length unicode string of the right character.
+
+        """
+        return self.get_glyph_kerning(self.get_glyph_index(left),
+                                      self.get_glyph_index(right))
+
+    def _get_kerning_subtables(self):
+        # Return the offset and number of pairs of each horizontal format 0
+        # kerning subtable.  Pairs should be sorted, so that they can be
+        # searched; those of the few fonts that are not are read into a
+        # dictionary, which is returned as well.
+        if self._kerning_subtables is not None:
+            return self._kerning_subtables
+        self._kerning_subtables = list()
+        if 'kern' not in self._tables:
+            return self._kerning_subtables
         header = \
             _read_kern_header_table(self._data, self._tables['kern'].offset)
         offset = self._tables['kern'].offset + header.size
-        kernings = dict()
         for i in range(header.n_tables):
             header = _read_kern_subtable_header(self._data, offset)
             if header.coverage & header.horizontal_mask \
                and not header.coverage & header.minimum_mask \
                and not header.coverage & header.perpendicular_mask:
                 if header.coverage & header.format_mask == 0:
-                    self._add_kernings_format0(kernings, offset + header.size)
+                    format0 = _read_kern_subtable_format0(
+                        self._data, offset + header.size)
+                    pairs_offset = offset + header.size + format0.size
+                    self._kerning_subtables.append(
+                        (pairs_offset, format0.n_pairs,
+                         self._read_unsorted_kernings_format0(
+                             pairs_offset, format0.n_pairs)))
             offset += header.length
-        self._glyph_kernings = kernings
-        return kernings
+        return self._kerning_subtables
+
+    def _read_unsorted_kernings_format0(self, offset, n_pairs):
+        pairs = self._data[offset:offset + 6 * n_pairs]
+        keys = [key for key, _ in struct.iter_unpack('>Ih', pairs)]
+        if keys == sorted(keys):
+            return None
+        unsorted_pairs = dict()
+        for key, value in struct.iter_unpack('>Ih', pairs):
+            unsorted_pairs[key] = unsorted_pairs.get(key, 0) + value
+        return unsorted_pairs
 
-    def _add_kernings_format0(self, kernings, offset):
-        header = _read_kern_subtable_format0(self._data, offset)
+    def _add_kernings_format0(self, kernings, offset, n_pairs):
         kerning_pairs = _read_kern_subtable_format0Pair.array(self._data,
-                                                              offset + header.size, header.n_pairs)
+                                                              offset, n_pairs)
         for pair in kerning_pairs:
             if (pair.left, pair.right) in kernings:
                 kernings[(pair.left, pair.right)] += pair.value \
@@ -391,24 +500,87 @@ class TruetypeInfo:
         """
         if self._character_map:
             return self._character_map
+        self._character_map = dict()
+        segments = self._get_character_map_segments()
+        if not segments:
+            return self._character_map
+
+        end_count, start_count, id_delta, id_range_offset, address = segments
+        character_map = self._character_map
+        for i in range(len(end_count)):
+            if id_range_offset[i] != 0:
+                if id_range_offset[i] == 65535:
+                    continue  # Hack around a dodgy font (babelfish.ttf)
+                for c in range(start_count[i], end_count[i] + 1):
+                    addr = id_range_offset[i] + 2 * (c - start_count[i]) + \
+                        address + 2 * i
+                    g = struct.unpack('>H', self._data[addr:addr + 2])[0]
+                    if g != 0:
+                        character_map[chr(c)] = (g + id_delta[i]) % 65536
+            else:
+                for c in range(start_count[i], end_count[i] + 1):
+                    g = (c + id_delta[i]) % 65536
+                    if g != 0:
+                        character_map[chr(c)] = g
+        return character_map
+
+    def get_glyph_index(self, character):
+        """Return the glyph index of a character.
+
+        The segments of the character map are searched in the mapped file.
+        Currently only format 4 character maps are read.
+
+        :Parameters:
+            `character` : str
+                Unit-length unicode string.
+
+        :rtype: int
+        :return: The glyph index, or 0 (the missing glyph) if the font does
+            not map the character.
+        """
+        segments = self._get_character_map_segments()
+        if not segments:
+            return 0
+
+        end_count, start_count, id_delta, id_range_offset, address = segments
+        c = ord(character)
+        i = bisect.bisect_left(end_count, c)
+        if i == len(end_count) or c < start_count[i]:
+            return 0
+        if id_range_offset[i] == 0:
+            return (c + id_delta[i]) % 65536
+        if id_range_offset[i] == 65535:
+            return 0  # Hack around a dodgy font (babelfish.ttf)
+        addr = id_range_offset[i] + 2 * (c - start_count[i]) + address + 2 * i
+        g = struct.unpack_from('>H', self._data, addr)[0]
+        if g == 0:
+            return 0
+        return (g + id_delta[i]) % 65536
+
+    def _get_character_map_segments(self):
+        # Return the end counts, start counts, id deltas and id range offsets
+        # of the format 4 character map's segments, and the address of the id
+        # range offsets; or an empty tuple if there is no such map.
+        if self._character_map_segments is not None:
+            return self._character_map_segments
+        self._character_map_segments = ()
         cmap = _read_cmap_header(self._data, self._tables['cmap'].offset)
         records = _read_cmap_encoding_record.array(self._data,
                                                    self._tables['cmap'].offset + cmap.size, cmap.num_tables)
-        self._character_map = dict()
         for record in records:
             if record.platform_id == 3 and record.encoding_id == 1:
                 # Look at Windows Unicode charmaps only
                 offset = self._tables['cmap'].offset + record.offset
                 format_header = _read_cmap_format_header(self._data, offset)
                 if format_header.format == 4:
-                    self._character_map = \
-                        self._get_character_map_format4(offset)
+                    self._character_map_segments = \
+                        self._read_character_map_format4(offset)
                     break
-        return self._character_map
+        return self._character_map_segments
 
-    def _get_character_map_format4(self, offset):
+    def _read_character_map_format4(self, offset):
         header = _read_cmap_format4Header(self._data, offset)
-        seg_count = header.seg_count_x2 / 2
+        seg_count = header.seg_count_x2 // 2
         array_size = struct.calcsize('>%dH' % seg_count)
         end_count = self._read_array('>%dH' % seg_count,
                                      offset + header.size)
@@ -420,23 +592,8 @@ class TruetypeInfo:
             offset + header.size + array_size + 2 + array_size + array_size
         id_range_offset = self._read_array('>%dH' % seg_count,
                                            id_range_offset_address)
-        character_map = dict()
-        for i in range(0, seg_count):
-            if id_range_offset[i] != 0:
-                if id_range_offset[i] == 65535:
-                    continue  # Hack around a dodgy font (babelfish.ttf)
-                for c in range(start_count[i], end_count[i] + 1):
-                    addr = id_range_offset[i] + 2 * (c - start_count[i]) + \
-                        id_range_offset_address + 2 * i
-                    g = struct.unpack('>H', self._data[addr:addr + 2])[0]
-                    if g != 0:
-                        character_map[chr(c)] = (g + id_delta[i]) % 65536
-            else:
-                for c in range(start_count[i], end_count[i] + 1):
-                    g = (c + id_delta[i]) % 65536
-                    if g != 0:
-                        character_map[chr(c)] = g
-        return character_map
+        return (end_count, start_count, id_delta, id_range_offset,
+                id_range_offset_address)
 
     def _read_array(self, format, offset):
         size = struct.calcsize(format)
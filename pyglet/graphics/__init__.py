@@ -163,10 +163,16 @@ import ctypes
 import pyglet
 from pyglet.gl import *
 from pyglet import gl
+from pyglet import profiler
 from pyglet.graphics import vertexbuffer, vertexattribute, vertexdomain
 
 _debug_graphics_batch = pyglet.options['debug_graphics_batch']
 
+_profiler = profiler.get_default()
+
+# Marks the end of a group's span in `Batch._draw_list_spans`.
+_end_group_span = object()
+
 
 def draw(size, mode, *data):
     """Draw a primitive immediately.
@@ -336,6 +342,7 @@ class Batch:
         self.top_groups = list()
 
         self._draw_list = list()
+        self._draw_list_spans = list()
         self._draw_list_dirty = False
 
     def invalidate(self):
@@ -489,7 +496,7 @@ class Batch:
                     del domain_map[(formats, mode, indexed)]
                     continue
                 draw_list.append(
-                    (lambda d, m: lambda: d.draw(m))(domain, mode))
+                    ((lambda d, m: lambda: d.draw(m))(domain, mode), None))
 
             # Sort and visit child groups of this group
             children = self.group_children.get(group)
@@ -499,7 +506,8 @@ class Batch:
                     draw_list.extend(visit(child))
 
             if children or domain_map:
-                return [group.set_state] + draw_list + [group.unset_state]
+                return ([(group.set_state, group)] + draw_list +
+                        [(group.unset_state, _end_group_span)])
             else:
                 # Remove unused group from batch
                 del self.group_map[group]
@@ -515,12 +523,16 @@ class Batch:
                     pass
                 return list()
 
-        self._draw_list = list()
+        draw_list = list()
 
         self.top_groups.sort()
         for group in list(self.top_groups):
-            self._draw_list.extend(visit(group))
+            draw_list.extend(visit(group))
 
+        # The span of each entry is the group whose state it sets, so that
+        # the time spent in each group can be profiled.
+        self._draw_list = [func for func, _ in draw_list]
+        self._draw_list_spans = [span for _, span in draw_list]
         self._draw_list_dirty = False
 
         if _debug_graphics_batch:
@@ -556,9 +568,30 @@ class Batch:
         if self._draw_list_dirty:
             self._update_draw_list()
 
+        if _profiler.enabled:
+            self._draw_profiled()
+            return
+
         for func in self._draw_list:
             func()
 
+    def _draw_profiled(self):
+        """Draw the batch, recording a profiler span for the whole batch and
+        for each group."""
+        start = _profiler.begin()
+        group_starts = list()
+        for func, span in zip(self._draw_list, self._draw_list_spans):
+            if span is None:
+                func()
+            elif span is _end_group_span:
+                func()
+                group, group_start = group_starts.pop()
+                _profiler.end(repr(group), 'graphics', group_start)
+            else:
+                group_starts.append((span, _profiler.begin()))
+                func()
+        _profiler.end('Batch.draw', 'graphics', start)
+
     def draw_subset(self, vertex_lists):
         """Draw only some vertex lists in the batch.
 
@@ -635,6 +668,30 @@ class Group:
         The default implementation does nothing."""
         pass
 
+    def set_raster_state(self, rasterizer):
+        """Apply the state change to a software rasterizer.
+
+        This is the counterpart of `set_state` used when the group is drawn
+        by a `pyglet.graphics.raster.Rasterizer`.  The default implementation
+        does nothing.
+
+        :Parameters:
+            `rasterizer` : `pyglet.graphics.raster.Rasterizer`
+                Rasterizer drawing the group.
+
+        :since: pyglet 1.2
+        """
+        pass
+
+    def unset_raster_state(self, rasterizer):
+        """Repeal the state change made by `set_raster_state`.
+
+        The default implementation does nothing.
+
+        :since: pyglet 1.2
+        """
+        pass
+
     def set_state_recursive(self):
         """Set this group and its ancestry.
 
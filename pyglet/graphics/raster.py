@@ -0,0 +1,815 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+"""Software rendering of vertex lists into an image.
+
+A `Rasterizer` draws the contents of a `pyglet.graphics.Batch`, a vertex
+domain or a single vertex list into an RGBA framebuffer held in system
+memory, without an OpenGL context.  This allows graphics to be rendered on
+machines with no GPU or display, for example to produce thumbnails on a
+server or to compare rendered pixels in tests::
+
+    rasterizer = Rasterizer(640, 480)
+    rasterizer.clear((0, 0, 0, 255))
+    rasterizer.draw_batch(batch)
+    rasterizer.get_image_data().save('frame.png')
+
+Vertex coordinates are taken to be window coordinates, as with the default
+projection set by `pyglet.window.Window.on_resize`.  Points, lines,
+triangles and quads in any of the OpenGL primitive modes are supported, as
+are vertex colors, blending and scissoring.  Only the ``vertices``,
+``colors`` and ``tex_coords`` attributes are used.
+
+The OpenGL state of groups is replaced by the rasterizer's own state: before
+drawing the vertex lists of a group, its `Group.set_raster_state` method is
+called with the rasterizer, and `Group.unset_raster_state` afterwards.  The
+groups used by sprites and text layouts implement these methods.
+
+Textures are sampled with nearest filtering and modulate the vertex color.
+Textures must be readable without OpenGL, so images are given to sprites as a
+`RasterTexture`; fonts can likewise store their glyphs in raster textures by
+setting a `pyglet.font.base.Font.texture_class` that derives from
+`RasterTexture`.
+
+:since: pyglet 1.2
+"""
+
+import ctypes
+import itertools
+from math import ceil, floor
+
+from pyglet.gl import *
+from pyglet import image
+from pyglet.graphics import vertexattribute, vertexdomain
+
+
+def _get_rgba_data(source):
+    """Return the RGBA bytes of an image, with opaque alpha if it has none.
+    """
+    data = source.get_image_data()
+    width = data.width
+    if 'A' in data.format:
+        return data.get_data('RGBA', width * 4)
+
+    rgb = data.get_data('RGB', width * 3)
+    rgba = bytearray(b'\xff' * (width * data.height * 4))
+    rgba[0::4] = rgb[0::3]
+    rgba[1::4] = rgb[1::3]
+    rgba[2::4] = rgb[2::3]
+    return rgba
+
+
+class RasterTexture(image.Texture):
+
+    """A texture whose pixels are held in system memory.
+
+    Raster textures can be created and drawn without an OpenGL context, but
+    can only be drawn by a `Rasterizer`.  Their ids are unique among raster
+    textures, so groups comparing textures by id work as usual.
+    """
+    _ids = itertools.count(1 << 24)
+
+    def __init__(self, width, height, target=GL_TEXTURE_2D, id=None,
+                 internalformat=GL_RGBA):
+        if id is None:
+            id = next(self._ids)
+        super().__init__(width, height, target, id)
+        self.internalformat = internalformat
+        self.data = bytearray(width * height * 4)
+
+    def __del__(self):
+        pass
+
+    @classmethod
+    def create(cls, width, height, internalformat=GL_RGBA, rectangle=False,
+               force_rectangle=False, min_filter=GL_LINEAR,
+               mag_filter=GL_LINEAR):
+        """Create an empty texture of exactly the given size.
+
+        The remaining parameters are accepted for compatibility with
+        `Texture.create`.
+
+        :rtype: `RasterTexture`
+        """
+        return cls(width, height, GL_TEXTURE_2D, None, internalformat)
+
+    @classmethod
+    def create_for_size(cls, target, min_width, min_height,
+                        internalformat=None, min_filter=GL_LINEAR,
+                        mag_filter=GL_LINEAR):
+        """Create an empty texture of exactly the given size.
+
+        Unlike `Texture.create_for_size` the size is not rounded up to a
+        power of 2.
+
+        :rtype: `RasterTexture`
+        """
+        if internalformat is None:
+            internalformat = GL_RGBA
+        return cls(min_width, min_height, target, None, internalformat)
+
+    @classmethod
+    def create_for_image(cls, source):
+        """Create a texture holding a copy of an image.
+
+        :Parameters:
+            `source` : `pyglet.image.AbstractImage`
+                Image to copy; its anchor is kept.
+
+        :rtype: `RasterTexture`
+        """
+        texture = cls(source.width, source.height)
+        texture.data[:] = _get_rgba_data(source)
+        texture.anchor_x = source.anchor_x
+        texture.anchor_y = source.anchor_y
+        return texture
+
+    def get_image_data(self, z=0):
+        return image.ImageData(self.width, self.height, 'RGBA',
+                               bytes(self.data))
+
+    def blit_into(self, source, x, y, z):
+        data = source.get_image_data()
+        x -= data.anchor_x
+        y -= data.anchor_y
+        rgba = _get_rgba_data(data)
+        row_size = data.width * 4
+        pitch = self.width * 4
+        for row in range(data.height):
+            offset = (y + row) * pitch + x * 4
+            self.data[offset:offset + row_size] = \
+                rgba[row * row_size:(row + 1) * row_size]
+
+
+def _factor_zero(sr, sg, sb, sa, dr, dg, db, da):
+    return 0., 0., 0., 0.
+
+
+def _factor_one(sr, sg, sb, sa, dr, dg, db, da):
+    return 1., 1., 1., 1.
+
+
+def _factor_src_color(sr, sg, sb, sa, dr, dg, db, da):
+    return sr / 255., sg / 255., sb / 255., sa / 255.
+
+
+def _factor_one_minus_src_color(sr, sg, sb, sa, dr, dg, db, da):
+    return 1 - sr / 255., 1 - sg / 255., 1 - sb / 255., 1 - sa / 255.
+
+
+def _factor_dst_color(sr, sg, sb, sa, dr, dg, db, da):
+    return dr / 255., dg / 255., db / 255., da / 255.
+
+
+def _factor_one_minus_dst_color(sr, sg, sb, sa, dr, dg, db, da):
+    return 1 - dr / 255., 1 - dg / 255., 1 - db / 255., 1 - da / 255.
+
+
+def _factor_src_alpha(sr, sg, sb, sa, dr, dg, db, da):
+    f = sa / 255.
+    return f, f, f, f
+
+
+def _factor_one_minus_src_alpha(sr, sg, sb, sa, dr, dg, db, da):
+    f = 1 - sa / 255.
+    return f, f, f, f
+
+
+def _factor_dst_alpha(sr, sg, sb, sa, dr, dg, db, da):
+    f = da / 255.
+    return f, f, f, f
+
+
+def _factor_one_minus_dst_alpha(sr, sg, sb, sa, dr, dg, db, da):
+    f = 1 - da / 255.
+    return f, f, f, f
+
+
+def _factor_src_alpha_saturate(sr, sg, sb, sa, dr, dg, db, da):
+    f = min(sa, 255 - da) / 255.
+    return f, f, f, 1.
+
+
+_blend_factors = {
+    GL_ZERO: _factor_zero,
+    GL_ONE: _factor_one,
+    GL_SRC_COLOR: _factor_src_color,
+    GL_ONE_MINUS_SRC_COLOR: _factor_one_minus_src_color,
+    GL_DST_COLOR: _factor_dst_color,
+    GL_ONE_MINUS_DST_COLOR: _factor_one_minus_dst_color,
+    GL_SRC_ALPHA: _factor_src_alpha,
+    GL_ONE_MINUS_SRC_ALPHA: _factor_one_minus_src_alpha,
+    GL_DST_ALPHA: _factor_dst_alpha,
+    GL_ONE_MINUS_DST_ALPHA: _factor_one_minus_dst_alpha,
+    GL_SRC_ALPHA_SATURATE: _factor_src_alpha_saturate,
+}
+
+# Factors for which each channel of the result depends on other channels of
+# the destination, so a span cannot be blended channel by channel.
+_dst_alpha_factors = (GL_DST_ALPHA, GL_ONE_MINUS_DST_ALPHA,
+                      GL_SRC_ALPHA_SATURATE)
+
+
+class Rasterizer:
+
+    """An RGBA framebuffer in system memory that vertex lists are drawn into.
+
+    The rasterizer has a small set of state, standing in for the OpenGL state
+    set by groups.  The state is changed by setting these attributes, and
+    saved and restored with `push_state` and `pop_state`:
+
+    `blend` : bool
+        If True, pixels are blended with the framebuffer using
+        `blend_src` and `blend_dest`, given as OpenGL blend factors such as
+        ``GL_SRC_ALPHA``.  Otherwise pixels are replaced.
+    `texture` : `pyglet.image.Texture`
+        Texture sampled by primitives with texture coordinates, if
+        `texture_enabled` is True.  Textures other than `RasterTexture` are
+        read back with `Texture.get_image_data`, which requires OpenGL.
+    `scissor` : (int, int, int, int)
+        The ``(x, y, width, height)`` rectangle that drawing is limited to,
+        or None to draw to the whole framebuffer.
+    `translate_x`, `translate_y` : float
+        Offset added to vertex coordinates.
+    `color` : (int, int, int, int)
+        RGBA color of vertices without a color attribute.
+
+    The framebuffer rows are stored bottom to top, as in OpenGL.
+    """
+
+    def __init__(self, width, height):
+        """Create a rasterizer with a framebuffer cleared to transparent
+        black.
+
+        :Parameters:
+            `width` : int
+                Width of the framebuffer, in pixels.
+            `height` : int
+                Height of the framebuffer, in pixels.
+
+        """
+        self.width = width
+        self.height = height
+        self.buffer = bytearray(width * height * 4)
+        self._state_stack = list()
+        self._texel_cache = dict()
+        self._span_tables = dict()
+
+    blend = False
+    blend_src = GL_SRC_ALPHA
+    blend_dest = GL_ONE_MINUS_SRC_ALPHA
+    texture = None
+    texture_enabled = False
+    scissor = None
+    translate_x = 0
+    translate_y = 0
+    color = (255, 255, 255, 255)
+
+    _state_names = ('blend', 'blend_src', 'blend_dest', 'texture',
+                    'texture_enabled', 'scissor', 'translate_x',
+                    'translate_y', 'color')
+
+    def push_state(self):
+        """Save the current state; it is restored by `pop_state`."""
+        self._state_stack.append(
+            [getattr(self, name) for name in self._state_names])
+
+    def pop_state(self):
+        """Restore the state saved by the matching `push_state`."""
+        state = self._state_stack.pop()
+        for name, value in zip(self._state_names, state):
+            setattr(self, name, value)
+
+    def clear(self, color=(0, 0, 0, 0)):
+        """Fill the framebuffer with a color, ignoring the scissor rectangle.
+
+        :Parameters:
+            `color` : (int, int, int, int)
+                RGBA color to fill with.
+
+        """
+        self.buffer[:] = bytes(color) * (self.width * self.height)
+
+    def get_image_data(self):
+        """Get a copy of the framebuffer.
+
+        :rtype: `pyglet.image.ImageData`
+        """
+        return image.ImageData(self.width, self.height, 'RGBA',
+                               bytes(self.buffer))
+
+    def get_pixel(self, x, y):
+        """Get the color of a pixel in the framebuffer.
+
+        :rtype: (int, int, int, int)
+        """
+        offset = (y * self.width + x) * 4
+        return tuple(self.buffer[offset:offset + 4])
+
+    # Drawing
+
+    def draw_batch(self, batch):
+        """Draw all vertex lists in a batch, in the order `Batch.draw` would.
+
+        :Parameters:
+            `batch` : `pyglet.graphics.Batch`
+                Batch to draw.
+
+        """
+        def visit(group):
+            group.set_raster_state(self)
+
+            domain_map = batch.group_map[group]
+            for (_, mode, _), domain in list(domain_map.items()):
+                self.draw_domain(domain, mode)
+
+            children = batch.group_children.get(group)
+            if children:
+                children.sort()
+                for child in list(children):
+                    visit(child)
+
+            group.unset_raster_state(self)
+
+        self._texel_cache.clear()
+        batch.top_groups.sort()
+        for group in list(batch.top_groups):
+            visit(group)
+        self._texel_cache.clear()
+
+    def draw_domain(self, domain, mode, vertex_list=None):
+        """Draw vertices in a domain, as `VertexDomain.draw` does.
+
+        :Parameters:
+            `domain` : `pyglet.graphics.vertexdomain.VertexDomain`
+                Domain to draw, which may be indexed.
+            `mode` : int
+                OpenGL drawing mode, e.g. ``GL_POINTS``, ``GL_LINES``, etc.
+            `vertex_list` : `pyglet.graphics.vertexdomain.VertexList`
+                Vertex list to draw, or ``None`` for all lists in the domain.
+
+        """
+        indexed = isinstance(domain, vertexdomain.IndexedVertexDomain)
+        if vertex_list is not None:
+            if indexed:
+                regions = [(vertex_list.index_start, vertex_list.index_count)]
+            else:
+                regions = [(vertex_list.start, vertex_list.count)]
+        elif indexed:
+            regions = zip(*domain.index_allocator.get_allocated_regions())
+        else:
+            regions = zip(*domain.allocator.get_allocated_regions())
+
+        vertices = self._get_vertices(domain)
+        for start, count in regions:
+            if indexed:
+                indices = domain.get_index_region(start, count).array[:]
+            else:
+                indices = range(start, start + count)
+            self._draw_primitives(mode, [vertices[i] for i in indices])
+
+    def draw_vertex_list(self, vertex_list, mode):
+        """Draw a vertex list, as `VertexList.draw` does.
+
+        :Parameters:
+            `vertex_list` : `pyglet.graphics.vertexdomain.VertexList`
+                Vertex list to draw.
+            `mode` : int
+                OpenGL drawing mode, e.g. ``GL_POINTS``, ``GL_LINES``, etc.
+
+        """
+        self.draw_domain(vertex_list.domain, mode, vertex_list)
+
+    def draw(self, size, mode, *data):
+        """Draw a primitive immediately, as `pyglet.graphics.draw` does.
+
+        :Parameters:
+            `size` : int
+                Number of vertices given
+            `mode` : int
+                OpenGL drawing mode, e.g. ``GL_TRIANGLES``.
+            `data` : data items
+                Attribute formats and data.
+
+        """
+        self.draw_indexed(size, mode, range(size), *data)
+
+    def draw_indexed(self, size, mode, indices, *data):
+        """Draw a primitive with indexed vertices immediately, as
+        `pyglet.graphics.draw_indexed` does.
+
+        :Parameters:
+            `size` : int
+                Number of vertices given
+            `mode` : int
+                OpenGL drawing mode, e.g. ``GL_TRIANGLES``.
+            `indices` : sequence of int
+                Sequence of integers giving indices into the vertex list.
+            `data` : data items
+                Attribute formats and data.
+
+        """
+        arrays = dict()
+        for format, array in data:
+            attribute = vertexattribute.create_attribute(format)
+            assert size == len(array) // attribute.count, \
+                'Data for %s is incorrect length' % format
+            arrays[attribute.plural] = (attribute, list(array))
+        vertices = self._make_vertices(size, arrays)
+        self._draw_primitives(mode, [vertices[i] for i in indices])
+
+    # Vertex data
+
+    def _get_vertices(self, domain):
+        count = domain.allocator.capacity
+        arrays = dict()
+        for name in ('vertices', 'colors', 'tex_coords'):
+            attribute = domain.attribute_names.get(name)
+            if attribute is not None:
+                region = attribute.get_region(attribute.buffer, 0, count)
+                arrays[name] = (attribute, region.array[:])
+        return self._make_vertices(count, arrays)
+
+    def _make_vertices(self, count, arrays):
+        """Return a list of (x, y, r, g, b, a, u, v) tuples, with colors
+        scaled to 0-255.
+        """
+        attribute, data = arrays['vertices']
+        n = attribute.count
+        xs = [x + self.translate_x for x in data[0::n]]
+        ys = [y + self.translate_y for y in data[1::n]]
+
+        if 'colors' in arrays:
+            attribute, data = arrays['colors']
+            n = attribute.count
+            scale = 255. if attribute.gl_type in (GL_FLOAT, GL_DOUBLE) else \
+                255. / ((1 << ctypes.sizeof(attribute.c_type) * 8) - 1)
+            if scale != 1.:
+                data = [c * scale for c in data]
+            alphas = data[3::4] if n == 4 else [255.] * count
+            colors = zip(data[0::n], data[1::n], data[2::n], alphas)
+        else:
+            colors = itertools.repeat(self.color)
+
+        if 'tex_coords' in arrays:
+            attribute, data = arrays['tex_coords']
+            n = attribute.count
+            tex_coords = zip(data[0::n], data[1::n] if n > 1 else
+                             itertools.repeat(0.))
+        else:
+            tex_coords = itertools.repeat((0., 0.))
+
+        return [(x, y) + tuple(c) + t
+                for x, y, c, t in zip(xs, ys, colors, tex_coords)]
+
+    def _draw_primitives(self, mode, vertices):
+        n = len(vertices)
+        if mode == GL_TRIANGLES:
+            for i in range(0, n - 2, 3):
+                self._fill_triangle(*vertices[i:i + 3])
+        elif mode == GL_QUADS:
+            for i in range(0, n - 3, 4):
+                v0, v1, v2, v3 = vertices[i:i + 4]
+                self._fill_triangle(v0, v1, v2)
+                self._fill_triangle(v0, v2, v3)
+        elif mode == GL_TRIANGLE_STRIP:
+            for i in range(n - 2):
+                self._fill_triangle(*vertices[i:i + 3])
+        elif mode == GL_QUAD_STRIP:
+            for i in range(0, n - 3, 2):
+                v0, v1, v2, v3 = vertices[i:i + 4]
+                self._fill_triangle(v0, v1, v3)
+                self._fill_triangle(v0, v3, v2)
+        elif mode in (GL_TRIANGLE_FAN, GL_POLYGON):
+            for i in range(1, n - 1):
+                self._fill_triangle(vertices[0], vertices[i], vertices[i + 1])
+        elif mode == GL_LINES:
+            for i in range(0, n - 1, 2):
+                self._draw_line(vertices[i], vertices[i + 1])
+        elif mode in (GL_LINE_STRIP, GL_LINE_LOOP):
+            for i in range(n - 1):
+                self._draw_line(vertices[i], vertices[i + 1])
+            if mode == GL_LINE_LOOP and n > 2:
+                self._draw_line(vertices[-1], vertices[0])
+        elif mode == GL_POINTS:
+            for vertex in vertices:
+                self._draw_point(vertex)
+        else:
+            raise ValueError('Unsupported drawing mode %r' % mode)
+
+    # Pixel pipeline
+
+    def _get_clip(self):
+        """Return the (x1, y1, x2, y2) pixel rectangle to draw within, with
+        x2 and y2 exclusive."""
+        if self.scissor is None:
+            return 0, 0, self.width, self.height
+        x, y, width, height = self.scissor
+        return (max(x, 0), max(y, 0),
+                min(x + width, self.width), min(y + height, self.height))
+
+    def _get_texels(self):
+        """Return (data, width, height, alpha_only) of the owner of the
+        bound texture, or None if texturing is disabled."""
+        texture = self.texture
+        if not self.texture_enabled or texture is None:
+            return None
+        while getattr(texture, 'owner', None) is not None:
+            texture = texture.owner
+
+        if isinstance(texture, RasterTexture):
+            return (texture.data, texture.width, texture.height,
+                    texture.internalformat == GL_ALPHA)
+
+        try:
+            return self._texel_cache[texture.id]
+        except KeyError:
+            data = texture.get_image_data()
+            texels = (data.get_data('RGBA', data.width * 4),
+                      data.width, data.height, False)
+            self._texel_cache[texture.id] = texels
+            return texels
+
+    def _get_blend(self):
+        """Return a function blending a source color into the framebuffer
+        at an offset, or None if blending is disabled."""
+        if not self.blend:
+            return None
+        try:
+            src_factor = _blend_factors[self.blend_src]
+            dest_factor = _blend_factors[self.blend_dest]
+        except KeyError:
+            raise ValueError('Unsupported blend function %r' %
+                             ((self.blend_src, self.blend_dest),))
+
+        buffer = self.buffer
+        if (self.blend_src, self.blend_dest) == \
+                (GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA):
+            def blend(offset, r, g, b, a):
+                if a >= 255:
+                    buffer[offset:offset + 4] = bytes((r, g, b, 255))
+                elif a > 0:
+                    d = buffer[offset:offset + 4]
+                    f = 255 - a
+                    buffer[offset:offset + 4] = bytes((
+                        (r * a + d[0] * f + 127) // 255,
+                        (g * a + d[1] * f + 127) // 255,
+                        (b * a + d[2] * f + 127) // 255,
+                        (a * a + d[3] * f + 127) // 255))
+            return blend
+
+        def blend(offset, r, g, b, a):
+            dr, dg, db, da = buffer[offset:offset + 4]
+            sf = src_factor(r, g, b, a, dr, dg, db, da)
+            df = dest_factor(r, g, b, a, dr, dg, db, da)
+            buffer[offset:offset + 4] = bytes((
+                min(int(r * sf[0] + dr * df[0] + 0.5), 255),
+                min(int(g * sf[1] + dg * df[1] + 0.5), 255),
+                min(int(b * sf[2] + db * df[2] + 0.5), 255),
+                min(int(a * sf[3] + da * df[3] + 0.5), 255)))
+        return blend
+
+    def _get_span_tables(self, color):
+        """Return per-channel translation tables blending a constant color
+        over any destination value, or None if the blend function mixes
+        channels."""
+        key = (color, self.blend_src, self.blend_dest)
+        try:
+            return self._span_tables[key]
+        except KeyError:
+            pass
+
+        if self.blend_src in _dst_alpha_factors or \
+                self.blend_dest in _dst_alpha_factors:
+            tables = None
+        else:
+            src_factor = _blend_factors[self.blend_src]
+            dest_factor = _blend_factors[self.blend_dest]
+            tables = [bytearray(256) for _ in range(4)]
+            for d in range(256):
+                sf = src_factor(*(color + (d, d, d, d)))
+                df = dest_factor(*(color + (d, d, d, d)))
+                for channel in range(4):
+                    tables[channel][d] = min(int(
+                        color[channel] * sf[channel] + d * df[channel] + 0.5),
+                        255)
+            tables = [bytes(table) for table in tables]
+
+        if len(self._span_tables) > 256:
+            self._span_tables.clear()
+        self._span_tables[key] = tables
+        return tables
+
+    def _fill_span(self, offset, count, color, blend):
+        """Fill `count` pixels from `offset` with a constant color."""
+        end = offset + count * 4
+        if blend is None or (color[3] >= 255 and
+                             (self.blend_src, self.blend_dest) ==
+                             (GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)):
+            self.buffer[offset:end] = bytes(color) * count
+            return
+
+        tables = self._get_span_tables(color)
+        if tables is None:
+            for pixel in range(offset, end, 4):
+                blend(pixel, *color)
+            return
+
+        buffer = self.buffer
+        for channel, table in enumerate(tables):
+            buffer[offset + channel:end:4] = \
+                buffer[offset + channel:end:4].translate(table)
+
+    def _shade(self, offset, r, g, b, a, u, v, texels, blend):
+        """Color one pixel, sampling the texture and blending."""
+        if texels is not None:
+            data, width, height, alpha_only = texels
+            x = int(u * width)
+            y = int(v * height)
+            x = 0 if x < 0 else width - 1 if x >= width else x
+            y = 0 if y < 0 else height - 1 if y >= height else y
+            i = (y * width + x) * 4
+            if alpha_only:
+                a = a * data[i + 3] / 255.
+            else:
+                r = r * data[i] / 255.
+                g = g * data[i + 1] / 255.
+                b = b * data[i + 2] / 255.
+                a = a * data[i + 3] / 255.
+
+        r = int(r + 0.5)
+        g = int(g + 0.5)
+        b = int(b + 0.5)
+        a = int(a + 0.5)
+        if blend is None:
+            self.buffer[offset:offset + 4] = bytes((r, g, b, a))
+        else:
+            blend(offset, r, g, b, a)
+
+    def _draw_point(self, vertex):
+        x = int(floor(vertex[0]))
+        y = int(floor(vertex[1]))
+        clip_x1, clip_y1, clip_x2, clip_y2 = self._get_clip()
+        if clip_x1 <= x < clip_x2 and clip_y1 <= y < clip_y2:
+            self._shade((y * self.width + x) * 4, *vertex[2:],
+                        texels=self._get_texels(), blend=self._get_blend())
+
+    def _draw_line(self, v0, v1):
+        """Draw a one pixel wide line, lighting the pixels whose centers
+        are crossed along the major axis.  The last pixel is not drawn, so
+        that connected lines do not draw shared pixels twice."""
+        dx = v1[0] - v0[0]
+        dy = v1[1] - v0[1]
+        if dx == dy == 0:
+            return
+        major = 0 if abs(dx) >= abs(dy) else 1
+        minor = 1 - major
+        length = v1[major] - v0[major]
+
+        clip_x1, clip_y1, clip_x2, clip_y2 = self._get_clip()
+        clip_min = (clip_x1, clip_y1)
+        clip_max = (clip_x2, clip_y2)
+        texels = self._get_texels()
+        blend = self._get_blend()
+        width = self.width
+
+        if length > 0:
+            start = int(ceil(v0[major] - 0.5))
+            end = int(ceil(v1[major] - 0.5))
+            step = 1
+        else:
+            start = int(floor(v0[major] - 0.5))
+            end = int(floor(v1[major] - 0.5))
+            step = -1
+        for i in range(start, end, step):
+            t = (i + 0.5 - v0[major]) / length
+            j = int(floor(v0[minor] + t * (v1[minor] - v0[minor])))
+            if not (clip_min[major] <= i < clip_max[major] and
+                    clip_min[minor] <= j < clip_max[minor]):
+                continue
+            x, y = (i, j) if major == 0 else (j, i)
+            attributes = [a0 + t * (a1 - a0)
+                          for a0, a1 in zip(v0[2:], v1[2:])]
+            self._shade((y * width + x) * 4, *attributes,
+                        texels=texels, blend=blend)
+
+    def _fill_triangle(self, v0, v1, v2):
+        """Fill a triangle, covering the pixels whose centers lie inside it.
+
+        Pixel centers lying exactly on an edge are covered by only one of
+        the two triangles sharing the edge, so that quads are not blended
+        twice along their diagonal.
+        """
+        x0, y0 = v0[0], v0[1]
+        det = (v1[0] - x0) * (v2[1] - y0) - (v2[0] - x0) * (v1[1] - y0)
+        if det == 0:
+            return
+        if det < 0:
+            v1, v2 = v2, v1
+            det = -det
+
+        clip_x1, clip_y1, clip_x2, clip_y2 = self._get_clip()
+        y_min = max(clip_y1, int(floor(min(v0[1], v1[1], v2[1]))))
+        y_max = min(clip_y2, int(ceil(max(v0[1], v1[1], v2[1]))))
+        if y_min >= y_max:
+            return
+
+        # Each edge is the half-plane A * x + B * y + C > 0, or >= 0 for
+        # edges whose normal (A, B) points right, or up if vertical.  C is
+        # computed from the lower endpoint, so that the two triangles
+        # sharing an edge compute bounds exactly opposite each other.
+        edges = list()
+        for a, b in ((v0, v1), (v1, v2), (v2, v0)):
+            A = a[1] - b[1]
+            B = b[0] - a[0]
+            p = min((a[1], a[0]), (b[1], b[0]))
+            C = -(A * p[1] + B * p[0])
+            edges.append((A, B, C, A > 0 or (A == 0 and B > 0)))
+
+        # Gradients of the interpolated attributes.
+        dx1 = v1[0] - x0
+        dy1 = v1[1] - y0
+        dx2 = v2[0] - x0
+        dy2 = v2[1] - y0
+        gradients = list()
+        for a0, a1, a2 in zip(v0[2:], v1[2:], v2[2:]):
+            gradients.append((
+                a0,
+                ((a1 - a0) * dy2 - (a2 - a0) * dy1) / det,
+                ((a2 - a0) * dx1 - (a1 - a0) * dx2) / det))
+
+        texels = self._get_texels()
+        blend = self._get_blend()
+        flat = texels is None and \
+            not any(dadx or dady for _, dadx, dady in gradients)
+        if flat:
+            color = tuple(int(a0 + 0.5) for a0, _, _ in gradients[:4])
+
+        width = self.width
+        for y in range(y_min, y_max):
+            yc = y + 0.5
+            x_start = clip_x1
+            x_end = clip_x2 - 1
+            for A, B, C, inclusive in edges:
+                e = B * yc + C
+                if A == 0:
+                    if e < 0 or (e == 0 and not inclusive):
+                        break
+                    continue
+                t = -e / A
+                if A > 0:
+                    x = int(ceil(t - 0.5)) if inclusive else \
+                        int(floor(t - 0.5)) + 1
+                    if x > x_start:
+                        x_start = x
+                else:
+                    x = int(ceil(t - 0.5)) - 1
+                    if x < x_end:
+                        x_end = x
+            else:
+                if x_start > x_end:
+                    continue
+                offset = (y * width + x_start) * 4
+                count = x_end - x_start + 1
+                if flat:
+                    self._fill_span(offset, count, color, blend)
+                    continue
+
+                xc = x_start + 0.5
+                attributes = [a0 + dadx * (xc - x0) + dady * (yc - y0)
+                              for a0, dadx, dady in gradients]
+                steps = [dadx for _, dadx, _ in gradients]
+                for offset in range(offset, offset + count * 4, 4):
+                    self._shade(offset, *attributes,
+                                texels=texels, blend=blend)
+                    attributes = [a + s for a, s in zip(attributes, steps)]
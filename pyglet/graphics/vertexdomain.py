@@ -56,6 +56,7 @@ The entire domain can be efficiently drawn in one step with the
 the same OpenGL primitive mode.
 """
 
+import array
 import ctypes
 import re
 
@@ -441,6 +442,17 @@ class VertexList:
 
     def _set_attribute_data(self, i, data):
         attribute = self.domain.attributes[i]
+        if isinstance(data, array.array) and \
+                attribute.stride == attribute.size and \
+                data.typecode == attribute.c_type._type_ and \
+                len(data) == attribute.count * self.count:
+            # Copy arrays of the attribute's type straight into a
+            # non-interleaved buffer.
+            attribute.buffer.set_data_region(
+                ctypes.c_void_p(data.buffer_info()[0]),
+                attribute.stride * self.start, attribute.stride * self.count)
+            return
+
         # TODO without region
         region = attribute.get_region(attribute.buffer, self.start, self.count)
         region.array[:] = data
@@ -141,11 +141,14 @@ from pyglet import gl
 from pyglet.gl import *
 from pyglet.gl import gl_info
 from pyglet import graphics
+from pyglet import profiler
 from pyglet.window import *
 
 from pyglet.image import atlas
 from pyglet.compat import asbytes, bytes_type, BytesIO
 
+_profiler = profiler.get_default()
+
 
 class ImageException(Exception):
     pass
@@ -859,6 +862,17 @@ class ImageData(AbstractImage):
         If `internalformat` is specified, glTexImage is used to initialise
         the texture; otherwise, glTexSubImage is used to update a region.
         """
+        if _profiler.enabled:
+            start = _profiler.begin()
+            try:
+                self._blit_to_texture(target, level, x, y, z, internalformat)
+            finally:
+                _profiler.end('ImageData.blit_to_texture', 'image', start,
+                              {'width': self.width, 'height': self.height})
+        else:
+            self._blit_to_texture(target, level, x, y, z, internalformat)
+
+    def _blit_to_texture(self, target, level, x, y, z, internalformat):
         x -= self.anchor_x
         y -= self.anchor_y
 
@@ -173,6 +173,149 @@ class Allocator:
         return 1.0 - self.used_area / float(possible_area)
 
 
+class SkylineAllocator:
+
+    """Rectangular area allocation using a skyline.
+
+    The allocator tracks the top edge ("skyline") of the allocated area as a
+    list of horizontal segments, and places each rectangle at the lowest
+    position along it, preferring the position that wastes the least area
+    beneath the rectangle.  Unlike `Allocator` it packs well regardless of
+    the order in which rectangles of differing heights are allocated, which
+    suits glyphs rendered as text is first displayed.
+
+    The interface is the same as `Allocator`, with the addition of `clear`.
+    """
+
+    def __init__(self, width, height):
+        """Create a `SkylineAllocator` of the given size.
+
+        :Parameters:
+            `width` : int
+                Width of the allocation region.
+            `height` : int
+                Height of the allocation region.
+
+        """
+        assert width > 0 and height > 0
+        self.width = width
+        self.height = height
+        self.clear()
+
+    def clear(self):
+        """Free the whole area for reuse."""
+        # [x, y, width] of each skyline segment, left to right.
+        self.skyline = [[0, 0, self.width]]
+        self.used_area = 0
+
+    def _fit(self, index, width, height):
+        """Return the y at which a rectangle would rest if its left edge
+        were at skyline segment `index`, and the area wasted beneath it; or
+        None if it doesn't fit there."""
+        skyline = self.skyline
+        x = skyline[index][0]
+        if x + width > self.width:
+            return None
+        y = 0
+        remaining = width
+        i = index
+        while remaining > 0:
+            y = max(y, skyline[i][1])
+            remaining -= skyline[i][2]
+            i += 1
+        if y + height > self.height:
+            return None
+
+        waste = 0
+        remaining = width
+        i = index
+        while remaining > 0:
+            segment_width = min(remaining, skyline[i][2])
+            waste += (y - skyline[i][1]) * segment_width
+            remaining -= segment_width
+            i += 1
+        return y, waste
+
+    def alloc(self, width, height):
+        """Get a free area in the allocator of the given size.
+
+        After calling `alloc`, the requested area will no longer be used.
+        If there is not enough room to fit the given area `AllocatorException`
+        is raised.
+
+        :Parameters:
+            `width` : int
+                Width of the area to allocate.
+            `height` : int
+                Height of the area to allocate.
+
+        :rtype: int, int
+        :return: The X and Y coordinates of the bottom-left corner of the
+            allocated region.
+        """
+        best = None
+        for index in range(len(self.skyline)):
+            fit = self._fit(index, width, height)
+            if fit is not None:
+                y, waste = fit
+                key = (y + height, waste)
+                if best is None or key < best[0]:
+                    best = key, index, y
+        if best is None:
+            raise AllocatorException('No more space in %r for box %dx%d' % (
+                self, width, height))
+
+        _, index, y = best
+        skyline = self.skyline
+        x = skyline[index][0]
+
+        # Replace the segments beneath the rectangle with its top edge.
+        end = x + width
+        i = index
+        while i < len(skyline) and skyline[i][0] < end:
+            segment_end = skyline[i][0] + skyline[i][2]
+            if segment_end > end:
+                skyline[i][2] = segment_end - end
+                skyline[i][0] = end
+                break
+            del skyline[i]
+        skyline.insert(index, [x, y + height, width])
+
+        # Merge neighbouring segments of equal height.
+        i = max(0, index - 1)
+        while i < len(skyline) - 1 and i <= index + 1:
+            if skyline[i][1] == skyline[i + 1][1]:
+                skyline[i][2] += skyline[i + 1][2]
+                del skyline[i + 1]
+            else:
+                i += 1
+
+        self.used_area += width * height
+        return x, y
+
+    def get_usage(self):
+        """Get the fraction of area already allocated.
+
+        This method is useful for debugging and profiling only.
+
+        :rtype: float
+        """
+        return self.used_area / float(self.width * self.height)
+
+    def get_fragmentation(self):
+        """Get the fraction of area beneath the skyline that is not
+        allocated, and so is unlikely to ever be used.
+
+        This method is useful for debugging and profiling only.
+
+        :rtype: float
+        """
+        covered_area = sum(y * width for _, y, width in self.skyline)
+        if not covered_area:
+            return 0.
+        return 1.0 - self.used_area / float(covered_area)
+
+
 class TextureAtlas:
 
     """Collection of images within a texture.
@@ -0,0 +1,301 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+
+"""Cache decoded images on disk in a form ready for texture upload.
+
+Decoding PNG, BMP or GIF files and converting the result to a format
+OpenGL accepts directly can take a significant part of application start-up.
+`ImageCache` stores the converted pixels of each image it loads in a cache
+directory, keyed by a hash of the encoded file contents and the requested
+format and pitch.  Subsequent loads of the same file memory-map the cached
+pixels instead of decoding the file again.
+
+Example usage::
+
+    cache = ImageCache('cache/images', max_size=64 << 20)
+    image = cache.load('car.png')
+
+The cache is opt-in.  `pyglet.resource` uses it for `resource.image` and
+`resource.texture` when `pyglet.resource.image_cache` (or the `image_cache`
+attribute of a `Loader`) is set::
+
+    pyglet.resource.image_cache = ImageCache('cache/images')
+
+When the total size of the cache exceeds `max_size`, the least recently used
+entries are removed.  Images that cannot be converted to plain pixel data,
+such as compressed DDS textures, bypass the cache; they are already in a
+form that uploads without conversion.
+
+:since: pyglet 1.2
+"""
+
+import ctypes
+import hashlib
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+import pyglet
+from pyglet.compat import BytesIO
+
+# Formats that glTexImage2D accepts without any extension.
+_gl_formats = ('A', 'B', 'G', 'I', 'L', 'LA', 'R', 'RGB', 'RGBA')
+_default_formats = {1: 'L', 2: 'LA', 3: 'RGB', 4: 'RGBA'}
+
+# magic, version, width, height, pitch, format
+_header = struct.Struct('<4sHIIi8s')
+_magic = b'PGIC'
+_version = 1
+_suffix = '.pgic'
+
+
+class ImageCache:
+
+    """An on-disk cache of decoded image data.
+
+    :Ivariables:
+        `directory` : str
+            Directory holding the cache entries.
+        `max_size` : int
+            Maximum total size of the cache entries, in bytes.
+        `hits` : int
+            Number of loads served from the cache.
+        `misses` : int
+            Number of loads that had to decode the image.
+        `evictions` : int
+            Number of entries removed to keep the cache within `max_size`.
+
+    """
+
+    def __init__(self, directory, max_size=256 << 20):
+        """Create a cache storing its entries in `directory`.
+
+        The directory is created if it does not exist.  Entries left by a
+        previous run are reused.
+
+        :Parameters:
+            `directory` : str
+                Directory in which to store cache entries.
+            `max_size` : int
+                Maximum total size of the cache, in bytes.
+
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # Map key to entry size, least recently used first.
+        self._entries = OrderedDict()
+        self._size = 0
+        entries = []
+        for filename in os.listdir(directory):
+            if not filename.endswith(_suffix):
+                continue
+            try:
+                stat = os.stat(os.path.join(directory, filename))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, filename[:-len(_suffix)],
+                            stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._size += size
+
+    @property
+    def size(self):
+        """Total size of all cache entries, in bytes.
+
+        :type: int
+        """
+        return self._size
+
+    def load(self, filename, file=None, format=None, pitch=None):
+        """Load an image, decoding it only if it is not already cached.
+
+        :Parameters:
+            `filename` : str
+                Used to guess the image format, and to load the file if
+                `file` is unspecified.
+            `file` : file-like object or None
+                Source of image data in any supported format.
+            `format` : str or None
+                Format of the returned image data.  If unspecified, the
+                decoded format is kept when OpenGL accepts it directly,
+                otherwise the closest of ``L``, ``LA``, ``RGB`` and ``RGBA``
+                is used.
+            `pitch` : int or None
+                Number of bytes per row of the returned image data.  Defaults
+                to tightly packed rows in bottom-to-top order.
+
+        :rtype: `AbstractImage`
+        """
+        if file is None:
+            with open(filename, 'rb') as f:
+                encoded = f.read()
+        else:
+            encoded = file.read()
+
+        key = self._get_key(encoded, format, pitch)
+        image = self._read(key)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = pyglet.image.load(filename, file=BytesIO(encoded))
+        if not isinstance(image, pyglet.image.ImageData):
+            return image
+
+        image_format = format or image.format
+        if image_format not in _gl_formats:
+            image_format = _default_formats[len(image_format)]
+        image_pitch = pitch or image.width * len(image_format)
+        data = image.get_data(image_format, image_pitch)
+        image = pyglet.image.ImageData(image.width, image.height,
+                                       image_format, data, image_pitch)
+        self._write(key, image)
+        return image
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for key in list(self._entries):
+            self._remove(key)
+
+    @staticmethod
+    def _get_key(encoded, format, pitch):
+        digest = hashlib.sha1(encoded)
+        digest.update(('%s:%s' % (format, pitch)).encode('ascii'))
+        return digest.hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + _suffix)
+
+    def _read(self, key):
+        if key not in self._entries:
+            return None
+
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except OSError:
+            self._forget(key)
+            return None
+        except ValueError:
+            # Empty file.
+            self._remove(key)
+            return None
+
+        try:
+            magic, version, width, height, pitch, format = \
+                _header.unpack_from(buffer)
+            format = format.rstrip(b'\0').decode('ascii')
+        except (struct.error, UnicodeDecodeError):
+            valid = False
+        else:
+            length = abs(pitch) * height
+            valid = (magic == _magic and version == _version and
+                     _header.size + length <= len(buffer))
+        if not valid:
+            buffer.close()
+            self._remove(key)
+            return None
+
+        # The ctypes array shares the mapped pages; nothing is read from
+        # disk until the data is uploaded.
+        data = (ctypes.c_ubyte * length).from_buffer(buffer, _header.size)
+
+        self._entries.move_to_end(key)
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return pyglet.image.ImageData(width, height, format, data, pitch)
+
+    def _write(self, key, image):
+        data = image.get_data(image.format, image.pitch)
+        header = _header.pack(_magic, _version, image.width, image.height,
+                              image.pitch, image.format.encode('ascii'))
+        size = len(header) + len(data)
+        if size > self.max_size:
+            return
+
+        path = self._get_path(key)
+        temp_path = '%s.%d.tmp' % (path, os.getpid())
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(header)
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        self._forget(key)
+        self._entries[key] = size
+        self._size += size
+        self._evict()
+
+    def _evict(self):
+        for key in list(self._entries):
+            if self._size <= self.max_size:
+                break
+            if self._remove(key):
+                self.evictions += 1
+
+    def _remove(self, key):
+        try:
+            os.remove(self._get_path(key))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Still mapped by a live image on some platforms; try again on
+            # the next eviction.
+            return False
+        self._forget(key)
+        return True
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
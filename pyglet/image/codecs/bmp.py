@@ -144,6 +144,12 @@ def ptr_add(ptr, offset):
     return ctypes.pointer(type(ptr.contents).from_address(address))
 
 
+def to_bytes(data, offset, length):
+    if offset + length > len(data):
+        raise ImageDecodeException('BMP file is truncated')
+    return data[offset:offset + length]
+
+
 def to_ctypes(buffer, offset, type):
     if offset + ctypes.sizeof(type) > len(buffer):
         raise ImageDecodeException('BMP file is truncated')
@@ -193,32 +199,25 @@ class BMPImageDecoder(ImageDecoder):
         bitcount = info_header.biBitCount
         if bitcount == 1:
             pitch = (width + 7) // 8
-            bits_type = ctypes.c_ubyte
             decoder = decode_1bit
         elif bitcount == 4:
             pitch = (width + 1) // 2
-            bits_type = ctypes.c_ubyte
             decoder = decode_4bit
         elif bitcount == 8:
-            bits_type = ctypes.c_ubyte
             pitch = width
             decoder = decode_8bit
         elif bitcount == 16:
             pitch = width * 2
-            bits_type = ctypes.c_uint16
             decoder = decode_bitfields
         elif bitcount == 24:
             pitch = width * 3
-            bits_type = ctypes.c_ubyte
             decoder = decode_24bit
         elif bitcount == 32:
             pitch = width * 4
             if compression == BI_RGB:
                 decoder = decode_32bit_rgb
-                bits_type = ctypes.c_ubyte
             elif compression == BI_BITFIELDS:
                 decoder = decode_bitfields
-                bits_type = ctypes.c_uint32
             else:
                 raise ImageDecodeException(
                     'Unsupported compression: %r' % (filename or file))
@@ -227,17 +226,14 @@ class BMPImageDecoder(ImageDecoder):
                 'Unsupported bit count %d: %r' % (bitcount, filename or file))
 
         pitch = (pitch + 3) & ~3
-        packed_width = pitch // ctypes.sizeof(bits_type)
+        bits = to_bytes(bytes, bits_offset, pitch * height)
 
         if bitcount < 16 and compression == BI_RGB:
             clr_used = info_header.biClrUsed or (1 << bitcount)
-            palette = to_ctypes(buffer, palette_offset, RGBQUAD * clr_used)
-            bits = to_ctypes(buffer, bits_offset,
-                             bits_type * packed_width * height)
+            palette = to_bytes(bytes, palette_offset,
+                               ctypes.sizeof(RGBQUAD) * clr_used)
             return decoder(bits, palette, width, height, pitch, pitch_sign)
         elif bitcount >= 16 and compression == BI_RGB:
-            bits = to_ctypes(buffer, bits_offset,
-                             bits_type * (packed_width * height))
             return decoder(bits, None, width, height, pitch, pitch_sign)
         elif compression == BI_BITFIELDS:
             if info_header.biSize >= ctypes.sizeof(BITMAPV4HEADER):
@@ -254,79 +250,88 @@ class BMPImageDecoder(ImageDecoder):
                 g_mask = fields.green
                 b_mask = fields.blue
 
-            class _BitsArray(ctypes.LittleEndianStructure):
-                _pack_ = 1
-                _fields_ = [
-                    ('data', bits_type * packed_width * height),
-                ]
-            bits = to_ctypes(buffer, bits_offset, _BitsArray).data
             return decoder(bits, r_mask, g_mask, b_mask,
-                           width, height, pitch, pitch_sign)
+                           width, height, pitch, pitch_sign, bitcount // 8)
+
+
+# The decoders below never touch individual pixels from Python.  Palette
+# lookups are done with bytes.translate over the whole image, sub-byte
+# indices are unpacked one bit-plane at a time with extended slicing, and
+# bitfield channels are assembled from per-byte lookup tables combined with
+# a single big-integer OR.  Row padding is decoded along with the pixels,
+# which keeps every row the same length and lets each step run over the
+# entire image at once.
+
+def palette_tables(palette):
+    """Return red, green and blue translation tables for a packed RGBQUAD
+    palette.  Entries beyond the end of the palette map to black.
+    """
+    pad = bytes(256 - len(palette) // 4)
+    return (palette[2::4] + pad,
+            palette[1::4] + pad,
+            palette[0::4] + pad)
+
+
+def interleave(planes):
+    """Interleave equal-length byte planes into a single buffer."""
+    count = len(planes)
+    buffer = bytearray(len(planes[0]) * count)
+    for i, plane in enumerate(planes):
+        buffer[i::count] = plane
+    return buffer
+
+
+def unpack_indices(bits, bitcount):
+    """Expand packed 1- or 4-bit palette indices to one byte per pixel,
+    most significant bits first.
+    """
+    per_byte = 8 // bitcount
+    mask = (1 << bitcount) - 1
+    planes = []
+    for i in range(per_byte):
+        shift = 8 - bitcount * (i + 1)
+        table = bytes((b >> shift) & mask for b in range(256))
+        planes.append(bits.translate(table))
+    return interleave(planes)
+
+
+def decode_palette(indices, palette, width, height, rgb_pitch, pitch_sign):
+    planes = [indices.translate(table) for table in palette_tables(palette)]
+    buffer = bytes(interleave(planes))
+    return ImageData(width, height, 'RGB', buffer, pitch_sign * rgb_pitch)
 
 
 def decode_1bit(bits, palette, width, height, pitch, pitch_sign):
     rgb_pitch = (((pitch << 3) + 7) & ~0x7) * 3
-    buffer = (ctypes.c_ubyte * (height * rgb_pitch))()
-    i = 0
-    for row in bits:
-        for packed in row:
-            for _ in range(8):
-                rgb = palette[(packed & 0x80) >> 7]
-                buffer[i] = rgb.rgbRed
-                buffer[i + 1] = rgb.rgbGreen
-                buffer[i + 2] = rgb.rgbBlue
-                i += 3
-                packed <<= 1
-
-    return ImageData(width, height, 'RGB', buffer, pitch_sign * rgb_pitch)
+    indices = bytes(unpack_indices(bits, 1))
+    return decode_palette(indices, palette, width, height, rgb_pitch,
+                          pitch_sign)
 
 
 def decode_4bit(bits, palette, width, height, pitch, pitch_sign):
     rgb_pitch = (((pitch << 1) + 1) & ~0x1) * 3
-    buffer = (ctypes.c_ubyte * (height * rgb_pitch))()
-    i = 0
-    for row in bits:
-        for packed in row:
-            for index in ((packed & 0xf0) >> 4, packed & 0xf):
-                rgb = palette[index]
-                buffer[i] = rgb.rgbRed
-                buffer[i + 1] = rgb.rgbGreen
-                buffer[i + 2] = rgb.rgbBlue
-                i += 3
-
-    return ImageData(width, height, 'RGB', buffer, pitch_sign * rgb_pitch)
+    indices = bytes(unpack_indices(bits, 4))
+    return decode_palette(indices, palette, width, height, rgb_pitch,
+                          pitch_sign)
 
 
 def decode_8bit(bits, palette, width, height, pitch, pitch_sign):
     rgb_pitch = pitch * 3
-    buffer = (ctypes.c_ubyte * (height * rgb_pitch))()
-    i = 0
-    for row in bits:
-        for index in row:
-            rgb = palette[index]
-            buffer[i] = rgb.rgbRed
-            buffer[i + 1] = rgb.rgbGreen
-            buffer[i + 2] = rgb.rgbBlue
-            i += 3
-
-    return ImageData(width, height, 'RGB', buffer, pitch_sign * rgb_pitch)
+    return decode_palette(bits, palette, width, height, rgb_pitch,
+                          pitch_sign)
 
 
 def decode_24bit(bits, palette, width, height, pitch, pitch_sign):
-    buffer = (ctypes.c_ubyte * (height * pitch))()
-    ctypes.memmove(buffer, bits, len(buffer))
-    return ImageData(width, height, 'BGR', buffer, pitch_sign * pitch)
+    return ImageData(width, height, 'BGR', bits, pitch_sign * pitch)
 
 
 def decode_32bit_rgb(bits, palette, width, height, pitch, pitch_sign):
-    buffer = (ctypes.c_ubyte * (height * pitch))()
-    ctypes.memmove(buffer, bits, len(buffer))
-    return ImageData(width, height, 'BGRA', buffer, pitch_sign * pitch)
+    return ImageData(width, height, 'BGRA', bits, pitch_sign * pitch)
 
 
 def get_shift(mask):
     if not mask:
-        return 0
+        return 0, 0
 
     # Shift down
     shift = 0
@@ -345,23 +350,38 @@ def get_shift(mask):
         return s, 0
 
 
-def decode_bitfields(bits, r_mask, g_mask, b_mask,
-                     width, height, pitch, pitch_sign):
-    r_shift1, r_shift2 = get_shift(r_mask)
-    g_shift1, g_shift2 = get_shift(g_mask)
-    b_shift1, b_shift2 = get_shift(b_mask)
-
-    rgb_pitch = 3 * len(bits[0])
-    buffer = (ctypes.c_ubyte * (height * rgb_pitch))()
-
-    i = 0
-    for row in bits:
-        for packed in row:
-            buffer[i] = (packed & r_mask) >> r_shift1 << r_shift2
-            buffer[i + 1] = (packed & g_mask) >> g_shift1 << g_shift2
-            buffer[i + 2] = (packed & b_mask) >> b_shift1 << b_shift2
-            i += 3
+def decode_channel(bits, mask, bytes_per_pixel):
+    """Extract one 8-bit channel from little-endian packed pixels.
+
+    Each byte of the pixel contributes a disjoint set of bits to the channel,
+    so the channel is the OR of one translated plane per source byte.
+    """
+    shift1, shift2 = get_shift(mask)
+    planes = []
+    for i in range(bytes_per_pixel):
+        table = bytes((((b << (8 * i)) & mask) >> shift1 << shift2) & 0xff
+                      for b in range(256))
+        if any(table):
+            planes.append(bits[i::bytes_per_pixel].translate(table))
 
+    length = len(bits) // bytes_per_pixel
+    if not planes:
+        return bytes(length)
+    elif len(planes) == 1:
+        return planes[0]
+
+    value = 0
+    for plane in planes:
+        value |= int.from_bytes(plane, 'little')
+    return value.to_bytes(length, 'little')
+
+
+def decode_bitfields(bits, r_mask, g_mask, b_mask,
+                     width, height, pitch, pitch_sign, bytes_per_pixel=4):
+    rgb_pitch = 3 * (pitch // bytes_per_pixel)
+    planes = [decode_channel(bits, mask, bytes_per_pixel)
+              for mask in (r_mask, g_mask, b_mask)]
+    buffer = bytes(interleave(planes))
     return ImageData(width, height, 'RGB', buffer, pitch_sign * rgb_pitch)
 
 
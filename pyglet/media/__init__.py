@@ -78,6 +78,7 @@ collect unused resources.
 """
 
 import atexit
+import bisect
 import ctypes
 import heapq
 import sys
@@ -85,7 +86,7 @@ import threading
 import time
 
 import pyglet
-from pyglet.compat import bytes_type, BytesIO
+from pyglet.compat import bytes_type
 
 _debug = pyglet.options['debug_media']
 
@@ -328,9 +329,10 @@ class AudioData:
 
     This class is used internally by pyglet.
 
+    Consuming part of a packet does not copy the remaining samples; the
+    packet keeps its original buffer and advances an offset into it.
+
     :Ivariables:
-        `data` : str or ctypes array or pointer
-            Sample data.
         `length` : int
             Size of sample data, in bytes.
         `timestamp` : float
@@ -341,21 +343,52 @@ class AudioData:
             List of events contained within this packet.  Events are
             timestamped relative to this audio packet.
 
+    A packet may also be created over part of a larger buffer, by giving the
+    `offset` of its first byte.
+
     """
 
-    def __init__(self, data, length, timestamp, duration, events):
-        self.data = data
+    def __init__(self, data, length, timestamp, duration, events, offset=0):
+        self._data = data
+        self._offset = offset
         self.length = length
         self.timestamp = timestamp
         self.duration = duration
         self.events = events
 
+    @property
+    def data(self):
+        """Unconsumed sample data.
+
+        Before any data is consumed this is the object the packet was created
+        with.  Afterwards it is a ctypes array sharing memory with that
+        object, which can be passed to any function expecting a pointer.
+
+        :type: str or ctypes array or pointer
+        """
+        if not self._offset or self._data is None:
+            return self._data
+        return self._get_view()
+
+    def _get_view(self):
+        view_type = ctypes.c_ubyte * self.length
+        try:
+            return view_type.from_buffer(self._data, self._offset)
+        except TypeError:
+            # Read-only buffers and pointers are addressed directly; the
+            # view holds a reference to keep the packet's memory alive.
+            address = ctypes.cast(self._data, ctypes.c_void_p).value
+            view = view_type.from_address(address + self._offset)
+            view._packet = self._data
+            return view
+
     def consume(self, bytes_, audio_format):
         """Remove some data from beginning of packet.  All events are
         cleared."""
         self.events = ()
-        if bytes_ == self.length:
-            self.data = None
+        if bytes_ >= self.length:
+            self._data = None
+            self._offset = 0
             self.length = 0
             self.timestamp += self.duration
             self.duration = 0.
@@ -363,27 +396,30 @@ class AudioData:
         elif bytes_ == 0:
             return
 
-        if not isinstance(self.data, str):
-            # TODO: Create a string buffer for the whole packet then
-            #     chop it up.  Could do some pointer arith here and
-            #     save a bit of data pushing, but my guess is this is
-            #     faster than fudging aruond with ctypes (and easier).
-            data = ctypes.create_string_buffer(self.length)
-            ctypes.memmove(data, self.data, self.length)
-            self.data = data
-        self.data = self.data[bytes_:]
+        self._offset += bytes_
         self.length -= bytes_
         self.duration -= bytes_ / float(audio_format.bytes_per_second)
         self.timestamp += bytes_ / float(audio_format.bytes_per_second)
 
+    def get_buffer(self):
+        """Return the unconsumed sample data as a memoryview of bytes,
+        without copying it.
+
+        :rtype: memoryview
+        """
+        if self._data is None:
+            return memoryview(b'')
+        if isinstance(self._data, bytes_type):
+            view = memoryview(self._data)
+            return view[self._offset:self._offset + self.length]
+        return memoryview(self._get_view()).cast('B')
+
     def get_string_data(self):
         """Return data as a string. (Python 3: return as bytes)"""
-        if isinstance(self.data, bytes_type):
-            return self.data
-
-        buf = ctypes.create_string_buffer(self.length)
-        ctypes.memmove(buf, self.data, self.length)
-        return buf.raw
+        if (isinstance(self._data, bytes_type) and not self._offset and
+                self.length == len(self._data)):
+            return self._data
+        return self.get_buffer().tobytes()
 
 
 class MediaEvent:
@@ -602,18 +638,115 @@ class StreamingSource(Source):
         return self
 
 
+class _StaticBuffer:
+    """Decoded audio data shared by a `StaticSource` and all of its queue
+    sources.
+
+    The data is held as a list of immutable bytes chunks, which queue sources
+    hand out to players without copying.  Chunks are either all decoded up
+    front, or decoded from the source the first time a queue source reads
+    past the end of the data decoded so far.
+    """
+
+    # Arbitrary: number of bytes to request from the source at a time.
+    _request_size = 1 << 20  # 1 MB
+
+    def __init__(self, source=None, converter=None):
+        self._source = source
+        self._converter = converter
+        self._chunks = list()
+        self._offsets = list()
+        self.size = 0
+        self._lock = threading.Lock()
+
+    def _append(self, chunk):
+        if chunk:
+            self._chunks.append(chunk)
+            self._offsets.append(self.size)
+            self.size += len(chunk)
+
+    def _decode(self):
+        """Decode the next chunk from the source.  Return False once the
+        source is exhausted."""
+        audio_data = self._source.get_audio_data(self._request_size)
+        if not audio_data:
+            if self._converter:
+                self._append(self._converter.flush())
+            self._source = None
+            self._converter = None
+            return False
+        data = audio_data.get_string_data()
+        if self._converter:
+            data = self._converter.convert(data)
+        self._append(data)
+        return True
+
+    def decode_all(self):
+        """Decode the rest of the source into a single chunk."""
+        with self._lock:
+            while self._source is not None:
+                self._decode()
+            if len(self._chunks) > 1:
+                data = b''.join(self._chunks)
+                del self._chunks[:]
+                del self._offsets[:]
+                self.size = 0
+                self._append(data)
+
+    def get_chunk(self, offset):
+        """Get the chunk holding the byte at `offset`, decoding more of the
+        source if necessary.
+
+        :rtype: (bytes, int)
+        :return: The chunk and the offset of its first byte, or None if
+            `offset` is past the end of the data.
+        """
+        if self._source is None and len(self._chunks) == 1:
+            # Fully decoded into one chunk; nothing can change any more.
+            if offset < self.size:
+                return self._chunks[0], 0
+            return None
+
+        with self._lock:
+            while offset >= self.size:
+                if self._source is None or not self._decode():
+                    return None
+            index = bisect.bisect_right(self._offsets, offset) - 1
+            return self._chunks[index], self._offsets[index]
+
+
 class StaticSource(Source):
 
     """A source that has been completely decoded in memory.  This source can
     be queued onto multiple players any number of times.
+
+    The decoded data is shared by every player it is queued on.  Unless a
+    format is given, it is stored in the format returned by the audio
+    driver's `AbstractAudioDriver.get_preferred_audio_format`, which is
+    looked up when the source is first queued.  The platform drivers play
+    the source's own format, so it is stored unconverted; only a
+    `pyglet.media.mixer.Mixer` asks for its own format, so that its voices
+    are converted once rather than every time they are played.  Sources
+    longer than `max_eager_duration` seconds are decoded as they are first
+    played rather than all at once.
     """
 
-    def __init__(self, source):
+    #: Sources longer than this, in seconds, are decoded lazily.
+    max_eager_duration = 30.
+
+    _use_preferred_format = False
+
+    def __init__(self, source, audio_format=None):
         """Construct a `StaticSource` for the data in `source`.
 
         :Parameters:
             `source` : `Source`
                 The source to read and decode audio and video data from.
+            `audio_format` : `AudioFormat`
+                Format to store the decoded audio in.  Defaults to the
+                format returned by the current audio driver's
+                `AbstractAudioDriver.get_preferred_audio_format`, which is
+                looked up when the source is first queued.
 
         """
         source = source.get_queue_source()
@@ -625,24 +758,50 @@ class StaticSource(Source):
         if not self.audio_format:
             return
 
-        # Arbitrary: number of bytes to request at a time.
-        buffer_size = 1 << 20  # 1 MB
+        self._use_preferred_format = audio_format is None
+        self._eager = (source.duration is not None and
+                       source.duration <= self.max_eager_duration)
+        self._set_buffer(source, audio_format)
+
+    def _set_buffer(self, source, audio_format):
+        converter = None
+        if audio_format and audio_format != source.audio_format:
+            from . import pcm
+            converter = pcm.Converter(source.audio_format, audio_format,
+                                      pyglet.options['audio_resampler'])
+            self.audio_format = audio_format
+
+        self._buffer = _StaticBuffer(source, converter)
+        if self._eager:
+            self._buffer.decode_all()
+            self._duration = self._buffer.size / \
+                float(self.audio_format.bytes_per_second)
+        else:
+            self._duration = source.duration
 
-        # Naive implementation.  Driver-specific implementations may override
-        # to load static audio data into device (or at least driver) memory.
-        data = BytesIO()
-        while True:
-            audio_data = source.get_audio_data(buffer_size)
-            if not audio_data:
-                break
-            data.write(audio_data.get_string_data())
-        self._data = data.getvalue()
+    def _convert_to_preferred_format(self):
+        self._use_preferred_format = False
+        driver = get_audio_driver()
+        if not driver:
+            return
+        audio_format = driver.get_preferred_audio_format(self.audio_format)
+        if not audio_format or audio_format == self.audio_format:
+            return
 
-        self._duration = len(self._data) / \
-            float(self.audio_format.bytes_per_second)
+        buffer = self._buffer
+        if buffer.size == 0 and buffer._source is not None:
+            # Nothing decoded yet; convert straight from the source.
+            source = buffer._source
+        else:
+            source = StaticMemorySource(buffer, self.audio_format)
+        self._set_buffer(source, audio_format)
 
     def get_queue_source(self):
-        return StaticMemorySource(self._data, self.audio_format)
+        if self._use_preferred_format:
+            self._convert_to_preferred_format()
+        source = StaticMemorySource(self._buffer, self.audio_format)
+        source._duration = self._duration
+        return source
 
     def get_audio_data(self, bytes_):
         raise RuntimeError('StaticSource cannot be queued.')
@@ -656,10 +815,14 @@ class StaticMemorySource(StaticSource):
     def __init__(self, data, audio_format):
         """Construct a memory source over the given data buffer.
         """
-        self._file = BytesIO(data)
-        self._max_offset = len(data)
+        if not isinstance(data, _StaticBuffer):
+            buffer = _StaticBuffer()
+            buffer._append(bytes(data))
+            data = buffer
+        self._buffer = data
+        self._offset = 0
         self.audio_format = audio_format
-        self._duration = len(data) / float(audio_format.bytes_per_second)
+        self._duration = data.size / float(audio_format.bytes_per_second)
 
     def seek(self, timestamp):
         offset = int(timestamp * self.audio_format.bytes_per_second)
@@ -670,10 +833,10 @@ class StaticMemorySource(StaticSource):
         elif self.audio_format.bytes_per_sample == 4:
             offset &= 0xfffffffc
 
-        self._file.seek(offset)
+        self._offset = offset
 
     def get_audio_data(self, bytes_):
-        offset = self._file.tell()
+        offset = self._offset
         timestamp = float(offset) / self.audio_format.bytes_per_second
 
         # Align to sample size
@@ -682,18 +845,116 @@ class StaticMemorySource(StaticSource):
         elif self.audio_format.bytes_per_sample == 4:
             bytes_ &= 0xfffffffc
 
-        data = self._file.read(bytes_)
-        if not len(data):
+        chunk = self._buffer.get_chunk(offset)
+        if chunk is None or not bytes_:
             return None
 
+        # Packets never span chunks; they reference the shared chunk
+        # rather than copying out of it.
+        data, chunk_offset = chunk
+        start = offset - chunk_offset
+        length = min(bytes_, len(data) - start)
+        self._offset += length
+
+        duration = float(length) / self.audio_format.bytes_per_second
+        return AudioData(data, length, timestamp, duration, list(), start)
+
+
+def _can_convert(in_format, out_format):
+    """Return True if audio in `in_format` can be converted to
+    `out_format` as it is played."""
+    if not in_format or not out_format:
+        return False
+    return all(audio_format.channels in (1, 2) and
+               audio_format.sample_size in (8, 16)
+               for audio_format in (in_format, out_format))
+
+
+def _best_audio_format(*audio_formats):
+    """Return the format that audio of all of `audio_formats` can be
+    converted to without losing channels, precision or sample rate."""
+    return AudioFormat(
+        channels=max(audio_format.channels for audio_format in audio_formats),
+        sample_size=max(audio_format.sample_size
+                        for audio_format in audio_formats),
+        sample_rate=max(audio_format.sample_rate
+                        for audio_format in audio_formats))
+
+
+class _ConvertedSource(Source):
+
+    """Queue source converting the audio of another queue source to a
+    different format as it is read.
+
+    Used by `SourceGroup` to play sources of different audio formats in
+    sequence.
+    """
+
+    def __init__(self, source, audio_format):
+        from . import pcm
+        self._source = source
+        self._converter = pcm.Converter(source.audio_format, audio_format,
+                                        pyglet.options['audio_resampler'])
+        self.audio_format = audio_format
+        self.video_format = source.video_format
+        self._duration = source.duration
+        # Source time just after the last packet returned.
+        self._timestamp = 0.
+
+    def seek(self, timestamp):
+        self._source.seek(timestamp)
+        self._converter.reset()
+        self._timestamp = timestamp
+
+    def get_audio_data(self, bytes_):
+        in_format = self._source.audio_format
+        # Request about as much source data as will convert to `bytes_`,
+        # in whole frames.
+        frames = max(1, int(bytes_ * in_format.bytes_per_second /
+                            self.audio_format.bytes_per_second /
+                            in_format.bytes_per_sample))
+        # Events of packets that convert to no data are passed on with the
+        # next data returned.
+        events = list()
+        while True:
+            audio_data = self._source.get_audio_data(
+                frames * in_format.bytes_per_sample)
+            if not audio_data:
+                # End of stream; return what the resampler held back.
+                data = self._converter.flush()
+                if not data:
+                    return None
+                timestamp = self._timestamp
+                break
+            events.extend(audio_data.events)
+            data = self._converter.convert(audio_data.get_buffer())
+            if data:
+                timestamp = audio_data.timestamp
+                break
+
         duration = float(len(data)) / self.audio_format.bytes_per_second
-        return AudioData(data, len(data), timestamp, duration, list())
+        self._timestamp = timestamp + duration
+        return AudioData(data, len(data), timestamp, duration, events)
+
+    def get_next_video_timestamp(self):
+        return self._source.get_next_video_timestamp()
+
+    def get_next_video_frame(self):
+        return self._source.get_next_video_frame()
 
 
 class SourceGroup:
 
-    """Read data from a queue of sources, with support for looping.  All
-    sources must share the same audio format.
+    """Read data from a queue of sources, with support for looping.
+
+    Sources whose audio format differs from the group's are converted to it
+    as they are read, by mixing channels up or down, converting between 8-
+    and 16-bit samples and resampling.  `Player` widens the format of a
+    group it has not started playing to fit each source it queues, so that
+    no source is played with fewer channels, bits or samples than it has.
+    The resampling method is set by the ``audio_resampler`` option.  Only
+    8- and 16-bit mono and stereo audio can be converted; other sources
+    must share the group's audio format.
 
     :Ivariables:
         `audio_format` : `AudioFormat`
@@ -719,11 +980,26 @@ class SourceGroup:
             self._sources[0].seek(time)
 
     def queue(self, source):
-        source = source.get_queue_source()
-        assert(source.audio_format == self.audio_format)
+        source = self._convert(source.get_queue_source())
         self._sources.append(source)
         self.duration += source.duration
 
+    def _convert(self, source):
+        if source.audio_format == self.audio_format:
+            return source
+        if not _can_convert(source.audio_format, self.audio_format):
+            raise MediaException('Cannot convert %r to %r' % (
+                source.audio_format, self.audio_format))
+        return _ConvertedSource(source, self.audio_format)
+
+    def _set_audio_format(self, audio_format):
+        """Change the group's audio format, converting the queued sources to
+        it instead.  Only valid before the group is played."""
+        sources = [source._source if isinstance(source, _ConvertedSource)
+                   else source for source in self._sources]
+        self.audio_format = audio_format
+        self._sources = [self._convert(source) for source in sources]
+
     def has_next(self):
         return len(self._sources) > 1
 
@@ -950,6 +1226,10 @@ class AbstractAudioPlayer:
         """See `Player.cone_outer_gain`."""
         pass
 
+    def set_priority(self, priority):
+        """See `Player.priority`."""
+        pass
+
 
 class Player(pyglet.event.EventDispatcher):
 
@@ -972,6 +1252,8 @@ class Player(pyglet.event.EventDispatcher):
     _cone_outer_angle = 360.
     _cone_outer_gain = 1.
 
+    _priority = 0
+
     def __init__(self):
         self._group_queue = list()
         self._audio_player = None
@@ -983,10 +1265,21 @@ class Player(pyglet.event.EventDispatcher):
         if isinstance(source, SourceGroup):
             self._group_queue.append(source)
         else:
-            if (self._group_queue and
-                    source.audio_format == self._group_queue[-1].audio_format and
-                    source.video_format == self._group_queue[-1].video_format):
-                self._group_queue[-1].queue(source)
+            group = self._group_queue and self._group_queue[-1]
+            if (group and
+                    source.video_format == group.video_format and
+                    (source.audio_format == group.audio_format or
+                     _can_convert(source.audio_format, group.audio_format))):
+                # Until the group is played, widen its format to fit the
+                # new source rather than degrading the new source.
+                if (source.audio_format != group.audio_format and
+                        not (self._audio_player and
+                             group is self._group_queue[0])):
+                    audio_format = _best_audio_format(group.audio_format,
+                                                      source.audio_format)
+                    if audio_format != group.audio_format:
+                        group._set_audio_format(audio_format)
+                group.queue(source)
             else:
                 group = SourceGroup(source.audio_format, source.video_format)
                 group.advance_after_eos = True
@@ -1112,6 +1405,7 @@ class Player(pyglet.event.EventDispatcher):
         set_('cone_inner_angle')
         set_('cone_outer_angle')
         set_('cone_outer_gain')
+        set_('priority')
 
     @property
     def source(self):
@@ -1203,6 +1497,14 @@ class Player(pyglet.event.EventDispatcher):
     cone_inner_angle = _player_property('cone_inner_angle')
     cone_outer_angle = _player_property('cone_outer_angle')
     cone_outer_gain = _player_property('cone_outer_gain')
+    priority = _player_property('priority', doc="""Importance of this
+        player's sound when voices must be stolen.
+
+        Only used when mixing players with a `pyglet.media.mixer.Mixer`;
+        higher priorities are stolen last.  Defaults to 0.
+
+        :type: int
+        """)
 
     # Events
 
@@ -1288,6 +1590,19 @@ class AbstractAudioDriver:
     def create_audio_player(self, source_group, player):
         raise NotImplementedError('abstract')
 
+    def get_preferred_audio_format(self, audio_format):
+        """Get the format this driver would rather play audio of the given
+        format in.
+
+        Audio that is played many times, such as a `StaticSource`, can be
+        converted to this format once instead of every time it is played.
+        The default implementation returns `audio_format` unchanged, for
+        drivers that play any supported format directly.
+
+        :rtype: `AudioFormat`
+        """
+        return audio_format
+
     def get_listener(self):
         raise NotImplementedError('abstract')
 
@@ -1463,6 +1778,10 @@ def get_audio_driver():
             if _debug:
                 print('Error importing driver %s:\n%s' %
                       (driver_name, str(exp)))
+
+    if _audio_driver and pyglet.options['audio_mixer']:
+        from .mixer import Mixer
+        _audio_driver = Mixer(_audio_driver)
     return _audio_driver
 
 
@@ -1,3 +1,6 @@
+import heapq
+import itertools
+import threading
 import time
 
 from pyglet.media import AbstractAudioPlayer, AbstractAudioDriver, \
@@ -18,7 +21,113 @@ class SilentAudioPacket:
         self.duration -= dt
 
 
+class SilentAudioWorker(MediaThread):
+    """A single thread servicing every `SilentAudioPlayerPacketConsumer`.
+
+    Players are kept in a priority queue keyed by the time they next need
+    servicing, so the thread only ever sleeps until the earliest of them.
+    Rescheduling a player marks its previous queue entry as stale rather
+    than removing it from the heap.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Heap of [wake time, sequence number, player]; player is None for
+        # stale entries.
+        self._queue = list()
+        self._entries = dict()
+        self._sequence = itertools.count()
+        # Players being serviced; `schedule` ignores any others.
+        self._players = set()
+
+    def add(self, player):
+        """Start servicing `player` immediately."""
+        with self.condition:
+            self._players.add(player)
+            self.schedule(player, 0)
+
+    def remove(self, player):
+        """Stop servicing `player`."""
+        with self.condition:
+            self._players.discard(player)
+            entry = self._entries.pop(player, None)
+            if entry is not None:
+                entry[2] = None
+
+    def schedule(self, player, delay):
+        """Service `player` after `delay` seconds, replacing any earlier
+        schedule.  A delay of None leaves the player idle until it is
+        scheduled again.  Players that were never added, or have been
+        removed, are ignored."""
+        with self.condition:
+            if player not in self._players:
+                return
+            entry = self._entries.pop(player, None)
+            if entry is not None:
+                entry[2] = None
+            if delay is None:
+                return
+            entry = [time.time() + delay, next(self._sequence), player]
+            self._entries[player] = entry
+            heapq.heappush(self._queue, entry)
+            if self._queue[0] is entry:
+                self.condition.notify()
+
+    def run(self):
+        queue = self._queue
+        while True:
+            with self.condition:
+                while True:
+                    if self.stopped:
+                        return
+                    while queue and queue[0][2] is None:
+                        heapq.heappop(queue)
+                    if not queue:
+                        self.condition.wait()
+                        continue
+                    now = time.time()
+                    wake_time = queue[0][0]
+                    if wake_time > now:
+                        self.condition.wait(wake_time - now)
+                        continue
+                    _, _, player = heapq.heappop(queue)
+                    del self._entries[player]
+                    break
+
+            delay = player._service(now - wake_time)
+            with self.condition:
+                # Leave the player alone if it was removed or rescheduled
+                # while being serviced.
+                if delay is False:
+                    self._players.discard(player)
+                elif player not in self._entries:
+                    self.schedule(player, delay)
+
+
+_worker = None
+
+
+def _get_worker():
+    global _worker
+    if _worker is None:
+        _worker = SilentAudioWorker()
+        _worker.start()
+    return _worker
+
+
 class SilentAudioPlayerPacketConsumer(AbstractAudioPlayer):
+    """Consume audio data at playback speed without playing it.
+
+    All packet consumers are serviced by one shared `SilentAudioWorker`.
+
+    :Ivariables:
+        `service_latency` : float
+            Delay, in seconds, between when this player was most recently
+            due to be serviced and when the worker serviced it.
+        `max_service_latency` : float
+            Largest `service_latency` seen so far.
+
+    """
     # When playing video, length of audio (in secs) to buffer ahead.
     _buffer_time = 0.4
 
@@ -39,119 +148,129 @@ class SilentAudioPlayerPacketConsumer(AbstractAudioPlayer):
         self._packets = list()
         self._packets_duration = 0
         self._events = list()
+        self._eos = False
 
         # Actual play state.
         self._playing = False
 
-        # TODO Be nice to avoid creating this thread if user doesn't care
+        self.service_latency = 0.
+        self.max_service_latency = 0.
+
+        # NOTE Use self._lock for all instance vars used by the worker.
+        # TODO Be nice to avoid servicing this player if user doesn't care
         #      about EOS events and there's no video format.
-        # NOTE Use thread.condition as lock for all instance vars used by
-        # worker
-        self._thread = MediaThread(target=self._worker_func)
+        self._lock = threading.RLock()
+        self._worker = _get_worker()
         if source_group.audio_format:
-            self._thread.start()
+            self._worker.add(self)
 
     def delete(self):
         if _debug:
             print('SilentAudioPlayer.delete')
-        self._thread.stop()
+        self._worker.remove(self)
 
     def play(self):
         if _debug:
             print('SilentAudioPlayer.play')
 
-        self._thread.condition.acquire()
-        if not self._playing:
-            self._playing = True
-            self._timestamp_time = time.time()
-            self._thread.condition.notify()
-        self._thread.condition.release()
+        with self._lock:
+            if not self._playing:
+                self._playing = True
+                self._timestamp_time = time.time()
+                if not self._eos or self._events:
+                    self._worker.schedule(self, 0)
 
     def stop(self):
         if _debug:
             print('SilentAudioPlayer.stop')
 
-        self._thread.condition.acquire()
-        if self._playing:
-            timestamp = self.get_time()
-            if self._packets:
-                packet = self._packets[0]
-                self._packets_duration -= timestamp - packet.timestamp
-                packet.consume(timestamp - packet.timestamp)
-            self._playing = False
-        self._thread.condition.release()
+        with self._lock:
+            if self._playing:
+                timestamp = self.get_time()
+                if self._packets:
+                    packet = self._packets[0]
+                    self._packets_duration -= timestamp - packet.timestamp
+                    packet.consume(timestamp - packet.timestamp)
+                self._playing = False
 
     def clear(self):
         if _debug:
             print('SilentAudioPlayer.clear')
 
-        self._thread.condition.acquire()
-        del self._packets[:]
-        self._packets_duration = 0
-        del self._events[:]
-        self._thread.condition.release()
+        with self._lock:
+            del self._packets[:]
+            self._packets_duration = 0
+            del self._events[:]
 
     def get_time(self):
         if _debug:
             print('SilentAudioPlayer.get_time()')
-        self._thread.condition.acquire()
-
-        packets = self._packets
-
-        if self._playing:
-            # Consume timestamps
-            result = None
-            offset = time.time() - self._timestamp_time
-            while packets:
-                packet = packets[0]
-                if offset > packet.duration:
-                    del packets[0]
-                    self._timestamp_time += packet.duration
-                    offset -= packet.duration
-                    self._packets_duration -= packet.duration
-                else:
-                    packet.consume(offset)
-                    self._packets_duration -= offset
-                    self._timestamp_time += offset
-                    result = packet.timestamp
-                    break
-        else:
-            # Paused
-            if packets:
-                result = packets[0].timestamp
-            else:
-                result = None
 
-        self._thread.condition.release()
+        with self._lock:
+            packets = self._packets
+
+            if self._playing:
+                # Consume timestamps
+                result = None
+                offset = time.time() - self._timestamp_time
+                while packets:
+                    packet = packets[0]
+                    if offset > packet.duration:
+                        del packets[0]
+                        self._timestamp_time += packet.duration
+                        offset -= packet.duration
+                        self._packets_duration -= packet.duration
+                    else:
+                        packet.consume(offset)
+                        self._packets_duration -= offset
+                        self._timestamp_time += offset
+                        result = packet.timestamp
+                        break
+            else:
+                # Paused
+                if packets:
+                    result = packets[0].timestamp
+                else:
+                    result = None
 
         if _debug:
             print('SilentAudioPlayer.get_time() -> ', result)
         return result
 
-    # Worker func that consumes audio data and dispatches events
-    def _worker_func(self):
-        thread = self._thread
-        #buffered_time = 0
-        eos = False
-        events = self._events
+    def _service(self, latency):
+        """Consume audio data and dispatch events, as one step of the
+        worker.
 
-        while True:
-            thread.condition.acquire()
-            if thread.stopped or (eos and not events):
-                thread.condition.release()
-                break
+        Returns the number of seconds until the player next needs
+        servicing, None to wait until it is played, or False if it is
+        finished.
+        """
+        self.service_latency = latency
+        if latency > self.max_service_latency:
+            self.max_service_latency = latency
+
+        with self._lock:
+            events = self._events
+            if self._eos and not events:
+                return False
 
             # Use up "buffered" audio based on amount of time passed.
             timestamp = self.get_time()
             if _debug:
                 print('timestamp: %r' % timestamp)
 
-            # Dispatch events
-            while events and timestamp is not None:
-                if (events[0].timestamp is None or
-                        events[0].timestamp <= timestamp):
-                    events[0]._sync_dispatch_to_player(self.player)
-                    del events[0]
+            # Dispatch events.  Once the source is exhausted and all
+            # buffered audio has played there is no timestamp left, and any
+            # remaining events are due.
+            while events:
+                if timestamp is None:
+                    if not (self._playing and self._eos):
+                        break
+                elif (events[0].timestamp is not None and
+                        events[0].timestamp > timestamp):
+                    break
+                events[0]._sync_dispatch_to_player(self.player)
+                del events[0]
 
             # Calculate how much data to request from source
             secs = self._buffer_time - self._packets_duration
@@ -159,13 +278,13 @@ class SilentAudioPlayerPacketConsumer(AbstractAudioPlayer):
             if _debug:
                 print('Trying to buffer %d bytes (%r secs)' % (bytes, secs))
 
-            while bytes > self._min_update_bytes and not eos:
+            while bytes > self._min_update_bytes and not self._eos:
                 # Pull audio data from source
                 audio_data = self.source_group.get_audio_data(int(bytes))
-                if not audio_data and not eos:
+                if not audio_data:
                     events.append(MediaEvent(timestamp, 'on_eos'))
                     events.append(MediaEvent(timestamp, 'on_source_group_eos'))
-                    eos = True
+                    self._eos = True
                     break
 
                 # Pretend to buffer audio data, collect events.
@@ -177,20 +296,21 @@ class SilentAudioPlayerPacketConsumer(AbstractAudioPlayer):
                 for event in audio_data.events:
                     event.timestamp += audio_data.timestamp
                     events.append(event)
-                events.extend(audio_data.events)
                 bytes -= audio_data.length
 
+            if self._eos and not events:
+                return False
+
             sleep_time = self._sleep_time
             if not self._playing:
                 sleep_time = None
             elif events and events[0].timestamp and timestamp:
-                sleep_time = min(sleep_time, events[0].timestamp - timestamp)
+                sleep_time = max(0, min(sleep_time,
+                                        events[0].timestamp - timestamp))
 
             if _debug:
                 print('SilentAudioPlayer(Worker).sleep', sleep_time)
-            thread.sleep(sleep_time)
-
-            thread.condition.release()
+            return sleep_time
 
 
 class SilentTimeAudioPlayer(AbstractAudioPlayer):
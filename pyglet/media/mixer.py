@@ -0,0 +1,445 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+
+"""Software mixing of many players into a single driver stream.
+
+Each `Player` normally gets its own player on the audio driver, with its own
+driver source and buffering work.  A `Mixer` is an audio driver that
+instead gives each player a lightweight voice, mixes all playing voices in
+fixed-size blocks, and plays the mix through a single player on another
+driver.  This allows hundreds of short sounds to play concurrently without
+running out of driver sources.
+
+To route all players through a mixer, set the ``audio_mixer`` option before
+playing any media::
+
+    pyglet.options['audio_mixer'] = True
+
+A mixer can also be created explicitly, for example to mix to the silent
+driver in tests::
+
+    mixer = Mixer(get_silent_audio_driver(), max_voices=64)
+    audio_player = mixer.create_audio_player(source_group, player)
+
+Voices are converted to the mixer's audio format as they are mixed: 8-bit
+samples are widened, mono voices are panned across the output channels and
+every voice is resampled to the output sample rate (scaled by its pitch).
+A player's volume sets the voice gain, and the x component of its position,
+clamped to [-1, 1], pans it from left to right.
+
+When more than `Mixer.max_voices` voices are playing, starting another
+voice steals the playing voice with the lowest `Player.priority` (the oldest
+if several share it), provided its priority is no higher than the new
+voice's.  Otherwise the new voice is not played.  A stolen voice ends as if
+its source had finished, so its player receives the usual EOS events.
+
+:since: pyglet 1.2
+"""
+
+import itertools
+import threading
+from collections import deque
+
+from pyglet.media import AbstractAudioDriver, AbstractAudioPlayer, \
+    AudioData, AudioFormat, MediaException, MediaEvent, SourceGroup, \
+    Source
+from pyglet.media import pcm
+
+import pyglet
+_debug = pyglet.options['debug_media']
+
+
+class MixerVoice(AbstractAudioPlayer):
+    """The audio player given to each `Player` mixed by a `Mixer`."""
+
+    # Number of mixed blocks remembered for mapping the output time back to
+    # the voice's source time.
+    _max_timestamps = 64
+
+    def __init__(self, mixer, source_group, player):
+        super().__init__(source_group, player)
+        audio_format = source_group.audio_format
+        if audio_format.channels not in (1, 2):
+            raise MediaException('Cannot mix audio with %d channels' %
+                                 audio_format.channels)
+        if audio_format.sample_size not in (8, 16):
+            raise MediaException('Cannot mix %d-bit audio' %
+                                 audio_format.sample_size)
+
+        self.mixer = mixer
+        self.priority = 0
+        self.order = 0
+        self._volume = 1.0
+        self._pan = 0.0
+        self._pitch = 1.0
+
+        self._playing = False
+        self._finished = False
+        self._eos = False
+
+        self._channels = audio_format.channels
+        self._resampler = pcm.LinearResampler(self._channels,
+                                              audio_format.sample_rate,
+                                              mixer.audio_format.sample_rate)
+        # Resampled 16-bit data at the source channel count, not yet mixed.
+        self._buffer = bytearray()
+        # Source time of the first sample in _buffer.
+        self._timestamp = None
+        self._events = list()
+        # (mixer time, voice time) at the start of each recently mixed block.
+        self._timestamps = deque(maxlen=self._max_timestamps)
+
+    def play(self):
+        self.mixer._play_voice(self)
+
+    def stop(self):
+        self.mixer._stop_voice(self)
+
+    def delete(self):
+        self.mixer._remove_voice(self)
+
+    def clear(self):
+        with self.mixer._lock:
+            del self._buffer[:]
+            del self._events[:]
+            self._timestamp = None
+            self._timestamps.clear()
+            self._resampler.reset()
+            self._eos = False
+
+    def get_time(self):
+        mixer_time = self.mixer.get_time()
+        with self.mixer._lock:
+            if not self._timestamps:
+                return None
+            if mixer_time is None:
+                return self._timestamps[0][1]
+            for block_time, voice_time in reversed(self._timestamps):
+                if block_time <= mixer_time:
+                    return voice_time + (mixer_time - block_time) * self._pitch
+            return self._timestamps[0][1]
+
+    def set_volume(self, volume):
+        self._volume = volume
+
+    def set_position(self, position):
+        self._pan = max(-1.0, min(1.0, position[0]))
+
+    def set_pitch(self, pitch):
+        resampler = pcm.LinearResampler(
+            self._channels,
+            max(1, int(self.source_group.audio_format.sample_rate * pitch)),
+            self.mixer.audio_format.sample_rate)
+        with self.mixer._lock:
+            self._pitch = pitch
+            self._resampler = resampler
+
+    def set_priority(self, priority):
+        self.priority = priority
+
+    def _fill(self, size):
+        """Pull and convert source data until `size` bytes are buffered or
+        the source is exhausted."""
+        audio_format = self.source_group.audio_format
+        ratio = (audio_format.sample_rate * self._pitch /
+                 self.mixer.audio_format.sample_rate)
+        while len(self._buffer) < size and not self._eos:
+            # Ask for a few frames more than needed so that resampling
+            # round-off doesn't leave the buffer just short.
+            frame_size = audio_format.bytes_per_sample * audio_format.channels
+            needed = size - len(self._buffer)
+            request = int(needed * ratio * audio_format.bytes_per_sample / 2)
+            request += 4 * frame_size
+            audio_data = self.source_group.get_audio_data(request)
+            if not audio_data:
+                self._eos = True
+                self._buffer += self._resampler.flush()
+                break
+
+            if self._timestamp is None:
+                self._timestamp = audio_data.timestamp
+            for event in audio_data.events:
+                self._events.append(event)
+
+            data = pcm.to_16bit(audio_data.get_buffer(),
+                                audio_format.sample_size)
+            self._buffer += self._resampler.convert(data)
+
+    def _read(self, frames, mixer_time):
+        """Return up to `frames` frames converted to the mixer's format, or
+        None if the voice has nothing more to play."""
+        frame_size = 2 * self._channels
+        size = frames * frame_size
+        self._fill(size)
+        if not self._buffer:
+            self._finished = self._eos
+            return None
+
+        fragment = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        if self._timestamp is not None:
+            self._timestamps.append((mixer_time, self._timestamp))
+            self._timestamp += (len(fragment) // frame_size * self._pitch /
+                                self.mixer.audio_format.sample_rate)
+        if not self._buffer and self._eos:
+            self._finished = True
+
+        return self._pan_fragment(fragment)
+
+    def _pan_fragment(self, fragment):
+        volume = self._volume
+        left = volume * min(1.0, 1.0 - self._pan)
+        right = volume * min(1.0, 1.0 + self._pan)
+        output_channels = self.mixer.audio_format.channels
+
+        if self._channels == 1:
+            if output_channels == 1:
+                return pcm.mul(fragment, volume)
+            return pcm.tostereo(fragment, left, right)
+
+        if output_channels == 1:
+            return pcm.tomono(fragment, volume * 0.5, volume * 0.5)
+        if left == right:
+            return pcm.mul(fragment, volume)
+        return pcm.add(pcm.tostereo(pcm.tomono(fragment, 1, 0), left, 0),
+                       pcm.tostereo(pcm.tomono(fragment, 0, 1), 0, right))
+
+    def _dispatch_events(self):
+        for event in self._events:
+            event._sync_dispatch_to_player(self.player)
+        del self._events[:]
+
+    def _end(self):
+        """Signal the player that this voice has finished playing."""
+        MediaEvent(0, 'on_eos')._sync_dispatch_to_player(self.player)
+        MediaEvent(0, 'on_source_group_eos')._sync_dispatch_to_player(
+            self.player)
+
+
+class _MixerSource(Source):
+    """Endless source producing the mixer's output, one block at a time."""
+
+    _duration = float('inf')
+
+    def __init__(self, mixer):
+        self.mixer = mixer
+        self.audio_format = mixer.audio_format
+        self._timestamp = 0.
+
+    def get_audio_data(self, bytes_):
+        data = self.mixer.mix(self.mixer.block_size, self._timestamp)
+        duration = self.mixer.block_size / float(
+            self.audio_format.sample_rate)
+        audio_data = AudioData(data, len(data), self._timestamp, duration,
+                               list())
+        self._timestamp += duration
+        return audio_data
+
+    def seek(self, timestamp):
+        pass
+
+
+class Mixer(AbstractAudioDriver):
+    """An audio driver mixing its players into a single stream on another
+    driver.
+
+    :Ivariables:
+        `driver` : `AbstractAudioDriver`
+            Driver playing the mixed stream.
+        `audio_format` : `AudioFormat`
+            Format of the mixed stream.
+        `max_voices` : int
+            Maximum number of voices mixed at once.
+        `block_size` : int
+            Number of frames mixed at a time.
+        `steals` : int
+            Number of voices stopped, or refused, to stay within
+            `max_voices`.
+
+    """
+
+    def __init__(self, driver, audio_format=None, max_voices=32,
+                 block_size=1024):
+        """Create a mixer playing through `driver`.
+
+        :Parameters:
+            `driver` : `AbstractAudioDriver`
+                Driver to play the mixed stream on.
+            `audio_format` : `AudioFormat`
+                Format of the mixed stream.  Defaults to 16-bit stereo at
+                44.1 kHz.  Only 8- and 16-bit mono and stereo formats are
+                supported.
+            `max_voices` : int
+                Maximum number of voices mixed at once.
+            `block_size` : int
+                Number of frames to mix at a time.
+
+        """
+        if audio_format is None:
+            audio_format = AudioFormat(channels=2, sample_size=16,
+                                       sample_rate=44100)
+        if (audio_format.channels not in (1, 2) or
+                audio_format.sample_size not in (8, 16)):
+            raise MediaException('Unsupported mixer format %r' %
+                                 audio_format)
+        self.driver = driver
+        self.audio_format = audio_format
+        self.max_voices = max_voices
+        self.block_size = block_size
+        self.steals = 0
+
+        self._lock = threading.RLock()
+        self._voices = list()
+        self._order = itertools.count()
+        self._output = None
+
+    def create_audio_player(self, source_group, player):
+        if not source_group.audio_format:
+            return self.driver.create_audio_player(source_group, player)
+        return MixerVoice(self, source_group, player)
+
+    def get_listener(self):
+        return self.driver.get_listener()
+
+    def get_preferred_audio_format(self, audio_format):
+        # Voices keep their own channel count, since mono voices are panned.
+        if (audio_format.channels not in (1, 2) or
+                audio_format.sample_size not in (8, 16)):
+            return audio_format
+        return AudioFormat(channels=audio_format.channels, sample_size=16,
+                           sample_rate=self.audio_format.sample_rate)
+
+    def get_voices(self):
+        """Get the voices currently playing.
+
+        :rtype: list of `MixerVoice`
+        """
+        with self._lock:
+            return [voice for voice in self._voices if voice._playing]
+
+    def get_time(self):
+        """Return the time of the mixed stream currently being heard, or None
+        if the mixer has not started playing."""
+        if self._output is None:
+            return None
+        return self._output.get_time()
+
+    def delete(self):
+        """Stop playing the mixed stream and release the driver player."""
+        if self._output is not None:
+            self._output.delete()
+            self._output = None
+
+    def mix(self, frames, mixer_time=0.):
+        """Mix the next `frames` frames of all playing voices.
+
+        This is called from the output driver; it is only public so that the
+        mixer can be driven directly, for example by tests.
+
+        :rtype: bytes
+        """
+        with self._lock:
+            voices = [voice for voice in self._voices if voice._playing]
+
+        size = frames * 2 * self.audio_format.channels
+        output = bytes(size)
+        finished = list()
+        for voice in voices:
+            # The main thread clears and reconfigures voices under the lock.
+            with self._lock:
+                if not voice._playing:
+                    continue
+                fragment = voice._read(frames, mixer_time)
+                voice._dispatch_events()
+            if fragment:
+                if len(fragment) < size:
+                    fragment += bytes(size - len(fragment))
+                output = pcm.add(output, fragment)
+            if voice._finished:
+                finished.append(voice)
+
+        for voice in finished:
+            self._end_voice(voice)
+
+        return pcm.from_16bit(output, self.audio_format.sample_size)
+
+    def _start_output(self):
+        if self._output is None:
+            group = SourceGroup(self.audio_format, None)
+            group.queue(_MixerSource(self))
+            self._output = self.driver.create_audio_player(group, self)
+            self._output.play()
+
+    def _play_voice(self, voice):
+        with self._lock:
+            if voice._playing or voice._finished:
+                return
+            if voice not in self._voices:
+                self._voices.append(voice)
+            voice.order = next(self._order)
+
+            playing = [v for v in self._voices if v._playing]
+            if len(playing) >= self.max_voices:
+                victim = min(playing, key=lambda v: (v.priority, v.order))
+                self.steals += 1
+                if victim.priority > voice.priority:
+                    # Every playing voice outranks the new one.
+                    if _debug:
+                        print('Mixer refused voice', voice)
+                    self._end_voice(voice)
+                    return
+                if _debug:
+                    print('Mixer stole voice', victim)
+                self._end_voice(victim)
+
+            voice._playing = True
+        self._start_output()
+
+    def _stop_voice(self, voice):
+        with self._lock:
+            voice._playing = False
+
+    def _remove_voice(self, voice):
+        with self._lock:
+            voice._playing = False
+            if voice in self._voices:
+                self._voices.remove(voice)
+
+    def _end_voice(self, voice):
+        with self._lock:
+            voice._playing = False
+            voice._finished = True
+            if voice in self._voices:
+                self._voices.remove(voice)
+        voice._end()
@@ -0,0 +1,399 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+
+"""Operations on fragments of PCM audio samples.
+
+This module is used internally by pyglet to mix and convert audio.  Each
+function works on a whole fragment at once, using `array` slicing and
+`map` so that the per-sample work stays in C wherever possible.
+
+Unless stated otherwise, fragments are bytes of native-endian signed 16-bit
+samples, with channels interleaved.  8-bit audio in pyglet is unsigned, and
+is converted with `to_16bit` and `from_16bit`.
+"""
+
+import array
+import math
+import operator
+import sys
+from fractions import Fraction
+
+_min_sample = -32768
+_max_sample = 32767
+
+# Index of the most significant byte of a native 16-bit sample.
+_high_byte = 1 if sys.byteorder == 'little' else 0
+
+# Maps an unsigned 8-bit sample to the high byte of the equivalent signed
+# 16-bit sample, and back.
+_flip_sign = bytes(b ^ 0x80 for b in range(256))
+
+
+def _clip(value):
+    return min(max(value, _min_sample), _max_sample)
+
+
+def _samples(fragment):
+    samples = array.array('h')
+    samples.frombytes(fragment)
+    return samples
+
+
+def _scale(samples, factor):
+    """Return an array of `samples` multiplied by `factor`, clipped."""
+    if factor == 1:
+        return samples
+    elif factor == 0:
+        return array.array('h', bytes(2 * len(samples)))
+    values = map(int, map(float(factor).__mul__, samples))
+    if not 0 <= factor <= 1:
+        values = map(_clip, values)
+    return array.array('h', values)
+
+
+def to_16bit(fragment, sample_size):
+    """Convert a fragment of 8- or 16-bit samples to signed 16-bit."""
+    if sample_size == 16:
+        return bytes(fragment)
+    elif sample_size != 8:
+        raise ValueError('Unsupported sample size %d' % sample_size)
+    high = bytes(fragment).translate(_flip_sign)
+    result = bytearray(2 * len(high))
+    result[_high_byte::2] = high
+    return bytes(result)
+
+
+def from_16bit(fragment, sample_size):
+    """Convert a fragment of signed 16-bit samples to 8- or 16-bit."""
+    if sample_size == 16:
+        return bytes(fragment)
+    elif sample_size != 8:
+        raise ValueError('Unsupported sample size %d' % sample_size)
+    return bytes(fragment)[_high_byte::2].translate(_flip_sign)
+
+
+def mul(fragment, factor):
+    """Multiply every sample by `factor`, clipping the result."""
+    if factor == 1:
+        return bytes(fragment)
+    return _scale(_samples(fragment), factor).tobytes()
+
+
+def add(fragment1, fragment2):
+    """Add two fragments of equal length sample by sample, clipping the
+    result."""
+    samples1 = _samples(fragment1)
+    samples2 = _samples(fragment2)
+    try:
+        result = array.array('h', map(operator.add, samples1, samples2))
+    except OverflowError:
+        result = array.array('h', map(_clip, map(operator.add,
+                                                 samples1, samples2)))
+    return result.tobytes()
+
+
+def tostereo(fragment, left, right):
+    """Convert a mono fragment to stereo, scaling each channel by the given
+    factor."""
+    samples = _samples(fragment)
+    result = array.array('h', bytes(4 * len(samples)))
+    result[0::2] = _scale(samples, left)
+    result[1::2] = _scale(samples, right)
+    return result.tobytes()
+
+
+def tomono(fragment, left, right):
+    """Convert a stereo fragment to mono, summing the channels scaled by the
+    given factors."""
+    samples = _samples(fragment)
+    values = map(int, map(operator.add,
+                          map(float(left).__mul__, samples[0::2]),
+                          map(float(right).__mul__, samples[1::2])))
+    if not (left >= 0 and right >= 0 and left + right <= 1):
+        values = map(_clip, values)
+    return array.array('h', values).tobytes()
+
+
+class LinearResampler:
+    """Convert the sample rate of a stream of fragments by linear
+    interpolation.
+
+    The resampler keeps the interpolation state between calls to `convert`,
+    so consecutive fragments of a stream join without discontinuities.
+    """
+
+    def __init__(self, channels, in_rate, out_rate):
+        self.channels = channels
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.reset()
+
+    def reset(self):
+        """Forget the interpolation state, for example after seeking."""
+        # Input position of the next output frame, relative to the first
+        # frame of the next fragment, and the last frame of the previous
+        # fragment, which is at position -1.
+        self._position = 0.
+        self._previous = None
+
+    def convert(self, fragment):
+        """Return the next fragment of the resampled stream."""
+        if self.in_rate == self.out_rate:
+            return bytes(fragment)
+
+        channels = self.channels
+        samples = _samples(fragment)
+        if not samples:
+            return b''
+        previous = self._previous
+        if previous is None:
+            # Nothing precedes the start of the stream; hold its first frame.
+            previous = samples[:channels]
+        samples = previous + samples
+        frames = len(samples) // channels
+
+        # Each output frame interpolates between the input frames either
+        # side of its position, which is counted from the previous frame.
+        position = self._position + 1
+        step = self.in_rate / float(self.out_rate)
+        count = max(0, int(math.ceil((frames - 1 - position) / step)))
+        positions = [position + i * step for i in range(count)]
+        while positions and positions[-1] >= frames - 1:
+            positions.pop()
+        indices = list(map(int, positions))
+        fractions = list(map(operator.sub, positions, indices))
+        next_indices = list(map((1).__add__, indices))
+
+        result = array.array('h', bytes(2 * len(positions) * channels))
+        for channel in range(channels):
+            data = samples[channel::channels]
+            a = list(map(data.__getitem__, indices))
+            b = map(data.__getitem__, next_indices)
+            result[channel::channels] = array.array('h', map(int, map(
+                operator.add, a,
+                map(operator.mul, map(operator.sub, b, a), fractions))))
+
+        self._previous = samples[-channels:]
+        self._position = position + len(positions) * step - frames
+        return result.tobytes()
+
+    def flush(self):
+        """Return the end of the resampled stream, and reset for a new
+        stream.
+
+        The output falling between the last two frames converted is held
+        back until the next fragment arrives; at the end of the stream it is
+        produced by holding the last frame.
+        """
+        if self.in_rate == self.out_rate or self._previous is None:
+            return b''
+        fragment = self.convert(self._previous.tobytes())
+        self.reset()
+        return fragment
+
+
+class SincResampler:
+    """Convert the sample rate of a stream of fragments with a windowed-sinc
+    filter.
+
+    This gives much less aliasing than `LinearResampler`, at a higher cost.
+    The filter coefficients for each fractional input position are computed
+    once, and each output sample is a single dot product over `taps` input
+    samples.  Output lags the input stream by ``taps // 2`` frames, which
+    are produced once the following input arrives, or by `flush` at the end
+    of the stream.
+    """
+
+    def __init__(self, channels, in_rate, out_rate, taps=32):
+        self.channels = channels
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.taps = taps
+
+        # Output sample n falls at input position n * _down / _up.
+        ratio = Fraction(in_rate, out_rate)
+        self._down = ratio.numerator
+        self._up = ratio.denominator
+        # Lowpass below the lower of the two Nyquist frequencies.
+        self._cutoff = min(1.0, out_rate / float(in_rate))
+        self._filters = dict()
+        self.reset()
+
+    def reset(self):
+        """Forget the stream state, for example after seeking."""
+        half = self.taps // 2
+        # Input samples of each channel, starting with zeroed history.
+        self._history = [array.array('h', bytes(2 * (half - 1)))
+                         for _ in range(self.channels)]
+        # Position of the next output sample, in units of 1 / _up input
+        # samples from the first sample in _history.
+        self._position = (half - 1) * self._up
+
+    def _get_filter(self, phase):
+        coefficients = self._filters.get(phase)
+        if coefficients is None:
+            half = self.taps // 2
+            cutoff = self._cutoff
+            offset = phase / float(self._up)
+            coefficients = list()
+            for k in range(self.taps):
+                x = k - (half - 1) - offset
+                if x == 0:
+                    value = cutoff
+                else:
+                    value = math.sin(math.pi * cutoff * x) / (math.pi * x)
+                # Blackman window over [-half, half].
+                w = 0.5 + 0.5 * x / half
+                window = (0.42 - 0.5 * math.cos(2 * math.pi * w) +
+                          0.08 * math.cos(4 * math.pi * w))
+                coefficients.append(value * window)
+            self._filters[phase] = coefficients
+        return coefficients
+
+    def convert(self, fragment):
+        """Return the next fragment of the resampled stream."""
+        if self.in_rate == self.out_rate:
+            return bytes(fragment)
+
+        channels = self.channels
+        taps = self.taps
+        half = taps // 2
+        up = self._up
+        down = self._down
+        samples = _samples(fragment)
+        history = self._history
+        for channel in range(channels):
+            history[channel].extend(samples[channel::channels])
+
+        # Produce every output sample whose filter lies within the input.
+        available = len(history[0]) - (taps - half)
+        position = self._position
+        positions = list()
+        while position // up < available:
+            positions.append(position)
+            position += down
+        end = self._position = position
+
+        result = array.array('h', bytes(2 * len(positions) * channels))
+        mul = operator.mul
+        for channel in range(channels):
+            data = history[channel]
+            output = list()
+            for position in positions:
+                start = position // up - half + 1
+                coefficients = self._get_filter(position % up)
+                output.append(sum(map(mul, coefficients,
+                                      data[start:start + taps])))
+            result[channel::channels] = array.array(
+                'h', [_clip(int(round(value))) for value in output])
+
+        # Discard input no longer needed by any future output sample.
+        discard = max(0, end // up - half + 1)
+        for channel in range(channels):
+            del history[channel][:discard]
+        self._position -= discard * up
+        return result.tobytes()
+
+    def flush(self):
+        """Return the end of the resampled stream, and reset for a new
+        stream.
+
+        The frames still lagging behind the input are filtered with silence
+        after the end of the stream.
+        """
+        if self.in_rate == self.out_rate:
+            return b''
+        padding = self.taps - self.taps // 2
+        fragment = self.convert(bytes(2 * self.channels * padding))
+        self.reset()
+        return fragment
+
+
+_resamplers = {
+    'linear': LinearResampler,
+    'sinc': SincResampler,
+}
+
+
+class Converter:
+    """Convert a stream of fragments from one audio format to another.
+
+    Only 8- and 16-bit mono and stereo formats are supported.  Fragments
+    passed to `convert` must hold whole frames of the input format, and are
+    returned in the output format.  Mono is converted to stereo by copying
+    the channel, and stereo to mono by averaging both channels.
+
+    The sample rate is converted by `LinearResampler` if `resampler` is
+    ``'linear'``, or by `SincResampler` if it is ``'sinc'``.
+    """
+
+    def __init__(self, in_format, out_format, resampler='linear'):
+        for audio_format in (in_format, out_format):
+            if (audio_format.channels not in (1, 2) or
+                    audio_format.sample_size not in (8, 16)):
+                raise ValueError('Cannot convert %r' % audio_format)
+        self.in_format = in_format
+        self.out_format = out_format
+        if resampler not in _resamplers:
+            raise ValueError('Unknown resampler %r' % resampler)
+        self._resampler = _resamplers[resampler](out_format.channels,
+                                                 in_format.sample_rate,
+                                                 out_format.sample_rate)
+
+    def reset(self):
+        """Forget the stream state, for example after seeking."""
+        self._resampler.reset()
+
+    def convert(self, fragment):
+        """Return the next fragment of the converted stream."""
+        in_format = self.in_format
+        out_format = self.out_format
+        if in_format == out_format:
+            return bytes(fragment)
+
+        fragment = to_16bit(fragment, in_format.sample_size)
+        if in_format.channels > out_format.channels:
+            fragment = tomono(fragment, 0.5, 0.5)
+        elif in_format.channels < out_format.channels:
+            fragment = tostereo(fragment, 1, 1)
+        fragment = self._resampler.convert(fragment)
+        return from_16bit(fragment, out_format.sample_size)
+
+    def flush(self):
+        """Return the end of the converted stream held back by the
+        resampler, and reset for a new stream."""
+        if self.in_format == self.out_format:
+            return b''
+        return from_16bit(self._resampler.flush(),
+                          self.out_format.sample_size)
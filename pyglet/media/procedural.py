@@ -33,17 +33,112 @@
 # ----------------------------------------------------------------------------
 # $Id:$
 
+"""Procedurally generated audio sources.
+
+Periodic waveforms are generated from a table holding one exact repeating
+period of samples, which is computed once and then sliced and repeated to
+fill each packet.  The table is indexed by absolute sample position, so
+the waveform stays phase-continuous across packets and after seeking.
+
+Any source can be shaped by an envelope, for example::
+
+    envelope = ADSREnvelope(attack=0.05, decay=0.2, release=0.3,
+                            sustain_amplitude=0.6)
+    source = Sine(1.0, frequency=440, envelope=envelope)
+"""
+
 from pyglet.media import Source, AudioFormat, AudioData
 
-import ctypes
-import os
+import array
 import math
+import os
+from fractions import Fraction
+from operator import mul
+
+# Longest period, in samples, for which a waveform table is built.  Tones
+# below a few Hz have longer periods and are computed packet by packet.
+_max_table_samples = 1 << 16
+
+# Waveform tables shared between sources, so that a tone played repeatedly
+# is only tabulated once.
+_tables = dict()
+_max_tables = 64
+
+
+class Envelope:
+    """Amplitude envelope applied to a procedural source."""
+
+    def get_gains(self, sample_rate, duration, start, count):
+        """Return the gain for each of `count` samples beginning at sample
+        `start` of a sound lasting `duration` seconds.
+
+        :rtype: sequence of float
+        """
+        raise NotImplementedError('abstract')
+
+
+class FlatEnvelope(Envelope):
+    """A constant amplitude envelope."""
+
+    def __init__(self, amplitude=0.5):
+        self.amplitude = max(min(1.0, amplitude), 0)
+
+    def get_gains(self, sample_rate, duration, start, count):
+        return array.array('d', [self.amplitude]) * count
+
+
+class ADSREnvelope(Envelope):
+    """An attack, decay, sustain, release envelope.
+
+    The amplitude rises linearly from 0 to 1 over `attack` seconds, falls to
+    `sustain_amplitude` over `decay` seconds and holds that level until the
+    final `release` seconds of the sound, over which it falls back to 0.
+    """
+
+    def __init__(self, attack, decay, release, sustain_amplitude=0.5):
+        self.attack = attack
+        self.decay = decay
+        self.release = release
+        self.sustain_amplitude = max(min(1.0, sustain_amplitude), 0)
+
+    def get_gains(self, sample_rate, duration, start, count):
+        sustain = self.sustain_amplitude
+        attack_end = int(self.attack * sample_rate)
+        decay_end = attack_end + int(self.decay * sample_rate)
+        release_start = int((duration - self.release) * sample_rate)
+        release_start = max(release_start, decay_end)
+        release_length = max(int(duration * sample_rate) - release_start, 1)
+
+        # Each segment is (first sample, end sample, start gain, end gain).
+        segments = ((0, attack_end, 0.0, 1.0),
+                    (attack_end, decay_end, 1.0, sustain),
+                    (decay_end, release_start, sustain, sustain),
+                    (release_start, release_start + release_length,
+                     sustain, 0.0))
+
+        end = start + count
+        gains = array.array('d')
+        for first, last, from_gain, to_gain in segments:
+            lo = max(first, start)
+            hi = min(last, end)
+            if lo >= hi:
+                continue
+            if from_gain == to_gain:
+                gains.extend(array.array('d', [from_gain]) * (hi - lo))
+            else:
+                slope = (to_gain - from_gain) / (last - first)
+                base = from_gain - first * slope
+                gains.extend([base + i * slope for i in range(lo, hi)])
+        if len(gains) < count:
+            gains.extend(array.array('d', [0.0]) * (count - len(gains)))
+        return gains
 
 
 class ProceduralSource(Source):
     """Generate audio data"""
 
-    def __init__(self, duration, sample_rate=44800, sample_size=16):
+    def __init__(self, duration, sample_rate=44800, sample_size=16,
+                 envelope=None):
         self._duration = float(duration)
         self.audio_format = AudioFormat(
             channels=1,
@@ -54,18 +149,26 @@ class ProceduralSource(Source):
         self._bytes_per_sample = sample_size >> 3
         self._bytes_per_second = self._bytes_per_sample * sample_rate
         self._max_offset = int(self._bytes_per_second * self._duration)
+        self.envelope = envelope
 
         if self._bytes_per_sample == 2:
             self._max_offset &= 0xfffffffe
 
+    def get_audio_data(self, bytes_):
+        return self._get_audio_data(bytes_)
+
     def _get_audio_data(self, bytes_):
         bytes_ = min(bytes_, self._max_offset - self._offset)
+        if self._bytes_per_sample == 2:
+            bytes_ &= 0xfffffffe
         if bytes_ <= 0:
             return None
 
         timestamp = float(self._offset) / self._bytes_per_second
         duration = float(bytes_) / self._bytes_per_second
         data = self._generate_data(bytes_, self._offset)
+        if self.envelope is not None:
+            data = self._apply_envelope(data, self._offset)
         self._offset += bytes_
 
         return AudioData(data,
@@ -81,6 +184,17 @@ class ProceduralSource(Source):
         """
         raise NotImplementedError('abstract')
 
+    def _apply_envelope(self, data, offset):
+        start = offset // self._bytes_per_sample
+        count = len(data) // self._bytes_per_sample
+        gains = self.envelope.get_gains(self.audio_format.sample_rate,
+                                        self._duration, start, count)
+        if self._bytes_per_sample == 1:
+            return bytes(int((sample - 128) * gain) + 128
+                         for sample, gain in zip(data, gains))
+        samples = array.array('h', bytes(data))
+        return array.array('h', map(int, map(mul, samples, gains))).tobytes()
+
     def seek(self, timestamp):
         self._offset = int(timestamp * self._bytes_per_second)
 
@@ -96,9 +210,9 @@ class Silence(ProceduralSource):
 
     def _generate_data(self, bytes_, offset):
         if self._bytes_per_sample == 1:
-            return '\127' * bytes_
+            return b'\x80' * bytes_
         else:
-            return '\0' * bytes_
+            return b'\0' * bytes_
 
 
 class WhiteNoise(ProceduralSource):
@@ -107,88 +221,93 @@ class WhiteNoise(ProceduralSource):
         return os.urandom(bytes_)
 
 
-class Sine(ProceduralSource):
+class _PeriodicSource(ProceduralSource):
+    """A waveform repeating at `frequency` Hz.
+
+    Subclasses implement `_waveform`, mapping a phase in [0, 1) to an
+    amplitude in [-1, 1].
+    """
 
     def __init__(self, duration, frequency=440, **kwargs):
         super().__init__(duration, **kwargs)
         self.frequency = frequency
+        self._table = None
+        self._table_key = None
 
-    def _generate_data(self, bytes_, offset):
+    def _waveform(self, phase):
+        raise NotImplementedError('abstract')
+
+    def _pack(self, values):
+        """Quantize amplitudes to samples of the source's sample size."""
+        waveform = self._waveform
         if self._bytes_per_sample == 1:
-            start = offset
-            samples = bytes_
-            bias = 127
-            amplitude = 127
-            data = (ctypes.c_ubyte * samples)()
-        else:
-            start = offset >> 1
-            samples = bytes_ >> 1
-            bias = 0
-            amplitude = 32767
-            data = (ctypes.c_short * samples)()
-        step = self.frequency * (math.pi * 2) / self.audio_format.sample_rate
-        for i in range(samples):
-            data[i] = int(math.sin(step * (i + start)) * amplitude + bias)
-        return data
+            return bytes([128 + int(round(waveform(p) * 127)) for p in values])
+        return array.array(
+            'h', [int(round(waveform(p) * 32767)) for p in values]).tobytes()
+
+    def _get_table(self):
+        """Return the repeating table of samples, or None if the waveform's
+        period is too long to tabulate."""
+        key = (type(self), self.frequency, self.audio_format.sample_rate,
+               self._bytes_per_sample)
+        if key != self._table_key:
+            self._table_key = key
+            if key not in _tables:
+                if len(_tables) >= _max_tables:
+                    _tables.clear()
+                _tables[key] = self._create_table()
+            self._table = _tables[key]
+        return self._table
+
+    def _create_table(self):
+        # The table holds `cycles` whole cycles in `period` samples.  For
+        # frequencies that don't divide the sample rate evenly this is the
+        # closest fraction with a short enough period, which is well within
+        # a cent of the requested pitch.
+        if self.frequency <= 0:
+            return None
+        rate = self.audio_format.sample_rate
+        ratio = Fraction(rate) / Fraction(self.frequency)
+        max_cycles = max(1, int(_max_table_samples * self.frequency / rate))
+        ratio = ratio.limit_denominator(max_cycles)
+        period, cycles = ratio.numerator, ratio.denominator
+        if period > _max_table_samples:
+            return None
+        return self._pack(
+            (i * cycles % period) / period for i in range(period))
 
+    def _generate_data(self, bytes_, offset):
+        table = self._get_table()
+        if table is None:
+            start = offset // self._bytes_per_sample
+            count = bytes_ // self._bytes_per_sample
+            step = self.frequency / self.audio_format.sample_rate
+            return self._pack(((start + i) * step) % 1.0
+                              for i in range(count))
 
-class Saw(ProceduralSource):
+        start = offset % len(table)
+        repeats = (start + bytes_ + len(table) - 1) // len(table)
+        return (table * repeats)[start:start + bytes_]
 
-    def __init__(self, duration, frequency=440, **kwargs):
-        super().__init__(duration, **kwargs)
-        self.frequency = frequency
 
-    def _generate_data(self, bytes_, offset):
-        # TODO: TODO consider offset
-        if self._bytes_per_sample == 1:
-            samples = bytes_
-            value = 127
-            max = 255
-            min = 0
-            data = (ctypes.c_ubyte * samples)()
-        else:
-            samples = bytes_ >> 1
-            value = 0
-            max = 32767
-            min = -32768
-            data = (ctypes.c_short * samples)()
-        step = (max - min) * 2 * self.frequency / self.audio_format.sample_rate
-        for i in range(samples):
-            value += step
-            if value > max:
-                value = max - (value - max)
-                step = -step
-            if value < min:
-                value = min - (value - min)
-                step = -step
-            data[i] = value
-        return data
-
-
-class Square(ProceduralSource):
+class Sine(_PeriodicSource):
 
-    def __init__(self, duration, frequency=440, **kwargs):
-        super().__init__(duration, **kwargs)
-        self.frequency = frequency
+    def _waveform(self, phase):
+        return math.sin(phase * (math.pi * 2))
 
-    def _generate_data(self, bytes_, offset):
-        # TODO: TODO consider offset
-        if self._bytes_per_sample == 1:
-            samples = bytes_
-            value = 0
-            amplitude = 255
-            data = (ctypes.c_ubyte * samples)()
-        else:
-            samples = bytes_ >> 1
-            value = -32768
-            amplitude = 65535
-            data = (ctypes.c_short * samples)()
-        period = self.audio_format.sample_rate / self.frequency / 2
-        count = 0
-        for i in range(samples):
-            count += 1
-            if count == period:
-                value = amplitude - value
-                count = 0
-            data[i] = value
-        return data
+
+class Saw(_PeriodicSource):
+
+    def _waveform(self, phase):
+        # Rises from zero to the peak, falls to the trough and back to zero.
+        if phase < 0.25:
+            return phase * 4
+        elif phase < 0.75:
+            return 2 - phase * 4
+        return phase * 4 - 4
+
+
+class Square(_PeriodicSource):
+
+    def _waveform(self, phase):
+        return -1.0 if phase < 0.5 else 1.0
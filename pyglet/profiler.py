@@ -0,0 +1,449 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+
+"""Timing of the work done by pyglet in each frame.
+
+The profiler records named timing spans around the main points of work in a
+pyglet application:
+
+``EventLoop.idle`` (category ``app``)
+    Each iteration of the event loop that ticks the clock and redraws the
+    windows; usually one frame.
+Scheduled functions (category ``clock``)
+    Each function called by `pyglet.clock.Clock.call_scheduled_functions`,
+    named after the function.
+Events (category ``event``)
+    Each `pyglet.event.EventDispatcher.dispatch_event`, named after the event
+    type.
+``Batch.draw`` and groups (category ``graphics``)
+    Each `pyglet.graphics.Batch.draw`, and within it each group drawn, named
+    after the group.
+``ImageData.blit_to_texture`` (category ``image``)
+    Each upload of image data to a texture.
+
+Profiling is disabled by default.  Until it is enabled it costs a flag test
+at each of these points, except event dispatch, which is instrumented only
+while profiling is enabled::
+
+    from pyglet import profiler
+
+    profiler.get_default().enable()
+    pyglet.app.run()
+    profiler.get_default().export_chrome_trace('trace.json')
+
+The exported file can be loaded into ``chrome://tracing`` or Perfetto to see
+what caused slow frames.  Applications can time their own code with
+`Profiler.span`::
+
+    with profiler.get_default().span('physics'):
+        world.step(dt)
+
+For each span name the profiler keeps the durations of the most recent spans
+in a ring buffer, from which `SpanStats` gives the mean, maximum, percentiles
+and histogram.
+
+:since: pyglet 1.2
+"""
+
+import array
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class SpanStats:
+
+    """Durations of the most recent spans with one name.
+
+    :Ivariables:
+        `name` : str
+            Name of the span.
+        `category` : str
+            Category of the span.
+        `count` : int
+            Number of spans recorded since the profiler was cleared,
+            including those no longer in the history.
+        `total` : float
+            Total duration of all spans recorded, in seconds.
+        `max` : float
+            Longest duration of all spans recorded, in seconds.
+
+    """
+
+    def __init__(self, name, category, history):
+        self.name = name
+        self.category = category
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+        self._durations = array.array('d', bytes(8 * history))
+        self._history = history
+
+    def add(self, duration):
+        """Record the duration of a span.
+
+        :Parameters:
+            `duration` : float
+                Duration of the span, in seconds.
+
+        """
+        self._durations[self.count % self._history] = duration
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def get_durations(self):
+        """Get the durations in the history, oldest first.
+
+        :rtype: list of float
+        """
+        if self.count <= self._history:
+            return self._durations[:self.count].tolist()
+        index = self.count % self._history
+        return (self._durations[index:] + self._durations[:index]).tolist()
+
+    def get_mean(self):
+        """Get the mean duration of the spans in the history.
+
+        :rtype: float
+        """
+        durations = self.get_durations()
+        if not durations:
+            return 0.
+        return sum(durations) / len(durations)
+
+    def get_percentile(self, percentile):
+        """Get a percentile of the durations in the history.
+
+        :Parameters:
+            `percentile` : float
+                Percentile between 0 and 100; for example, 99 gives the
+                duration exceeded by only 1% of the spans.
+
+        :rtype: float
+        """
+        durations = sorted(self.get_durations())
+        if not durations:
+            return 0.
+        index = int(round(percentile / 100. * (len(durations) - 1)))
+        return durations[min(max(index, 0), len(durations) - 1)]
+
+    def get_histogram(self, bins=10, limit=None):
+        """Count the durations in the history in equal width bins.
+
+        :Parameters:
+            `bins` : int
+                Number of bins.
+            `limit` : float
+                Upper edge of the last bin, in seconds.  Durations above it
+                are counted in the last bin.  Defaults to the longest
+                duration in the history.
+
+        :rtype: list of (float, int)
+        :return: The lower edge of each bin in seconds, with the number of
+            durations within the bin.
+        """
+        durations = self.get_durations()
+        if limit is None:
+            limit = max(durations) if durations else 0.
+        width = limit / bins
+        counts = [0] * bins
+        for duration in durations:
+            index = int(duration / width) if width else 0
+            counts[min(index, bins - 1)] += 1
+        return [(i * width, count) for i, count in enumerate(counts)]
+
+    def __repr__(self):
+        return '%s(%r, count=%d, mean=%.3fms, max=%.3fms)' % (
+            self.__class__.__name__, self.name, self.count,
+            self.get_mean() * 1000, self.max * 1000)
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'category', 'args', 'start')
+
+    def __init__(self, profiler, name, category, args):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = self.profiler.begin()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.end(self.name, self.category, self.start, self.args)
+
+
+class Profiler:
+
+    """Recorder of timing spans.
+
+    Spans are recorded only while `enabled` is True.  Code that records spans
+    should test `enabled` before taking any timestamp, so that it costs
+    nothing else while profiling is disabled::
+
+        if profiler.enabled:
+            start = profiler.begin()
+            do_work()
+            profiler.end('work', 'app', start)
+        else:
+            do_work()
+
+    :Ivariables:
+        `enabled` : bool
+            True if spans are being recorded.
+        `stats` : dict
+            The `SpanStats` of each span name recorded.
+
+    """
+
+    def __init__(self, history=256, max_events=100000,
+                 time_function=time.perf_counter):
+        """Create a disabled profiler.
+
+        :Parameters:
+            `history` : int
+                Number of durations kept for the statistics of each span
+                name.
+            `max_events` : int
+                Number of the most recent spans kept for trace export.
+            `time_function` : function
+                Function returning the current time in seconds.
+
+        """
+        self.enabled = False
+        self.history = history
+        self._toggle_handlers = list()
+        self.stats = dict()
+        self._time = time_function
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._epoch = time_function()
+
+    def enable(self):
+        """Start recording spans."""
+        self._set_enabled(True)
+
+    def disable(self):
+        """Stop recording spans.  Recorded spans are kept."""
+        self._set_enabled(False)
+
+    def _set_enabled(self, enabled):
+        if enabled != self.enabled:
+            self.enabled = enabled
+            for handler in self._toggle_handlers:
+                handler(enabled)
+
+    def add_toggle_handler(self, handler):
+        """Call a function whenever the profiler is enabled or disabled.
+
+        Code too hot for even a test of `enabled` can swap in an instrumented
+        version of itself from the handler.  The handler is called as
+        ``handler(enabled)``, and immediately if the profiler is already
+        enabled.
+
+        :Parameters:
+            `handler` : callable
+                Function to call.
+
+        """
+        self._toggle_handlers.append(handler)
+        if self.enabled:
+            handler(True)
+
+    def clear(self):
+        """Discard all recorded spans and statistics."""
+        with self._lock:
+            self.stats.clear()
+            self._events.clear()
+
+    def begin(self):
+        """Get the start time of a span, to be given to `end`.
+
+        :rtype: float
+        """
+        return self._time()
+
+    def end(self, name, category, start, args=None):
+        """Record a span that started at `start` and ends now.
+
+        :Parameters:
+            `name` : str
+                Name of the span.  Statistics are kept by name.
+            `category` : str
+                Category of the span, such as ``'app'`` or ``'event'``.
+            `start` : float
+                Start time returned by `begin`.
+            `args` : dict
+                Optional JSON serialisable values shown with the span in a
+                trace.
+
+        """
+        duration = self._time() - start
+        with self._lock:
+            try:
+                stats = self.stats[name]
+            except KeyError:
+                stats = self.stats[name] = \
+                    SpanStats(name, category, self.history)
+            stats.add(duration)
+            self._events.append((name, category, start, duration,
+                                 threading.get_ident(), args))
+
+    def span(self, name, category='function', args=None):
+        """Time a block of code in a ``with`` statement.
+
+        The block is timed only if the profiler is enabled when it is
+        entered.
+
+        :Parameters:
+            `name` : str
+                Name of the span.
+            `category` : str
+                Category of the span.
+            `args` : dict
+                Optional JSON serialisable values shown with the span in a
+                trace.
+
+        """
+        if self.enabled:
+            return _Span(self, name, category, args)
+        return _null_span
+
+    def call(self, func, args=(), kwargs=None, category='function',
+             name=None):
+        """Call a function, recording a span named after it.
+
+        :Parameters:
+            `func` : callable
+                Function to call.
+            `args` : tuple
+                Positional arguments to pass.
+            `kwargs` : dict
+                Keyword arguments to pass.
+            `category` : str
+                Category of the span.
+            `name` : str
+                Name of the span; defaults to the qualified name of `func`.
+
+        :return: The return value of `func`.
+        """
+        if name is None:
+            name = getattr(func, '__qualname__', None) or repr(func)
+        start = self._time()
+        try:
+            return func(*args, **(kwargs or {}))
+        finally:
+            self.end(name, category, start)
+
+    def get_stats(self, category=None):
+        """Get the statistics of the recorded spans, longest mean first.
+
+        :Parameters:
+            `category` : str
+                If given, only spans of this category are returned.
+
+        :rtype: list of `SpanStats`
+        """
+        with self._lock:
+            stats = [s for s in self.stats.values()
+                     if category is None or s.category == category]
+        stats.sort(key=lambda s: s.get_mean(), reverse=True)
+        return stats
+
+    def get_chrome_trace(self):
+        """Get the recorded spans in the Chrome trace event format.
+
+        :rtype: dict
+        """
+        pid = os.getpid()
+        epoch = self._epoch
+        with self._lock:
+            events = list(self._events)
+        trace_events = list()
+        for name, category, start, duration, tid, args in events:
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (start - epoch) * 1e6,
+                'dur': duration * 1e6,
+                'pid': pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = args
+            trace_events.append(event)
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, file):
+        """Write the recorded spans as Chrome trace JSON.
+
+        :Parameters:
+            `file` : str or file-like object
+                Filename or file opened for writing text.
+
+        """
+        trace = self.get_chrome_trace()
+        if isinstance(file, str):
+            with open(file, 'w') as f:
+                json.dump(trace, f)
+        else:
+            json.dump(trace, file)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_null_span = _NullSpan()
+
+_default = Profiler()
+
+
+def get_default():
+    """Get the profiler used by pyglet's own instrumentation.
+
+    :rtype: `Profiler`
+    """
+    return _default
@@ -294,10 +294,13 @@ class Loader:
         `script_home` : str
             Base resource location, defaulting to the location of the
             application script.
+        `image_cache` : `pyglet.image.cache.ImageCache`
+            If set, images and textures are loaded through this on-disk
+            cache of decoded image data.  Defaults to None.
 
     """
 
-    def __init__(self, path=None, script_home=None):
+    def __init__(self, path=None, script_home=None, image_cache=None):
         """Create a loader for the given path.
 
         If no path is specified it defaults to ``['.']``; that is, just the
@@ -311,6 +314,9 @@ class Loader:
             `script_home` : str
                 Base location of relative files.  Defaults to the result of
                 `get_script_home`.
+            `image_cache` : `pyglet.image.cache.ImageCache`
+                On-disk cache of decoded image data to use when loading
+                images and textures, or None to always decode them.
 
         """
         if path is None:
@@ -322,6 +328,7 @@ class Loader:
             script_home = get_script_home()
         self._script_home = script_home
         self._index = None
+        self.image_cache = image_cache
 
         # Map bin size to list of atlases
         self._texture_atlas_bins = dict()
@@ -472,13 +479,18 @@ class Loader:
         file = self.file(name)
         font.add_file(file)
 
-    def _alloc_image(self, name, atlas=True):
+    def _load_image(self, name):
         file = self.file(name)
         try:
-            img = pyglet.image.load(name, file=file)
+            if self.image_cache is not None:
+                return self.image_cache.load(name, file=file)
+            return pyglet.image.load(name, file=file)
         finally:
             file.close()
 
+    def _alloc_image(self, name, atlas=True):
+        img = self._load_image(name)
+
         if not atlas:
             return img.get_texture(True)
 
@@ -668,8 +680,7 @@ class Loader:
         if name in self._cached_textures:
             return self._cached_textures[name]
 
-        file = self.file(name)
-        texture = pyglet.image.load(name, file=file).get_texture()
+        texture = self._load_image(name).get_texture()
         self._cached_textures[name] = texture
         return texture
 
@@ -732,6 +743,13 @@ class Loader:
 #: :type: list of str
 path = list()
 
+#: Default on-disk cache of decoded images, used by `image` and `texture`.
+#:
+#: Set to an instance of `pyglet.image.cache.ImageCache` to enable caching.
+#:
+#: :type: `pyglet.image.cache.ImageCache`
+image_cache = None
+
 
 class _DefaultLoader(Loader):
 
@@ -744,6 +762,15 @@ class _DefaultLoader(Loader):
         global path
         path = value
 
+    @property
+    def image_cache(self):
+        return image_cache
+
+    @image_cache.setter
+    def image_cache(self, value):
+        global image_cache
+        image_cache = value
+
 
 _default_loader = _DefaultLoader()
 reindex = _default_loader.reindex
@@ -145,6 +145,17 @@ class SpriteGroup(graphics.Group):
         glPopAttrib()
         glDisable(self.texture.target)
 
+    def set_raster_state(self, rasterizer):
+        rasterizer.push_state()
+        rasterizer.texture_enabled = True
+        rasterizer.texture = self.texture
+        rasterizer.blend = True
+        rasterizer.blend_src = self.blend_src
+        rasterizer.blend_dest = self.blend_dest
+
+    def unset_raster_state(self, rasterizer):
+        rasterizer.pop_state()
+
     def __repr__(self):
         return '%s(%r)' % (self.__class__.__name__, self.texture)
 
@@ -73,10 +73,12 @@ creating scrollable layouts.
 :since: pyglet 1.1
 """
 
+import math
 import os.path
 
 import pyglet
-from pyglet.text import layout, document, caret
+from pyglet.gl import GL_QUADS
+from pyglet.text import layout, document, caret, cache
 
 
 class DocumentDecodeException(Exception):
@@ -90,6 +92,12 @@ class DocumentDecoder:
     """Abstract document decoder.
     """
 
+    #: Number of characters read from a file at a time by decoders that
+    #: parse incrementally.
+    #:
+    #: :type: int
+    chunk_size = 65536
+
     def decode(self, text, location=None):
         """Decode document text.
 
@@ -104,6 +112,24 @@ class DocumentDecoder:
         """
         raise NotImplementedError('abstract')
 
+    def decode_file(self, file, location=None):
+        """Decode document text read from a file.
+
+        The default implementation reads the whole file and calls `decode`.
+        Decoders of formats that can be parsed incrementally read the file
+        `chunk_size` characters at a time instead.
+
+        :Parameters:
+            `file` : file-like object
+                File opened in text mode to read the document from.
+            `location` : `Location`
+                Location to use as base path for additional resources
+                referenced within the document (for example, HTML images).
+
+        :rtype: `AbstractDocument`
+        """
+        return self.decode(file.read(), location)
+
 
 def get_decoder(filename, mimetype=None):
     """Get a document decoder for the given filename and MIME type.
@@ -168,10 +194,11 @@ def load(filename, file=None, mimetype=None):
     :rtype: `AbstractDocument`
     """
     decoder = get_decoder(filename, mimetype)
-    if file is None:
-        file = open(filename)
     location = pyglet.resource.FileLocation(os.path.dirname(filename))
-    return decoder.decode(file.read(), location)
+    if file is None:
+        with open(filename) as file:
+            return decoder.decode_file(file, location)
+    return decoder.decode_file(file, location)
 
 
 def decode_html(text, location=None):
@@ -226,10 +253,28 @@ class DocumentLabel(layout.TextLayout):
     associated document.
     """
 
+    _cached = False
+    _label_cache = None
+    _cache_region = None
+
+    # Groups used while rendering the label into its cache region.
+    _cache_top_group = cache.LabelRenderGroup()
+    _cache_background_group = pyglet.graphics.OrderedGroup(
+        0, _cache_top_group)
+    _cache_foreground_group = layout.TextLayoutForegroundGroup(
+        1, _cache_top_group)
+    _cache_foreground_decoration_group = \
+        layout.TextLayoutForegroundDecorationGroup(2, _cache_top_group)
+
+    # Transparent border around the label in its cache region, for glyphs
+    # overhanging the layout box.
+    _cache_padding = 2
+
     def __init__(self, document=None,
                  x=0, y=0, width=None, height=None,
                  anchor_x='left', anchor_y='baseline',
-                 multiline=False, dpi=None, batch=None, group=None):
+                 multiline=False, dpi=None, batch=None, group=None,
+                 cached=False):
         """Create a label for a given document.
 
         :Parameters:
@@ -258,6 +303,9 @@ class DocumentLabel(layout.TextLayout):
                 Optional graphics batch to add the label to.
             `group` : `Group`
                 Optional graphics group to use.
+            `cached` : bool
+                If True, the label is drawn from a shared texture.  See
+                `cached`.
 
         """
         super().__init__(document,
@@ -269,8 +317,142 @@ class DocumentLabel(layout.TextLayout):
         self._y = y
         self._anchor_x = anchor_x
         self._anchor_y = anchor_y
+        self._cached = cached
+        self._update()
+
+    @property
+    def cached(self):
+        """Draw the label from a shared texture.
+
+        When True, the glyphs of the label are rendered into a region of the
+        `pyglet.text.cache.LabelCache` of the current context whenever its
+        text, style or layout changes, and the label is drawn as a single
+        textured quad.  Moving the label doesn't render it again.  This
+        suits the many mostly static labels of a HUD; labels that change
+        every frame are better left uncached.
+
+        Labels containing inline elements or too large for the cache, and
+        labels whose texture has been reclaimed by the cache, draw their
+        glyphs as usual until they next change.  Labels are also drawn
+        uncached if the context can't render to textures.
+
+        :type: bool
+        """
+        return self._cached
+
+    @cached.setter
+    def cached(self, cached):
+        self._cached = cached
         self._update()
 
+    def _update(self):
+        if not self._update_enabled:
+            return
+
+        if not (self._cached and self._update_cached()):
+            self._release_label_cache()
+            super()._update()
+
+    def _update_cached(self):
+        # Render the label into the cache and draw it as a quad; return
+        # False if the label must be drawn uncached instead.
+        label_cache = cache.get_label_cache()
+        if label_cache is None:
+            return False
+
+        for vertex_list in self._vertex_lists:
+            vertex_list.delete()
+        for box in self._boxes:
+            box.delete(self)
+        self._vertex_lists = list()
+        self._boxes = list()
+        self.groups.clear()
+
+        if not self._document or not self._document.text_length:
+            self._release_label_cache()
+            return True
+
+        lines = self._get_lines()
+        for line in lines:
+            for box in line.boxes:
+                if isinstance(box, layout._InlineElementBox):
+                    return False
+
+        if self._multiline and self._wrap_lines:
+            width = self._width
+        else:
+            width = self.content_width
+        padding = self._cache_padding
+        width = int(math.ceil(width)) + padding * 2
+        height = int(math.ceil(self.content_height)) + padding * 2
+
+        region = self._cache_region
+        if region is not None and region.width >= width and \
+                region.height >= height:
+            label_cache.touch(region)
+        else:
+            region = label_cache.allocate(self, width, height)
+            if region is None:
+                return False
+            self._label_cache = label_cache
+            self._cache_region = region
+        target = region.get_region(0, 0, width, height)
+
+        left = self._get_left()
+        top = self._get_top(lines)
+
+        groups = (self.batch, self.top_group, self.background_group,
+                  self.foreground_group, self.foreground_decoration_group)
+        self.batch = pyglet.graphics.Batch()
+        self.top_group = self._cache_top_group
+        self.background_group = self._cache_background_group
+        self.foreground_group = self._cache_foreground_group
+        self.foreground_decoration_group = \
+            self._cache_foreground_decoration_group
+        try:
+            colors_iter = self._document.get_style_runs('color')
+            background_iter = self._document.get_style_runs(
+                'background_color')
+            context = layout._StaticLayoutContext(self, self._document,
+                                                  colors_iter,
+                                                  background_iter)
+            for line in lines:
+                self._create_vertex_lists(left + line.x, top + line.y,
+                                          line.start, line.boxes, context)
+            label_cache.render(target, self.batch,
+                               left - padding, top + padding)
+        finally:
+            (self.batch, self.top_group, self.background_group,
+             self.foreground_group, self.foreground_decoration_group) = groups
+            self._vertex_lists = list()
+            self.groups.clear()
+
+        x1 = left - padding
+        y2 = top + padding
+        x2 = x1 + width
+        y1 = y2 - height
+        group = cache.LabelCacheGroup(target.owner, self.top_group.parent)
+        self._vertex_lists.append(self.batch.add(
+            4, GL_QUADS, group,
+            ('v2i/dynamic', (x1, y1, x2, y1, x2, y2, x1, y2)),
+            ('t3f/static', target.tex_coords)))
+        return True
+
+    def _release_label_cache(self):
+        if self._cache_region is not None:
+            self._label_cache.release(self)
+            self._cache_region = None
+
+    def _on_label_cache_evicted(self):
+        # Called by the cache when it reclaims the label's texture; the
+        # glyphs are drawn instead until the label next changes.
+        self._cache_region = None
+        super()._update()
+
+    def delete(self):
+        super().delete()
+        self._release_label_cache()
+
     @property
     def text(self):
         """The text of the label.
@@ -295,7 +477,7 @@ class DocumentLabel(layout.TextLayout):
 
     @color.setter
     def color(self, color):
-        self.document.set_style(0, len(self.document.text),
+        self.document.set_style(0, self.document.text_length,
                                 {'color': color})
 
     @property
@@ -311,7 +493,7 @@ class DocumentLabel(layout.TextLayout):
 
     @font_name.setter
     def font_name(self, font_name):
-        self.document.set_style(0, len(self.document.text),
+        self.document.set_style(0, self.document.text_length,
                                 {'font_name': font_name})
 
     @property
@@ -324,7 +506,7 @@ class DocumentLabel(layout.TextLayout):
 
     @font_size.setter
     def font_size(self, font_size):
-        self.document.set_style(0, len(self.document.text),
+        self.document.set_style(0, self.document.text_length,
                                 {'font_size': font_size})
 
     @property
@@ -337,7 +519,7 @@ class DocumentLabel(layout.TextLayout):
 
     @bold.setter
     def bold(self, bold):
-        self.document.set_style(0, len(self.document.text),
+        self.document.set_style(0, self.document.text_length,
                                 {'bold': bold})
 
     @property
@@ -350,7 +532,7 @@ class DocumentLabel(layout.TextLayout):
 
     @italic.setter
     def italic(self, italic):
-        self.document.set_style(0, len(self.document.text),
+        self.document.set_style(0, self.document.text_length,
                                 {'italic': italic})
 
     def get_style(self, name):
@@ -366,7 +548,7 @@ class DocumentLabel(layout.TextLayout):
 
         :rtype: object
         """
-        return self.document.get_style_range(name, 0, len(self.document.text))
+        return self.document.get_style_range(name, 0, self.document.text_length)
 
     def set_style(self, name, value):
         """Set a document style value by name over the whole document.
@@ -379,7 +561,7 @@ class DocumentLabel(layout.TextLayout):
                 Value of the style.
 
         """
-        self.document.set_style(0, len(self.document.text), {name: value})
+        self.document.set_style(0, self.document.text_length, {name: value})
 
 
 class Label(DocumentLabel):
@@ -393,7 +575,8 @@ class Label(DocumentLabel):
                  x=0, y=0, width=None, height=None,
                  anchor_x='left', anchor_y='baseline',
                  align='left',
-                 multiline=False, dpi=None, batch=None, group=None):
+                 multiline=False, dpi=None, batch=None, group=None,
+                 cached=False):
         """Create a plain text label.
 
         :Parameters:
@@ -437,14 +620,17 @@ class Label(DocumentLabel):
                 Optional graphics batch to add the label to.
             `group` : `Group`
                 Optional graphics group to use.
+            `cached` : bool
+                If True, the label is drawn from a shared texture.  See
+                `DocumentLabel.cached`.
 
         """
         document = decode_text(text)
         super().__init__(document, x, y, width, height,
                          anchor_x, anchor_y,
-                         multiline, dpi, batch, group)
+                         multiline, dpi, batch, group, cached)
 
-        self.document.set_style(0, len(self.document.text), {
+        self.document.set_style(0, self.document.text_length, {
             'font_name': font_name,
             'font_size': font_size,
             'bold': bold,
@@ -465,7 +651,8 @@ class HTMLLabel(DocumentLabel):
     def __init__(self, text='', location=None,
                  x=0, y=0, width=None, height=None,
                  anchor_x='left', anchor_y='baseline',
-                 multiline=False, dpi=None, batch=None, group=None):
+                 multiline=False, dpi=None, batch=None, group=None,
+                 cached=False):
         """Create a label with an HTML string.
 
         :Parameters:
@@ -497,6 +684,9 @@ class HTMLLabel(DocumentLabel):
                 Optional graphics batch to add the label to.
             `group` : `Group`
                 Optional graphics group to use.
+            `cached` : bool
+                If True, the label is drawn from a shared texture.  See
+                `DocumentLabel.cached`.
 
         """
         self._text = text
@@ -504,7 +694,7 @@ class HTMLLabel(DocumentLabel):
         document = decode_html(text, location)
         super().__init__(document, x, y, width, height,
                          anchor_x, anchor_y,
-                         multiline, dpi, batch, group)
+                         multiline, dpi, batch, group, cached)
 
     @property
     def text(self):
@@ -0,0 +1,347 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+"""Shared textures for labels drawn from a cache.
+
+A `DocumentLabel` with ``cached`` set renders its glyphs once into a region
+of a texture held by a `LabelCache`, and is then drawn as a single textured
+quad.  The cache holds at most `LabelCache.max_textures` textures per
+OpenGL object space.  Regions cannot be freed individually, so when all
+textures are full the least recently used texture is cleared, and the
+labels that were drawn from it go back to drawing their glyphs until they
+next change.
+"""
+
+from collections import OrderedDict
+from ctypes import byref
+from weakref import WeakSet
+
+from pyglet.gl import *
+from pyglet import gl
+from pyglet import graphics
+from pyglet import image
+from pyglet.image.atlas import SkylineAllocator, AllocatorException
+
+
+class LabelCacheGroup(graphics.Group):
+
+    """Rendering group for the quads of cached labels.
+
+    The cached textures hold premultiplied colour, so the group blends with
+    ``GL_ONE`` / ``GL_ONE_MINUS_SRC_ALPHA``.  Like `TextLayoutTextureGroup`
+    the group is shared by all labels drawn from the same texture.
+    """
+
+    def __init__(self, texture, parent=None):
+        super().__init__(parent)
+        self.texture = texture
+
+    def set_state(self):
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT | GL_CURRENT_BIT)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+        glEnable(self.texture.target)
+        glBindTexture(self.texture.target, self.texture.id)
+        glColor4f(1, 1, 1, 1)
+
+    def unset_state(self):
+        glPopAttrib()
+
+    def __hash__(self):
+        return hash((self.texture.id, self.parent))
+
+    def __eq__(self, other):
+        return (self.__class__ is other.__class__ and
+                self.texture.id == other.texture.id and
+                self.parent is other.parent)
+
+    def __repr__(self):
+        return '%s(%d, %r)' % (self.__class__.__name__,
+                               self.texture.id,
+                               self.parent)
+
+
+class LabelRenderGroup(graphics.Group):
+
+    """Top-level group used while rendering a label into the cache.
+
+    Colour is blended as for `TextLayoutGroup`, but alpha is accumulated
+    with ``GL_ONE`` / ``GL_ONE_MINUS_SRC_ALPHA`` so that the texture ends up
+    holding premultiplied colour and the coverage of the label.
+    """
+
+    def set_state(self):
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT | GL_CURRENT_BIT)
+        glEnable(GL_BLEND)
+        glBlendFuncSeparate(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA,
+                            GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+
+    def unset_state(self):
+        glPopAttrib()
+
+
+class _Page:
+    # A texture of the cache, with the labels currently drawn from it.
+
+    def __init__(self, texture):
+        self.texture = texture
+        self.allocator = SkylineAllocator(texture.width, texture.height)
+        self.labels = WeakSet()
+
+    def clear(self):
+        self.allocator.clear()
+        self.labels.clear()
+
+
+class LabelCache:
+
+    """Textures shared by cached labels.
+
+    Labels are given regions of the cache's textures with `allocate`.  When
+    a region can't be found in any texture and `max_textures` are already in
+    use, the least recently used texture is reclaimed: every label drawn
+    from it has its ``_on_label_cache_evicted`` method called, and the
+    texture is reused from scratch.
+
+    :Ivariables:
+        `texture_width` : int
+            Width of each texture.
+        `texture_height` : int
+            Height of each texture.
+        `max_textures` : int
+            Maximum number of textures to create.
+        `evictions` : int
+            Number of times a texture has been reclaimed.  Useful for
+            profiling only.
+
+    """
+
+    def __init__(self, texture_width=1024, texture_height=1024,
+                 max_textures=4):
+        """Create a label cache.
+
+        :Parameters:
+            `texture_width` : int
+                Width of each texture.
+            `texture_height` : int
+                Height of each texture.
+            `max_textures` : int
+                Maximum number of textures to create.  Together with the
+                texture size this limits the video memory used by the
+                cache.
+
+        """
+        self.texture_width = texture_width
+        self.texture_height = texture_height
+        self.max_textures = max_textures
+        self.evictions = 0
+        # Pages in order of use, least recently used first.
+        self._pages = OrderedDict()
+
+    def _create_texture(self):
+        return image.Texture.create(self.texture_width, self.texture_height,
+                                    min_filter=GL_NEAREST,
+                                    mag_filter=GL_NEAREST)
+
+    def allocate(self, label, width, height):
+        """Get a region for a label of the given size.
+
+        Any region previously allocated to the label is released.
+
+        :Parameters:
+            `label` : `DocumentLabel`
+                Label the region is for.
+            `width` : int
+                Width of the region.
+            `height` : int
+                Height of the region.
+
+        :rtype: `pyglet.image.TextureRegion`
+        :return: The region, or None if the label is too large to fit in a
+            texture of the cache.
+        """
+        self.release(label)
+        if width > self.texture_width or height > self.texture_height:
+            return None
+
+        # Most recently used textures are tried first, then textures no
+        # longer drawn by any label, a new texture, and finally the least
+        # recently used texture is evicted.
+        for page in reversed(self._pages):
+            try:
+                x, y = page.allocator.alloc(width, height)
+            except AllocatorException:
+                continue
+            return self._assign(page, label, x, y, width, height)
+
+        for page in self._pages:
+            if not page.labels:
+                page.clear()
+                break
+        else:
+            if len(self._pages) < self.max_textures:
+                page = _Page(self._create_texture())
+                self._pages[page] = None
+            else:
+                page = next(iter(self._pages))
+                self._evict(page)
+
+        x, y = page.allocator.alloc(width, height)
+        return self._assign(page, label, x, y, width, height)
+
+    def _assign(self, page, label, x, y, width, height):
+        page.labels.add(label)
+        self._pages.move_to_end(page)
+        return page.texture.get_region(x, y, width, height)
+
+    def _evict(self, page):
+        labels = list(page.labels)
+        page.clear()
+        self.evictions += 1
+        for label in labels:
+            label._on_label_cache_evicted()
+
+    def _get_page(self, texture):
+        for page in self._pages:
+            if page.texture is texture:
+                return page
+        return None
+
+    def touch(self, region):
+        """Mark the texture of a region as recently used.
+
+        :Parameters:
+            `region` : `pyglet.image.TextureRegion`
+                A region returned by `allocate`.
+
+        """
+        page = self._get_page(region.owner)
+        if page is not None:
+            self._pages.move_to_end(page)
+
+    def release(self, label):
+        """Release the region allocated to a label, if any.
+
+        The area of the region is not reused until the whole texture is
+        cleared, which happens once no label is drawn from it.
+
+        :Parameters:
+            `label` : `DocumentLabel`
+                Label to release.
+
+        """
+        for page in self._pages:
+            page.labels.discard(label)
+
+    def get_usage(self):
+        """Get the fraction of the cache's textures already allocated.
+
+        This method is useful for debugging and profiling only.
+
+        :rtype: float
+        """
+        if not self._pages:
+            return 0.
+        return sum(page.allocator.used_area for page in self._pages) / float(
+            self.max_textures * self.texture_width * self.texture_height)
+
+    @staticmethod
+    def render(region, batch, left, top):
+        """Draw a batch into a region.
+
+        The region is cleared to transparent, and the batch drawn with
+        window coordinates ``(left, top)`` at the top-left corner of the
+        region.
+
+        :Parameters:
+            `region` : `pyglet.image.TextureRegion`
+                Region to draw into.
+            `batch` : `pyglet.graphics.Batch`
+                Batch to draw.
+            `left` : int
+                Left edge of the region in the coordinates of the batch.
+            `top` : int
+                Top edge of the region in the coordinates of the batch.
+
+        """
+        previous = GLint()
+        glGetIntegerv(GL_FRAMEBUFFER_BINDING_EXT, byref(previous))
+        framebuffer = GLuint()
+        glGenFramebuffersEXT(1, byref(framebuffer))
+        glBindFramebufferEXT(GL_FRAMEBUFFER_EXT, framebuffer)
+        glFramebufferTexture2DEXT(GL_FRAMEBUFFER_EXT, GL_COLOR_ATTACHMENT0_EXT,
+                                  region.owner.target, region.owner.id, 0)
+
+        glPushAttrib(GL_VIEWPORT_BIT | GL_SCISSOR_BIT | GL_ENABLE_BIT |
+                     GL_COLOR_BUFFER_BIT | GL_TRANSFORM_BIT)
+        glViewport(region.x, region.y, region.width, region.height)
+        glScissor(region.x, region.y, region.width, region.height)
+        glEnable(GL_SCISSOR_TEST)
+        glClearColor(0, 0, 0, 0)
+        glClear(GL_COLOR_BUFFER_BIT)
+
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(left, left + region.width, top - region.height, top, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        batch.draw()
+
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glPopAttrib()
+
+        glBindFramebufferEXT(GL_FRAMEBUFFER_EXT, previous.value)
+        glDeleteFramebuffersEXT(1, byref(framebuffer))
+
+
+def get_label_cache():
+    """Get the label cache of the current OpenGL object space.
+
+    :rtype: `LabelCache`
+    :return: The cache, or None if the context can't render to textures.
+    """
+    object_space = gl.current_context.object_space
+    try:
+        return object_space.pyglet_text_label_cache
+    except AttributeError:
+        if gl.gl_info.have_extension('GL_EXT_framebuffer_object'):
+            cache = LabelCache()
+        else:
+            cache = None
+        object_space.pyglet_text_label_cache = cache
+        return cache
@@ -364,7 +364,7 @@ class Caret:
 
         m2 = self._next_word_re.search(self._layout.document.text, p)
         if not m2:
-            m2 = len(self._layout.document.text)
+            m2 = self._layout.document.text_length
         else:
             m2 = m2.start()
         self._position = m2
@@ -411,8 +411,8 @@ class Caret:
         self._layout.ensure_x_visible(x)
 
     def on_layout_update(self):
-        if self.position > len(self._layout.document.text):
-            self.position = len(self._layout.document.text)
+        if self.position > self._layout.document.text_length:
+            self.position = self._layout.document.text_length
         self._update()
 
     def on_text(self, text):
@@ -449,7 +449,7 @@ class Caret:
         elif motion == key.MOTION_DELETE:
             if self.mark is not None:
                 self._delete_selection()
-            elif self._position < len(self._layout.document.text):
+            elif self._position < self._layout.document.text_length:
                 self._layout.document.delete_text(
                     self._position, self._position + 1)
         elif self._mark is not None and not select:
@@ -459,7 +459,7 @@ class Caret:
         if motion == key.MOTION_LEFT:
             self.position = max(0, self.position - 1)
         elif motion == key.MOTION_RIGHT:
-            self.position = min(len(self._layout.document.text),
+            self.position = min(self._layout.document.text_length,
                                 self.position + 1)
         elif motion == key.MOTION_UP:
             self.line = max(0, self.line - 1)
@@ -476,16 +476,16 @@ class Caret:
                     self._layout.get_position_from_line(line + 1) - 1
                 self._update(line)
             else:
-                self.position = len(self._layout.document.text)
+                self.position = self._layout.document.text_length
         elif motion == key.MOTION_BEGINNING_OF_FILE:
             self.position = 0
         elif motion == key.MOTION_END_OF_FILE:
-            self.position = len(self._layout.document.text)
+            self.position = self._layout.document.text_length
         elif motion == key.MOTION_NEXT_WORD:
             pos = self._position + 1
             m = self._next_word_re.search(self._layout.document.text, pos)
             if not m:
-                self.position = len(self._layout.document.text)
+                self.position = self._layout.document.text_length
             else:
                 self.position = m.start()
         elif motion == key.MOTION_PREVIOUS_WORD:
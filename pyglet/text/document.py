@@ -164,10 +164,11 @@ of a ``None`` style is style- and application-dependent.
 :since: pyglet 1.1
 """
 
-import re
+from contextlib import contextmanager
 
 from pyglet import event
 from pyglet.text import runlist
+from pyglet.text.textbuffer import TextBuffer
 
 #: The style attribute takes on multiple values in the document.
 STYLE_INDETERMINATE = 'indeterminate'
@@ -264,13 +265,23 @@ class AbstractDocument(event.EventDispatcher):
     document format.  It may be easier to implement the document format in
     terms of one of the supplied concrete classes `FormattedDocument` or
     `UnformattedDocument`.
+
+    The text is kept in a `pyglet.text.textbuffer.TextBuffer`, so inserting
+    and deleting text doesn't copy the whole document, and the `text`
+    property is only joined together when it is read.  Use `text_length` and
+    `get_text` to avoid that where possible.
     """
-    _previous_paragraph_re = re.compile('\n[^\n\u2029]*$')
-    _next_paragraph_re = re.compile('[\n\u2029]')
+
+    _batch = None
+
+    # True while the deletion of text replaced within `batch_edit` is being
+    # dispatched, when the document already holds the text inserted in its
+    # place.
+    _replacing_text = False
 
     def __init__(self, text=''):
         super().__init__()
-        self._text = ''
+        self._buffer = TextBuffer()
         self._elements = list()
         if text:
             self.insert_text(0, text)
@@ -284,15 +295,40 @@ class AbstractDocument(event.EventDispatcher):
 
         :type: str
         """
-        return self._text
+        return self._buffer.text
 
     @text.setter
     def text(self, text):
-        if text == self._text:
+        if text == self._buffer.text:
             return
-        self.delete_text(0, len(self._text))
+        self.delete_text(0, len(self._buffer))
         self.insert_text(0, text)
 
+    @property
+    def text_length(self):
+        """Number of characters in the document text.
+
+        :type: int
+        """
+        return len(self._buffer)
+
+    def get_text(self, start=0, end=None):
+        """Get a range of the document text.
+
+        This is equivalent to slicing `text`, but doesn't require the whole
+        text to be joined together after a modification.
+
+        :Parameters:
+            `start` : int
+                Starting character position.
+            `end` : int
+                Ending character position (exclusive), or None for the end
+                of the document.
+
+        :rtype: str
+        """
+        return self._buffer.get_text(start, end)
+
     def get_paragraph_start(self, pos):
         """Get the starting position of a paragraph.
 
@@ -302,16 +338,7 @@ class AbstractDocument(event.EventDispatcher):
 
         :rtype: int
         """
-        # Tricky special case where the $ in pattern matches before the \n at
-        # the end of the string instead of the end of the string.
-        if (self._text[:pos + 1].endswith('\n') or
-                self._text[:pos + 1].endswith('\u2029')):
-            return pos
-
-        m = self._previous_paragraph_re.search(self._text, 0, pos + 1)
-        if not m:
-            return 0
-        return m.start() + 1
+        return self._buffer.get_paragraph_start(pos)
 
     def get_paragraph_end(self, pos):
         """Get the end position of a paragraph.
@@ -322,10 +349,7 @@ class AbstractDocument(event.EventDispatcher):
 
         :rtype: int
         """
-        m = self._next_paragraph_re.search(self._text, pos)
-        if not m:
-            return len(self._text)
-        return m.start() + 1
+        return self._buffer.get_paragraph_end(pos)
 
     def get_style_runs(self, attribute):
         """Get a style iterator over the given style attribute.
@@ -422,10 +446,13 @@ class AbstractDocument(event.EventDispatcher):
 
         """
         self._insert_text(start, text, attributes)
-        self.dispatch_event('on_insert_text', start, text)
+        if self._batch is not None:
+            self._batch.insert_text(start, len(text))
+        else:
+            self.dispatch_event('on_insert_text', start, text)
 
     def _insert_text(self, start, text, attributes):
-        self._text = ''.join((self._text[:start], text, self._text[start:]))
+        self._buffer.insert(start, text)
         len_text = len(text)
         for element in self._elements:
             if element._position >= start:
@@ -442,7 +469,10 @@ class AbstractDocument(event.EventDispatcher):
 
         """
         self._delete_text(start, end)
-        self.dispatch_event('on_delete_text', start, end)
+        if self._batch is not None:
+            self._batch.delete_text(start, end)
+        else:
+            self.dispatch_event('on_delete_text', start, end)
 
     def _delete_text(self, start, end):
         for element in list(self._elements):
@@ -451,7 +481,7 @@ class AbstractDocument(event.EventDispatcher):
             elif element._position >= end:  # fix bug 538
                 element._position -= (end - start)
 
-        self._text = self._text[:start] + self._text[end:]
+        self._buffer.delete(start, end)
 
     def insert_element(self, position, element, attributes=None):
         """Insert a element into the document.
@@ -503,11 +533,17 @@ class AbstractDocument(event.EventDispatcher):
 
         """
         self._set_style(start, end, attributes)
-        self.dispatch_event('on_style_text', start, end, attributes)
+        self._style_changed(start, end, attributes)
 
     def _set_style(self, start, end, attributes):
         raise NotImplementedError('abstract')
 
+    def _style_changed(self, start, end, attributes):
+        if self._batch is not None:
+            self._batch.set_style(start, end, attributes)
+        else:
+            self.dispatch_event('on_style_text', start, end, attributes)
+
     def set_paragraph_style(self, start, end, attributes):
         """Set the style for a range of paragraphs.
 
@@ -526,7 +562,69 @@ class AbstractDocument(event.EventDispatcher):
         start = self.get_paragraph_start(start)
         end = self.get_paragraph_end(end)
         self._set_style(start, end, attributes)
-        self.dispatch_event('on_style_text', start, end, attributes)
+        self._style_changed(start, end, attributes)
+
+    @contextmanager
+    def batch_edit(self):
+        """Context manager grouping several edits of the document.
+
+        Edits within the block change the document straight away, so it can
+        be queried as usual, but the ``on_insert_text``, ``on_delete_text``
+        and ``on_style_text`` events are held back.  When the block exits,
+        all text changes are reported as one deletion and one insertion of
+        the range of text that changed, followed by one ``on_style_text``
+        event for each range of restyled text.  Style changes are also
+        applied to the style runs together, rather than one at a time.
+
+        This saves layouts from updating after every edit, for example when
+        a syntax highlighter restyles many tokens at once::
+
+            with document.batch_edit():
+                for start, end, color in tokens:
+                    document.set_style(start, end, {'color': color})
+
+        Blocks may be nested; the events are dispatched when the outermost
+        block exits.
+        """
+        if self._batch is not None:
+            yield
+            return
+
+        self._batch = _EditBatch()
+        try:
+            yield
+        finally:
+            batch = self._batch
+            self._batch = None
+            self._end_batch_edit(batch)
+
+    def _end_batch_edit(self, batch):
+        if batch.text_start is not None:
+            start = batch.text_start
+            if batch.text_old_end > start:
+                self._replacing_text = batch.text_end > start
+                try:
+                    self.dispatch_event('on_delete_text', start,
+                                        batch.text_old_end)
+                finally:
+                    self._replacing_text = False
+            if batch.text_end > start:
+                self.dispatch_event('on_insert_text', start,
+                                    self.get_text(start, batch.text_end))
+
+        # Merged ranges can span several values of an attribute, so report
+        # each part over which the attributes restyled are uniform.
+        length = self.text_length
+        for start, end, names in batch.get_style_ranges():
+            end = min(end, length)
+            if start >= end:
+                continue
+            names = sorted(names)
+            runs = runlist.ZipRunIterator(
+                [self.get_style_runs(name) for name in names])
+            for run_start, run_end, values in runs.ranges(start, end):
+                self.dispatch_event('on_style_text', run_start, run_end,
+                                    dict(zip(names, values)))
 
     def on_insert_text(self, start, text):
         """Text was inserted into the document.
@@ -590,25 +688,25 @@ class UnformattedDocument(AbstractDocument):
 
     def get_style_runs(self, attribute):
         value = self.styles.get(attribute)
-        return runlist.ConstRunIterator(len(self.text), value)
+        return runlist.ConstRunIterator(self.text_length, value)
 
     def get_style(self, attribute, position=None):
         return self.styles.get(attribute)
 
     def set_style(self, start, end, attributes):
         return super().set_style(
-            0, len(self.text), attributes)
+            0, self.text_length, attributes)
 
     def _set_style(self, start, end, attributes):
         self.styles.update(attributes)
 
     def set_paragraph_style(self, start, end, attributes):
         return super().set_paragraph_style(
-            0, len(self.text), attributes)
+            0, self.text_length, attributes)
 
     def get_font_runs(self, dpi=None):
         ft = self.get_font(dpi=dpi)
-        return runlist.ConstRunIterator(len(self.text), ft)
+        return runlist.ConstRunIterator(self.text_length, ft)
 
     def get_font(self, position=None, dpi=None):
         from pyglet import font
@@ -620,7 +718,7 @@ class UnformattedDocument(AbstractDocument):
                          bold=bool(bold), italic=bool(italic), dpi=dpi)
 
     def get_element_runs(self):
-        return runlist.ConstRunIterator(len(self._text), None)
+        return runlist.ConstRunIterator(len(self._buffer), None)
 
 
 class FormattedDocument(AbstractDocument):
@@ -633,27 +731,40 @@ class FormattedDocument(AbstractDocument):
 
     def __init__(self, text=''):
         self._style_runs = dict()
+        # Style changes made within `batch_edit`, applied together.
+        self._pending_styles = dict()
         super().__init__(text)
 
     def get_style_runs(self, attribute):
+        self._apply_pending_styles()
         try:
             return self._style_runs[attribute].get_run_iterator()
         except KeyError:
             return _no_style_range_iterator
 
     def get_style(self, attribute, position=0):
+        self._apply_pending_styles()
         try:
             return self._style_runs[attribute][position]
         except KeyError:
             return None
 
     def _set_style(self, start, end, attributes):
+        if self._batch is not None:
+            for attribute, value in attributes.items():
+                try:
+                    pending = self._pending_styles[attribute]
+                except KeyError:
+                    pending = self._pending_styles[attribute] = list()
+                pending.append((start, end, value))
+            return
+
         for attribute, value in list(attributes.items()):
             try:
                 runs = self._style_runs[attribute]
             except KeyError:
                 runs = self._style_runs[attribute] = runlist.RunList(0, None)
-                runs.insert(0, len(self._text))
+                runs.insert(0, len(self._buffer))
             runs.set_run(start, end, value)
 
     def get_font_runs(self, dpi=None):
@@ -669,9 +780,28 @@ class FormattedDocument(AbstractDocument):
         return iter[position]
 
     def get_element_runs(self):
-        return _ElementIterator(self._elements, len(self._text))
+        return _ElementIterator(self._elements, len(self._buffer))
+
+    def _apply_pending_styles(self):
+        if not self._pending_styles:
+            return
+
+        pending_styles = self._pending_styles
+        self._pending_styles = dict()
+        for attribute, ranges in pending_styles.items():
+            try:
+                runs = self._style_runs[attribute]
+            except KeyError:
+                runs = self._style_runs[attribute] = \
+                    runlist.RunList(len(self._buffer), None)
+            runs.set_runs(ranges)
+
+    def _end_batch_edit(self, batch):
+        self._apply_pending_styles()
+        super()._end_batch_edit(batch)
 
     def _insert_text(self, start, text, attributes):
+        self._apply_pending_styles()
         super()._insert_text(start, text, attributes)
 
         len_text = len(text)
@@ -685,15 +815,191 @@ class FormattedDocument(AbstractDocument):
                 except KeyError:
                     runs = self._style_runs[attribute] = \
                         runlist.RunList(0, None)
-                    runs.insert(0, len(self.text))
+                    runs.insert(0, len(self._buffer))
                 runs.set_run(start, start + len_text, value)
 
     def _delete_text(self, start, end):
+        self._apply_pending_styles()
         super()._delete_text(start, end)
         for runs in list(self._style_runs.values()):
             runs.delete(start, end)
 
 
+class _EditBatch:
+    # Changes made to a document within `AbstractDocument.batch_edit`.
+
+    def __init__(self):
+        # Characters text_start to text_old_end of the document before the
+        # batch have been replaced by characters text_start to text_end.
+        self.text_start = None
+        self.text_old_end = None
+        self.text_end = None
+        # Restyled ranges and attribute names, in current positions.
+        self.styles = list()
+
+    def _extend_text_range(self, start, end):
+        # Extend the replaced range to include characters start to end of
+        # the current text.
+        if self.text_start is None:
+            self.text_start = start
+            self.text_old_end = self.text_end = end
+        else:
+            self.text_start = min(self.text_start, start)
+            if end > self.text_end:
+                self.text_old_end += end - self.text_end
+                self.text_end = end
+
+    def insert_text(self, start, length):
+        self._extend_text_range(start, start)
+        self.text_end += length
+
+        def move(position):
+            if position >= start:
+                return position + length
+            return position
+
+        self.styles = [(move(style_start), move(style_end), names)
+                       for style_start, style_end, names in self.styles]
+
+    def delete_text(self, start, end):
+        self._extend_text_range(start, end)
+        self.text_end -= end - start
+
+        def move(position):
+            if position <= start:
+                return position
+            return max(start, position - (end - start))
+
+        styles = list()
+        for style_start, style_end, names in self.styles:
+            style_start = move(style_start)
+            style_end = move(style_end)
+            if style_start < style_end:
+                styles.append((style_start, style_end, names))
+        self.styles = styles
+
+    def set_style(self, start, end, attributes):
+        if start < end:
+            self.styles.append((start, end, set(attributes)))
+
+    def get_style_ranges(self):
+        # Merge overlapping and adjacent restyled ranges.
+        ranges = list()
+        for start, end, names in sorted(self.styles, key=lambda s: s[0]):
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+                ranges[-1][2] |= names
+            else:
+                ranges.append([start, end, set(names)])
+        return ranges
+
+
+class DocumentBuilder:
+
+    """Build a `FormattedDocument` by appending text to it.
+
+    Decoders produce a document from start to end.  Inserting each piece of
+    text into a `FormattedDocument` updates every run list and dispatches
+    events for a document nothing is watching yet.  The builder instead
+    collects the text, and the positions at which each style changes, and
+    creates the document and its run lists at once in `get_document`.
+    """
+
+    def __init__(self):
+        self._chunks = list()
+        self._length = 0
+        self._paragraph_start = 0
+        self._style_runs = dict()
+        self._elements = list()
+
+    @property
+    def length(self):
+        """Number of characters appended so far.
+
+        :type: int
+        """
+        return self._length
+
+    def _set_style(self, start, attributes):
+        for attribute, value in attributes.items():
+            try:
+                runs = self._style_runs[attribute]
+            except KeyError:
+                runs = self._style_runs[attribute] = \
+                    runlist.RunListBuilder(None)
+            runs.set_value(start, value)
+
+    def append_text(self, text, attributes=None):
+        """Append text to the document.
+
+        As with `AbstractDocument.insert_text`, styles not given in
+        `attributes` continue from the preceding text.
+
+        :Parameters:
+            `text` : str
+                Text to append.
+            `attributes` : dict
+                Optional dictionary giving named style attributes of the
+                appended text.
+
+        """
+        if not text:
+            return
+
+        if attributes:
+            self._set_style(self._length, attributes)
+        self._chunks.append(text)
+
+        paragraph_break = max(text.rfind('\n'), text.rfind('\u2029'))
+        if paragraph_break >= 0:
+            self._paragraph_start = self._length + paragraph_break + 1
+        self._length += len(text)
+
+    def append_element(self, element, attributes=None):
+        """Append an element to the document.
+
+        :Parameters:
+            `element` : `InlineElement`
+                Element to append.
+            `attributes` : dict
+                Optional dictionary giving named style attributes of the
+                element.
+
+        """
+        assert element._position is None, \
+            'Element is already in a document.'
+        element._position = self._length
+        self._elements.append(element)
+        self.append_text('\0', attributes)
+
+    def set_paragraph_style(self, attributes):
+        """Set the style of the last paragraph appended.
+
+        The style also applies to text appended later, as with
+        `AbstractDocument.set_paragraph_style` at the end of a document.
+        Nothing is set if the paragraph is empty.
+
+        :Parameters:
+            `attributes` : dict
+                Dictionary giving named style attributes of the paragraph.
+
+        """
+        if self._paragraph_start < self._length:
+            self._set_style(self._paragraph_start, attributes)
+
+    def get_document(self):
+        """Create the document built.
+
+        :rtype: `FormattedDocument`
+        """
+        document = FormattedDocument(''.join(self._chunks))
+        document._elements = list(self._elements)
+        document._style_runs = dict(
+            (attribute, runs.get_run_list(self._length))
+            for attribute, runs in self._style_runs.items())
+        return document
+
+
 def _iter_elements(elements, length):
     last = 0
     for element in elements:
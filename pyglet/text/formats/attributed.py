@@ -36,13 +36,11 @@
 documents.
 """
 
-import operator
-import parser
+import io
 import re
-import token
+import tokenize
 
 import pyglet
-from functools import reduce
 
 _pattern = re.compile(r"""
     (?P<escape_hex>\{\#x(?P<escape_hex_val>[0-9a-fA-F]+)\})
@@ -59,16 +57,60 @@ _pattern = re.compile(r"""
   | (?P<text>[^\{\}\n]+)
     """, re.VERBOSE | re.DOTALL)
 
+# The last position between two characters of plain text.
+_split_pattern = re.compile(r'.*[^{}\n](?=[^{}\n])', re.DOTALL)
+
+
+def _find_split(text):
+    # Find a position at which text can be decoded in two parts with the same
+    # result as decoding it whole: within a run of plain text after the last
+    # closed brace.  Returns 0 if there is none.
+    end = len(text)
+    while True:
+        lbrace = text.rfind('{', 0, end)
+        if lbrace < 0 or lbrace < text.rfind('}', 0, end):
+            break
+        end = lbrace
+    start = text.rfind('}', 0, end) + 1
+    match = _split_pattern.match(text, start, end)
+    if match:
+        return match.end()
+    return 0
+
 
 class AttributedTextDecoder(pyglet.text.DocumentDecoder):
 
     def decode(self, text, location=None):
-        self.doc = pyglet.text.document.FormattedDocument()
+        self._begin()
+        self._decode_text(text)
+        return self.builder.get_document()
+
+    def decode_file(self, file, location=None):
+        self._begin()
+        text = ''
+        while True:
+            chunk = file.read(self.chunk_size)
+            if not chunk:
+                break
+            text += chunk
+            split = _find_split(text)
+            if split:
+                self._decode_text(text[:split])
+                text = text[split:]
+        self._decode_text(text)
+        return self.builder.get_document()
 
+    def _begin(self):
+        self.builder = pyglet.text.document.DocumentBuilder()
         self.length = 0
         self.attributes = dict()
-        next_trailing_space = True
-        trailing_newline = True
+        self.next_trailing_space = True
+        self.trailing_newline = True
+        self._compiled = dict()
+
+    def _decode_text(self, text):
+        next_trailing_space = self.next_trailing_space
+        trailing_newline = self.trailing_newline
 
         for m in _pattern.finditer(text):
             group = m.lastgroup
@@ -89,21 +131,17 @@ class AttributedTextDecoder(pyglet.text.DocumentDecoder):
                 self.append(m.group('nl_para')[1:])  # ignore the first \n
                 trailing_newline = True
             elif group == 'attr':
-                try:
-                    ast = parser.expr(m.group('attr_val'))
-                    if self.safe(ast):
-                        val = eval(ast.compile())
-                    else:
-                        val = None
-                except (parser.ParserError, SyntaxError):
+                code = self._compile(m.group('attr_val'))
+                if code is not None:
+                    val = eval(code)
+                else:
                     val = None
                 name = m.group('attr_name')
                 if name[0] == '.':
                     if trailing_newline:
                         self.attributes[name[1:]] = val
                     else:
-                        self.doc.set_paragraph_style(self.length, self.length,
-                                                     {name[1:]: val})
+                        self.builder.set_paragraph_style({name[1:]: val})
                 else:
                     self.attributes[name] = val
             elif group == 'escape_dec':
@@ -116,23 +154,39 @@ class AttributedTextDecoder(pyglet.text.DocumentDecoder):
                 self.append('}')
             next_trailing_space = trailing_space
 
-        return self.doc
+        self.next_trailing_space = next_trailing_space
+        self.trailing_newline = trailing_newline
+
+    def _compile(self, expression):
+        # Documents repeat the same few attribute values many times, so the
+        # checked and compiled expressions are kept for the whole decode.
+        try:
+            return self._compiled[expression]
+        except KeyError:
+            pass
+        code = None
+        try:
+            if self.safe(expression):
+                code = compile(expression, '<attribute>', 'eval')
+        except SyntaxError:
+            pass
+        self._compiled[expression] = code
+        return code
 
     def append(self, text):
-        self.doc.insert_text(self.length, text, self.attributes)
+        self.builder.append_text(text, self.attributes)
         self.length += len(text)
         self.attributes.clear()
 
     _safe_names = ('True', 'False', 'None')
 
-    def safe(self, ast):
-        tree = ast.totuple()
-        return self.safe_node(tree)
-
-    def safe_node(self, node):
-        if token.ISNONTERMINAL(node[0]):
-            return reduce(operator.and_, list(map(self.safe_node, node[1:])))
-        elif node[0] == token.NAME:
-            return node[1] in self._safe_names
-        else:
-            return True
+    def safe(self, expression):
+        # Only literals and operators are allowed: any name other than the
+        # constants above (including keywords such as ``lambda``) is not.
+        try:
+            tokens = list(tokenize.generate_tokens(
+                io.StringIO(expression).readline))
+        except (tokenize.TokenError, SyntaxError):
+            return False
+        return all(t.string in self._safe_names
+                   for t in tokens if t.type == tokenize.NAME)
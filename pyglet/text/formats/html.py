@@ -137,6 +137,24 @@ class HTMLDecoder(html.parser.HTMLParser, structured.StructuredTextDecoder):
     }
 
     def decode_structured(self, text, location):
+        self._begin_html(location)
+        self.feed(text)
+        self.close()
+        self.flush_data()
+
+    def decode_structured_file(self, file, location):
+        self._begin_html(location)
+        while True:
+            chunk = file.read(self.chunk_size)
+            if not chunk:
+                break
+            self.feed(chunk)
+        self.close()
+        self.flush_data()
+
+    def _begin_html(self, location):
+        self.reset()
+        self._data = list()
         self.location = location
         self._font_size_stack = [3]
         self.list_stack.append(structured.UnorderedListBuilder(dict()))
@@ -149,9 +167,6 @@ class HTMLDecoder(html.parser.HTMLParser, structured.StructuredTextDecoder):
 
         self.push_style('_default', self.default_style)
 
-        self.feed(text)
-        self.close()
-
     def get_image(self, filename):
         return pyglet.image.load(filename, file=self.location.open(filename))
 
@@ -162,6 +177,20 @@ class HTMLDecoder(html.parser.HTMLParser, structured.StructuredTextDecoder):
             self.need_block_begin = False
 
     def handle_data(self, data):
+        # The parser can split the text between two tags over several calls,
+        # particularly when the document is fed in chunks.  Whitespace is
+        # collapsed over the whole text, so it is only decoded when the next
+        # tag, or the end of the document, is reached.
+        self._data.append(data)
+
+    def flush_data(self):
+        if not self._data:
+            return
+        data = ''.join(self._data)
+        del self._data[:]
+        self.decode_data(data)
+
+    def decode_data(self, data):
         if self.in_metadata:
             return
 
@@ -178,6 +207,7 @@ class HTMLDecoder(html.parser.HTMLParser, structured.StructuredTextDecoder):
             self.strip_leading_space = data.endswith(' ')
 
     def handle_starttag(self, tag, case_attrs):
+        self.flush_data()
         if self.in_metadata:
             return
 
@@ -324,6 +354,7 @@ class HTMLDecoder(html.parser.HTMLParser, structured.StructuredTextDecoder):
         self.push_style(element, style)
 
     def handle_endtag(self, tag):
+        self.flush_data()
         element = tag.lower()
         if element not in self.element_stack:
             return
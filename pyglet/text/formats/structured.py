@@ -263,20 +263,34 @@ class OrderedListBuilder(ListBuilder):
 class StructuredTextDecoder(pyglet.text.DocumentDecoder):
 
     def decode(self, text, location=None):
+        location = self._begin(location)
+        self.decode_structured(text, location)
+        return self.builder.get_document()
+
+    def decode_file(self, file, location=None):
+        location = self._begin(location)
+        self.decode_structured_file(file, location)
+        return self.builder.get_document()
+
+    def _begin(self, location):
         self.len_text = 0
         self.current_style = dict()
         self.next_style = dict()
         self.stack = list()
         self.list_stack = list()
-        self.document = pyglet.text.document.FormattedDocument()
+        self.builder = pyglet.text.document.DocumentBuilder()
         if location is None:
             location = pyglet.resource.FileLocation('')
-        self.decode_structured(text, location)
-        return self.document
+        return location
 
     def decode_structured(self, text, location):
         raise NotImplementedError('abstract')
 
+    def decode_structured_file(self, file, location):
+        # Formats that can be parsed incrementally override this to read
+        # the file in chunks.
+        self.decode_structured(file.read(), location)
+
     def push_style(self, key, styles):
         old_styles = dict()
         for name in list(styles.keys()):
@@ -302,11 +316,11 @@ class StructuredTextDecoder(pyglet.text.DocumentDecoder):
                 break
 
     def add_text(self, text):
-        self.document.insert_text(self.len_text, text, self.next_style)
+        self.builder.append_text(text, self.next_style)
         self.next_style.clear()
         self.len_text += len(text)
 
     def add_element(self, element):
-        self.document.insert_element(self.len_text, element, self.next_style)
+        self.builder.append_element(element, self.next_style)
         self.next_style.clear()
         self.len_text += 1
@@ -155,7 +155,12 @@ document; they will be ignored by the built-in text classes.
 
 import re
 import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain
+from operator import add
 
+import pyglet
 from pyglet.gl import *
 from pyglet import event
 from pyglet import graphics
@@ -212,6 +217,10 @@ class _Line:
     paragraph_begin = False
     paragraph_end = False
 
+    # Layout parameters the line was wrapped with; see
+    # `IncrementalTextLayout._get_wrap_key`.
+    wrap_key = None
+
     x = None
     y = None
 
@@ -232,7 +241,7 @@ class _Line:
 
     def delete(self, layout):
         for vertex_list in self.vertex_lists:
-            vertex_list.delete()
+            layout._delete_vertex_list(vertex_list)
         self.vertex_lists = list()
 
         for box in self.boxes:
@@ -334,36 +343,44 @@ class _GlyphBox(_AbstractBox):
                 TextLayoutTextureGroup(self.owner, layout.foreground_group)
 
         n_glyphs = self.length
-        vertices = list()
-        tex_coords = list()
-        x1 = x
+        kerns, glyphs = zip(*self.glyphs)
+
+        # Left edge of each glyph's advance, and of the end of the box.
+        edges = list(accumulate(
+            map(add, kerns, [glyph.advance for glyph in glyphs]), initial=x))
+
+        # Origin of each glyph, repeated for each corner of its quad, for
+        # each run of glyphs on the same baseline.
+        origins = list()
+        integral = type(sum(edges)) is int
         for start, end, baseline in context.baseline_iter.ranges(i, i + n_glyphs):
             baseline = layout._parse_distance(baseline)
-            assert len(self.glyphs[start - i:end - i]) == end - start
-            for kern, glyph in self.glyphs[start - i:end - i]:
-                x1 += kern
-                v0, v1, v2, v3 = glyph.vertices
-                v0 += x1
-                v2 += x1
-                v1 += y + baseline
-                v3 += y + baseline
-                vertices.extend(
-                    list(map(int, [v0, v1, v2, v1, v2, v3, v0, v3])))
-                t = glyph.tex_coords
-                tex_coords.extend(t)
-                x1 += glyph.advance
+            y1 = y + baseline
+            integral = integral and type(y1) is int
+            origins.extend(chain.from_iterable(
+                (x1, y1, x1, y1, x1, y1, x1, y1) for x1 in map(
+                    add, edges[start - i:end - i], kerns[start - i:end - i])))
+
+        vertices = map(add, chain.from_iterable(
+            glyph.quad for glyph in glyphs), origins)
+        if not integral:
+            vertices = map(int, vertices)
+        vertices = array('f', list(vertices))
+        tex_coords = array('f')
+        tex_coords.frombytes(b''.join(
+            [glyph.tex_coords_data for glyph in glyphs]))
 
         # Text color
-        colors = list()
+        colors = array('B')
         for start, end, color in context.colors_iter.ranges(i, i + n_glyphs):
             if color is None:
                 color = (0, 0, 0, 255)
-            colors.extend(color * ((end - start) * 4))
+            colors.frombytes(bytes(color) * ((end - start) * 4))
 
-        vertex_list = layout.batch.add(n_glyphs * 4, GL_QUADS, group,
-                                       ('v2f/dynamic', vertices),
-                                       ('t3f/dynamic', tex_coords),
-                                       ('c4B/dynamic', colors))
+        vertex_list = layout._add_vertex_list(n_glyphs * 4, GL_QUADS, group,
+                                              ('v2f/dynamic', vertices),
+                                              ('t3f/dynamic', tex_coords),
+                                              ('c4B/dynamic', colors))
         context.add_list(vertex_list)
 
         # Decoration (background color and underline)
@@ -378,13 +395,11 @@ class _GlyphBox(_AbstractBox):
         underline_colors = list()
         y1 = y + self.descent + baseline
         y2 = y + self.ascent + baseline
-        x1 = x
         for start, end, decoration in \
                 context.decoration_iter.ranges(i, i + n_glyphs):
             bg, underline = decoration
-            x2 = x1
-            for kern, glyph in self.glyphs[start - i:end - i]:
-                x2 += glyph.advance + kern
+            x1 = edges[start - i]
+            x2 = edges[end - i]
 
             if bg is not None:
                 background_vertices.extend(
@@ -396,10 +411,8 @@ class _GlyphBox(_AbstractBox):
                     [x1, y + baseline - 2, x2, y + baseline - 2])
                 underline_colors.extend(underline * 2)
 
-            x1 = x2
-
         if background_vertices:
-            background_list = layout.batch.add(
+            background_list = layout._add_vertex_list(
                 len(background_vertices) // 2, GL_QUADS,
                 layout.background_group,
                 ('v2f/dynamic', background_vertices),
@@ -407,7 +420,7 @@ class _GlyphBox(_AbstractBox):
             context.add_list(background_list)
 
         if underline_vertices:
-            underline_list = layout.batch.add(
+            underline_list = layout._add_vertex_list(
                 len(underline_vertices) // 2, GL_LINES,
                 layout.foreground_decoration_group,
                 ('v2f/dynamic', underline_vertices),
@@ -544,6 +557,15 @@ class TextLayoutGroup(graphics.Group):
     def unset_state(self):
         glPopAttrib()
 
+    def set_raster_state(self, rasterizer):
+        rasterizer.push_state()
+        rasterizer.blend = True
+        rasterizer.blend_src = GL_SRC_ALPHA
+        rasterizer.blend_dest = GL_ONE_MINUS_SRC_ALPHA
+
+    def unset_raster_state(self, rasterizer):
+        rasterizer.pop_state()
+
 
 class ScrollableTextLayoutGroup(graphics.Group):
 
@@ -589,6 +611,31 @@ class ScrollableTextLayoutGroup(graphics.Group):
         glTranslatef(-self.translate_x, -self.translate_y, 0)
         glPopAttrib()
 
+    def set_raster_state(self, rasterizer):
+        rasterizer.push_state()
+        rasterizer.blend = True
+        rasterizer.blend_src = GL_SRC_ALPHA
+        rasterizer.blend_dest = GL_ONE_MINUS_SRC_ALPHA
+        # The clipping planes are approximated by a scissor rectangle.
+        x = self._clip_x - 1
+        y = self._clip_y - self._clip_height
+        width = self._clip_width + 2
+        height = self._clip_height
+        if rasterizer.scissor is not None:
+            sx, sy, swidth, sheight = rasterizer.scissor
+            right = min(x + width, sx + swidth)
+            top = min(y + height, sy + sheight)
+            x = max(x, sx)
+            y = max(y, sy)
+            width = max(right - x, 0)
+            height = max(top - y, 0)
+        rasterizer.scissor = (x, y, width, height)
+        rasterizer.translate_x += self.translate_x
+        rasterizer.translate_y += self.translate_y
+
+    def unset_raster_state(self, rasterizer):
+        rasterizer.pop_state()
+
     def _set_top(self, top):
         self._clip_y = top
         self.translate_y = self._clip_y - self._view_y
@@ -665,6 +712,9 @@ class TextLayoutForegroundGroup(graphics.OrderedGroup):
     def set_state(self):
         glEnable(GL_TEXTURE_2D)
 
+    def set_raster_state(self, rasterizer):
+        rasterizer.texture_enabled = True
+
     # unset_state not needed, as parent group will pop enable bit
 
 
@@ -679,6 +729,9 @@ class TextLayoutForegroundDecorationGroup(graphics.OrderedGroup):
     def set_state(self):
         glDisable(GL_TEXTURE_2D)
 
+    def set_raster_state(self, rasterizer):
+        rasterizer.texture_enabled = False
+
     # unset_state not needed, as parent group will pop enable bit
 
 
@@ -699,6 +752,9 @@ class TextLayoutTextureGroup(graphics.Group):
     def set_state(self):
         glBindTexture(GL_TEXTURE_2D, self.texture.id)
 
+    def set_raster_state(self, rasterizer):
+        rasterizer.texture = self.texture
+
     # unset_state not needed, as next group will either bind a new texture or
     # pop enable bit.
 
@@ -761,6 +817,8 @@ class TextLayout:
     _update_enabled = True
     _own_batch = False
     _origin_layout = False  # Lay out relative to origin?  Otherwise to box.
+    _watched_fonts = ()
+    _scheduled_refresh = None
 
     def __init__(self, document, width=None, height=None,
                  multiline=False, dpi=None, batch=None, group=None,
@@ -857,6 +915,14 @@ class TextLayout:
     :type: float
     """)
 
+    def _add_vertex_list(self, count, mode, group, *data):
+        # Vertex lists of glyphs and decorations are created and deleted
+        # through these methods, so that subclasses can reuse them.
+        return self.batch.add(count, mode, group, *data)
+
+    def _delete_vertex_list(self, vertex_list):
+        vertex_list.delete()
+
     def delete(self):
         """Remove this layout from its batch.
         """
@@ -866,6 +932,7 @@ class TextLayout:
 
         for box in self._boxes:
             box.delete(self)
+        self._unwatch_fonts()
 
     def draw(self):
         """Draw this text layout.
@@ -910,7 +977,7 @@ class TextLayout:
         self._init_document()
 
     def _get_lines(self):
-        len_text = len(self._document.text)
+        len_text = self._document.text_length
         glyphs = self._get_glyphs()
         owner_runs = runlist.RunList(len_text, None)
         self._get_owner_runs(owner_runs, glyphs, 0, len_text)
@@ -932,7 +999,7 @@ class TextLayout:
         self._boxes = list()
         self.groups.clear()
 
-        if not self._document or not self._document.text:
+        if not self._document or not self._document.text_length:
             return
 
         lines = self._get_lines()
@@ -1039,9 +1106,41 @@ class TextLayout:
             if element:
                 glyphs.append(_InlineElementBox(element))
             else:
+                self._watch_font(font)
                 glyphs.extend(font.get_glyphs(text[start:end]))
         return glyphs
 
+    def _watch_font(self, font):
+        # Get glyphs again if the font reuses the texture of any it
+        # returned; see `Font.max_textures`.
+        if font not in self._watched_fonts:
+            if not self._watched_fonts:
+                self._watched_fonts = set()
+            self._watched_fonts.add(font)
+            font.add_eviction_handler(self._on_glyphs_evicted)
+
+    def _unwatch_fonts(self):
+        for font in self._watched_fonts:
+            font.remove_eviction_handler(self._on_glyphs_evicted)
+        self._watched_fonts = ()
+        if self._scheduled_refresh:
+            pyglet.app.event_loop.clock.unschedule(self._scheduled_refresh)
+            self._scheduled_refresh = None
+
+    def _on_glyphs_evicted(self, font, texture):
+        # Glyphs are evicted while a layout, not necessarily this one, is
+        # getting glyphs; refresh once that is done.  Keep the bound method
+        # scheduled, as the clock unschedules by identity.
+        if not self._scheduled_refresh:
+            self._scheduled_refresh = self._refresh_glyphs
+            pyglet.app.event_loop.clock.schedule_once(
+                self._scheduled_refresh, 0)
+
+    def _refresh_glyphs(self, dt):
+        self._scheduled_refresh = None
+        if self._document:
+            self._init_document()
+
     def _get_owner_runs(self, owner_runs, glyphs, start, end):
         owner = glyphs[start].owner
         run_start = start
@@ -1079,7 +1178,7 @@ class TextLayout:
             'left')
         if self._width is None:
             wrap_iterator = runlist.ConstRunIterator(
-                len(self.document.text), False)
+                self.document.text_length, False)
         else:
             wrap_iterator = runlist.FilteredRunIterator(
                 self._document.get_style_runs('wrap'),
@@ -1105,7 +1204,8 @@ class TextLayout:
         line.align = align_iterator[start]
         line.margin_left = self._parse_distance(margin_left_iterator[start])
         line.margin_right = self._parse_distance(margin_right_iterator[start])
-        if start == 0 or self.document.text[start - 1] in '\n\u2029':
+        if start == 0 or \
+                self.document.get_text(start - 1, start) in '\n\u2029':
             line.paragraph_begin = True
             line.margin_left += self._parse_distance(indent_iterator[start])
         wrap = wrap_iterator[start]
@@ -1148,7 +1248,7 @@ class TextLayout:
             # Iterate over glyphs in this owner run.  `text` is the
             # corresponding character data for the glyph, and is used to find
             # whitespace and newlines.
-            for (text, glyph) in zip(self.document.text[start:end],
+            for (text, glyph) in zip(self.document.get_text(start, end),
                                      glyphs[start:end]):
                 if nokern:
                     kern = 0
@@ -1770,6 +1870,12 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
     affected line(s) are reflowed.  Use `begin_update` and `end_update` to
     further reduce the amount of processing required.
 
+    When the width changes, only the paragraphs that are visible, or within
+    `wrap_margin` of the view, are wrapped again immediately; the others are
+    wrapped as they are scrolled into view.  Until then, `content_width` and
+    `content_height` take their lines at the width they were last wrapped
+    to.
+
     The layout can also display a text selection (text with a different
     background color).  The `Caret` class implements a visible text cursor and
     provides event handlers for scrolling, selecting and editing text in an
@@ -1780,12 +1886,41 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
     _selection_color = [255, 255, 255, 255]
     _selection_background_color = [46, 106, 197, 255]
 
+    #: Distance, in pixels, above and below the view within which lines are
+    #: wrapped again immediately after the width changes, or None for the
+    #: height of the layout.
+    wrap_margin = None
+
+    #: Number of lines above and below the view to keep vertex lists for, so
+    #: that they are ready before they are scrolled into view.
+    overscan = 2
+
     def __init__(self, document, width, height, multiline=False, dpi=None,
                  batch=None, group=None, wrap_lines=True):
         event.EventDispatcher.__init__(self)
         self.glyphs = list()
         self.lines = list()
 
+        # Vertex lists of lines that are no longer displayed, by mode, group
+        # and formats, for reuse by lines scrolled into view.
+        self._vertex_list_pool = dict()
+        self._vertex_list_keys = dict()
+        self._vertex_lists_to_clear = set()
+
+        #: Number of vertex lists added to the batch; see
+        #: `allocations_per_line`.
+        self.vertex_list_allocations = 0
+        #: Number of lines vertex lists have been created for.
+        self.lines_placed = 0
+
+        # Sorted keys of `lines` for bisection: the start positions, and the
+        # negated y coordinates of the bottoms and tops of the lines.  Kept up
+        # to date by `on_insert_text`, `on_delete_text` and
+        # `_update_flow_lines`.
+        self._line_starts = list()
+        self._line_bottoms = list()
+        self._line_tops = list()
+
         self.invalid_glyphs = _InvalidRange()
         self.invalid_flow = _InvalidRange()
         self.invalid_lines = _InvalidRange()
@@ -1809,7 +1944,7 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
         self.on_insert_text(0, self._document.text)
 
     def _uninit_document(self):
-        self.on_delete_text(0, len(self._document.text))
+        self.on_delete_text(0, self._document.text_length)
 
     def _get_lines(self):
         return self.lines
@@ -1817,11 +1952,90 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
     def delete(self):
         for line in self.lines:
             line.delete(self)
+        for vertex_lists in self._vertex_list_pool.values():
+            for vertex_list in vertex_lists:
+                vertex_list.delete()
+        self._vertex_list_pool.clear()
+        self._vertex_list_keys.clear()
+        self._vertex_lists_to_clear.clear()
+        self._unwatch_fonts()
         self.batch = None
         if self._document:
             self._document.remove_handlers(self)
         self._document = None
 
+    def _add_vertex_list(self, count, mode, group, *data):
+        formats, initial_arrays = graphics._parse_data(data)
+        key = (mode, group, formats)
+        vertex_lists = self._vertex_list_pool.get(key)
+        if not vertex_lists:
+            self.vertex_list_allocations += 1
+            vertex_list = self.batch.add(count, mode, group, *data)
+            self._vertex_list_keys[vertex_list] = key
+            return vertex_list
+
+        # Rewrite the vertex list of a line scrolled out of view: the
+        # smallest one that is large enough, or else the largest, grown.
+        best = max(range(len(vertex_lists)), key=lambda i: (
+            vertex_lists[i].count >= count, -vertex_lists[i].count))
+        vertex_list = vertex_lists.pop(best)
+        self._vertex_lists_to_clear.discard(vertex_list)
+        size = vertex_list.get_size()
+        if size < count:
+            vertex_list.resize(count)
+        elif size > count:
+            # Pad the data with collapsed vertices.
+            for _, initial_array in initial_arrays:
+                padding = len(initial_array) // count * (size - count)
+                if isinstance(initial_array, array):
+                    initial_array.frombytes(
+                        bytes(padding * initial_array.itemsize))
+                else:
+                    initial_array.extend([0] * padding)
+        for i, initial_array in initial_arrays:
+            vertex_list._set_attribute_data(i, initial_array)
+        return vertex_list
+
+    def _delete_vertex_list(self, vertex_list):
+        # Keep the vertex list in the batch for reuse.  Unless it is reused
+        # by the end of the update, its vertices are collapsed so that
+        # nothing is drawn.
+        key = self._vertex_list_keys[vertex_list]
+        self._vertex_list_pool.setdefault(key, list()).append(vertex_list)
+        self._vertex_lists_to_clear.add(vertex_list)
+
+    def _trim_vertex_list_pool(self):
+        # Keep no more unused vertex lists of each kind than there are lines
+        # displayed.
+        size = max(0, min(self.visible_lines.end, len(self.lines)) -
+                   self.visible_lines.start)
+        for vertex_lists in self._vertex_list_pool.values():
+            while len(vertex_lists) > size:
+                vertex_list = vertex_lists.pop(0)
+                del self._vertex_list_keys[vertex_list]
+                self._vertex_lists_to_clear.discard(vertex_list)
+                vertex_list.delete()
+
+        # The first attribute of all layout vertex lists is 'v2f' vertices.
+        for vertex_list in self._vertex_lists_to_clear:
+            vertex_list._set_attribute_data(
+                0, array('f', bytes(8 * vertex_list.get_size())))
+        self._vertex_lists_to_clear.clear()
+
+    @property
+    def allocations_per_line(self):
+        """Average number of vertex lists added to the batch for each line
+        displayed.
+
+        Lines scrolled into view reuse the vertex lists of lines scrolled out
+        of view, so this approaches zero while scrolling.
+
+        :type: float
+        """
+        if not self.lines_placed:
+            return 0.0
+        return self.vertex_list_allocations / self.lines_placed
+
     def on_insert_text(self, start, text):
         len_text = len(text)
         self.glyphs[start:start] = [None] * len_text
@@ -1832,9 +2046,10 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
 
         self.owner_runs.insert(start, len_text)
 
-        for line in self.lines:
-            if line.start >= start:
-                line.start += len_text
+        line_starts = self._line_starts
+        for i in range(bisect_left(line_starts, start), len(line_starts)):
+            line_starts[i] += len_text
+            self.lines[i].start += len_text
 
         self._update()
 
@@ -1848,9 +2063,10 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
         self.owner_runs.delete(start, end)
 
         size = end - start
-        for line in self.lines:
-            if line.start > start:
-                line.start = max(line.start - size, start)
+        line_starts = self._line_starts
+        for i in range(bisect_right(line_starts, start), len(line_starts)):
+            line = self.lines[i]
+            line_starts[i] = line.start = max(line.start - size, start)
 
         if start == 0:
             self.invalid_flow.invalidate(0, 1)
@@ -1877,6 +2093,11 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
         if not self._update_enabled:
             return
 
+        if self._document._replacing_text:
+            # The document already holds the text that will be inserted
+            # after this deletion; update then.
+            return
+
         trigger_update_event = (self.invalid_glyphs.is_invalid() or
                                 self.invalid_flow.is_invalid() or
                                 self.invalid_lines.is_invalid())
@@ -1887,6 +2108,7 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
                 line.delete(self)
             del self.lines[:]
             self.lines.append(_Line(0))
+            self.lines[0].wrap_key = self._get_wrap_key()
             font = self.document.get_font(0, dpi=self._dpi)
             self.lines[0].ascent = font.ascent
             self.lines[0].descent = font.descent
@@ -1896,6 +2118,9 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
         self._update_glyphs()
         self._update_flow_glyphs()
         self._update_flow_lines()
+        while self._invalidate_stale_lines():
+            self._update_flow_glyphs()
+            self._update_flow_lines()
         self._update_visible_lines()
         self._update_vertex_lists()
         self.top_group.top = self._get_top(self.lines)
@@ -1908,6 +2133,12 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
         if trigger_update_event:
             self.dispatch_event('on_layout_update')
 
+    def _refresh_glyphs(self, dt):
+        self._scheduled_refresh = None
+        if self._document:
+            self.invalid_glyphs.invalidate(0, self._document.text_length)
+            self._update()
+
     def _update_glyphs(self):
         invalid_start, invalid_end = self.invalid_glyphs.validate()
 
@@ -1915,15 +2146,17 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
             return
 
         # Find grapheme breaks and extend glyph range to encompass.
-        text = self.document.text
+        get_text = self._document.get_text
         while invalid_start > 0:
-            if _grapheme_break(text[invalid_start - 1], text[invalid_start]):
+            left, right = get_text(invalid_start - 1, invalid_start + 1)
+            if _grapheme_break(left, right):
                 break
             invalid_start -= 1
 
-        len_text = len(text)
+        len_text = self._document.text_length
         while invalid_end < len_text:
-            if _grapheme_break(text[invalid_end - 1], text[invalid_end]):
+            left, right = get_text(invalid_end - 1, invalid_end + 1)
+            if _grapheme_break(left, right):
                 break
             invalid_end += 1
 
@@ -1936,7 +2169,8 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
             if element:
                 self.glyphs[start] = _InlineElementBox(element)
             else:
-                text = self.document.text[start:end]
+                self._watch_font(font)
+                text = self._document.get_text(start, end)
                 self.glyphs[start:end] = font.get_glyphs(text)
 
         # Update owner runs
@@ -1952,74 +2186,71 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
         if invalid_end - invalid_start <= 0:
             return
 
+        if not self._document.text_length:
+            # `_update` has replaced the lines with one empty line.
+            self.content_width = 0
+            return
+
         # Find first invalid line
         line_index = 0
         for i, line in enumerate(self.lines):
-            if line.start >= invalid_start:
+            if line.start > invalid_start:
                 break
             line_index = i
 
         # Flow from previous line; fixes issue with adding a space into
         # overlong line (glyphs before space would then flow back onto
-        # previous line).  TODO Could optimise this by keeping track of where
-        # the overlong lines are.
-        line_index = max(0, line_index - 1)
+        # previous line).  Lines in earlier paragraphs are unaffected, so
+        # there's no need when the line begins a paragraph.  TODO Could
+        # optimise this by keeping track of where the overlong lines are.
+        if line_index > 0:
+            line_start = self.lines[line_index].start
+            if not (self._multiline and 0 < line_start <= invalid_start and
+                    self._document.get_text(line_start - 1, line_start)
+                    in '\n\u2029'):
+                line_index -= 1
 
         # (No need to find last invalid line; the update loop below stops
         # calling the flow generator when no more changes are necessary.)
 
+        lines = self.lines
         try:
-            line = self.lines[line_index]
-            invalid_start = min(invalid_start, line.start)
-            line.delete(self)
-            line = self.lines[line_index] = _Line(invalid_start)
-            self.invalid_lines.invalidate(line_index, line_index + 1)
+            invalid_start = min(invalid_start, lines[line_index].start)
         except IndexError:
             line_index = 0
             invalid_start = 0
-            line = _Line(0)
-            self.lines.append(line)
-            self.invalid_lines.insert(0, 1)
 
-        content_width_invalid = False
-        next_start = invalid_start
+        # Flow new lines until one ends where an old line after the invalid
+        # range begins.  Only the old lines before that one are replaced, so
+        # a paragraph that gains or loses lines leaves the lines after it
+        # alone.
+        new_lines = list()
+        old_end = line_index
+        wrap_key = self._get_wrap_key()
 
         for line in self._flow_glyphs(self.glyphs, self.owner_runs,
-                                      invalid_start, len(self._document.text)):
-            try:
-                old_line = self.lines[line_index]
-                old_line.delete(self)
-                old_line_width = old_line.width + old_line.margin_left
-                new_line_width = line.width + line.margin_left
-                if (old_line_width == self.content_width and
-                        new_line_width < old_line_width):
-                    content_width_invalid = True
-                self.lines[line_index] = line
-                self.invalid_lines.invalidate(line_index, line_index + 1)
-            except IndexError:
-                self.lines.append(line)
-                self.invalid_lines.insert(line_index, 1)
+                                      invalid_start, self._document.text_length):
+            line.wrap_key = wrap_key
+            new_lines.append(line)
 
             next_start = line.start + line.length
-            line_index += 1
-
-            try:
-                next_line = self.lines[line_index]
-                if next_start == next_line.start and next_start > invalid_end:
-                    # No more lines need to be modified, early exit.
-                    break
-            except IndexError:
-                pass
+            while old_end < len(lines) and lines[old_end].start < next_start:
+                old_end += 1
+            if (next_start > invalid_end and old_end < len(lines) and
+                    lines[old_end].start == next_start):
+                # No more lines need to be modified, early exit.
+                break
         else:
-            # The last line is at line_index - 1, if there are any more lines
-            # after that they are stale and need to be deleted.
-            if next_start == len(self._document.text) and line_index > 0:
-                for line in self.lines[line_index:]:
-                    old_line_width = old_line.width + old_line.margin_left
-                    if old_line_width == self.content_width:
-                        content_width_invalid = True
-                    line.delete(self)
-                del self.lines[line_index:]
+            # The flow reached the end of the document, so any lines after
+            # the last flowed are stale.
+            old_end = len(lines)
+
+        content_width_invalid = False
+        for line in lines[line_index:old_end]:
+            if line.width + line.margin_left == self.content_width:
+                content_width_invalid = True
+            line.delete(self)
+        self._replace_lines(line_index, old_end, new_lines)
 
         if content_width_invalid:
             # Rescan all lines to look for the new maximum content width
@@ -2029,24 +2260,123 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
                                     content_width)
             self.content_width = content_width
 
+    def _replace_lines(self, start, end, new_lines):
+        # Replace `lines[start:end]` with `new_lines`, keeping the line
+        # index and the ranges of line indices in step.
+        self.lines[start:end] = new_lines
+        placeholders = [0] * len(new_lines)
+        for index in (self._line_starts, self._line_bottoms, self._line_tops):
+            if len(index) > start:
+                index[start:end] = placeholders
+
+        new_end = start + len(new_lines)
+        delta = new_end - end
+        if delta > 0:
+            self.invalid_lines.insert(end, delta)
+            self.invalid_vertex_lines.insert(end, delta)
+        elif delta < 0:
+            self.invalid_lines.delete(new_end, end)
+            self.invalid_vertex_lines.delete(new_end, end)
+        self.invalid_lines.invalidate(start, new_end)
+
+        visible_lines = self.visible_lines
+        if delta and visible_lines.is_invalid():
+            if visible_lines.start >= end:
+                visible_lines.start += delta
+            if visible_lines.end >= end:
+                visible_lines.end = max(visible_lines.end + delta,
+                                        visible_lines.start)
+
+    def _get_wrap_key(self):
+        # Lines flowed with a different key must be flowed again before they
+        # are displayed.
+        if self._multiline and self._wrap_lines:
+            return self._width
+        return None
+
+    def _invalidate_stale_lines(self):
+        # Invalidate the flow of paragraphs near the view that were wrapped
+        # to a different width.  Returns True if any were.
+        wrap_key = self._get_wrap_key()
+        margin = self.wrap_margin
+        if margin is None:
+            margin = self.height
+        top = self.view_y + margin
+        bottom = self.view_y - self.height - margin
+
+        lines = self.lines
+        stale = False
+        i = bisect_left(self._line_bottoms, -top)
+        end_index = bisect_right(self._line_tops, -bottom)
+        while i < end_index:
+            if lines[i].wrap_key == wrap_key:
+                i += 1
+                continue
+
+            # Invalidate the whole paragraph, as its lines flow together.
+            start = i
+            while start > 0 and not lines[start].paragraph_begin:
+                start -= 1
+            while i < len(lines) - 1 and not lines[i].paragraph_end:
+                i += 1
+            end = min(max(lines[i].start + lines[i].length,
+                          lines[start].start + 1),
+                      self._document.text_length)
+            if end > lines[start].start:
+                self.invalid_flow.invalidate(lines[start].start, end)
+                stale = True
+            else:
+                # No text to flow again.
+                for line in lines[start:i + 1]:
+                    line.wrap_key = wrap_key
+            i += 1
+        return stale
+
     def _update_flow_lines(self):
         invalid_start, invalid_end = self.invalid_lines.validate()
         if invalid_end - invalid_start <= 0:
             return
 
         invalid_end = self._flow_lines(self.lines, invalid_start, invalid_end)
+        self._update_line_index(invalid_start, invalid_end)
 
         # Invalidate lines that need new vertex lists.
         self.invalid_vertex_lines.invalidate(invalid_start, invalid_end)
 
+    def _update_line_index(self, start, end):
+        # Update the bisection keys of the lines flowed between `start` and
+        # `end`.  Lines added or removed by `_replace_lines` are always
+        # reflowed.
+        lines = self.lines
+        line_starts = self._line_starts
+        line_bottoms = self._line_bottoms
+        line_tops = self._line_tops
+        del line_starts[len(lines):]
+        del line_bottoms[len(lines):]
+        del line_tops[len(lines):]
+
+        for i in range(start, min(end, len(lines))):
+            line = lines[i]
+            if i < len(line_starts):
+                line_starts[i] = line.start
+                line_bottoms[i] = -(line.y + line.descent)
+                line_tops[i] = -(line.y + line.ascent)
+            else:
+                line_starts.append(line.start)
+                line_bottoms.append(-(line.y + line.descent))
+                line_tops.append(-(line.y + line.ascent))
+
     def _update_visible_lines(self):
-        start = sys.maxsize
-        end = 0
-        for i, line in enumerate(self.lines):
-            if line.y + line.descent < self.view_y:
-                start = min(start, i)
-            if line.y + line.ascent > self.view_y - self.height:
-                end = max(end, i) + 1
+        # The first line with its bottom below the top of the view, and the
+        # line after the last with its top above the bottom of the view,
+        # extended by the overscan.
+        start = bisect_right(self._line_bottoms, -self.view_y)
+        end = bisect_left(self._line_tops, self.height - self.view_y)
+        if start == len(self.lines):
+            start = sys.maxsize
+        elif end:
+            start = max(0, start - self.overscan)
+            end = min(len(self.lines), end + self.overscan)
 
         # Delete newly invisible lines
         for i in range(self.visible_lines.start, min(start, len(self.lines))):
@@ -2070,6 +2400,7 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
 
         invalid_start, invalid_end = self.invalid_vertex_lines.validate()
         if invalid_end - invalid_start <= 0:
+            self._trim_vertex_list_pool()
             return
 
         colors_iter = self.document.get_style_runs('color')
@@ -2089,27 +2420,31 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
         context = _IncrementalLayoutContext(self, self._document,
                                             colors_iter, background_iter)
 
-        for line in self.lines[invalid_start:invalid_end]:
+        visible_start = max(invalid_start, self.visible_lines.start)
+        visible_end = min(invalid_end, self.visible_lines.end)
+        for i in range(invalid_start, min(invalid_end, len(self.lines))):
+            line = self.lines[i]
             line.delete(self)
-            context.line = line
-            y = line.y
-
-            # Early out if not visible
-            if y + line.descent > self.view_y:
-                continue
-            elif y + line.ascent < self.view_y - self.height:
-                break
+            if visible_start <= i < visible_end:
+                context.line = line
+                self._create_vertex_lists(line.x, line.y, line.start,
+                                          line.boxes, context)
+                self.lines_placed += 1
 
-            self._create_vertex_lists(line.x, y, line.start,
-                                      line.boxes, context)
+        self._trim_vertex_list_pool()
 
-    # Invalidate everything when width changes
+    # Lines are wrapped again as they become visible when width changes; see
+    # `_invalidate_stale_lines`.
 
     def _set_width(self, width):
         if width == self._width:
             return
 
-        self.invalid_flow.invalidate(0, len(self.document.text))
+        if not self.lines:
+            self.invalid_flow.invalidate(0, self.document.text_length)
+        elif self._get_wrap_key() is None:
+            # Not wrapped again, but aligned to the new width.
+            self.invalid_lines.invalidate(0, len(self.lines))
         super()._set_width(width)
 
     def _get_width(self):
@@ -2124,6 +2459,9 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
 
         super()._set_height(height)
         if self._update_enabled:
+            if self._invalidate_stale_lines():
+                self._update()
+                return
             self._update_visible_lines()
             self._update_vertex_lists()
 
@@ -2133,7 +2471,7 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
     height = property(_get_height, _set_height)
 
     def _set_multiline(self, multiline):
-        self.invalid_flow.invalidate(0, len(self.document.text))
+        self.invalid_flow.invalidate(0, self.document.text_length)
         super()._set_multiline(multiline)
 
     def _get_multiline(self):
@@ -2146,6 +2484,9 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
     def _set_view_y(self, view_y):
         # view_y must be negative.
         super()._set_view_y(view_y)
+        if self._update_enabled and self._invalidate_stale_lines():
+            self._update()
+            return
         self._update_visible_lines()
         self._update_vertex_lists()
 
@@ -2169,7 +2510,7 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
 
         """
         start = max(0, start)
-        end = min(end, len(self.document.text))
+        end = min(end, self.document.text_length)
         if start == self._selection_start and end == self._selection_end:
             return
 
@@ -2278,11 +2619,7 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
         :return: (x, y)
         """
         if line is None:
-            line = self.lines[0]
-            for next_line in self.lines:
-                if next_line.start > position:
-                    break
-                line = next_line
+            line = self.lines[max(0, self.get_line_from_position(position))]
         else:
             line = self.lines[line]
 
@@ -2319,11 +2656,7 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
         x -= self.top_group.translate_x
         y -= self.top_group.translate_y
 
-        line_index = 0
-        for line in self.lines:
-            if y > line.y + line.descent:
-                break
-            line_index += 1
+        line_index = bisect_right(self._line_bottoms, -y)
         if line_index >= len(self.lines):
             line_index = len(self.lines) - 1
         return line_index
@@ -2351,12 +2684,7 @@ class IncrementalTextLayout(ScrollableTextLayout, event.EventDispatcher):
 
         :rtype: int
         """
-        line = -1
-        for next_line in self.lines:
-            if next_line.start > position:
-                break
-            line += 1
-        return line
+        return bisect_right(self._line_starts, position) - 1
 
     def get_position_from_line(self, line):
         """Get the first document character position of a given line index.
@@ -189,6 +189,63 @@ class RunList:
         # Delete collapsed runs
         self.runs = [r for r in self.runs if r.count > 0]
 
+    def set_runs(self, ranges):
+        """Set the values of several ranges of characters.
+
+        The result is the same as calling `set_run` for each range in turn,
+        but when the ranges don't overlap the run list is rebuilt in a single
+        pass rather than searched and rewritten for each range.
+
+        :Parameters:
+            `ranges` : list of (int, int, object)
+                Start index, end index (exclusive) and value of each range.
+
+        """
+        # Like `set_run`, ignore any part of a range beyond the run list.
+        size = sum(run.count for run in self.runs)
+        ordered = sorted(((max(start, 0), min(end, size), value)
+                          for start, end, value in ranges
+                          if min(end, size) > max(start, 0)),
+                         key=lambda r: r[0])
+        if not ordered:
+            return
+        for (_, end, _), (start, _, _) in zip(ordered, ordered[1:]):
+            if start < end:
+                # Overlapping ranges must be set in the order given.
+                for start, end, value in ranges:
+                    self.set_run(start, end, value)
+                return
+
+        old_runs = list(self)
+        runs = list()
+
+        def add(count, value):
+            if runs and runs[-1].value == value:
+                runs[-1].count += count
+            elif count > 0:
+                runs.append(_Run(value, count))
+
+        i = 0
+
+        def copy(start, end):
+            # Copy the old values of characters start to end.
+            nonlocal i
+            while i < len(old_runs) and old_runs[i][1] <= start:
+                i += 1
+            j = i
+            while j < len(old_runs) and old_runs[j][0] < end:
+                run_start, run_end, value = old_runs[j]
+                add(min(run_end, end) - max(run_start, start), value)
+                j += 1
+
+        pos = 0
+        for start, end, value in ordered:
+            copy(pos, start)
+            add(end - start, value)
+            pos = end
+        copy(pos, old_runs[-1][1])
+        self.runs = runs
+
     def __iter__(self):
         i = 0
         for run in self.runs:
@@ -227,6 +284,75 @@ class RunList:
         return str(list(self))
 
 
+class RunListBuilder:
+
+    """Build a `RunList` from values given in order of position.
+
+    Decoders produce the style of a document from start to end, and
+    setting each value with `RunList.set_run` as the document grows would
+    search and rewrite the run list each time.  The builder instead records
+    only the positions at which the value changes.
+    """
+
+    def __init__(self, initial=None):
+        """Create a run list builder.
+
+        :Parameters:
+            `initial` : object
+                The value of characters before any value is set.
+
+        """
+        self._starts = [0]
+        self._values = [initial]
+
+    def set_value(self, pos, value):
+        """Set the value of all characters from a position onwards.
+
+        Characters beyond the end of the run list being built take the
+        value too, until another value is set.  Any value set from a later
+        position is replaced.
+
+        :Parameters:
+            `pos` : int
+                Starting index.
+            `value` : object
+                Value to set.
+
+        """
+        starts = self._starts
+        values = self._values
+        while len(starts) > 1 and starts[-1] > pos:
+            del starts[-1]
+            del values[-1]
+
+        if starts[-1] == pos:
+            values[-1] = value
+            if len(values) > 1 and values[-2] == value:
+                del starts[-1]
+                del values[-1]
+        elif values[-1] != value:
+            starts.append(pos)
+            values.append(value)
+
+    def get_run_list(self, size):
+        """Get the run list built.
+
+        :Parameters:
+            `size` : int
+                Number of characters in the run list.
+
+        :rtype: `RunList`
+        """
+        run_list = RunList(size, self._values[0])
+        ends = self._starts[1:] + [size]
+        runs = [_Run(value, min(end, size) - start)
+                for start, end, value in zip(self._starts, ends, self._values)
+                if start < size]
+        if runs:
+            run_list.runs = runs
+        return run_list
+
+
 class AbstractRunIterator:
 
     """Range iteration over `RunList`.
@@ -414,6 +540,9 @@ class ZipRunIterator(AbstractRunIterator):
             min_end = min(ends)
             yield start, min_end, values
             start = min_end
+            if start >= end:
+                # The iterators are exhausted.
+                break
             for i, iterator in enumerate(iterators):
                 if ends[i] == min_end:
                     starts[i], ends[i], values[i] = next(iterator)
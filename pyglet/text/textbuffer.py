@@ -0,0 +1,317 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+"""Text storage for documents.
+
+`TextBuffer` keeps the text of a document as a list of short chunks, so that
+inserting or deleting a few characters only copies the chunk containing them
+rather than the whole text.  The chunk lengths and the number of paragraph
+breaks in each chunk are kept in binary indexed trees, which find the chunk
+containing a character position, or the paragraph break nearest to it, in
+logarithmic time.
+"""
+
+
+def _count_breaks(text):
+    return text.count('\n') + text.count('\u2029')
+
+
+def _find_break(text, start):
+    newline = text.find('\n', start)
+    separator = text.find('\u2029', start)
+    if newline < 0:
+        return separator
+    if separator < 0:
+        return newline
+    return min(newline, separator)
+
+
+def _rfind_break(text, end):
+    return max(text.rfind('\n', 0, end), text.rfind('\u2029', 0, end))
+
+
+class _SumTree:
+    # Binary indexed (Fenwick) tree over a list of non-negative integers,
+    # supporting prefix sums, point updates and searching by prefix sum.
+
+    def __init__(self, values):
+        size = len(values)
+        tree = [0]
+        tree.extend(values)
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._step = 1 << (size.bit_length() - 1) if size else 0
+        self.total = sum(values)
+
+    def add(self, index, delta):
+        tree = self._tree
+        size = len(tree)
+        index += 1
+        while index < size:
+            tree[index] += delta
+            index += index & -index
+        self.total += delta
+
+    def prefix(self, index):
+        # Sum of the first `index` values.
+        tree = self._tree
+        total = 0
+        while index:
+            total += tree[index]
+            index &= index - 1
+        return total
+
+    def find(self, value):
+        # Index of the value containing `value`, that is, the first index
+        # whose inclusive prefix sum exceeds it, and the remainder of `value`
+        # within it.
+        tree = self._tree
+        size = len(tree) - 1
+        index = 0
+        step = self._step
+        while step:
+            next_index = index + step
+            if next_index <= size and tree[next_index] <= value:
+                index = next_index
+                value -= tree[next_index]
+            step >>= 1
+        return index, value
+
+
+class TextBuffer:
+    """Mutable text, stored in chunks.
+
+    Insertions and deletions within a chunk take time proportional to the
+    chunk size and logarithmic in the number of chunks.  When a chunk grows
+    past twice `chunk_size`, or an edit spans several chunks, the chunks are
+    split or joined and the index is rebuilt, in time linear in the number
+    of chunks.
+
+    The complete text is only joined together when `text` is read, and is
+    kept until the next modification.
+    """
+
+    #: Number of characters in each chunk when text is split.
+    chunk_size = 1024
+
+    def __init__(self, text=''):
+        self._set_chunks(self._split(text))
+
+    def _split(self, text):
+        size = self.chunk_size
+        return [text[i:i + size] for i in range(0, len(text), size)] or ['']
+
+    def _set_chunks(self, chunks):
+        self._chunks = chunks
+        self._lengths = _SumTree([len(chunk) for chunk in chunks])
+        self._breaks = _SumTree([_count_breaks(chunk) for chunk in chunks])
+        self._text = None
+
+    def _locate(self, position):
+        # Chunk index and offset of the character at `position`.  The end of
+        # the text is located at the end of the last chunk.
+        if position >= self._lengths.total:
+            index = len(self._chunks) - 1
+            return index, len(self._chunks[index])
+        return self._lengths.find(max(position, 0))
+
+    def __len__(self):
+        return self._lengths.total
+
+    @property
+    def text(self):
+        """The complete text.
+
+        :type: str
+        """
+        if self._text is None:
+            self._text = ''.join(self._chunks)
+        return self._text
+
+    def get_text(self, start=0, end=None):
+        """Get the text between two positions.
+
+        Unlike slicing `text`, this does not join the complete text.
+
+        :Parameters:
+            `start` : int
+                Starting character position.
+            `end` : int
+                Ending character position (exclusive), or None for the end
+                of the text.
+
+        :rtype: str
+        """
+        length = self._lengths.total
+        if end is None or end > length:
+            end = length
+        start = max(start, 0)
+        if start >= end:
+            return ''
+        if self._text is not None:
+            return self._text[start:end]
+
+        chunks = self._chunks
+        index, offset = self._locate(start)
+        remaining = end - start
+        parts = []
+        while remaining > 0:
+            part = chunks[index][offset:offset + remaining]
+            parts.append(part)
+            remaining -= len(part)
+            index += 1
+            offset = 0
+        return ''.join(parts)
+
+    def insert(self, position, text):
+        """Insert text.
+
+        :Parameters:
+            `position` : int
+                Character position to insert at.
+            `text` : str
+                Text to insert.
+
+        """
+        if not text:
+            return
+
+        chunks = self._chunks
+        index, offset = self._locate(position)
+        chunk = chunks[index]
+        chunk = ''.join((chunk[:offset], text, chunk[offset:]))
+        if len(chunk) > self.chunk_size * 2:
+            chunks[index:index + 1] = self._split(chunk)
+            self._set_chunks(chunks)
+            return
+
+        chunks[index] = chunk
+        self._lengths.add(index, len(text))
+        self._breaks.add(index, _count_breaks(text))
+        self._text = None
+
+    def delete(self, start, end):
+        """Delete text.
+
+        :Parameters:
+            `start` : int
+                Starting character position to delete from.
+            `end` : int
+                Ending character position to delete to (exclusive).
+
+        """
+        end = min(end, self._lengths.total)
+        if start >= end:
+            return
+
+        chunks = self._chunks
+        index, offset = self._locate(start)
+        end_index, end_offset = self._locate(end)
+        chunk = chunks[index]
+        if index == end_index:
+            deleted = chunk[offset:end_offset]
+            chunk = chunk[:offset] + chunk[end_offset:]
+            if chunk or len(chunks) == 1:
+                chunks[index] = chunk
+                self._lengths.add(index, -len(deleted))
+                self._breaks.add(index, -_count_breaks(deleted))
+                self._text = None
+                return
+            del chunks[index]
+        else:
+            chunk = chunk[:offset] + chunks[end_index][end_offset:]
+            chunks[index:end_index + 1] = [chunk] if chunk else []
+            if not chunks:
+                chunks.append('')
+        self._set_chunks(chunks)
+
+    def get_paragraph_start(self, position):
+        """Get the starting position of the paragraph containing a position.
+
+        A paragraph break at `position` itself is taken to begin the
+        paragraph, as in `pyglet.text.document.AbstractDocument`.
+
+        :Parameters:
+            `position` : int
+                Character position within paragraph.
+
+        :rtype: int
+        """
+        index, offset = self._locate(position)
+        chunk_break = _rfind_break(self._chunks[index], offset + 1)
+        if chunk_break < 0:
+            # Find the last chunk before this one with a paragraph break.
+            breaks = self._breaks.prefix(index)
+            if not breaks:
+                return 0
+            index, _ = self._breaks.find(breaks - 1)
+            chunk = self._chunks[index]
+            chunk_break = _rfind_break(chunk, len(chunk))
+
+        paragraph_break = self._lengths.prefix(index) + chunk_break
+        if paragraph_break == position:
+            return position
+        return paragraph_break + 1
+
+    def get_paragraph_end(self, position):
+        """Get the ending position of the paragraph containing a position.
+
+        The end position includes the paragraph break.
+
+        :Parameters:
+            `position` : int
+                Character position within paragraph.
+
+        :rtype: int
+        """
+        index, offset = self._locate(position)
+        chunk_break = _find_break(self._chunks[index], offset)
+        if chunk_break < 0:
+            # Find the first chunk after this one with a paragraph break.
+            breaks = self._breaks.prefix(index + 1)
+            if breaks == self._breaks.total:
+                return self._lengths.total
+            index, _ = self._breaks.find(breaks)
+            chunk_break = _find_break(self._chunks[index], 0)
+
+        return self._lengths.prefix(index) + chunk_break + 1
+
+    def get_paragraph_count(self):
+        """Get the number of paragraph breaks in the text.
+
+        :rtype: int
+        """
+        return self._breaks.total
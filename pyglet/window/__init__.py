@@ -1769,6 +1769,52 @@ class FPSDisplay:
         self.update()
         self._window_flip()
 
+
+class ProfilerDisplay(FPSDisplay):
+
+    """Display of a window's framerate and the slowest profiled spans.
+
+    The display is used as `FPSDisplay` is.  Creating it enables the
+    profiler; every `update_period` seconds the label is set to the
+    framerate followed by the `count` spans with the longest mean duration,
+    giving the mean and 99th percentile duration of each in milliseconds.
+
+    :see: `pyglet.profiler`
+
+    :Ivariables:
+        `label` : Label
+            The text label displaying the framerate and spans.
+        `profiler` : `pyglet.profiler.Profiler`
+            The profiler whose spans are displayed.
+
+    """
+
+    #: Number of spans displayed.
+    #:
+    #: :type: int
+    count = 8
+
+    def __init__(self, window, profiler=None):
+        from pyglet.text import Label
+
+        super().__init__(window)
+        self.label = Label('', x=10, y=window.height - 10, anchor_y='top',
+                           width=window.width - 20, multiline=True,
+                           font_size=10, color=(127, 127, 127, 191))
+        if profiler is None:
+            profiler = pyglet.profiler.get_default()
+        self.profiler = profiler
+        profiler.enable()
+
+    def set_fps(self, fps):
+        lines = ['%.2f fps' % fps]
+        for stats in self.profiler.get_stats()[:self.count]:
+            lines.append('%.2f / %.2f ms  %s' % (
+                stats.get_mean() * 1000, stats.get_percentile(99) * 1000,
+                stats.name))
+        self.label.text = '\n'.join(lines)
+
+
 # Try to determine which platform to use.
 if pyglet.compat_platform == 'darwin':
     from pyglet.window.cocoa import CocoaWindow as Window
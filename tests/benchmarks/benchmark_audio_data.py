@@ -0,0 +1,80 @@
+"""
+Measure the cost of draining audio packets through partial writes.
+
+Audio drivers rarely take a whole packet at once; they write what fits in
+the device buffer and `consume` the rest later.  This benchmark drains one
+second of CD-quality audio in driver-sized writes, the way the PulseAudio
+and DirectSound drivers do, and reports the bytes copied by `AudioData`
+itself (not counting the driver's own copy into the device buffer) per
+second of playback.
+"""
+import ctypes
+import timeit
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet.media import AudioData, AudioFormat
+
+audio_format = AudioFormat(channels=2, sample_size=16, sample_rate=44100)
+WRITE_SIZE = 4096
+
+
+class LegacyAudioData(AudioData):
+    """AudioData as it was before packets were consumed by offset."""
+
+    copied = 0
+
+    def __init__(self, data, length, timestamp, duration, events):
+        self.__dict__['data'] = data
+        self.length = length
+        self.timestamp = timestamp
+        self.duration = duration
+        self.events = events
+
+    data = property(lambda self: self.__dict__['data'])
+
+    def consume(self, bytes_, audio_format):
+        self.events = ()
+        if bytes_ == self.length:
+            self.__dict__['data'] = None
+            self.length = 0
+            self.timestamp += self.duration
+            self.duration = 0.
+            return
+        elif bytes_ == 0:
+            return
+
+        data = ctypes.create_string_buffer(self.length)
+        ctypes.memmove(data, self.data, self.length)
+        self.__dict__['data'] = data[bytes_:]
+        LegacyAudioData.copied += self.length + self.length - bytes_
+        self.length -= bytes_
+        self.duration -= bytes_ / float(audio_format.bytes_per_second)
+        self.timestamp += bytes_ / float(audio_format.bytes_per_second)
+
+
+def drain(cls, packet):
+    audio_data = cls(packet, len(packet), 0., 1., [])
+    device = ctypes.create_string_buffer(WRITE_SIZE)
+    while audio_data.length:
+        size = min(WRITE_SIZE, audio_data.length)
+        ctypes.memmove(device, audio_data.data, size)
+        audio_data.consume(size, audio_format)
+
+
+if __name__ == '__main__':
+    packet = bytes(audio_format.bytes_per_second)
+
+    legacy_time = min(timeit.repeat(lambda: drain(LegacyAudioData, packet),
+                                    repeat=5, number=1))
+    LegacyAudioData.copied = 0
+    drain(LegacyAudioData, packet)
+    current_time = min(timeit.repeat(lambda: drain(AudioData, packet),
+                                     repeat=5, number=1))
+
+    print('draining 1 s of 44.1 kHz stereo audio in {} byte writes:'.format(
+        WRITE_SIZE))
+    print("old:\t{:.5f} s\t{:,} bytes copied".format(
+        legacy_time, LegacyAudioData.copied))
+    print("new:\t{:.5f} s\t0 bytes copied".format(current_time))
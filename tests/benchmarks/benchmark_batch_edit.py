@@ -0,0 +1,93 @@
+"""
+Compare restyling a document shown in an IncrementalTextLayout one token at a
+time, as a syntax highlighter would without batching, against restyling it
+within `AbstractDocument.batch_edit`.
+
+The layout is created without a window: fonts are replaced by a font that
+returns the same glyph for every character.  Each pass colours every word of
+a 10 KB document, and the resulting style runs are checked for equality.
+"""
+import random
+import re
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet import graphics
+from pyglet.font.base import Glyph, GlyphTextureAtlas
+from pyglet.gl import GL_TEXTURE_2D
+from pyglet.text.document import FormattedDocument
+from pyglet.text.layout import IncrementalTextLayout
+
+
+class Font:
+    ascent = 12
+    descent = -4
+
+    def __init__(self):
+        texture = GlyphTextureAtlas(256, 256, GL_TEXTURE_2D, 0)
+        self.glyph = Glyph(0, 0, 0, 8, 8, texture)
+        self.glyph.set_bearings(0, 0, 8)
+
+    def get_glyphs(self, text):
+        return [self.glyph] * len(text)
+
+    def get_glyphs_for_width(self, text, width):
+        return [self.glyph] * len(text)
+
+    def add_eviction_handler(self, handler):
+        pass
+
+    def remove_eviction_handler(self, handler):
+        pass
+
+
+def make_document():
+    rng = random.Random(0)
+    words = ['def', 'return', 'self', 'value', 'x', '(', ')', ':', '0']
+    lines = list()
+    while sum(map(len, lines)) < 10000:
+        lines.append(' '.join(rng.choice(words)
+                              for _ in range(rng.randrange(1, 12))) + '\n')
+    document = FormattedDocument(''.join(lines))
+    IncrementalTextLayout(document, 600, 400, multiline=True,
+                          batch=graphics.Batch())
+    return document
+
+
+def highlight(document, tokens, colors):
+    for (start, end), color in zip(tokens, colors):
+        document.set_style(start, end, {'color': color})
+
+
+def highlight_batched(document, tokens, colors):
+    with document.batch_edit():
+        highlight(document, tokens, colors)
+
+
+if __name__ == '__main__':
+    import timeit
+
+    font = Font()
+    pyglet.font.load = lambda *args, **kwargs: font
+
+    legacy = make_document()
+    current = make_document()
+    tokens = [m.span() for m in re.finditer(r'\S+', legacy.text)]
+    rng = random.Random(1)
+    passes = [[(rng.randrange(256), 0, 0, 255) for _ in tokens]
+              for _ in range(2)]
+
+    legacy_time = current_time = 0
+    for colors in passes:
+        legacy_time += timeit.timeit(
+            lambda: highlight(legacy, tokens, colors), number=1)
+        current_time += timeit.timeit(
+            lambda: highlight_batched(current, tokens, colors), number=1)
+        assert (list(legacy._style_runs['color']) ==
+                list(current._style_runs['color']))
+
+    print('{} tokens, {} passes:\told: {:.3f}\tnew: {:.3f}\t'
+          'speedup: {:.1f}x'.format(len(tokens), len(passes), legacy_time,
+                                    current_time,
+                                    legacy_time / current_time))
@@ -0,0 +1,70 @@
+"""
+Compare the BMP decoders against the per-pixel implementation they replaced.
+
+Bitmaps of each supported depth are generated in memory, decoded with both
+the legacy decoder (bmplegacy.py) and pyglet's current decoder, and the
+decoded pixels are checked for equality before timing.
+"""
+import io
+import random
+import struct
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet.image.codecs.bmp import BMPImageDecoder
+from bmplegacy import BMPImageDecoder as LegacyBMPImageDecoder
+
+BI_RGB = 0
+BI_BITFIELDS = 3
+
+
+def make_bmp(width, height, bitcount):
+    """Return the bytes of a random bottom-up bitmap with the given depth."""
+    rng = random.Random(bitcount)
+    pitch = ((width * bitcount + 7) // 8 + 3) & ~3
+
+    palette = b''
+    masks = b''
+    compression = BI_RGB
+    if bitcount <= 8:
+        palette = bytes(rng.randrange(256) for _ in range(4 << bitcount))
+    elif bitcount == 16:
+        compression = BI_BITFIELDS
+        masks = struct.pack('<3I', 0xf800, 0x07e0, 0x001f)
+    elif bitcount == 32:
+        compression = BI_BITFIELDS
+        masks = struct.pack('<3I', 0xff0000, 0xff00, 0xff)
+
+    bits = bytes(rng.randrange(256) for _ in range(pitch * height))
+    offset = 14 + 40 + len(masks) + len(palette)
+    file_header = struct.pack('<2sIHHI', b'BM', offset + len(bits), 0, 0,
+                              offset)
+    info_header = struct.pack('<IiiHHIIiiII', 40, width, height, 1, bitcount,
+                              compression, len(bits), 0, 0, 0, 0)
+    return file_header + info_header + masks + palette + bits
+
+
+def decode(decoder, data):
+    image = decoder.decode(io.BytesIO(data), 'benchmark.bmp')
+    return bytes(image._current_data)
+
+
+if __name__ == '__main__':
+    import timeit
+
+    width, height = 256, 256
+    legacy = LegacyBMPImageDecoder()
+    current = BMPImageDecoder()
+
+    print('{}x{} bitmaps, min time of 5 decodes:'.format(width, height))
+    for bitcount in (1, 4, 8, 16, 32):
+        data = make_bmp(width, height, bitcount)
+        assert decode(legacy, data) == decode(current, data), bitcount
+
+        legacy_time = min(timeit.repeat(lambda: decode(legacy, data),
+                                        repeat=5, number=1))
+        current_time = min(timeit.repeat(lambda: decode(current, data),
+                                         repeat=5, number=1))
+        print("{:>2}-bit\told: {:.5f}\tnew: {:.5f}\tspeedup: {:.1f}x".format(
+            bitcount, legacy_time, current_time, legacy_time / current_time))
@@ -0,0 +1,102 @@
+"""
+Compare decoding large attributed text and HTML documents by inserting each
+piece of text into a FormattedDocument, as the decoders used to, against
+building the document at once with DocumentBuilder.
+
+The legacy decoders below are the current decoders with the builder replaced
+by a FormattedDocument; the decoded documents are checked for equality before
+timing.  Streaming from a file in chunks is timed too.
+"""
+import io
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet.text.document import FormattedDocument
+from pyglet.text.formats.attributed import AttributedTextDecoder
+from pyglet.text.formats.html import HTMLDecoder
+
+
+class LegacyBuilder:
+
+    def __init__(self):
+        self.document = FormattedDocument()
+
+    def append_text(self, text, attributes=None):
+        self.document.insert_text(len(self.document.text), text, attributes)
+
+    def append_element(self, element, attributes=None):
+        self.document.insert_element(len(self.document.text), element,
+                                     attributes)
+
+    def set_paragraph_style(self, attributes):
+        end = len(self.document.text)
+        self.document.set_paragraph_style(end, end, attributes)
+
+    def get_document(self):
+        return self.document
+
+
+class LegacyAttributedTextDecoder(AttributedTextDecoder):
+
+    def _begin(self):
+        super()._begin()
+        self.builder = LegacyBuilder()
+
+
+class LegacyHTMLDecoder(HTMLDecoder):
+
+    def _begin(self, location):
+        location = super()._begin(location)
+        self.builder = LegacyBuilder()
+        return location
+
+
+attributed_paragraph = '''{.align 'left'}Paragraph {bold True}with bold{bold False}
+text, {italic True}italic text{italic False} and {color (255, 0, 0, 255)}red
+text{color None} that is {font_size 14}long enough{font_size 12} to wrap.
+
+'''
+
+html_paragraph = '''<p>Paragraph <b>with bold</b> text, <i>italic text</i>
+and <font color="red">red text</font> that is <font size="+1">long
+enough</font> to wrap.</p>
+'''
+
+
+def style_runs(document):
+    return dict((name, list(runs))
+                for name, runs in document._style_runs.items())
+
+
+def decode(decoder, text):
+    return decoder.decode(text)
+
+
+def decode_file(decoder, text):
+    return decoder.decode_file(io.StringIO(text))
+
+
+if __name__ == '__main__':
+    import timeit
+
+    for name, paragraph, legacy, current in (
+            ('attributed', attributed_paragraph,
+             LegacyAttributedTextDecoder(), AttributedTextDecoder()),
+            ('html', html_paragraph, LegacyHTMLDecoder(), HTMLDecoder())):
+        text = paragraph * 1000
+        expected = legacy.decode(text)
+        for document in (current.decode(text), decode_file(current, text)):
+            assert document.text == expected.text, name
+            assert style_runs(document) == style_runs(expected), name
+
+        legacy_time = min(timeit.repeat(lambda: decode(legacy, text),
+                                        repeat=3, number=1))
+        current_time = min(timeit.repeat(lambda: decode(current, text),
+                                         repeat=3, number=1))
+        file_time = min(timeit.repeat(lambda: decode_file(current, text),
+                                      repeat=3, number=1))
+        print('{:<10}\t{} KB\told: {:.4f}\tnew: {:.4f}\tfile: {:.4f}\t'
+              'speedup: {:.1f}x'.format(name, len(text) // 1024, legacy_time,
+                                        current_time, file_time,
+                                        legacy_time / current_time))
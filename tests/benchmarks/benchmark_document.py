@@ -0,0 +1,71 @@
+"""
+Compare typing into a large document with the text stored in a single string,
+as AbstractDocument used to, against pyglet's chunked text storage.
+
+Each keystroke inserts a character in the middle of a 5 MB document and looks
+up the paragraph containing it.
+"""
+import re
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet.text.textbuffer import TextBuffer
+
+_previous_paragraph_re = re.compile('\n[^\n\u2029]*$')
+_next_paragraph_re = re.compile('[\n\u2029]')
+
+
+class LegacyText:
+
+    def __init__(self, text):
+        self._text = text
+
+    def insert(self, start, text):
+        self._text = ''.join((self._text[:start], text, self._text[start:]))
+
+    def get_paragraph_start(self, pos):
+        if (self._text[:pos + 1].endswith('\n') or
+                self._text[:pos + 1].endswith('\u2029')):
+            return pos
+
+        m = _previous_paragraph_re.search(self._text, 0, pos + 1)
+        if not m:
+            return 0
+        return m.start() + 1
+
+    def get_paragraph_end(self, pos):
+        m = _next_paragraph_re.search(self._text, pos)
+        if not m:
+            return len(self._text)
+        return m.start() + 1
+
+
+def type_text(buffer, position, count):
+    for i in range(count):
+        buffer.insert(position + i, 'x')
+        buffer.get_paragraph_start(position + i)
+        buffer.get_paragraph_end(position + i)
+
+
+if __name__ == '__main__':
+    import timeit
+
+    text = ('Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 8 +
+            '\n') * 11000
+    position = len(text) // 2
+    count = 200
+
+    legacy = LegacyText(text)
+    current = TextBuffer(text)
+    type_text(legacy, position, 1)
+    type_text(current, position, 1)
+    assert legacy._text == current.text
+
+    print('{} keystrokes into {} characters:'.format(count, len(text)))
+    legacy_time = min(timeit.repeat(
+        lambda: type_text(legacy, position, count), repeat=3, number=1))
+    current_time = min(timeit.repeat(
+        lambda: type_text(current, position, count), repeat=3, number=1))
+    print("old: {:.5f}\tnew: {:.5f}\tspeedup: {:.1f}x".format(
+        legacy_time, current_time, legacy_time / current_time))
@@ -0,0 +1,106 @@
+"""
+Compare placing glyph boxes against the glyph-by-glyph implementation they
+replaced.
+
+A box of glyphs is placed with both the legacy implementation
+(glyphboxlegacy.py) and pyglet's current one, into vertex lists in memory,
+and the vertex data is checked for equality before timing.
+"""
+import random
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet import graphics
+from pyglet.font.base import Glyph, GlyphTextureAtlas
+from pyglet.gl import GL_TEXTURE_2D
+from pyglet.text import layout, runlist
+from glyphboxlegacy import GlyphBox as LegacyGlyphBox
+
+
+class Layout:
+    foreground_group = layout.TextLayout.foreground_group
+    background_group = layout.TextLayout.background_group
+    foreground_decoration_group = \
+        layout.TextLayout.foreground_decoration_group
+
+    def __init__(self):
+        self.batch = graphics.Batch()
+        self.groups = dict()
+        self.vertex_lists = list()
+
+    def _parse_distance(self, distance):
+        return distance
+
+    def _add_vertex_list(self, count, mode, group, *data):
+        return self.batch.add(count, mode, group, *data)
+
+    def _delete_vertex_list(self, vertex_list):
+        vertex_list.delete()
+
+
+class Context:
+
+    def __init__(self, length, layout):
+        self.colors_iter = runlist.RunList(length, None).get_run_iterator()
+        self.baseline_iter = runlist.RunList(length, 0).get_run_iterator()
+        self.decoration_iter = \
+            runlist.RunList(length, (None, None)).get_run_iterator()
+        self.vertex_lists = layout.vertex_lists
+
+    def add_list(self, vertex_list):
+        self.vertex_lists.append(vertex_list)
+
+
+def make_glyphs(count):
+    rng = random.Random(count)
+    texture = GlyphTextureAtlas(256, 256, GL_TEXTURE_2D, 0)
+    font_glyphs = list()
+    for _ in range(96):
+        glyph = Glyph(rng.randrange(240), rng.randrange(240), 0,
+                      rng.randrange(1, 16), rng.randrange(1, 16), texture)
+        glyph.set_bearings(rng.randrange(-4, 1), rng.randrange(-2, 3),
+                           rng.randrange(4, 16))
+        font_glyphs.append(glyph)
+    glyphs = [(rng.choice((0, 0, 0, -1)), rng.choice(font_glyphs))
+              for _ in range(count)]
+    return texture, glyphs
+
+
+def place(box_class, texture, glyphs, x):
+    fake_layout = Layout()
+    font = Layout()
+    font.ascent, font.descent = 12, -4
+    box = box_class(texture, font, glyphs,
+                    sum(kern + glyph.advance for kern, glyph in glyphs))
+    box.place(fake_layout, 0, x, 20, Context(len(glyphs), fake_layout))
+    vertex_list, = fake_layout.vertex_lists
+    return vertex_list
+
+
+def read(vertex_list):
+    return (list(vertex_list.vertices), list(vertex_list.tex_coords),
+            list(vertex_list.colors))
+
+
+if __name__ == '__main__':
+    import timeit
+
+    # Layouts are usually placed at whole pixels, but need not be.
+    for x in (10, 10.5):
+        print('Box at x={}:'.format(x))
+        for count in (10, 100, 1000, 10000):
+            texture, glyphs = make_glyphs(count)
+            assert read(place(LegacyGlyphBox, texture, glyphs, x)) == \
+                read(place(layout._GlyphBox, texture, glyphs, x))
+
+            number = max(1, 10000 // count)
+            legacy_time = min(timeit.repeat(
+                lambda: place(LegacyGlyphBox, texture, glyphs, x),
+                repeat=5, number=number)) / number
+            current_time = min(timeit.repeat(
+                lambda: place(layout._GlyphBox, texture, glyphs, x),
+                repeat=5, number=number)) / number
+            print("{:>5} glyphs\told: {:.5f}\tnew: {:.5f}\t"
+                  "speedup: {:.1f}x".format(count, legacy_time, current_time,
+                                            legacy_time / current_time))
@@ -0,0 +1,42 @@
+"""
+Compare grapheme cluster segmentation throughput against the implementation
+that classified every character with unicodedata on each call
+(graphemelegacy.py).  Results are checked for equality before timing.
+"""
+import random
+import timeit
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet.font.base import get_grapheme_clusters
+from graphemelegacy import get_grapheme_clusters as legacy_clusters
+
+
+def make_text(ranges, length=10000, seed=0):
+    rng = random.Random(seed)
+    return ''.join(chr(rng.choice(rng.choice(ranges))) for _ in range(length))
+
+
+samples = [
+    ('ASCII', [range(0x20, 0x7f), [0x0a]]),
+    ('Latin-1', [range(0x20, 0x7f), range(0xa0, 0x100)]),
+    ('Combining', [range(0x41, 0x5b), range(0x300, 0x310)]),
+    ('Devanagari', [range(0x900, 0x980)]),
+    ('CJK', [range(0x4e00, 0x9fff), range(0x3000, 0x3010)]),
+    ('Hangul', [range(0xac00, 0xd7a4)]),
+]
+
+
+if __name__ == '__main__':
+    print('characters segmented per second (10000-character strings):')
+    for name, ranges in samples:
+        text = make_text(ranges)
+        assert get_grapheme_clusters(text) == legacy_clusters(text), name
+
+        legacy = min(timeit.repeat(lambda: legacy_clusters(text),
+                                   repeat=3, number=1))
+        current = min(timeit.repeat(lambda: get_grapheme_clusters(text),
+                                    repeat=3, number=1))
+        print('{:<12}old: {:>11,.0f}  new: {:>11,.0f}  speedup: {:.1f}x'.format(
+            name, len(text) / legacy, len(text) / current, legacy / current))
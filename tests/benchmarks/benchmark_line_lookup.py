@@ -0,0 +1,90 @@
+"""
+Compare caret navigation in a 200,000 line layout against the linear line
+scans it replaced.
+
+A caret moving by line looks up the line of its position, the point of the
+line above or below, and the position nearest that point, as
+`pyglet.text.caret.Caret.move_to_point` does.  The lines are made up without
+a window, and the lookups are checked against the legacy implementation
+(linelookuplegacy.py) before timing.
+"""
+import random
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet.text import layout
+import linelookuplegacy
+
+
+class TopGroup:
+    translate_x = 0
+    translate_y = 0
+
+
+def make_layout(count):
+    text_layout = layout.IncrementalTextLayout.__new__(
+        layout.IncrementalTextLayout)
+    text_layout.top_group = TopGroup()
+    text_layout._line_starts = list()
+    text_layout._line_bottoms = list()
+    text_layout._line_tops = list()
+    text_layout.lines = list()
+
+    rng = random.Random(count)
+    start = 0
+    y = 0
+    for _ in range(count):
+        line = layout._Line(start)
+        line.length = rng.randrange(1, 80)
+        line.ascent = 12
+        line.descent = -4
+        y -= 16
+        line.y = y
+        text_layout.lines.append(line)
+        start += line.length
+    text_layout._update_line_index(0, count)
+    return text_layout
+
+
+def navigate(text_layout, get_line_from_position, get_line_from_point,
+             positions):
+    lines = text_layout.lines
+    result = list()
+    for position in positions:
+        line = get_line_from_position(text_layout, position)
+        line = lines[min(line + 1, len(lines) - 1)]
+        result.append(get_line_from_point(text_layout, 0, line.y))
+    return result
+
+
+def current_line_from_position(text_layout, position):
+    return text_layout.get_line_from_position(position)
+
+
+def current_line_from_point(text_layout, x, y):
+    return text_layout.get_line_from_point(x, y)
+
+
+if __name__ == '__main__':
+    import timeit
+
+    count = 200000
+    text_layout = make_layout(count)
+    end = text_layout.lines[-1].start + text_layout.lines[-1].length
+    rng = random.Random(0)
+    positions = [rng.randrange(end) for _ in range(100)]
+
+    legacy = (text_layout, linelookuplegacy.get_line_from_position,
+              linelookuplegacy.get_line_from_point, positions)
+    current = (text_layout, current_line_from_position,
+               current_line_from_point, positions)
+    assert navigate(*legacy) == navigate(*current)
+
+    print('{} caret moves in {} lines:'.format(len(positions), count))
+    legacy_time = min(timeit.repeat(lambda: navigate(*legacy),
+                                    repeat=3, number=1))
+    current_time = min(timeit.repeat(lambda: navigate(*current),
+                                     repeat=3, number=1))
+    print("old: {:.5f}\tnew: {:.5f}\tspeedup: {:.1f}x".format(
+        legacy_time, current_time, legacy_time / current_time))
@@ -0,0 +1,38 @@
+"""
+Measure the cost of the profiler's instrumentation of event dispatch.
+
+Dispatching an event through `EventDispatcher.dispatch_event` with the
+profiler disabled, which runs the uninstrumented method, is compared against
+dispatching with the profiler enabled.
+"""
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet import event, profiler
+
+
+class Dispatcher(event.EventDispatcher):
+
+    def on_test(self, value):
+        return event.EVENT_HANDLED
+
+Dispatcher.register_event_type('on_test')
+
+
+if __name__ == '__main__':
+    import timeit
+
+    dispatcher = Dispatcher()
+    number = 200000
+
+    def time(func):
+        return min(timeit.repeat(func, repeat=5, number=number)) / number
+
+    disabled = time(lambda: dispatcher.dispatch_event('on_test', 1))
+    profiler.get_default().enable()
+    enabled = time(lambda: dispatcher.dispatch_event('on_test', 1))
+    profiler.get_default().disable()
+
+    print('dispatch_event, ns per call:')
+    print('disabled: {:.0f}\tenabled: {:.0f}'.format(
+        disabled * 1e9, enabled * 1e9))
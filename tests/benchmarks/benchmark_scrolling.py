@@ -0,0 +1,106 @@
+"""
+Compare scrolling through an IncrementalTextLayout with and without reusing
+the vertex lists of lines scrolled out of view.
+
+The lines are made up without a window, and the view is scrolled down one
+line at a time, updating the visible lines and their vertex lists as setting
+`view_y` does.  The layout without reuse creates and deletes vertex lists as
+lines enter and leave the view, as before vertex lists were pooled.
+"""
+import random
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet import graphics
+from pyglet.font.base import Glyph, GlyphTextureAtlas
+from pyglet.gl import GL_TEXTURE_2D
+from pyglet.text import layout
+from pyglet.text.document import UnformattedDocument
+
+
+class TopGroup:
+    view_y = 0
+    translate_x = 0
+    translate_y = 0
+
+
+class Font:
+    ascent = 12
+    descent = -4
+
+
+class UnpooledLayout(layout.IncrementalTextLayout):
+
+    def _add_vertex_list(self, count, mode, group, *data):
+        self.vertex_list_allocations += 1
+        return self.batch.add(count, mode, group, *data)
+
+    def _delete_vertex_list(self, vertex_list):
+        vertex_list.delete()
+
+
+def make_layout(cls, count, height):
+    rng = random.Random(count)
+    texture = GlyphTextureAtlas(256, 256, GL_TEXTURE_2D, 0)
+    glyphs = list()
+    for _ in range(96):
+        glyph = Glyph(rng.randrange(240), rng.randrange(240), 0,
+                      rng.randrange(1, 16), rng.randrange(1, 16), texture)
+        glyph.set_bearings(-2, 0, 8)
+        glyphs.append(glyph)
+
+    text_layout = cls.__new__(cls)
+    text_layout.top_group = TopGroup()
+    text_layout.batch = graphics.Batch()
+    text_layout.groups = dict()
+    text_layout._dpi = 96
+    text_layout._height = height
+    text_layout._vertex_list_pool = dict()
+    text_layout._vertex_list_keys = dict()
+    text_layout._vertex_lists_to_clear = set()
+    text_layout.vertex_list_allocations = 0
+    text_layout.lines_placed = 0
+    text_layout.invalid_style = layout._InvalidRange()
+    text_layout.invalid_vertex_lines = layout._InvalidRange()
+    text_layout.visible_lines = layout._InvalidRange()
+    text_layout._line_starts = list()
+    text_layout._line_bottoms = list()
+    text_layout._line_tops = list()
+    text_layout.lines = list()
+
+    start = 0
+    for i in range(count):
+        line = layout._Line(start)
+        length = rng.randrange(20, 80)
+        box_glyphs = [(0, rng.choice(glyphs)) for _ in range(length)]
+        line.add_box(layout._GlyphBox(texture, Font, box_glyphs, length * 8))
+        line.x = 0
+        line.y = -16 * (i + 1)
+        text_layout.lines.append(line)
+        start += length
+    text_layout._document = UnformattedDocument('x' * start)
+    text_layout._update_line_index(0, count)
+    return text_layout
+
+
+def scroll(text_layout, count):
+    for i in range(count):
+        text_layout.top_group.view_y = -16 * i
+        text_layout._update_visible_lines()
+        text_layout._update_vertex_lists()
+
+
+if __name__ == '__main__':
+    import timeit
+
+    count = 2000
+    height = 600
+    for cls in (UnpooledLayout, layout.IncrementalTextLayout):
+        text_layout = make_layout(cls, count, height)
+        scroll(text_layout, 1)
+        text_layout.vertex_list_allocations = text_layout.lines_placed = 0
+        elapsed = timeit.timeit(lambda: scroll(text_layout, count - 40),
+                                number=1)
+        print('{:<24}{:.5f}s\t{:.2f} allocations per line'.format(
+            cls.__name__, elapsed, text_layout.allocations_per_line))
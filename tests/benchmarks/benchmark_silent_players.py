@@ -0,0 +1,61 @@
+"""
+Play many players through the silent audio driver at once.
+
+The legacy driver (silentlegacy.py) starts a thread per player; the current
+driver services every player from one worker thread.  For each, report the
+number of threads, the time taken to create and start the players, and how
+late players were serviced relative to when they were due.
+"""
+import sys
+import threading
+import time
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet.media import SourceGroup
+from pyglet.media.drivers import silent
+from pyglet.media.procedural import Silence
+import silentlegacy
+
+
+def run(driver, count, duration):
+    threads = threading.active_count()
+    start = time.perf_counter()
+    players = []
+    for _ in range(count):
+        source = Silence(60)
+        group = SourceGroup(source.audio_format, None)
+        group.queue(source)
+        audio_player = driver.create_audio_player(group, None)
+        audio_player.play()
+        players.append(audio_player)
+    created = time.perf_counter() - start
+    new_threads = threading.active_count() - threads
+
+    time.sleep(duration)
+    latencies = sorted(getattr(p, 'max_service_latency', float('nan'))
+                       for p in players)
+    for audio_player in players:
+        audio_player.delete()
+    return created, new_threads, latencies
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    duration = 3.
+    # A thread per player quickly runs into the process's thread limit.
+    legacy_count = min(count, 1000)
+
+    for name, driver, n in (
+            ('legacy', silentlegacy.create_audio_driver(), legacy_count),
+            ('current', silent.create_audio_driver(), count)):
+        created, threads, latencies = run(driver, n, duration)
+        print('{:>7}: {} players, {} new threads, created in {:.2f}s'.format(
+            name, n, threads, created))
+        if name == 'current':
+            print('         max service latency (ms): median {:.2f}, '
+                  '95th {:.2f}, worst {:.2f}'.format(
+                      latencies[len(latencies) // 2] * 1000,
+                      latencies[int(len(latencies) * 0.95)] * 1000,
+                      latencies[-1] * 1000))
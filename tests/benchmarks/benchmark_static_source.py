@@ -0,0 +1,76 @@
+"""
+Queue the same static sound many times and read it back in packets.
+
+The legacy queue source wrapped the decoded data in a BytesIO and copied
+every packet out of it; the current one hands out packets referencing the
+static source's shared buffer.  Reports the time taken, and the memory
+allocated while reading the sound once.
+"""
+import time
+import tracemalloc
+from io import BytesIO
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet.media import AudioData, StaticSource
+from pyglet.media.procedural import Sine
+
+
+class LegacyStaticMemorySource:
+    """The BytesIO-based queue source StaticSource used to create."""
+
+    def __init__(self, data, audio_format):
+        self._file = BytesIO(data)
+        self.audio_format = audio_format
+
+    def get_audio_data(self, bytes_):
+        offset = self._file.tell()
+        timestamp = float(offset) / self.audio_format.bytes_per_second
+        data = self._file.read(bytes_)
+        if not len(data):
+            return None
+        duration = float(len(data)) / self.audio_format.bytes_per_second
+        return AudioData(data, len(data), timestamp, duration, list())
+
+
+def play(create_source, count, packet_size):
+    packets = []
+    for _ in range(count):
+        source = create_source()
+        while True:
+            audio_data = source.get_audio_data(packet_size)
+            if not audio_data:
+                break
+            # Keep packets alive, as a driver's queue would.
+            packets.append(audio_data)
+        del packets[:]
+
+
+def measure(create_source, count, packet_size):
+    start = time.perf_counter()
+    play(create_source, count, packet_size)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    play(create_source, 1, packet_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    count = 500
+    packet_size = 4096
+    static = StaticSource(Sine(0.5), Sine(0.5).audio_format)
+    data = static.get_queue_source().get_audio_data(1 << 30).get_string_data()
+
+    print('{} plays of a {:.0f} KB sound in {} byte packets:'.format(
+        count, len(data) / 1024., packet_size))
+    for name, create_source in (
+            ('legacy', lambda: LegacyStaticMemorySource(
+                data, static.audio_format)),
+            ('current', static.get_queue_source)):
+        elapsed, peak = measure(create_source, count, packet_size)
+        print('{:>7}: {:.3f}s, peak allocated per play {:.1f} KB'.format(
+            name, elapsed, peak / 1024.))
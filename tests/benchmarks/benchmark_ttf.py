@@ -0,0 +1,71 @@
+"""
+Compare looking up glyphs, advances and kerning in TrueType fonts through
+the dictionaries built by `TruetypeInfo` against the lookups made directly
+in the mapped file.
+
+Pass the fonts to measure on the command line; large fonts, such as CJK
+fonts, show the difference best.  By default the DejaVu fonts are used.
+"""
+import glob
+import sys
+import timeit
+import tracemalloc
+
+from pyglet.font.ttf import TruetypeInfo
+
+
+def lookup_dicts(filename, text):
+    info = TruetypeInfo(filename)
+    character_map = info.get_character_map()
+    advances = info.get_glyph_advances()
+    kernings = info.get_glyph_kernings() if 'kern' in info._tables else {}
+    result = []
+    previous = 0
+    for c in text:
+        glyph = character_map.get(c, 0)
+        result.append((glyph, advances[min(glyph, len(advances) - 1)],
+                       kernings.get((previous, glyph), 0)))
+        previous = glyph
+    info.close()
+    return result
+
+
+def lookup_lazy(filename, text):
+    info = TruetypeInfo(filename)
+    result = []
+    previous = 0
+    for c in text:
+        glyph = info.get_glyph_index(c)
+        result.append((glyph, info.get_glyph_advance(glyph),
+                       info.get_glyph_kerning(previous, glyph)))
+        previous = glyph
+    info.close()
+    return result
+
+
+def peak_memory(function, *args):
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == '__main__':
+    filenames = sys.argv[1:] or \
+        sorted(glob.glob('/usr/share/fonts/truetype/dejavu/*.ttf'))
+    # A paragraph's worth of lookups, as made when first laying out text.
+    text = 'The quick brown fox jumps over the lazy dog. AVAWAT Ty' * 10
+
+    for filename in filenames:
+        assert lookup_dicts(filename, text) == lookup_lazy(filename, text)
+        dicts_time = min(timeit.repeat(lambda: lookup_dicts(filename, text),
+                                       repeat=5, number=1))
+        lazy_time = min(timeit.repeat(lambda: lookup_lazy(filename, text),
+                                      repeat=5, number=1))
+        print('{}\n\tdicts: {:.5f}s {:>6}KB\tlazy: {:.5f}s {:>6}KB\t'
+              'speedup: {:.1f}x'.format(
+                  filename,
+                  dicts_time, peak_memory(lookup_dicts, filename, text) // 1024,
+                  lazy_time, peak_memory(lookup_lazy, filename, text) // 1024,
+                  dicts_time / lazy_time))
@@ -0,0 +1,133 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+
+"""_GlyphBox.place from pyglet.text.layout as it was before glyph quads
+were generated for a whole box at once, kept for comparison by
+benchmark_glyph_box.py.
+"""
+
+from pyglet.gl import GL_QUADS, GL_LINES
+from pyglet.text.layout import _GlyphBox, TextLayoutTextureGroup
+
+
+class GlyphBox(_GlyphBox):
+
+    def place(self, layout, i, x, y, context):
+        assert self.glyphs
+        try:
+            group = layout.groups[self.owner]
+        except KeyError:
+            group = layout.groups[self.owner] = \
+                TextLayoutTextureGroup(self.owner, layout.foreground_group)
+
+        n_glyphs = self.length
+        vertices = list()
+        tex_coords = list()
+        x1 = x
+        for start, end, baseline in context.baseline_iter.ranges(i, i + n_glyphs):
+            baseline = layout._parse_distance(baseline)
+            assert len(self.glyphs[start - i:end - i]) == end - start
+            for kern, glyph in self.glyphs[start - i:end - i]:
+                x1 += kern
+                v0, v1, v2, v3 = glyph.vertices
+                v0 += x1
+                v2 += x1
+                v1 += y + baseline
+                v3 += y + baseline
+                vertices.extend(
+                    list(map(int, [v0, v1, v2, v1, v2, v3, v0, v3])))
+                t = glyph.tex_coords
+                tex_coords.extend(t)
+                x1 += glyph.advance
+
+        # Text color
+        colors = list()
+        for start, end, color in context.colors_iter.ranges(i, i + n_glyphs):
+            if color is None:
+                color = (0, 0, 0, 255)
+            colors.extend(color * ((end - start) * 4))
+
+        vertex_list = layout.batch.add(n_glyphs * 4, GL_QUADS, group,
+                                       ('v2f/dynamic', vertices),
+                                       ('t3f/dynamic', tex_coords),
+                                       ('c4B/dynamic', colors))
+        context.add_list(vertex_list)
+
+        # Decoration (background color and underline)
+        #
+        # Should iterate over baseline too, but in practice any sensible
+        # change in baseline will correspond with a change in font size,
+        # and thus glyph run as well.  So we cheat and just use whatever
+        # baseline was seen last.
+        background_vertices = list()
+        background_colors = list()
+        underline_vertices = list()
+        underline_colors = list()
+        y1 = y + self.descent + baseline
+        y2 = y + self.ascent + baseline
+        x1 = x
+        for start, end, decoration in \
+                context.decoration_iter.ranges(i, i + n_glyphs):
+            bg, underline = decoration
+            x2 = x1
+            for kern, glyph in self.glyphs[start - i:end - i]:
+                x2 += glyph.advance + kern
+
+            if bg is not None:
+                background_vertices.extend(
+                    [x1, y1, x2, y1, x2, y2, x1, y2])
+                background_colors.extend(bg * 4)
+
+            if underline is not None:
+                underline_vertices.extend(
+                    [x1, y + baseline - 2, x2, y + baseline - 2])
+                underline_colors.extend(underline * 2)
+
+            x1 = x2
+
+        if background_vertices:
+            background_list = layout.batch.add(
+                len(background_vertices) // 2, GL_QUADS,
+                layout.background_group,
+                ('v2f/dynamic', background_vertices),
+                ('c4B/dynamic', background_colors))
+            context.add_list(background_list)
+
+        if underline_vertices:
+            underline_list = layout.batch.add(
+                len(underline_vertices) // 2, GL_LINES,
+                layout.foreground_decoration_group,
+                ('v2f/dynamic', underline_vertices),
+                ('c4B/dynamic', underline_colors))
+            context.add_list(underline_list)
@@ -0,0 +1,133 @@
+# ----------------------------------------------------------------------------
+# pyglet
+# Copyright (c) 2006-2008 Alex Holkner
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in
+#    the documentation and/or other materials provided with the
+#    distribution.
+#  * Neither the name of pyglet nor the names of its
+#    contributors may be used to endorse or promote products
+#    derived from this software without specific prior written
+#    permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# ----------------------------------------------------------------------------
+
+"""Grapheme clustering from pyglet.font.base as it was before property
+tables, kept for comparison by benchmark_grapheme.py.
+"""
+
+import unicodedata
+
+
+_other_grapheme_extend = \
+    list(map(chr, [0x09be, 0x09d7, 0x0be3, 0x0b57, 0x0bbe, 0x0bd7, 0x0cc2,
+                   0x0cd5, 0x0cd6, 0x0d3e, 0x0d57, 0x0dcf, 0x0ddf, 0x200c,
+                   0x200d, 0xff9e, 0xff9f]))  # skip codepoints above U+10000
+_logical_order_exception = \
+    list(map(chr, list(range(0xe40, 0xe45)) + list(range(0xec0, 0xec4))))
+
+_grapheme_extend = lambda c, cc: \
+    cc in ('Me', 'Mn') or c in _other_grapheme_extend
+
+_CR = '\u000d'
+_LF = '\u000a'
+_control = lambda c, cc: cc in ('ZI', 'Zp', 'Cc', 'Cf') and not \
+    c in list(map(chr, [0x000d, 0x000a, 0x200c, 0x200d]))
+_extend = lambda c, cc: _grapheme_extend(c, cc) or \
+    c in list(map(chr, [0xe30, 0xe32, 0xe33, 0xe45, 0xeb0, 0xeb2, 0xeb3]))
+_prepend = lambda c, cc: c in _logical_order_exception
+_spacing_mark = lambda c, cc: cc == 'Mc' and c not in _other_grapheme_extend
+
+
+def _grapheme_break(left, right):
+    # GB1
+    if left is None:
+        return True
+
+    # GB2 not required, see end of get_grapheme_clusters
+
+    # GB3
+    if left == _CR and right == _LF:
+        return False
+
+    left_cc = unicodedata.category(left)
+
+    # GB4
+    if _control(left, left_cc):
+        return True
+
+    right_cc = unicodedata.category(right)
+
+    # GB5
+    if _control(right, right_cc):
+        return True
+
+    # GB6, GB7, GB8 not implemented
+
+    # GB9
+    if _extend(right, right_cc):
+        return False
+
+    # GB9a
+    if _spacing_mark(right, right_cc):
+        return False
+
+    # GB9b
+    if _prepend(left, left_cc):
+        return False
+
+    # GB10
+    return True
+
+
+def get_grapheme_clusters(text):
+    """Implements Table 2 of UAX #29: Grapheme Cluster Boundaries.
+
+    Does not currently implement Hangul syllable rules.
+
+    :Parameters:
+        `text` : unicode
+            String to cluster.
+
+    :since: pyglet 1.1.2
+
+    :rtype: List of `unicode`
+    :return: List of Unicode grapheme clusters
+    """
+    clusters = list()
+    cluster = ''
+    left = None
+    for right in text:
+        if cluster and _grapheme_break(left, right):
+            clusters.append(cluster)
+            cluster = ''
+        elif cluster:
+            # Add a zero-width space to keep len(clusters) == len(text)
+            clusters.append('\u200b')
+        cluster += right
+        left = right
+
+    # GB2
+    if cluster:
+        clusters.append(cluster)
+    return clusters
@@ -30,7 +30,7 @@ class AllocatorEnvironment:
     def __init__(self, test_case, width, height):
         self.test_case = test_case
         self.rectes = list()
-        self.allocator = atlas.Allocator(width, height)
+        self.allocator = test_case.allocator_class(width, height)
 
     def check(self, test_case):
         for i, rect in enumerate(self.rectes):
@@ -52,6 +52,7 @@ class AllocatorEnvironment:
 
 
 class TestPack(unittest.TestCase):
+    allocator_class = atlas.Allocator
 
     def test_over_x(self):
         env = AllocatorEnvironment(self, 3, 3)
@@ -93,3 +94,32 @@ class TestPack(unittest.TestCase):
         env.add(4, 2)
         env.add(1, 2)
         env.add_fail(1, 1)
+
+
+class TestSkylinePack(TestPack):
+    allocator_class = atlas.SkylineAllocator
+
+    def test_5(self):
+        # Space beneath the skyline is never reused.
+        env = AllocatorEnvironment(self, 4, 4)
+        env.add(3, 2)
+        env.add(4, 2)
+        env.add_fail(1, 2)
+
+    def test_lowest_position(self):
+        env = AllocatorEnvironment(self, 4, 4)
+        env.add(2, 3)
+        env.add(2, 1)
+        # Rests on the shorter rectangle rather than the taller one.
+        x, y = env.allocator.alloc(2, 1)
+        self.assertEqual((x, y), (2, 1))
+
+    def test_usage_and_clear(self):
+        env = AllocatorEnvironment(self, 4, 4)
+        env.add(3, 2)
+        env.add(4, 2)
+        self.assertEqual(env.allocator.get_usage(), 14 / 16.)
+        self.assertEqual(env.allocator.get_fragmentation(), 2 / 16.)
+        env.allocator.clear()
+        self.assertEqual(env.allocator.get_usage(), 0.)
+        self.assertEqual(env.allocator.alloc(4, 4), (0, 0))
@@ -342,3 +342,80 @@ class ClockTestCase(unittest.TestCase):
         items = sorted(i.next_ts for i in self.clock._scheduled_items)
 
         self.assertEqual(items, expected)
+
+
+class FixedTimestepTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.time = 0
+        self.callback = mock.Mock()
+        self.clock = pyglet.clock.Clock(time_function=lambda: self.time)
+        self.clock.tick()
+
+    def tick(self, time):
+        self.time = time
+        self.clock.tick()
+
+    def test_schedule_fixed(self):
+        item = self.clock.schedule_fixed(self.callback, 0.25, 'arg')
+        self.tick(0.6)
+        self.assertEqual(self.callback.call_args_list,
+                         [mock.call(0.25, 'arg')] * 2)
+        self.assertAlmostEqual(item.alpha, 0.4)
+        self.tick(0.7)
+        self.assertEqual(self.callback.call_count, 2)
+        self.tick(0.75)
+        self.assertEqual(self.callback.call_count, 3)
+        self.assertAlmostEqual(item.alpha, 0.)
+        self.assertEqual(item.steps, 3)
+
+    def test_exact_steps(self):
+        self.clock.schedule_fixed(self.callback, 1 / 60.)
+        for frame in range(1, 121):
+            self.tick(frame / 60.)
+        self.assertEqual(self.callback.call_count, 120)
+
+    def test_max_catch_up(self):
+        self.clock.max_fixed_steps = 3
+        item = self.clock.schedule_fixed(self.callback, 0.1)
+        self.tick(1.05)
+        self.assertEqual(self.callback.call_count, 3)
+        self.assertEqual(item.dropped_steps, 7)
+        self.assertAlmostEqual(item.alpha, 0.5)
+        self.tick(1.1)
+        self.assertEqual(self.callback.call_count, 4)
+
+    def test_schedule_fixed_batch(self):
+        item = self.clock.schedule_fixed_batch(self.callback, 0.25, key=1)
+        self.tick(0.1)
+        self.assertFalse(self.callback.called)
+        self.tick(0.8)
+        self.callback.assert_called_once_with(0.25, 3, key=1)
+        self.assertEqual(item.steps, 3)
+
+    def test_unschedule_during_steps(self):
+        def suicidal_step(dt):
+            sock()
+            self.clock.unschedule(suicidal_step)
+
+        sock = mock.Mock()
+        self.clock.schedule_fixed(suicidal_step, 0.1)
+        self.tick(0.35)
+        self.tick(1)
+        self.assertEqual(sock.call_count, 1)
+
+    def test_get_sleep_time(self):
+        self.clock.schedule_once(self.callback, 1)
+        self.clock.schedule_fixed(self.callback, 0.25)
+        self.assertEqual(self.clock.get_sleep_time(), 0.25)
+        self.tick(0.3)
+        self.assertAlmostEqual(self.clock.get_sleep_time(), 0.2)
+
+    def test_call_sched_return_True_if_steps_run(self):
+        self.clock.schedule_fixed(self.callback, 0.25)
+        self.time = 0.1
+        self.assertFalse(self.clock.call_scheduled_functions(
+            self.clock.set_time(self.time)))
+        self.time = 0.3
+        self.assertTrue(self.clock.call_scheduled_functions(
+            self.clock.set_time(self.time)))
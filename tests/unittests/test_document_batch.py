@@ -0,0 +1,185 @@
+import random
+import unittest
+
+from pyglet.text import runlist
+from pyglet.text.document import FormattedDocument
+
+
+class Listener:
+
+    def __init__(self, document):
+        self.document = document
+        self.text = document.text
+        self.events = list()
+        document.push_handlers(self)
+
+    def on_insert_text(self, start, text):
+        self.events.append(('insert', start, text))
+        self.text = self.text[:start] + text + self.text[start:]
+
+    def on_delete_text(self, start, end):
+        self.events.append(('delete', start, end,
+                            self.document._replacing_text))
+        self.text = self.text[:start] + self.text[end:]
+
+    def on_style_text(self, start, end, attributes):
+        self.events.append(('style', start, end, attributes))
+
+
+class SetRunsTestCase(unittest.TestCase):
+
+    def check_set_runs(self, ranges):
+        expected = runlist.RunList(100, 0)
+        expected.set_run(10, 20, 1)
+        for start, end, value in ranges:
+            expected.set_run(start, end, value)
+
+        runs = runlist.RunList(100, 0)
+        runs.set_run(10, 20, 1)
+        runs.set_runs(ranges)
+        self.assertEqual(list(runs), list(expected))
+
+    def test_disjoint(self):
+        self.check_set_runs([(30, 40, 2), (0, 5, 3), (15, 30, 0), (40, 41, 2)])
+
+    def test_beyond_end(self):
+        self.check_set_runs([(90, 120, 2), (-5, 3, 3)])
+        runs = runlist.RunList(3, None)
+        runs.set_runs([(1, 10, 1)])
+        self.assertEqual(list(runs), [(0, 1, None), (1, 3, 1)])
+
+    def test_overlapping(self):
+        self.check_set_runs([(0, 50, 2), (10, 20, 3), (15, 60, 2)])
+
+    def test_random(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            ranges = list()
+            for _ in range(rng.randrange(20)):
+                start = rng.randrange(100)
+                end = rng.randrange(start, 101)
+                ranges.append((start, end, rng.randrange(3)))
+            self.check_set_runs(ranges)
+            ranges = list()
+            position = 0
+            while position < 100:
+                end = min(100, position + rng.randrange(1, 10))
+                ranges.append((position, end, rng.randrange(3)))
+                position = end + rng.randrange(3)
+            self.check_set_runs(ranges)
+
+
+class BatchEditTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.document = FormattedDocument('0123456789' * 10)
+        self.listener = Listener(self.document)
+
+    def test_styles(self):
+        with self.document.batch_edit():
+            self.document.set_style(10, 20, {'color': 1})
+            self.document.set_style(20, 30, {'bold': True})
+            self.document.set_style(50, 60, {'color': 2})
+            self.assertEqual(self.listener.events, [])
+            self.assertEqual(self.document.get_style('color', 55), 2)
+
+        # Adjacent restyled ranges are merged, and reported in parts over
+        # which the attributes are uniform.
+        self.assertEqual(self.listener.events, [
+            ('style', 10, 20, {'color': 1, 'bold': None}),
+            ('style', 20, 30, {'color': None, 'bold': True}),
+            ('style', 50, 60, {'color': 2}),
+        ])
+        self.assertEqual(list(self.document.get_style_runs('color').ranges(
+            0, 100)), [(0, 10, None), (10, 20, 1), (20, 50, None),
+                       (50, 60, 2), (60, 100, None)])
+
+    def test_styles_match_unbatched(self):
+        rng = random.Random(1)
+        edits = list()
+        for _ in range(200):
+            start = rng.randrange(100)
+            end = rng.randrange(start, 101)
+            edits.append((start, end, {'color': rng.randrange(4)}))
+
+        expected = FormattedDocument(self.document.text)
+        for start, end, attributes in edits:
+            expected.set_style(start, end, attributes)
+        with self.document.batch_edit():
+            for start, end, attributes in edits:
+                self.document.set_style(start, end, attributes)
+        self.assertEqual(list(self.document._style_runs['color']),
+                         list(expected._style_runs['color']))
+
+    def test_style_values(self):
+        with self.document.batch_edit():
+            self.document.set_style(0, 10, {'color': 1})
+            self.document.set_style(5, 15, {'color': 2})
+            self.document.set_style(15, 20, {'color': 2})
+        self.assertEqual(self.listener.events, [
+            ('style', 0, 5, {'color': 1}),
+            ('style', 5, 20, {'color': 2}),
+        ])
+
+    def test_style_beyond_end(self):
+        document = FormattedDocument('abc')
+        listener = Listener(document)
+        with document.batch_edit():
+            document.set_style(1, 10, {'color': 1})
+        expected = FormattedDocument('abc')
+        expected.set_style(1, 10, {'color': 1})
+        self.assertEqual(list(document._style_runs['color']),
+                         list(expected._style_runs['color']))
+        self.assertEqual(listener.events, [('style', 1, 3, {'color': 1})])
+
+    def test_text(self):
+        with self.document.batch_edit():
+            self.document.insert_text(50, 'abc')
+            self.document.delete_text(10, 15)
+            self.document.insert_text(80, 'de')
+            self.document.delete_text(0, 2)
+            self.assertEqual(self.listener.events, [])
+
+        self.assertEqual(self.listener.events, [
+            ('delete', 0, 82, True),
+            ('insert', 0, self.document.get_text(0, 80)),
+        ])
+        self.assertEqual(self.listener.text, self.document.text)
+
+    def test_random_text(self):
+        rng = random.Random(2)
+        with self.document.batch_edit():
+            for _ in range(100):
+                length = self.document.text_length
+                if rng.randrange(2):
+                    self.document.insert_text(rng.randrange(length + 1),
+                                              'x' * rng.randrange(1, 4))
+                else:
+                    start = rng.randrange(length)
+                    self.document.delete_text(
+                        start, min(length, start + rng.randrange(1, 4)))
+        self.assertLessEqual(len(self.listener.events), 2)
+        self.assertEqual(self.listener.text, self.document.text)
+
+    def test_styles_moved_by_text(self):
+        with self.document.batch_edit():
+            self.document.set_style(60, 70, {'color': 1})
+            self.document.insert_text(10, 'abc')
+            self.document.delete_text(0, 5)
+        self.assertEqual(self.listener.events[-1],
+                         ('style', 58, 68, {'color': 1}))
+        self.assertEqual(self.document.get_style('color', 58), 1)
+        self.assertEqual(self.document.get_style('color', 57), None)
+
+    def test_insert_only(self):
+        with self.document.batch_edit():
+            self.document.insert_text(10, 'ab')
+            self.document.insert_text(12, 'cd')
+        self.assertEqual(self.listener.events, [('insert', 10, 'abcd')])
+
+    def test_nested(self):
+        with self.document.batch_edit():
+            with self.document.batch_edit():
+                self.document.set_style(0, 10, {'color': 1})
+            self.assertEqual(self.listener.events, [])
+        self.assertEqual(len(self.listener.events), 1)
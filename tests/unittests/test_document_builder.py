@@ -0,0 +1,137 @@
+import io
+import random
+import unittest
+
+from pyglet.text import runlist
+from pyglet.text.document import DocumentBuilder, FormattedDocument
+from pyglet.text.formats.attributed import AttributedTextDecoder
+from pyglet.text.formats.html import HTMLDecoder
+
+
+def style_runs(document):
+    return dict((name, list(runs))
+                for name, runs in document._style_runs.items())
+
+
+class RunListBuilderTestCase(unittest.TestCase):
+
+    def test_initial(self):
+        builder = runlist.RunListBuilder('a')
+        self.assertEqual(list(builder.get_run_list(4)), [(0, 4, 'a')])
+
+    def test_values(self):
+        builder = runlist.RunListBuilder(None)
+        builder.set_value(2, 'a')
+        builder.set_value(4, 'b')
+        builder.set_value(6, 'b')
+        self.assertEqual(list(builder.get_run_list(8)),
+                         [(0, 2, None), (2, 4, 'a'), (4, 8, 'b')])
+
+    def test_replace_later_values(self):
+        builder = runlist.RunListBuilder(None)
+        builder.set_value(2, 'a')
+        builder.set_value(4, 'b')
+        builder.set_value(3, 'a')
+        self.assertEqual(list(builder.get_run_list(6)),
+                         [(0, 2, None), (2, 6, 'a')])
+        builder.set_value(0, 'c')
+        self.assertEqual(list(builder.get_run_list(6)), [(0, 6, 'c')])
+
+    def test_same_position(self):
+        builder = runlist.RunListBuilder(None)
+        builder.set_value(2, 'a')
+        builder.set_value(2, None)
+        self.assertEqual(list(builder.get_run_list(4)), [(0, 4, None)])
+
+
+class DocumentBuilderTestCase(unittest.TestCase):
+
+    def test_matches_insert_text(self):
+        rng = random.Random(1)
+        builder = DocumentBuilder()
+        document = FormattedDocument()
+        for i in range(300):
+            text = rng.choice(['ab', 'c\n', 'de f', '\n\n', ''])
+            attributes = dict()
+            for name in rng.sample(['bold', 'italic', 'color'],
+                                   rng.randrange(3)):
+                attributes[name] = rng.randrange(3)
+            builder.append_text(text, attributes)
+            document.insert_text(len(document.text), text, attributes)
+            if i % 7 == 0:
+                builder.set_paragraph_style({'align': i})
+                end = len(document.text)
+                document.set_paragraph_style(end, end, {'align': i})
+
+        built = builder.get_document()
+        self.assertEqual(built.text, document.text)
+        self.assertEqual(style_runs(built), style_runs(document))
+
+    def test_elements(self):
+        class Element:
+            _position = None
+
+        builder = DocumentBuilder()
+        builder.append_text('ab')
+        element = Element()
+        builder.append_element(element, {'bold': True})
+        builder.append_text('c')
+        document = builder.get_document()
+        self.assertEqual(document.text, 'ab\0c')
+        self.assertEqual(element._position, 2)
+        self.assertEqual(document._elements, [element])
+        self.assertEqual(list(document._style_runs['bold']),
+                         [(0, 2, None), (2, 4, True)])
+
+
+attributed_text = '''{font_name 'Arial'}{font_size 12}{.align 'center'}
+One paragraph {bold True}with bold{bold False} text that wraps onto
+several lines {color (255, 0, 0, 255)}in red{color None}.
+
+{.margin_left 12}Another {italic True}paragraph{italic False} {{with}}
+braces, escapes {#x41}{#66} and a hard{}
+break.
+'''
+
+html_text = '''<html><head><title>Ignored</title></head><body>
+<h1>Heading</h1>
+<p align="center">Some <b>bold</b> and <i>italic</i> text,
+an entity &amp; a reference &#65;.</p>
+<ul><li>One</li><li>Two <font color="red" size="+1">red</font></li></ul>
+<pre>  preformatted
+   text</pre>
+</body></html>
+'''
+
+
+class StreamingDecodeTestCase(unittest.TestCase):
+
+    def check_streaming(self, decoder_class, text):
+        expected = decoder_class().decode(text)
+        for chunk_size in (1, 2, 3, 7, 64):
+            decoder = decoder_class()
+            decoder.chunk_size = chunk_size
+            document = decoder.decode_file(io.StringIO(text))
+            self.assertEqual(document.text, expected.text)
+            self.assertEqual(style_runs(document), style_runs(expected))
+
+    def test_attributed(self):
+        self.check_streaming(AttributedTextDecoder, attributed_text * 3)
+
+    def test_html(self):
+        self.check_streaming(HTMLDecoder, html_text)
+
+    def test_attributed_styles(self):
+        document = AttributedTextDecoder().decode(attributed_text)
+        position = document.text.index('with bold')
+        self.assertTrue(document.get_style('bold', position))
+        self.assertFalse(document.get_style('bold', position - 2))
+        self.assertEqual(document.get_style('align', 0), 'center')
+        self.assertEqual(document.get_style('color', position), None)
+        self.assertIn('{with}', document.text)
+
+    def test_attributed_unsafe(self):
+        document = AttributedTextDecoder().decode(
+            "{bold __import__('os')}a{italic lambda: 1}b")
+        self.assertEqual(document.get_style('bold', 0), None)
+        self.assertEqual(document.get_style('italic', 1), None)
@@ -0,0 +1,345 @@
+import unittest
+from array import array
+import mock
+
+import pyglet.font
+from pyglet.font import base
+
+
+class FakeTexture:
+    pass
+
+
+class FakeGlyph:
+
+    def __init__(self, text, owner):
+        self.text = text
+        self.owner = owner
+        self.advance = 1
+
+
+class FakeGlyphRenderer(base.GlyphRenderer):
+
+    def __init__(self, font):
+        self.font = font
+
+    def render(self, text):
+        self.font.rendered.append(text)
+        if not self.font.textures:
+            self.font.textures.insert(0, FakeTexture())
+        return FakeGlyph(text, self.font.textures[0])
+
+
+class FakeFont(base.Font):
+    glyph_renderer_class = FakeGlyphRenderer
+
+    def __init__(self, max_glyphs=None):
+        self.max_glyphs = max_glyphs
+        super().__init__()
+        self.rendered = []
+
+
+class GraphemeClusterTestCase(unittest.TestCase):
+
+    def check_ascii(self, text):
+        # Appending a non-ASCII letter forces the general implementation,
+        # and always starts a new cluster.
+        expected = base.get_grapheme_clusters(text + 'é')[:-1]
+        self.assertEqual(base.get_grapheme_clusters(text), expected)
+
+    def test_ascii(self):
+        self.check_ascii('Hello, world!')
+        self.check_ascii('tab\tand\x00control')
+
+    def test_ascii_crlf(self):
+        self.check_ascii('one\r\ntwo\n\rthree\r\n')
+        self.assertEqual(base.get_grapheme_clusters('a\r\nb'),
+                         ['a', '\u200b', '\r\n', 'b'])
+
+    def test_grapheme_break(self):
+        self.assertTrue(base._grapheme_break(None, 'a'))
+        self.assertTrue(base._grapheme_break('a', 'b'))
+        self.assertFalse(base._grapheme_break('\r', '\n'))
+        self.assertFalse(base._grapheme_break('e', '\u0301'))
+
+    def test_empty(self):
+        self.assertEqual(base.get_grapheme_clusters(''), [])
+
+    def test_latin1(self):
+        self.assertEqual(base.get_grapheme_clusters('café\xad\r\n'),
+                         ['c', 'a', 'f', 'é', '\xad', '\u200b', '\r\n'])
+
+    def test_combining(self):
+        self.assertEqual(base.get_grapheme_clusters('e\u0301\u0302x'),
+                         ['\u200b', '\u200b', 'e\u0301\u0302', 'x'])
+        self.assertEqual(base.get_grapheme_clusters('\u0915\u093f'),
+                         ['\u200b', '\u0915\u093f'])
+
+    def test_control(self):
+        self.assertEqual(base.get_grapheme_clusters('a\u2028\u0301'),
+                         ['a', '\u2028', '\u0301'])
+
+    def test_hangul(self):
+        # Jamo L V T, followed by a precomposed LV syllable and a T.
+        text = '\u1100\u1161\u11a8\uac00\u11a8'
+        self.assertEqual(base.get_grapheme_clusters(text), list(text))
+        self.assertEqual(base.get_grapheme_clusters(text, hangul=True),
+                         ['\u200b', '\u200b', '\u1100\u1161\u11a8',
+                          '\u200b', '\uac00\u11a8'])
+        # LVT syllables take no further V.
+        self.assertEqual(base.get_grapheme_clusters('\uac01\u1161',
+                                                    hangul=True),
+                         ['\uac01', '\u1161'])
+
+
+class GlyphCacheTestCase(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        font = FakeFont()
+        font.get_glyphs('abca')
+        self.assertEqual(font.rendered, ['a', 'b', 'c'])
+        self.assertEqual(font.glyphs.misses, 3)
+        self.assertEqual(font.glyphs.hits, 1)
+        self.assertEqual(font.glyphs.hit_rate, 0.25)
+
+    def test_prepare(self):
+        font = FakeFont()
+        self.assertEqual(font.prepare('你好你'), 2)
+        self.assertEqual(font.prepare({'你', 'x'}), 1)
+        self.assertEqual(sorted(font.rendered), ['x', '你', '好'])
+        font.get_glyphs('你好')
+        self.assertEqual(len(font.rendered), 3)
+        self.assertEqual(font.glyphs.hits, 2)
+
+    def test_lru_bound(self):
+        font = FakeFont(max_glyphs=2)
+        font.get_glyphs('ab')
+        font.get_glyphs('a')
+        font.get_glyphs('c')
+        self.assertEqual(len(font.glyphs), 2)
+        self.assertEqual(font.glyphs.evictions, 1)
+        self.assertIn('a', font.glyphs)
+        self.assertNotIn('b', font.glyphs)
+
+        font.get_glyphs('b')
+        self.assertEqual(font.rendered, ['a', 'b', 'c', 'b'])
+
+    def test_release_texture(self):
+        font = FakeFont(max_glyphs=2)
+        font.get_glyphs('ab')
+        old_texture = font.textures[0]
+        font.textures.insert(0, FakeTexture())
+        font.get_glyphs('cd')
+        self.assertEqual(font.textures, [font.glyphs['c'].owner])
+        self.assertIsNot(font.textures[0], old_texture)
+
+
+class FakeImage:
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+
+class FakeTextureAtlas(base.GlyphTextureAtlas):
+
+    @classmethod
+    def create_for_size(cls, target, min_width, min_height,
+                        internalformat=None):
+        return cls(min_width, min_height, target, 0)
+
+    def blit_into(self, source, x, y, z):
+        pass
+
+
+class AtlasGlyphRenderer(base.GlyphRenderer):
+
+    def __init__(self, font):
+        self.font = font
+
+    def render(self, text):
+        self.font.rendered.append(text)
+        return self.font.create_glyph(FakeImage(7, 7))
+
+
+class AtlasFont(FakeFont):
+    glyph_renderer_class = AtlasGlyphRenderer
+    texture_class = FakeTextureAtlas
+    # Four 7x7 glyphs, with padding, fit in each texture.
+    texture_width = 16
+    texture_height = 16
+    max_textures = 2
+
+
+class TextureEvictionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.font = AtlasFont()
+        self.evicted = []
+        self.font.add_eviction_handler(self.on_evicted)
+
+    def on_evicted(self, font, texture):
+        self.evicted.append(texture)
+
+    def test_fit(self):
+        glyphs = self.font.get_glyphs('abcde')
+        self.assertEqual(len(self.font.textures), 2)
+        self.assertEqual({(g.x, g.y) for g in glyphs[:4]},
+                         {(0, 0), (8, 0), (0, 8), (8, 8)})
+        self.assertIs(glyphs[4].owner, self.font.textures[0])
+        self.assertEqual(self.font.textures[1].get_usage(), 1.)
+        self.assertEqual(self.font.get_texture_usage(), 0.625)
+
+    def test_evict_least_recently_used(self):
+        self.font.get_glyphs('abcdefgh')
+        first, second = self.font.textures[1], self.font.textures[0]
+        # Use a glyph from the first texture, so the second is evicted.
+        self.font.get_glyphs('a')
+        glyph = self.font.get_glyphs('i')[0]
+
+        self.assertIs(glyph.owner, second)
+        self.assertEqual(self.evicted, [second])
+        self.assertEqual(self.font.textures, [second, first])
+        self.assertEqual(self.font.texture_evictions, 1)
+        self.assertEqual(self.font.glyphs.evictions, 4)
+        self.assertNotIn('e', self.font.glyphs)
+        self.assertIn('a', self.font.glyphs)
+        self.assertEqual(self.font.get_texture_usage(), 0.625)
+
+    def test_remove_handler(self):
+        self.font.remove_eviction_handler(self.on_evicted)
+        self.font.get_glyphs('abcdefgh')
+        self.font.get_glyphs('i')
+        self.assertEqual(self.evicted, [])
+        self.assertEqual(self.font.texture_evictions, 1)
+
+    def test_weak_handler(self):
+        font = AtlasFont()
+
+        class Layout:
+            def on_evicted(self, font, texture):
+                pass
+
+        font.add_eviction_handler(Layout().on_evicted)
+        font.get_glyphs('abcdefgh')
+        font.get_glyphs('i')
+        self.assertEqual(font._eviction_handlers, [])
+
+    def test_no_eviction_within_call(self):
+        # Glyphs returned by one call never share a texture that is
+        # cleared; the font grows beyond max_textures instead.
+        for _ in range(5):
+            glyphs = self.font.get_glyphs('abcdefghi')
+        self.assertEqual(self.evicted, [])
+        self.assertEqual(self.font.texture_evictions, 0)
+        self.assertEqual(len(self.font.textures), 3)
+        for c, glyph in zip('abcdefghi', glyphs):
+            self.assertIs(self.font.glyphs[c], glyph)
+            self.assertIn(glyph.owner, self.font.textures)
+        self.assertEqual(self.font.rendered, list('abcdefghi'))
+
+    def test_evict_outside_call(self):
+        self.font.get_glyphs('abcdefghi')
+        # 'j', 'k' and 'l' fit beside 'i'; 'm' reuses a texture.
+        glyph = self.font.get_glyphs('jklm')[-1]
+        self.assertEqual(self.font.texture_evictions, 1)
+        self.assertIs(glyph.owner, self.evicted[0])
+
+
+class LoadFont(base.Font):
+    preloaded = []
+    created = 0
+
+    def __init__(self, name, size, bold=False, italic=False, dpi=None):
+        super().__init__()
+        LoadFont.created += 1
+
+    @classmethod
+    def have_font(cls, name):
+        cls.preloaded.append(('have_font', name))
+        return name == 'Present'
+
+    @classmethod
+    def preload(cls, name, size, bold=False, italic=False):
+        cls.preloaded.append((name, size, bold, italic))
+
+
+class FakeObjectSpace:
+    pass
+
+
+class FakeContext:
+
+    def __init__(self):
+        self.object_space = FakeObjectSpace()
+
+
+class LoadTestCase(unittest.TestCase):
+
+    def setUp(self):
+        LoadFont.preloaded = []
+        LoadFont.created = 0
+        patches = [mock.patch.object(pyglet.font, '_font_class', LoadFont),
+                   mock.patch.object(pyglet.font, '_have_font_cache', {}),
+                   mock.patch.object(pyglet.font.gl, 'current_context',
+                                     FakeContext())]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_hold(self):
+        with mock.patch.object(pyglet.font, 'hold_size', 2):
+            first = id(pyglet.font.load('A'))
+            pyglet.font.load('B')
+            # Using a font again keeps it held.
+            pyglet.font.load('A')
+            pyglet.font.load('C')
+            self.assertEqual(id(pyglet.font.load('A')), first)
+            self.assertEqual(LoadFont.created, 3)
+
+            # Only the two most recently used fonts are held.
+            pyglet.font.load('D')
+            pyglet.font.load('A')
+            pyglet.font.load('C')
+            self.assertEqual(LoadFont.created, 5)
+            pyglet.font.load('A')
+            self.assertEqual(LoadFont.created, 5)
+
+    def test_have_font_cached(self):
+        pyglet.font.load(['Missing', 'Present'])
+        pyglet.font.load(['Missing', 'Present'], 14)
+        self.assertEqual(LoadFont.preloaded, [('have_font', 'Missing'),
+                                              ('have_font', 'Present')])
+
+    def test_preload(self):
+        pyglet.font.preload([('Present', 10, True, False),
+                             (['Missing', 'Present'], 10),
+                             ('Other',),
+                             (None, 14, False, True)])
+        self.assertEqual(LoadFont.preloaded, [
+            ('Present', 10, True, False),
+            ('have_font', 'Missing'),
+            ('have_font', 'Present'),
+            ('Present', 10, False, False),
+            ('Other', 12, False, False),
+            (None, 14, False, True)])
+        self.assertEqual(LoadFont.created, 0)
+
+
+class GlyphTestCase(unittest.TestCase):
+
+    def test_quad(self):
+        texture = FakeTextureAtlas(16, 16, 0, 0)
+        glyph = texture.fit(FakeImage(7, 5))
+        glyph.set_bearings(-2, 1, 9)
+        self.assertEqual(glyph.vertices, (1, 2, 8, 7))
+        self.assertEqual(glyph.quad, (1, 2, 8, 2, 8, 7, 1, 7))
+
+    def test_tex_coords_data(self):
+        texture = FakeTextureAtlas(16, 16, 0, 0)
+        glyph = texture.fit(FakeImage(8, 4))
+        self.assertEqual(array('f', glyph.tex_coords_data).tolist(),
+                         list(glyph.tex_coords))
+        glyph.tex_coords = tuple(range(12))
+        self.assertEqual(array('f', glyph.tex_coords_data).tolist(),
+                         list(range(12)))
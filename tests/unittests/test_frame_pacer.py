@@ -0,0 +1,112 @@
+import unittest
+
+from pyglet.app import FramePacer
+
+
+class FakeSystem:
+    """Time and sleep functions, with sleeps overshooting by the given
+    amounts in turn."""
+
+    def __init__(self, overshoots=(0.,), spin_step=0.0001):
+        self.time = 0.
+        self.overshoots = list(overshoots)
+        self.spin_step = spin_step
+        self.sleeps = []
+        self.wake_early = False
+
+    def time_function(self):
+        return self.time
+
+    def sleep(self, duration):
+        if duration == 0.:
+            self.time += self.spin_step
+            return False
+        self.sleeps.append(duration)
+        if self.wake_early:
+            self.time += duration / 2
+            return True
+        overshoot = self.overshoots[(len(self.sleeps) - 1) %
+                                    len(self.overshoots)]
+        self.time += duration + overshoot
+        return False
+
+
+class FramePacerTestCase(unittest.TestCase):
+
+    def create_pacer(self, system, **kwargs):
+        return FramePacer(time_function=system.time_function,
+                          sleep_function=system.sleep, **kwargs)
+
+    def test_exact_sleep(self):
+        system = FakeSystem()
+        pacer = self.create_pacer(system)
+        for _ in range(3):
+            self.assertTrue(pacer.wait(0.01))
+        self.assertEqual(system.sleeps, [0.01] * 3)
+        self.assertAlmostEqual(system.time, 0.03)
+        self.assertEqual(pacer.frames, 3)
+        self.assertEqual(pacer.missed_frames, 0)
+
+    def test_learns_overshoot(self):
+        system = FakeSystem(overshoots=(0.002,))
+        pacer = self.create_pacer(system)
+        pacer.wait(0.01)
+        self.assertEqual(pacer.missed_frames, 1)
+        self.assertAlmostEqual(pacer.get_sleep_margin(), 0.002)
+
+        start = system.time
+        pacer.wait(0.01)
+        self.assertAlmostEqual(system.sleeps[-1], 0.008)
+        self.assertAlmostEqual(system.time - start, 0.01)
+        self.assertEqual(pacer.missed_frames, 1)
+        self.assertEqual(pacer.frames, 2)
+
+    def test_percentile_ignores_outliers(self):
+        system = FakeSystem(overshoots=[0.001] * 19 + [0.1])
+        pacer = self.create_pacer(system, history=20, percentile=90)
+        for _ in range(20):
+            pacer.wait(0.01)
+        self.assertAlmostEqual(pacer.get_sleep_margin(), 0.001)
+
+    def test_spin_limit(self):
+        system = FakeSystem(overshoots=(0.01,))
+        pacer = self.create_pacer(system, max_spin=0.003)
+        pacer.wait(0.02)
+        self.assertAlmostEqual(pacer.get_sleep_margin(), 0.003)
+        pacer.wait(0.02)
+        self.assertAlmostEqual(system.sleeps[-1], 0.017)
+        self.assertEqual(pacer.missed_frames, 2)
+
+    def test_short_timeout_spins(self):
+        system = FakeSystem(overshoots=(0.002,))
+        pacer = self.create_pacer(system)
+        pacer.wait(0.01)
+        del system.sleeps[:]
+        start = system.time
+        self.assertTrue(pacer.wait(0.001))
+        self.assertEqual(system.sleeps, [])
+        self.assertGreaterEqual(system.time - start, 0.001)
+        self.assertGreater(pacer.spin_time, 0.)
+
+    def test_early_wake(self):
+        system = FakeSystem()
+        pacer = self.create_pacer(system)
+        system.wake_early = True
+        self.assertFalse(pacer.wait(0.01))
+        self.assertEqual(pacer.frames, 0)
+        self.assertEqual(pacer.sleeps, 0)
+
+    def test_sleep_function_argument(self):
+        system = FakeSystem()
+        pacer = FramePacer(time_function=system.time_function)
+        pacer.wait(0.01, system.sleep)
+        self.assertEqual(system.sleeps, [0.01])
+
+    def test_reset(self):
+        system = FakeSystem(overshoots=(0.002,))
+        pacer = self.create_pacer(system)
+        pacer.wait(0.01)
+        pacer.reset()
+        self.assertEqual(pacer.get_sleep_margin(), 0.)
+        self.assertEqual((pacer.frames, pacer.missed_frames, pacer.sleeps),
+                         (0, 0, 0))
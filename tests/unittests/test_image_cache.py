@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import abspath, dirname, join
+
+from pyglet.image.cache import ImageCache
+
+bmp_files = ['rgb_8bpp.bmp', 'rgb_24bpp.bmp', 'rgba_32bpp.bmp']
+
+
+def image_path(filename):
+    return abspath(join(dirname(__file__), '../data/images', filename))
+
+
+class ImageCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_miss_then_hit(self):
+        cache = ImageCache(self.directory)
+        for filename in bmp_files:
+            first = cache.load(image_path(filename))
+            second = cache.load(image_path(filename))
+            self.assertEqual(first.format, second.format)
+            self.assertEqual(first.pitch, second.pitch)
+            self.assertEqual(bytes(first.get_data(first.format, first.pitch)),
+                             bytes(second.get_data(second.format,
+                                                   second.pitch)))
+        self.assertEqual(cache.misses, len(bmp_files))
+        self.assertEqual(cache.hits, len(bmp_files))
+
+    def test_gl_ready_format(self):
+        cache = ImageCache(self.directory)
+        image = cache.load(image_path('rgb_24bpp.bmp'))
+        self.assertEqual(image.format, 'RGB')
+        self.assertEqual(image.pitch, image.width * 3)
+
+    def test_format_and_pitch_in_key(self):
+        cache = ImageCache(self.directory)
+        cache.load(image_path('rgb_24bpp.bmp'))
+        image = cache.load(image_path('rgb_24bpp.bmp'), format='RGBA')
+        self.assertEqual(image.format, 'RGBA')
+        self.assertEqual(cache.misses, 2)
+
+    def test_persistent(self):
+        ImageCache(self.directory).load(image_path('rgb_8bpp.bmp'))
+        cache = ImageCache(self.directory)
+        cache.load(image_path('rgb_8bpp.bmp'))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 0)
+
+    def test_lru_eviction(self):
+        cache = ImageCache(self.directory)
+        for filename in bmp_files:
+            cache.load(image_path(filename))
+        # Touch the first entry so the second becomes least recently used.
+        cache.load(image_path(bmp_files[0]))
+
+        cache.max_size = cache.size - 1
+        cache.load(image_path('rgb_4bpp.bmp'))
+        self.assertTrue(cache.size <= cache.max_size)
+        self.assertTrue(cache.evictions >= 1)
+
+        hits = cache.hits
+        cache.load(image_path(bmp_files[1]))
+        self.assertEqual(cache.hits, hits)
+
+    def test_clear(self):
+        cache = ImageCache(self.directory)
+        cache.load(image_path('rgb_8bpp.bmp'))
+        cache.clear()
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def check_damaged_entry(self, damage):
+        ImageCache(self.directory).load(image_path('rgb_8bpp.bmp'))
+        path, = [join(self.directory, name)
+                 for name in os.listdir(self.directory)]
+        size = os.path.getsize(path)
+        with open(path, 'r+b') as f:
+            damage(f)
+
+        cache = ImageCache(self.directory)
+        image = cache.load(image_path('rgb_8bpp.bmp'))
+        self.assertEqual(image.format, 'RGB')
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        # The damaged entry was replaced.
+        self.assertEqual(os.path.getsize(path), size)
+        self.assertEqual(cache.size, size)
+
+    def test_truncated_header(self):
+        self.check_damaged_entry(lambda f: f.truncate(10))
+
+    def test_empty_file(self):
+        self.check_damaged_entry(lambda f: f.truncate(0))
+
+    def test_truncated_data(self):
+        self.check_damaged_entry(lambda f: f.truncate(100))
+
+    def test_bad_format(self):
+        def damage(f):
+            f.seek(18)
+            f.write(b'\xff' * 8)
+        self.check_damaged_entry(damage)
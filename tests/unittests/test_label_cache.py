@@ -0,0 +1,193 @@
+import sys
+import unittest
+import mock
+
+import pyglet
+from pyglet import graphics
+from pyglet.font import base
+from pyglet.font.base import GlyphTextureAtlas
+from pyglet.gl import GL_TEXTURE_2D, gl_info
+from pyglet.image import Texture
+from pyglet.text import cache
+from pyglet.text.cache import LabelCache
+
+
+class FakeLabelCache(LabelCache):
+    # Textures are never bound, so no GL context is needed.
+
+    def _create_texture(self):
+        self.textures_created += 1
+        return Texture(self.texture_width, self.texture_height,
+                       GL_TEXTURE_2D, self.textures_created)
+
+    textures_created = 0
+
+
+class FakeLabel:
+
+    def __init__(self):
+        self.evicted = 0
+
+    def _on_label_cache_evicted(self):
+        self.evicted += 1
+
+
+class LabelCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # Four 8x8 labels fit in each texture.
+        self.cache = FakeLabelCache(16, 16, max_textures=2)
+
+    def test_allocate(self):
+        label = FakeLabel()
+        region = self.cache.allocate(label, 8, 4)
+        self.assertEqual((region.width, region.height), (8, 4))
+        self.assertEqual(self.cache.textures_created, 1)
+
+    def test_shared_texture(self):
+        first = self.cache.allocate(FakeLabel(), 8, 8)
+        second = self.cache.allocate(FakeLabel(), 8, 8)
+        self.assertIs(first.owner, second.owner)
+        self.assertNotEqual((first.x, first.y), (second.x, second.y))
+
+    def test_too_large(self):
+        self.assertIsNone(self.cache.allocate(FakeLabel(), 17, 8))
+        self.assertEqual(self.cache.textures_created, 0)
+
+    def test_new_texture_when_full(self):
+        labels = [FakeLabel() for _ in range(5)]
+        regions = [self.cache.allocate(label, 8, 8) for label in labels]
+        self.assertEqual(self.cache.textures_created, 2)
+        self.assertIsNot(regions[0].owner, regions[4].owner)
+        self.assertEqual(self.cache.evictions, 0)
+
+    def test_lru_eviction(self):
+        labels = [FakeLabel() for _ in range(8)]
+        regions = [self.cache.allocate(label, 8, 8) for label in labels]
+        # Use the first texture so the second is least recently used.
+        self.cache.touch(regions[0])
+
+        label = FakeLabel()
+        region = self.cache.allocate(label, 8, 8)
+        self.assertEqual(self.cache.textures_created, 2)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertIs(region.owner, regions[4].owner)
+        self.assertEqual([l.evicted for l in labels], [0] * 4 + [1] * 4)
+        self.assertEqual(label.evicted, 0)
+
+    def test_unused_texture_reused(self):
+        labels = [FakeLabel() for _ in range(8)]
+        regions = [self.cache.allocate(label, 8, 8) for label in labels]
+        for label in labels[:4]:
+            self.cache.release(label)
+
+        region = self.cache.allocate(FakeLabel(), 8, 8)
+        self.assertIs(region.owner, regions[0].owner)
+        self.assertEqual(self.cache.evictions, 0)
+        self.assertEqual([l.evicted for l in labels], [0] * 8)
+
+    def test_allocate_releases_previous(self):
+        label = FakeLabel()
+        first = self.cache.allocate(label, 16, 16)
+        # The full texture is no longer drawn by any label, so is reused.
+        second = self.cache.allocate(label, 16, 16)
+        self.assertIs(first.owner, second.owner)
+        self.assertEqual(self.cache.textures_created, 1)
+        self.assertEqual(self.cache.evictions, 0)
+        self.assertEqual(label.evicted, 0)
+
+    def test_usage(self):
+        self.assertEqual(self.cache.get_usage(), 0.)
+        self.cache.allocate(FakeLabel(), 16, 8)
+        self.assertEqual(self.cache.get_usage(), 0.25)
+
+
+class FakeImage:
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+
+class FakeTextureAtlas(GlyphTextureAtlas):
+
+    @classmethod
+    def create_for_size(cls, target, min_width, min_height,
+                        internalformat=None):
+        return cls(min_width, min_height, target, 0)
+
+    def blit_into(self, source, x, y, z):
+        pass
+
+
+class FakeGlyphRenderer(base.GlyphRenderer):
+
+    def __init__(self, font):
+        self.font = font
+
+    def render(self, text):
+        glyph = self.font.create_glyph(FakeImage(7, 7))
+        glyph.set_bearings(0, 0, 8)
+        return glyph
+
+
+class FakeFont(base.Font):
+    glyph_renderer_class = FakeGlyphRenderer
+    texture_class = FakeTextureAtlas
+    ascent = 7
+    descent = 0
+
+
+class FakeContext:
+
+    def __init__(self):
+        self.object_space = FakeObjectSpace()
+
+
+class FakeObjectSpace:
+    pass
+
+
+class GetLabelCacheTestCase(unittest.TestCase):
+    """`get_label_cache` and cached labels, with a faked context."""
+
+    def setUp(self):
+        patchers = [
+            mock.patch.object(sys.modules['pyglet.gl'], 'current_context',
+                              FakeContext()),
+            mock.patch.object(gl_info, 'have_extension', return_value=True),
+            mock.patch.object(cache, 'LabelCache', FakeLabelCache),
+            mock.patch.object(FakeLabelCache, 'render'),
+            mock.patch.object(sys.modules['pyglet.font'], 'load',
+                              return_value=FakeFont()),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_one_cache_per_object_space(self):
+        label_cache = cache.get_label_cache()
+        self.assertIsInstance(label_cache, FakeLabelCache)
+        self.assertIs(cache.get_label_cache(), label_cache)
+
+        pyglet.gl.current_context = FakeContext()
+        self.assertIsNot(cache.get_label_cache(), label_cache)
+
+    def test_no_framebuffer_objects(self):
+        gl_info.have_extension.return_value = False
+        self.assertIsNone(cache.get_label_cache())
+
+    def test_cached_label(self):
+        batch = graphics.Batch()
+        label = pyglet.text.Label('cached', cached=True, batch=batch)
+        label_cache = cache.get_label_cache()
+        renders = label_cache.render.call_count
+        self.assertTrue(renders >= 1)
+        self.assertIs(label._label_cache, label_cache)
+        # Drawn as a single quad.
+        self.assertEqual(len(label._vertex_lists), 1)
+
+        label.text = 'changed'
+        self.assertEqual(label_cache.render.call_count, renders + 1)
+        self.assertEqual(len(label._vertex_lists), 1)
+        label.delete()
@@ -0,0 +1,376 @@
+import sys
+import unittest
+import mock
+
+import pyglet
+from pyglet import graphics
+from pyglet.font import base
+from pyglet.font.base import Glyph, GlyphTextureAtlas
+from pyglet.gl import GL_TEXTURE_2D
+from pyglet.text import layout, runlist
+from pyglet.text.document import UnformattedDocument
+
+
+class TopGroup:
+    view_y = 0
+    translate_x = 0
+    translate_y = 0
+
+
+class Font:
+    ascent = 12
+    descent = -4
+
+
+class LineIndexTestCase(unittest.TestCase):
+    """Line queries of an IncrementalTextLayout, with lines made up rather
+    than flowed from a document."""
+
+    def setUp(self):
+        text_layout = layout.IncrementalTextLayout.__new__(
+            layout.IncrementalTextLayout)
+        text_layout.top_group = TopGroup()
+        text_layout._update_enabled = False
+        text_layout.glyphs = [None] * 100
+        text_layout.owner_runs = runlist.RunList(100, None)
+        text_layout.invalid_glyphs = layout._InvalidRange()
+        text_layout.invalid_flow = layout._InvalidRange()
+        text_layout.invalid_style = layout._InvalidRange()
+        text_layout._line_starts = list()
+        text_layout._line_bottoms = list()
+        text_layout._line_tops = list()
+        text_layout.lines = list()
+        for i in range(10):
+            line = layout._Line(i * 10)
+            line.length = 10
+            line.ascent = 12
+            line.descent = -4
+            line.y = -16 * (i + 1)
+            text_layout.lines.append(line)
+        text_layout._update_line_index(0, 10)
+        self.layout = text_layout
+
+    def test_line_from_position(self):
+        for position in range(100):
+            self.assertEqual(self.layout.get_line_from_position(position),
+                             position // 10)
+
+    def test_line_from_point(self):
+        self.assertEqual(self.layout.get_line_from_point(0, 10), 0)
+        self.assertEqual(self.layout.get_line_from_point(0, -19), 0)
+        self.assertEqual(self.layout.get_line_from_point(0, -20), 1)
+        self.assertEqual(self.layout.get_line_from_point(0, -5000), 9)
+
+    def test_insert_text(self):
+        self.layout.on_insert_text(20, 'hello')
+        self.assertEqual([line.start for line in self.layout.lines],
+                         [0, 10, 25, 35, 45, 55, 65, 75, 85, 95])
+        self.assertEqual(self.layout.get_line_from_position(24), 1)
+        self.assertEqual(self.layout.get_line_from_position(25), 2)
+
+    def test_delete_text(self):
+        self.layout.on_delete_text(15, 35)
+        self.assertEqual([line.start for line in self.layout.lines],
+                         [0, 10, 15, 15, 20, 30, 40, 50, 60, 70])
+        self.assertEqual(self.layout.get_line_from_position(15), 3)
+        self.assertEqual(self.layout.get_line_from_position(19), 3)
+
+
+class VertexListPoolTestCase(unittest.TestCase):
+    """Scrolling an IncrementalTextLayout of made up lines, updating the
+    visible lines as setting `view_y` does."""
+
+    def setUp(self):
+        texture = GlyphTextureAtlas(256, 256, GL_TEXTURE_2D, 0)
+        glyph = Glyph(0, 0, 0, 8, 8, texture)
+        glyph.set_bearings(0, 0, 8)
+
+        text_layout = layout.IncrementalTextLayout.__new__(
+            layout.IncrementalTextLayout)
+        text_layout.top_group = TopGroup()
+        text_layout.batch = graphics.Batch()
+        text_layout.groups = dict()
+        text_layout._dpi = 96
+        text_layout._height = 160
+        text_layout._vertex_list_pool = dict()
+        text_layout._vertex_list_keys = dict()
+        text_layout._vertex_lists_to_clear = set()
+        text_layout.vertex_list_allocations = 0
+        text_layout.lines_placed = 0
+        text_layout.invalid_style = layout._InvalidRange()
+        text_layout.invalid_vertex_lines = layout._InvalidRange()
+        text_layout.visible_lines = layout._InvalidRange()
+        text_layout._line_starts = list()
+        text_layout._line_bottoms = list()
+        text_layout._line_tops = list()
+        text_layout.lines = list()
+        for i in range(100):
+            line = layout._Line(i * 10)
+            length = 5 + i % 5
+            line.add_box(layout._GlyphBox(texture, Font, [(0, glyph)] * length,
+                                          length * 8))
+            line.x = 0
+            line.y = -16 * (i + 1)
+            text_layout.lines.append(line)
+        text_layout._document = UnformattedDocument('x' * 1000)
+        text_layout._update_line_index(0, 100)
+        self.layout = text_layout
+
+    def scroll_to(self, line):
+        self.layout.top_group.view_y = -16 * line
+        self.layout._update_visible_lines()
+        self.layout._update_vertex_lists()
+
+    def get_placed_lines(self):
+        return [i for i, line in enumerate(self.layout.lines)
+                if line.vertex_lists]
+
+    def test_overscan(self):
+        self.layout.overscan = 3
+        self.scroll_to(20)
+        self.assertEqual(self.get_placed_lines(), list(range(16, 33)))
+
+    def test_reuse(self):
+        self.scroll_to(10)
+        allocations = self.layout.vertex_list_allocations
+        for line in range(11, 80):
+            self.scroll_to(line)
+        self.assertEqual(self.layout.vertex_list_allocations, allocations)
+        self.assertEqual(self.get_placed_lines(), list(range(76, 91)))
+        self.assertLess(self.layout.allocations_per_line, 0.2)
+
+    def test_jump(self):
+        self.scroll_to(0)
+        self.scroll_to(50)
+        self.assertEqual(self.get_placed_lines(), list(range(47, 62)))
+        pooled = sum(map(len, self.layout._vertex_list_pool.values()))
+        self.assertEqual(pooled, 0)
+
+
+class FakeImage:
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+
+class FakeTextureAtlas(GlyphTextureAtlas):
+
+    @classmethod
+    def create_for_size(cls, target, min_width, min_height,
+                        internalformat=None):
+        return cls(min_width, min_height, target, 0)
+
+    def blit_into(self, source, x, y, z):
+        pass
+
+
+class AtlasGlyphRenderer(base.GlyphRenderer):
+
+    def __init__(self, font):
+        self.font = font
+
+    def render(self, text):
+        glyph = self.font.create_glyph(FakeImage(7, 7))
+        glyph.set_bearings(0, 0, 8)
+        return glyph
+
+
+class AtlasFont(base.Font):
+    glyph_renderer_class = AtlasGlyphRenderer
+    texture_class = FakeTextureAtlas
+    # Four 7x7 glyphs, with padding, fit in each texture.
+    texture_width = 16
+    texture_height = 16
+    max_textures = 2
+    ascent = 7
+    descent = 0
+
+
+class GlyphEvictionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.font = AtlasFont()
+        self.batch = graphics.Batch()
+        self.clock = pyglet.app.event_loop.clock
+
+    def create_label(self, text):
+        with mock.patch.object(sys.modules['pyglet.font'], 'load',
+                               return_value=self.font):
+            return pyglet.text.Label(text, batch=self.batch)
+
+    def is_refresh_scheduled(self, label):
+        return any(item.func == label._refresh_glyphs
+                   for item in self.clock._scheduled_items)
+
+    def test_delete(self):
+        label = self.create_label('abc')
+        label.delete()
+        self.assertEqual(self.font._eviction_handlers, [])
+
+    def test_delete_incremental(self):
+        with mock.patch.object(sys.modules['pyglet.font'], 'load',
+                               return_value=self.font):
+            text_layout = layout.IncrementalTextLayout(
+                UnformattedDocument('abc'), 100, 100, batch=self.batch)
+        text_layout.delete()
+        self.assertEqual(self.font._eviction_handlers, [])
+
+    def test_delete_with_refresh_scheduled(self):
+        label = self.create_label('abcdefgh')
+        other = self.create_label('ijkl')
+        self.assertTrue(self.is_refresh_scheduled(label))
+        label.delete()
+        other.delete()
+        self.assertFalse(self.is_refresh_scheduled(label))
+
+    def test_refresh(self):
+        label = self.create_label('abcdefgh')
+        other = self.create_label('ijkl')
+        self.assertEqual(self.font.texture_evictions, 1)
+        with mock.patch.object(sys.modules['pyglet.font'], 'load',
+                               return_value=self.font), \
+                mock.patch.object(label, '_init_document') as init_document:
+            self.clock.tick()
+        init_document.assert_called_once_with()
+        self.assertFalse(self.is_refresh_scheduled(label))
+        label.delete()
+        other.delete()
+
+    def test_more_glyphs_than_textures(self):
+        label = self.create_label('abcdefghi')
+        self.assertFalse(self.is_refresh_scheduled(label))
+        self.assertEqual(self.font.texture_evictions, 0)
+        self.assertEqual(len(self.font.textures), 3)
+        label.delete()
+
+
+class WrapFont(AtlasFont):
+    texture_width = 256
+    texture_height = 256
+    max_textures = None
+
+
+class LazyWrapTestCase(unittest.TestCase):
+    """Changing the width of an IncrementalTextLayout wraps paragraphs again
+    only as they are scrolled into view."""
+
+    text = '\n'.join(' '.join('word%d' % (i * j % 7) for j in range(i % 9 + 3))
+                     for i in range(60))
+
+    def setUp(self):
+        self.font = WrapFont()
+        self.batch = graphics.Batch()
+        patcher = mock.patch.object(sys.modules['pyglet.font'], 'load',
+                                    return_value=self.font)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_layout(self, width):
+        return layout.IncrementalTextLayout(
+            UnformattedDocument(self.text), width, 70, multiline=True,
+            batch=self.batch)
+
+    def get_breaks(self, text_layout):
+        return [(line.start, line.length) for line in text_layout.lines]
+
+    def scroll_through(self, text_layout):
+        y = 0
+        while y < text_layout.content_height:
+            text_layout.view_y = -y
+            y += text_layout.height
+
+    def test_resize_is_lazy(self):
+        text_layout = self.create_layout(200)
+        text_layout.width = 120
+        self.assertEqual(text_layout.lines[0].wrap_key, 120)
+        self.assertEqual(text_layout.lines[-1].wrap_key, 200)
+        text_layout.delete()
+
+    def test_resize_and_scroll(self):
+        text_layout = self.create_layout(200)
+        for width in (120, 300, 96):
+            text_layout.width = width
+            self.scroll_through(text_layout)
+            self.assertEqual({line.wrap_key for line in text_layout.lines},
+                             {width})
+            fresh_layout = self.create_layout(width)
+            self.assertEqual(self.get_breaks(text_layout),
+                             self.get_breaks(fresh_layout))
+            self.assertEqual([line.y for line in text_layout.lines],
+                             [line.y for line in fresh_layout.lines])
+            self.assertEqual(text_layout.content_height,
+                             fresh_layout.content_height)
+            fresh_layout.delete()
+        text_layout.delete()
+
+    def test_scroll_up_after_resize(self):
+        text_layout = self.create_layout(200)
+        text_layout.view_y = -10000
+        text_layout.width = 120
+        text_layout.view_y = 0
+        self.scroll_through(text_layout)
+        fresh_layout = self.create_layout(120)
+        self.assertEqual(self.get_breaks(text_layout),
+                         self.get_breaks(fresh_layout))
+        fresh_layout.delete()
+        text_layout.delete()
+
+    def test_edit_keeps_later_lines(self):
+        text_layout = self.create_layout(200)
+        last_lines = text_layout.lines[-10:]
+        text_layout.document.insert_text(3, ' inserted words' * 4)
+        self.assertEqual(text_layout.lines[-10:], last_lines)
+        self.scroll_through(text_layout)
+
+        self.text = text_layout.document.text
+        fresh_layout = self.create_layout(200)
+        self.assertEqual(self.get_breaks(text_layout),
+                         self.get_breaks(fresh_layout))
+        self.assertEqual([line.y for line in text_layout.lines],
+                         [line.y for line in fresh_layout.lines])
+        fresh_layout.delete()
+        text_layout.delete()
+
+    def test_empty_document(self):
+        self.text = ''
+        text_layout = self.create_layout(150)
+        self.assertEqual(len(text_layout.lines), 1)
+        text_layout.width = 120
+        self.assertEqual(len(text_layout.lines), 1)
+        text_layout.delete()
+
+    def test_delete_all_text(self):
+        text_layout = self.create_layout(150)
+        document = text_layout.document
+        document.delete_text(0, len(document.text))
+        self.assertEqual(len(text_layout.lines), 1)
+        document.insert_text(0, 'word1 word2')
+        self.assertEqual(self.get_breaks(text_layout), [(0, 11)])
+        text_layout.delete()
+
+    def check_align(self, **kwargs):
+        def create_layout(align, width):
+            document = UnformattedDocument('word1 word2\nword3')
+            document.set_paragraph_style(0, len(document.text),
+                                         {'align': align})
+            return layout.IncrementalTextLayout(
+                document, width, 70, multiline=True, batch=self.batch,
+                **kwargs)
+
+        for align in ('center', 'right'):
+            text_layout = create_layout(align, 200)
+            text_layout.width = 400
+            self.scroll_through(text_layout)
+            fresh_layout = create_layout(align, 400)
+            self.assertEqual([line.x for line in text_layout.lines],
+                             [line.x for line in fresh_layout.lines])
+            self.assertTrue(text_layout.lines[0].x > 100)
+            fresh_layout.delete()
+            text_layout.delete()
+
+    def test_align_after_resize(self):
+        self.check_align()
+
+    def test_align_after_resize_without_wrapping(self):
+        self.check_align(wrap_lines=False)
@@ -1,4 +1,8 @@
+import ctypes
+import sys
 import unittest
+import mock
+import pyglet
 from pyglet import media
 
 
@@ -26,3 +30,283 @@ class SourceGroupTestCase(unittest.TestCase):
 
 class PlayerTestCase(unittest.TestCase):
     pass
+
+
+class AudioDataTestCase(unittest.TestCase):
+    audio_format = media.AudioFormat(channels=1, sample_size=8,
+                                     sample_rate=100)
+
+    def check_consume(self, data, raw):
+        audio_data = media.AudioData(data, len(raw), 0., len(raw) / 100., [])
+        audio_data.consume(3, self.audio_format)
+        self.assertEqual(audio_data.length, len(raw) - 3)
+        self.assertAlmostEqual(audio_data.timestamp, 0.03)
+        self.assertEqual(bytes(audio_data.data), raw[3:])
+        self.assertEqual(audio_data.get_string_data(), raw[3:])
+        self.assertEqual(audio_data.get_buffer().tobytes(), raw[3:])
+
+        audio_data.consume(4, self.audio_format)
+        self.assertEqual(audio_data.get_string_data(), raw[7:])
+        audio_data.consume(audio_data.length, self.audio_format)
+        self.assertEqual(audio_data.length, 0)
+        self.assertEqual(audio_data.get_string_data(), b'')
+
+    def test_consume_bytes(self):
+        raw = bytes(range(16))
+        self.check_consume(raw, raw)
+
+    def test_consume_ctypes_array(self):
+        raw = bytes(range(16))
+        self.check_consume((ctypes.c_ubyte * 16).from_buffer_copy(raw), raw)
+
+    def test_consume_shares_memory(self):
+        data = (ctypes.c_ubyte * 16)()
+        audio_data = media.AudioData(data, 16, 0., 0.16, [])
+        audio_data.consume(8, self.audio_format)
+        data[8] = 42
+        self.assertEqual(audio_data.data[0], 42)
+        self.assertEqual(audio_data.get_buffer()[0], 42)
+
+    def test_view_passes_as_pointer(self):
+        raw = bytes(range(16))
+        audio_data = media.AudioData(raw, 16, 0., 0.16, [])
+        audio_data.consume(10, self.audio_format)
+        destination = ctypes.create_string_buffer(6)
+        ctypes.memmove(destination, audio_data.data, 6)
+        self.assertEqual(destination.raw, raw[10:])
+
+
+class _ChunkedSource(media.Source):
+    """Source returning `raw` in packets of `packet_size` bytes."""
+
+    def __init__(self, raw, audio_format, packet_size):
+        self.raw = raw
+        self.audio_format = audio_format
+        self.packet_size = packet_size
+        self.offset = 0
+        self.requests = 0
+        self._duration = len(raw) / float(audio_format.bytes_per_second)
+
+    def get_audio_data(self, bytes_):
+        self.requests += 1
+        data = self.raw[self.offset:self.offset + self.packet_size]
+        if not data:
+            return None
+        timestamp = self.offset / float(self.audio_format.bytes_per_second)
+        self.offset += len(data)
+        return media.AudioData(data, len(data), timestamp,
+                               len(data) / float(
+                                   self.audio_format.bytes_per_second), [])
+
+
+class StaticSourceTestCase(unittest.TestCase):
+    audio_format = media.AudioFormat(channels=1, sample_size=16,
+                                     sample_rate=100)
+
+    def read_all(self, source, bytes_):
+        packets = []
+        while True:
+            audio_data = source.get_audio_data(bytes_)
+            if not audio_data:
+                return packets
+            packets.append(audio_data)
+
+    def test_packets_share_buffer(self):
+        raw = bytes(range(200))
+        static = media.StaticSource(
+            _ChunkedSource(raw, self.audio_format, 64), self.audio_format)
+        self.assertAlmostEqual(static.duration, 1.)
+
+        first = self.read_all(static.get_queue_source(), 30)
+        second = self.read_all(static.get_queue_source(), 30)
+        self.assertEqual(b''.join(p.get_string_data() for p in first), raw)
+        buffers = set(id(p.get_buffer().obj) for p in first + second)
+        self.assertEqual(len(buffers), 1)
+        self.assertAlmostEqual(first[1].timestamp, 0.15)
+
+    def test_seek(self):
+        raw = bytes(range(200))
+        static = media.StaticSource(
+            _ChunkedSource(raw, self.audio_format, 64), self.audio_format)
+        source = static.get_queue_source()
+        source.seek(0.5)
+        audio_data = source.get_audio_data(10)
+        self.assertAlmostEqual(audio_data.timestamp, 0.5)
+        self.assertEqual(audio_data.get_string_data(), raw[100:110])
+
+    def test_convert(self):
+        raw = bytes(range(200))
+        stereo = media.AudioFormat(channels=2, sample_size=16,
+                                   sample_rate=100)
+        static = media.StaticSource(
+            _ChunkedSource(raw, self.audio_format, 64), stereo)
+        self.assertEqual(static.audio_format, stereo)
+        data = b''.join(p.get_string_data() for p in
+                        self.read_all(static.get_queue_source(), 1000))
+        self.assertEqual(len(data), 400)
+        self.assertEqual(data[:8], raw[0:2] * 2 + raw[2:4] * 2)
+
+    def test_lazy_decode(self):
+        raw = bytes(range(200))
+        source = _ChunkedSource(raw, self.audio_format, 64)
+        with mock.patch.object(media.StaticSource, 'max_eager_duration', 0.5):
+            static = media.StaticSource(source, self.audio_format)
+        self.assertEqual(source.requests, 0)
+
+        queue_source = static.get_queue_source()
+        audio_data = queue_source.get_audio_data(100)
+        self.assertEqual(audio_data.length, 64)
+        self.assertEqual(source.requests, 1)
+
+        packets = [audio_data] + self.read_all(queue_source, 100)
+        self.assertEqual(b''.join(p.get_string_data() for p in packets), raw)
+        self.assertEqual(b''.join(p.get_string_data() for p in
+                                  self.read_all(static.get_queue_source(),
+                                                100)), raw)
+
+    def patch_audio_driver(self, driver):
+        # pyglet.media is a module proxy; patch the module itself.
+        return mock.patch.object(sys.modules['pyglet.media'],
+                                 'get_audio_driver', return_value=driver)
+
+    def check_preferred_format(self, eager):
+        raw = bytes(range(200))
+        stereo = media.AudioFormat(channels=2, sample_size=16,
+                                   sample_rate=100)
+        source = _ChunkedSource(raw, self.audio_format, 64)
+        driver = mock.Mock()
+        driver.get_preferred_audio_format.return_value = stereo
+        max_eager_duration = 30. if eager else 0.5
+        with self.patch_audio_driver(driver) as get_audio_driver, \
+                mock.patch.object(media.StaticSource, 'max_eager_duration',
+                                  max_eager_duration):
+            static = media.StaticSource(source)
+            self.assertFalse(get_audio_driver.called)
+            self.assertEqual(static.audio_format, self.audio_format)
+
+            queue_source = static.get_queue_source()
+            self.assertEqual(get_audio_driver.call_count, 1)
+            static.get_queue_source()
+            self.assertEqual(get_audio_driver.call_count, 1)
+
+        self.assertEqual(static.audio_format, stereo)
+        self.assertEqual(queue_source.audio_format, stereo)
+        self.assertAlmostEqual(static.duration, 1.)
+        data = b''.join(p.get_string_data() for p in
+                        self.read_all(queue_source, 1000))
+        self.assertEqual(len(data), 400)
+        self.assertEqual(data[:8], raw[0:2] * 2 + raw[2:4] * 2)
+
+    def test_preferred_format_on_queue(self):
+        self.check_preferred_format(eager=True)
+
+    def test_preferred_format_on_queue_lazy(self):
+        self.check_preferred_format(eager=False)
+
+    def test_no_driver(self):
+        raw = bytes(range(200))
+        with self.patch_audio_driver(None):
+            static = media.StaticSource(
+                _ChunkedSource(raw, self.audio_format, 64))
+            queue_source = static.get_queue_source()
+        self.assertEqual(queue_source.audio_format, self.audio_format)
+        self.assertEqual(b''.join(p.get_string_data() for p in
+                                  self.read_all(queue_source, 1000)), raw)
+
+
+class SourceGroupConversionTestCase(unittest.TestCase):
+    mono8 = media.AudioFormat(channels=1, sample_size=8, sample_rate=8000)
+    stereo16 = media.AudioFormat(channels=2, sample_size=16,
+                                 sample_rate=16000)
+
+    def read_all(self, group):
+        packets = []
+        while True:
+            audio_data = group.get_audio_data(4096)
+            if not audio_data:
+                return packets
+            packets.append(audio_data)
+
+    def test_mixed_formats(self):
+        group = media.SourceGroup(self.stereo16, None)
+        group.queue(_ChunkedSource(bytes(4000), self.stereo16, 1000))
+        group.queue(_ChunkedSource(bytes([192] * 800), self.mono8, 100))
+        group.advance_after_eos = True
+
+        packets = self.read_all(group)
+        data = b''.join(p.get_string_data() for p in packets)
+        # 1000 frames of the first source, then about 1600 converted ones.
+        self.assertTrue(abs(len(data) // 4 - 2600) <= 4)
+        self.assertEqual(data[-8:], b'\x00\x40' * 4)
+        for packet in packets:
+            self.assertEqual(packet.length % 4, 0)
+        self.assertAlmostEqual(packets[-1].timestamp + packets[-1].duration,
+                               0.0625 + 0.1, places=2)
+
+    def test_converted_source_is_flushed(self):
+        group = media.SourceGroup(self.stereo16, None)
+        with mock.patch.dict(pyglet.options, {'audio_resampler': 'sinc'}):
+            group.queue(_ChunkedSource(bytes([192] * 800), self.mono8, 100))
+        packets = self.read_all(group)
+        data = b''.join(p.get_string_data() for p in packets)
+        # 800 frames at 8 kHz make 1600 at 16 kHz, none held back.
+        self.assertTrue(abs(len(data) // 4 - 1600) <= 2)
+        last = packets[-1]
+        self.assertAlmostEqual(last.timestamp + last.duration, 0.1,
+                               places=2)
+
+    def test_converted_source_keeps_events(self):
+        source = _ChunkedSource(bytes(400), self.mono8, 2)
+        get_audio_data = source.get_audio_data
+
+        def get_audio_data_with_event(bytes_):
+            audio_data = get_audio_data(bytes_)
+            if audio_data:
+                audio_data.events.append(
+                    media.MediaEvent(audio_data.timestamp, 'on_test'))
+            return audio_data
+
+        source.get_audio_data = get_audio_data_with_event
+        group = media.SourceGroup(self.stereo16, None)
+        with mock.patch.dict(pyglet.options, {'audio_resampler': 'sinc'}):
+            group.queue(source)
+        # The first packets convert to nothing while the resampler fills.
+        events = [event for packet in self.read_all(group)
+                  for event in packet.events]
+        self.assertEqual(len(events), 200)
+
+    def test_unsupported_format(self):
+        group = media.SourceGroup(self.stereo16, None)
+        surround = media.AudioFormat(channels=6, sample_size=16,
+                                     sample_rate=16000)
+        self.assertRaises(media.MediaException, group.queue,
+                          _ChunkedSource(bytes(1200), surround, 120))
+
+    def test_player_queues_into_one_group(self):
+        player = media.Player()
+        player.queue(_ChunkedSource(bytes(4000), self.stereo16, 1000))
+        player.queue(_ChunkedSource(bytes(800), self.mono8, 100))
+        self.assertEqual(len(player._group_queue), 1)
+
+    def test_player_widens_group_format(self):
+        player = media.Player()
+        player.queue(_ChunkedSource(bytes([192] * 800), self.mono8, 100))
+        player.queue(_ChunkedSource(bytes(4000), self.stereo16, 1000))
+        group = player._group_queue[0]
+        self.assertEqual(group.audio_format, self.stereo16)
+
+        group.advance_after_eos = True
+        data = b''.join(p.get_string_data() for p in self.read_all(group))
+        # About 1600 converted frames of the first source, then 1000 frames.
+        self.assertTrue(abs(len(data) // 4 - 2600) <= 4)
+        self.assertEqual(data[:8], b'\x00\x40' * 4)
+
+    def test_player_keeps_playing_group_format(self):
+        player = media.Player()
+        player.queue(_ChunkedSource(bytes([192] * 800), self.mono8, 100))
+        player._audio_player = mock.Mock()
+        player.queue(_ChunkedSource(bytes(4000), self.stereo16, 1000))
+        player._audio_player = None
+        group = player._group_queue[0]
+        self.assertEqual(group.audio_format, self.mono8)
+        self.assertEqual(len(group._sources), 2)
@@ -0,0 +1,167 @@
+import array
+import threading
+import unittest
+
+import mock
+
+from pyglet import media
+from pyglet.media import procedural
+from pyglet.media.mixer import Mixer
+
+mono_8khz = media.AudioFormat(channels=1, sample_size=16, sample_rate=8000)
+
+
+def make_group(source):
+    group = media.SourceGroup(source.audio_format, None)
+    group.queue(source)
+    return group
+
+
+def make_voice(mixer, duration=1.0, frequency=100, priority=0, **kwargs):
+    source = procedural.Square(duration, frequency=frequency,
+                               sample_rate=8000, **kwargs)
+    voice = mixer.create_audio_player(make_group(source), mock.Mock())
+    voice.set_priority(priority)
+    return voice
+
+
+@mock.patch('pyglet.media.mixer.Mixer._start_output')
+@mock.patch('pyglet.media.MediaEvent._sync_dispatch_to_player',
+            autospec=True)
+class MixerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.mixer = Mixer(mock.Mock(), mono_8khz, max_voices=4,
+                           block_size=80)
+
+    def test_silence(self, *_):
+        self.assertEqual(self.mixer.mix(80), bytes(160))
+
+    def test_single_voice(self, *_):
+        voice = make_voice(self.mixer)
+        voice.play()
+        samples = array.array('h', self.mixer.mix(80))
+        self.assertEqual(list(samples[:40]), [-32767] * 40)
+        self.assertEqual(list(samples[40:]), [32767] * 40)
+
+    def test_gain_and_sum(self, *_):
+        for _ in range(2):
+            voice = make_voice(self.mixer)
+            voice.set_volume(0.25)
+            voice.play()
+        samples = array.array('h', self.mixer.mix(80))
+        self.assertTrue(abs(samples[60] - 16383) <= 2)
+
+    def test_paused_voice_not_mixed(self, *_):
+        voice = make_voice(self.mixer)
+        voice.play()
+        voice.stop()
+        self.assertEqual(self.mixer.mix(80), bytes(160))
+
+    def test_stereo_pan(self, *_):
+        mixer = Mixer(mock.Mock(), media.AudioFormat(2, 16, 8000),
+                      block_size=80)
+        voice = make_voice(mixer)
+        voice.set_position((1, 0, 0))
+        voice.play()
+        samples = array.array('h', mixer.mix(80))
+        self.assertEqual(samples[100], 0)
+        self.assertEqual(samples[101], 32767)
+
+    def test_resampling(self, *_):
+        mixer = Mixer(mock.Mock(), media.AudioFormat(1, 16, 16000),
+                      block_size=320)
+        voice = make_voice(mixer)
+        voice.play()
+        samples = array.array('h', mixer.mix(320))
+        # 100 Hz at 16 kHz: 80 samples low, then 80 samples high.
+        self.assertTrue(samples[40] < 0)
+        self.assertTrue(samples[120] > 0)
+        self.assertTrue(samples[200] < 0)
+
+    def test_resampled_voice_plays_to_end(self, *_):
+        mixer = Mixer(mock.Mock(), media.AudioFormat(1, 16, 16000),
+                      block_size=320)
+        voice = make_voice(mixer, duration=0.01, frequency=50)
+        voice.play()
+        samples = array.array('h', mixer.mix(320))
+        # 80 frames at 8 kHz play as 160 at 16 kHz.
+        self.assertEqual(sum(1 for sample in samples if sample), 160)
+
+    def test_8bit_voice(self, *_):
+        voice = make_voice(self.mixer, sample_size=8)
+        voice.play()
+        samples = array.array('h', self.mixer.mix(80))
+        self.assertEqual(samples[0], -127 << 8)
+        self.assertEqual(samples[79], 127 << 8)
+
+    def test_voice_finishes(self, dispatch, _):
+        voice = make_voice(self.mixer, duration=0.015)
+        voice.play()
+        self.mixer.mix(80)
+        self.assertEqual(self.mixer.get_voices(), [voice])
+        self.mixer.mix(80)
+        self.assertEqual(self.mixer.get_voices(), [])
+        events = [call[0][0].event for call in dispatch.call_args_list]
+        self.assertEqual(events, ['on_eos', 'on_source_group_eos'])
+
+    def test_voice_stealing(self, dispatch, _):
+        voices = [make_voice(self.mixer, priority=p) for p in (1, 0, 0, 1)]
+        for voice in voices:
+            voice.play()
+
+        newcomer = make_voice(self.mixer, priority=0)
+        newcomer.play()
+        playing = self.mixer.get_voices()
+        self.assertFalse(voices[1] in playing)
+        self.assertTrue(newcomer in playing)
+        self.assertEqual(len(playing), 4)
+        self.assertEqual(self.mixer.steals, 1)
+
+    def test_voice_refused(self, dispatch, _):
+        for _ in range(4):
+            make_voice(self.mixer, priority=2).play()
+        newcomer = make_voice(self.mixer, priority=1)
+        newcomer.play()
+        self.assertFalse(newcomer in self.mixer.get_voices())
+        self.assertEqual(self.mixer.steals, 1)
+
+    def test_clear_waits_for_read(self, *_):
+        voice = make_voice(self.mixer)
+        voice.play()
+        get_audio_data = voice.source_group.get_audio_data
+        cleared = threading.Event()
+        threads = []
+
+        def clear():
+            voice.clear()
+            cleared.set()
+
+        def read(bytes_):
+            if not threads:
+                threads.append(threading.Thread(target=clear))
+                threads[0].start()
+                # The voice is read with the mixer's lock held.
+                self.assertFalse(cleared.wait(0.05))
+            return get_audio_data(bytes_)
+
+        voice.source_group.get_audio_data = read
+        self.mixer.mix(80)
+        threads[0].join()
+        self.assertTrue(cleared.is_set())
+        self.assertEqual(len(voice._buffer), 0)
+
+
+class MixerSilentDriverTestCase(unittest.TestCase):
+
+    def test_output_through_silent_driver(self):
+        mixer = Mixer(media.get_silent_audio_driver(), mono_8khz)
+        voice = make_voice(mixer)
+        voice.play()
+        try:
+            self.assertTrue(mixer._output is not None)
+            self.assertEqual(mixer._output.source_group.audio_format,
+                             mono_8khz)
+        finally:
+            mixer.delete()
+        self.assertTrue(mixer._output is None)
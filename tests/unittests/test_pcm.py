@@ -0,0 +1,158 @@
+import array
+import math
+import unittest
+
+from pyglet.media import pcm
+
+
+def fragment(*samples):
+    return array.array('h', samples).tobytes()
+
+
+def samples(fragment):
+    return list(array.array('h', fragment))
+
+
+class PCMTestCase(unittest.TestCase):
+
+    def test_to_16bit(self):
+        self.assertEqual(samples(pcm.to_16bit(bytes([0, 128, 255]), 8)),
+                         [-32768, 0, 32512])
+
+    def test_from_16bit(self):
+        self.assertEqual(pcm.from_16bit(fragment(-32768, 0, 32512), 8),
+                         bytes([0, 128, 255]))
+
+    def test_mul_clips(self):
+        self.assertEqual(samples(pcm.mul(fragment(100, -20000), 2)),
+                         [200, -32768])
+
+    def test_add_clips(self):
+        self.assertEqual(samples(pcm.add(fragment(30000, 5),
+                                         fragment(30000, -10))),
+                         [32767, -5])
+
+    def test_tostereo(self):
+        self.assertEqual(samples(pcm.tostereo(fragment(100, 200), 1, 0.5)),
+                         [100, 50, 200, 100])
+
+    def test_tomono(self):
+        self.assertEqual(samples(pcm.tomono(fragment(100, 50, 200, 100),
+                                            0.5, 0.5)),
+                         [75, 150])
+
+    def test_resampler_is_continuous(self):
+        data = fragment(*range(0, 8000, 10))
+        whole = pcm.LinearResampler(1, 8000, 11025).convert(data)
+        resampler = pcm.LinearResampler(1, 8000, 11025)
+        pieces = b''.join(resampler.convert(data[i:i + 100])
+                          for i in range(0, len(data), 100))
+        self.assertTrue(abs(len(whole) - len(pieces)) <= 2)
+        for a, b in zip(samples(whole), samples(pieces)):
+            self.assertTrue(abs(a - b) <= 10)
+
+    def test_resampler_starts_at_first_frame(self):
+        data = fragment(100, -100, 200, -200, 300, -300, 400, -400)
+        up = pcm.LinearResampler(2, 8000, 16000)
+        self.assertEqual(samples(up.convert(data))[:6],
+                         [100, -100, 150, -150, 200, -200])
+        down = pcm.LinearResampler(2, 16000, 8000)
+        self.assertEqual(samples(down.convert(data))[:4],
+                         [100, -100, 300, -300])
+
+        # And again after seeking.
+        up.reset()
+        self.assertEqual(samples(up.convert(data))[:2], [100, -100])
+
+    def test_resampler_length(self):
+        data = fragment(*([1000] * 4410))
+        result = pcm.LinearResampler(1, 44100, 22050).convert(data)
+        self.assertTrue(abs(len(result) // 2 - 2205) <= 1)
+
+    def test_sinc_resampler_is_continuous(self):
+        data = fragment(*range(0, 8000, 10))
+        whole = pcm.SincResampler(1, 8000, 11025).convert(data)
+        resampler = pcm.SincResampler(1, 8000, 11025)
+        pieces = b''.join(resampler.convert(data[i:i + 100])
+                          for i in range(0, len(data), 100))
+        self.assertEqual(whole, pieces)
+
+    def test_sinc_resampler_accuracy(self):
+        tone = [int(10000 * math.sin(2 * math.pi * 1000 * i / 44100.))
+                for i in range(4410)]
+        result = samples(pcm.SincResampler(1, 44100, 48000).convert(
+            fragment(*tone)))
+        # Output lags by half the filter length.
+        self.assertTrue(abs(len(result) - 4800) <= 20)
+        for i in range(100, len(result)):
+            expected = 10000 * math.sin(2 * math.pi * 1000 * i / 48000.)
+            self.assertTrue(abs(result[i] - expected) < 20)
+
+    def check_flush(self, resampler_class, channels):
+        frames = 4410
+        data = fragment(*([1000] * frames * channels))
+        resampler = resampler_class(channels, 44100, 48000)
+        result = samples(resampler.convert(data[:len(data) // 2]) +
+                         resampler.convert(data[len(data) // 2:]))
+        tail = samples(resampler.flush())
+        self.assertTrue(tail)
+        self.assertTrue(abs((len(result) + len(tail)) // channels - 4800)
+                        <= 1)
+        return tail
+
+        # The resampler is ready for a new stream.
+        self.assertEqual(resampler.flush(), b'')
+        self.assertEqual(samples(resampler.convert(data))[:channels],
+                         samples(resampler_class(channels, 44100, 48000)
+                                 .convert(data))[:channels])
+
+    def test_linear_resampler_flush(self):
+        self.assertEqual(self.check_flush(pcm.LinearResampler, 1)[-1:],
+                         [1000])
+        self.assertEqual(self.check_flush(pcm.LinearResampler, 2)[-2:],
+                         [1000, 1000])
+
+    def test_sinc_resampler_flush(self):
+        self.check_flush(pcm.SincResampler, 1)
+        self.check_flush(pcm.SincResampler, 2)
+
+    def test_sinc_resampler_stereo(self):
+        data = fragment(*([1000, -2000] * 1000))
+        result = samples(pcm.SincResampler(2, 48000, 22050).convert(data))
+        self.assertEqual(result[200:204], [1000, -2000, 1000, -2000])
+
+    def test_converter(self):
+        mono8 = FakeFormat(1, 8, 8000)
+        stereo16 = FakeFormat(2, 16, 16000)
+        for resampler in ('linear', 'sinc'):
+            converter = pcm.Converter(mono8, stereo16, resampler)
+            result = samples(converter.convert(bytes([192] * 800)))
+            self.assertTrue(abs(len(result) - 3200) <= 80)
+            self.assertEqual(result[100:102], [16384, 16384])
+
+    def test_converter_flush(self):
+        mono8 = FakeFormat(1, 8, 8000)
+        stereo16 = FakeFormat(2, 16, 16000)
+        for resampler in ('linear', 'sinc'):
+            converter = pcm.Converter(mono8, stereo16, resampler)
+            result = samples(converter.convert(bytes([192] * 800)) +
+                             converter.flush())
+            self.assertTrue(abs(len(result) - 3200) <= 4)
+            self.assertEqual(converter.flush(), b'')
+
+    def test_converter_unsupported(self):
+        self.assertRaises(ValueError, pcm.Converter, FakeFormat(6, 16, 8000),
+                          FakeFormat(2, 16, 8000))
+        self.assertRaises(ValueError, pcm.Converter, FakeFormat(1, 8, 8000),
+                          FakeFormat(1, 16, 8000), 'cubic')
+
+
+class FakeFormat:
+
+    def __init__(self, channels, sample_size, sample_rate):
+        self.channels = channels
+        self.sample_size = sample_size
+        self.sample_rate = sample_rate
+
+    def __eq__(self, other):
+        return self.__dict__ == other.__dict__
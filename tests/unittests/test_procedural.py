@@ -0,0 +1,91 @@
+import array
+import math
+import unittest
+
+from pyglet.media import procedural
+
+
+class PeriodicSourceTestCase(unittest.TestCase):
+
+    def read_all(self, source, packet_size):
+        data = b''
+        while True:
+            audio_data = source.get_audio_data(packet_size)
+            if audio_data is None:
+                return data
+            data += audio_data.data
+
+    def test_packet_continuity(self):
+        for cls in (procedural.Sine, procedural.Saw, procedural.Square):
+            for frequency in (440, 261.63, 3.3):
+                whole = self.read_all(cls(0.25, frequency=frequency), 1 << 20)
+                pieces = self.read_all(cls(0.25, frequency=frequency), 1002)
+                self.assertEqual(whole, pieces, (cls, frequency))
+
+    def test_sine_values(self):
+        source = procedural.Sine(0.1, frequency=440, sample_rate=44100)
+        samples = array.array('h', self.read_all(source, 4096))
+        self.assertEqual(len(samples), 4410)
+        step = 440 * math.pi * 2 / 44100
+        for i in (0, 17, 1000, 4409):
+            expected = math.sin(step * i) * 32767
+            self.assertTrue(abs(samples[i] - expected) <= 1)
+
+    def test_untabulated_frequency(self):
+        # A period too long to tabulate is generated packet by packet.
+        source = procedural.Sine(0.1, frequency=0.5, sample_rate=44100)
+        self.assertTrue(source._get_table() is None)
+        samples = array.array('h', self.read_all(source, 1000))
+        self.assertEqual(len(samples), 4410)
+        self.assertTrue(abs(samples[4000] -
+                            math.sin(0.5 * math.pi * 2 * 4000 / 44100) *
+                            32767) <= 1)
+
+    def test_approximated_frequency(self):
+        source = procedural.Sine(1.0, frequency=261.63, sample_rate=44100)
+        samples = array.array('h', self.read_all(source, 4096))
+        step = 261.63 * math.pi * 2 / 44100
+        for i in (0, 1234, 44099):
+            expected = math.sin(step * i) * 32767
+            self.assertTrue(abs(samples[i] - expected) <= 2)
+
+    def test_square_8bit(self):
+        source = procedural.Square(0.01, frequency=100, sample_rate=8000,
+                                   sample_size=8)
+        data = self.read_all(source, 7)
+        self.assertEqual(set(data[:40]), {1})
+        self.assertEqual(set(data[40:80]), {255})
+
+    def test_seek(self):
+        source = procedural.Saw(1.0, frequency=440)
+        whole = self.read_all(source, 1 << 20)
+        source.seek(0.5)
+        self.assertEqual(self.read_all(source, 4096), whole[44800:])
+
+
+class EnvelopeTestCase(unittest.TestCase):
+
+    def test_adsr_gains(self):
+        envelope = procedural.ADSREnvelope(0.1, 0.1, 0.2, 0.5)
+        gains = envelope.get_gains(100, 1.0, 0, 100)
+        self.assertEqual(len(gains), 100)
+        self.assertAlmostEqual(gains[0], 0.0)
+        self.assertAlmostEqual(gains[5], 0.5)
+        self.assertAlmostEqual(gains[10], 1.0)
+        self.assertAlmostEqual(gains[15], 0.75)
+        self.assertAlmostEqual(gains[50], 0.5)
+        self.assertAlmostEqual(gains[90], 0.25)
+
+    def test_adsr_gains_range(self):
+        envelope = procedural.ADSREnvelope(0.1, 0.1, 0.2, 0.5)
+        gains = envelope.get_gains(100, 1.0, 0, 100)
+        self.assertEqual(list(envelope.get_gains(100, 1.0, 37, 21)),
+                         list(gains[37:58]))
+
+    def test_envelope_applied(self):
+        envelope = procedural.FlatEnvelope(0.5)
+        source = procedural.Square(0.01, frequency=100, sample_rate=8000,
+                                   envelope=envelope)
+        samples = array.array('h', source.get_audio_data(160).data)
+        self.assertEqual(samples[0], -16383)
+        self.assertEqual(samples[79], 16383)
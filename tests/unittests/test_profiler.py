@@ -0,0 +1,197 @@
+import io
+import json
+import unittest
+import mock
+
+from pyglet import clock, event, graphics
+from pyglet.graphics import vertexdomain
+from pyglet.profiler import Profiler, SpanStats, get_default
+
+
+class FakeTime:
+
+    def __init__(self):
+        self.time = 0.
+
+    def __call__(self):
+        return self.time
+
+
+class SpanStatsTestCase(unittest.TestCase):
+
+    def test_ring_buffer(self):
+        stats = SpanStats('span', 'app', 4)
+        for duration in range(1, 7):
+            stats.add(float(duration))
+        self.assertEqual(stats.get_durations(), [3., 4., 5., 6.])
+        self.assertEqual(stats.count, 6)
+        self.assertEqual(stats.total, 21.)
+        self.assertEqual(stats.max, 6.)
+        self.assertEqual(stats.get_mean(), 4.5)
+
+    def test_empty(self):
+        stats = SpanStats('span', 'app', 4)
+        self.assertEqual(stats.get_durations(), [])
+        self.assertEqual(stats.get_mean(), 0.)
+        self.assertEqual(stats.get_percentile(99), 0.)
+
+    def test_percentile(self):
+        stats = SpanStats('span', 'app', 100)
+        for duration in range(100, 0, -1):
+            stats.add(float(duration))
+        self.assertEqual(stats.get_percentile(0), 1.)
+        self.assertEqual(stats.get_percentile(50), 51.)
+        self.assertEqual(stats.get_percentile(100), 100.)
+
+    def test_histogram(self):
+        stats = SpanStats('span', 'app', 10)
+        for duration in (0., 1., 1.5, 3., 4.):
+            stats.add(duration)
+        self.assertEqual(stats.get_histogram(4),
+                         [(0., 1), (1., 2), (2., 0), (3., 2)])
+        self.assertEqual(stats.get_histogram(2, limit=2.),
+                         [(0., 1), (1., 4)])
+
+
+class ProfilerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.time = FakeTime()
+        self.profiler = Profiler(history=8, time_function=self.time)
+
+    def test_disabled(self):
+        with self.profiler.span('work'):
+            self.time.time += 1
+        self.assertEqual(self.profiler.get_stats(), [])
+
+    def test_span(self):
+        self.profiler.enable()
+        for _ in range(2):
+            with self.profiler.span('work', 'app'):
+                self.time.time += 0.5
+        with self.profiler.span('other', 'event'):
+            self.time.time += 2.
+
+        stats = self.profiler.get_stats()
+        self.assertEqual([s.name for s in stats], ['other', 'work'])
+        self.assertEqual(stats[1].count, 2)
+        self.assertEqual(stats[1].total, 1.)
+        self.assertEqual([s.name for s in self.profiler.get_stats('app')],
+                         ['work'])
+
+    def test_call(self):
+        def work(a, b=0):
+            self.time.time += 1
+            return a + b
+
+        self.profiler.enable()
+        self.assertEqual(self.profiler.call(work, (1,), {'b': 2}), 3)
+        self.assertEqual(self.profiler.stats[work.__qualname__].total, 1.)
+
+    def test_chrome_trace(self):
+        self.profiler.enable()
+        self.time.time = 1.
+        with self.profiler.span('work', 'app', {'frame': 1}):
+            self.time.time += 0.25
+
+        file = io.StringIO()
+        self.profiler.export_chrome_trace(file)
+        trace = json.loads(file.getvalue())
+        event, = trace['traceEvents']
+        self.assertEqual(event['name'], 'work')
+        self.assertEqual(event['cat'], 'app')
+        self.assertEqual(event['ph'], 'X')
+        self.assertEqual(event['ts'], 1e6)
+        self.assertEqual(event['dur'], 0.25e6)
+        self.assertEqual(event['args'], {'frame': 1})
+
+    def test_max_events(self):
+        profiler = Profiler(max_events=3, time_function=self.time)
+        profiler.enable()
+        for i in range(5):
+            with profiler.span('work'):
+                pass
+        self.assertEqual(len(profiler.get_chrome_trace()['traceEvents']), 3)
+        self.assertEqual(profiler.stats['work'].count, 5)
+
+    def test_toggle_handler(self):
+        calls = []
+        self.profiler.add_toggle_handler(calls.append)
+        self.profiler.enable()
+        self.profiler.enable()
+        self.profiler.disable()
+        self.assertEqual(calls, [True, False])
+
+        profiler = Profiler(time_function=self.time)
+        profiler.enable()
+        profiler.add_toggle_handler(calls.append)
+        self.assertEqual(calls, [True, False, True])
+
+    def test_clear(self):
+        self.profiler.enable()
+        with self.profiler.span('work'):
+            pass
+        self.profiler.clear()
+        self.assertEqual(self.profiler.stats, {})
+        self.assertEqual(self.profiler.get_chrome_trace()['traceEvents'], [])
+
+
+class Dispatcher(event.EventDispatcher):
+
+    def on_test(self):
+        return event.EVENT_HANDLED
+
+Dispatcher.register_event_type('on_test')
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = get_default()
+        self.profiler.clear()
+        self.profiler.enable()
+
+    def tearDown(self):
+        self.profiler.disable()
+        self.profiler.clear()
+
+    def test_dispatch_event(self):
+        self.assertEqual(Dispatcher().dispatch_event('on_test'),
+                         event.EVENT_HANDLED)
+        self.assertEqual(self.profiler.stats['on_test'].category, 'event')
+
+    def test_dispatch_event_uninstrumented_while_disabled(self):
+        self.profiler.disable()
+        self.assertIs(event.EventDispatcher.dispatch_event,
+                      event._dispatch_event)
+        Dispatcher().dispatch_event('on_test')
+        self.assertNotIn('on_test', self.profiler.stats)
+        self.profiler.enable()
+        self.assertIsNot(event.EventDispatcher.dispatch_event,
+                         event._dispatch_event)
+
+    def test_scheduled_functions(self):
+        def callback(dt):
+            pass
+
+        time = FakeTime()
+        test_clock = clock.Clock(time_function=time)
+        test_clock.schedule(callback)
+        test_clock.schedule_interval(callback, 1)
+        time.time += 1
+        test_clock.tick()
+        stats = self.profiler.stats[callback.__qualname__]
+        self.assertEqual(stats.category, 'clock')
+        self.assertEqual(stats.count, 2)
+
+    def test_batch_groups(self):
+        batch = graphics.Batch()
+        parent = graphics.OrderedGroup(0)
+        child = graphics.OrderedGroup(1, parent)
+        batch.add(1, 0, child, 'v2f')
+        with mock.patch.object(vertexdomain.VertexDomain, 'draw'):
+            batch.draw()
+        self.assertEqual(self.profiler.stats['Batch.draw'].count, 1)
+        self.assertEqual(self.profiler.stats[repr(parent)].count, 1)
+        self.assertEqual(self.profiler.stats[repr(child)].category,
+                         'graphics')
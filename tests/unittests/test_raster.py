@@ -0,0 +1,237 @@
+import sys
+import unittest
+import mock
+
+import pyglet
+from pyglet import graphics
+from pyglet.font.base import GlyphTextureAtlas
+from pyglet.gl import *
+from pyglet.graphics.raster import Rasterizer, RasterTexture
+from pyglet.image import ImageData
+from pyglet.sprite import Sprite
+
+
+class RasterGlyphTextureAtlas(RasterTexture, GlyphTextureAtlas):
+    pass
+
+
+class Font:
+    """Font drawing every character as a solid 4x6 block."""
+    ascent = 6
+    descent = 0
+
+    def __init__(self):
+        texture = RasterGlyphTextureAtlas.create_for_size(
+            GL_TEXTURE_2D, 16, 16, GL_ALPHA)
+        self.glyph = texture.fit(ImageData(4, 6, 'A', b'\xff' * 24))
+        self.glyph.set_bearings(0, 0, 5)
+
+    def get_glyphs(self, text):
+        return [self.glyph] * len(text)
+
+    def get_glyphs_for_width(self, text, width):
+        return [self.glyph] * len(text)
+
+    def add_eviction_handler(self, handler):
+        pass
+
+    def remove_eviction_handler(self, handler):
+        pass
+
+
+def coverage(rasterizer):
+    """Return the rows of the framebuffer, top first, with '#' for pixels
+    with any alpha."""
+    return [''.join('#' if rasterizer.get_pixel(x, y)[3] else '.'
+                    for x in range(rasterizer.width))
+            for y in reversed(range(rasterizer.height))]
+
+
+class RasterizerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rasterizer = Rasterizer(8, 8)
+
+    def test_clear(self):
+        self.rasterizer.clear((1, 2, 3, 4))
+        self.assertEqual(self.rasterizer.get_pixel(7, 7), (1, 2, 3, 4))
+        image = self.rasterizer.get_image_data()
+        self.assertEqual(image.get_data('RGBA', 32), bytes((1, 2, 3, 4)) * 64)
+
+    def test_quad(self):
+        self.rasterizer.draw(4, GL_QUADS,
+                             ('v2i', (2, 1, 6, 1, 6, 4, 2, 4)),
+                             ('c4B', (255, 0, 0, 255) * 4))
+        self.assertEqual(coverage(self.rasterizer), [
+            '........',
+            '........',
+            '........',
+            '........',
+            '..####..',
+            '..####..',
+            '..####..',
+            '........'])
+        self.assertEqual(self.rasterizer.get_pixel(2, 1), (255, 0, 0, 255))
+
+    def test_adjacent_triangles_blended_once(self):
+        self.rasterizer.clear((0, 0, 0, 255))
+        self.rasterizer.blend = True
+        self.rasterizer.draw(4, GL_QUADS,
+                             ('v2f', (0, 0, 8, 0, 8, 8, 0, 8)),
+                             ('c4B', (255, 255, 255, 128) * 4))
+        self.rasterizer.draw(4, GL_TRIANGLE_FAN,
+                             ('v2f', (0, 0, 3, 0, 8, 5, 8, 8)),
+                             ('c4B', (255, 255, 255, 128) * 4))
+        self.assertEqual(len(set(self.rasterizer.get_pixel(x, 0)[:3]
+                                 for x in range(3))), 1)
+        self.assertEqual(self.rasterizer.get_pixel(7, 7)[:3], (192,) * 3)
+        self.assertEqual(self.rasterizer.get_pixel(0, 7)[:3], (128,) * 3)
+
+    def test_gradient(self):
+        self.rasterizer.draw(4, GL_QUADS,
+                             ('v2i', (0, 0, 8, 0, 8, 8, 0, 8)),
+                             ('c3B', (0, 0, 0, 255, 0, 0, 255, 0, 0,
+                                      0, 0, 0)))
+        reds = [self.rasterizer.get_pixel(x, 3)[0] for x in range(8)]
+        self.assertEqual(reds, sorted(reds))
+        self.assertEqual(reds[0], 16)
+        self.assertEqual(reds[-1], 239)
+        self.assertEqual(self.rasterizer.get_pixel(0, 0)[3], 255)
+
+    def test_blend_functions(self):
+        self.rasterizer.clear((100, 100, 100, 255))
+        self.rasterizer.blend = True
+        self.rasterizer.blend_src = GL_ONE
+        self.rasterizer.blend_dest = GL_ONE
+        self.rasterizer.draw(3, GL_TRIANGLES,
+                             ('v2i', (0, 0, 8, 0, 0, 8)),
+                             ('c4B', (200, 10, 0, 0) * 3))
+        self.assertEqual(self.rasterizer.get_pixel(0, 0), (255, 110, 100, 255))
+
+        self.rasterizer.blend_src = GL_ZERO
+        self.rasterizer.blend_dest = GL_DST_ALPHA
+        self.rasterizer.draw(1, GL_POINTS, ('v2i', (7, 7)))
+        self.assertEqual(self.rasterizer.get_pixel(7, 7),
+                         (100, 100, 100, 255))
+
+    def test_scissor(self):
+        self.rasterizer.scissor = (2, 2, 3, 2)
+        self.rasterizer.draw(4, GL_QUADS,
+                             ('v2i', (0, 0, 8, 0, 8, 8, 0, 8)),
+                             ('c4B', (255, 255, 255, 255) * 4))
+        self.assertEqual(coverage(self.rasterizer), [
+            '........',
+            '........',
+            '........',
+            '........',
+            '..###...',
+            '..###...',
+            '........',
+            '........'])
+
+    def test_push_pop_state(self):
+        self.rasterizer.push_state()
+        self.rasterizer.blend = True
+        self.rasterizer.translate_x = 3
+        self.rasterizer.pop_state()
+        self.assertFalse(self.rasterizer.blend)
+        self.assertEqual(self.rasterizer.translate_x, 0)
+
+    def test_lines(self):
+        self.rasterizer.draw(3, GL_LINE_STRIP,
+                             ('v2f', (0.5, 0.5, 7.5, 0.5, 7.5, 7.5)))
+        self.rasterizer.draw(2, GL_LINES, ('v2i', (0, 8, 4, 4)))
+        self.assertEqual(coverage(self.rasterizer), [
+            '#.......',
+            '.#.....#',
+            '..#....#',
+            '...#...#',
+            '.......#',
+            '.......#',
+            '.......#',
+            '########'])
+
+    def test_indexed(self):
+        self.rasterizer.draw_indexed(4, GL_TRIANGLES, [0, 1, 2, 0, 2, 3],
+                                     ('v2i', (0, 0, 2, 0, 2, 2, 0, 2)))
+        self.assertEqual(coverage(self.rasterizer)[-3:],
+                         ['........', '##......', '##......'])
+
+    def test_batch_vertex_lists(self):
+        batch = graphics.Batch()
+        batch.add_indexed(4, GL_TRIANGLES, None, [0, 1, 2, 0, 2, 3],
+                          ('v2i', (0, 0, 2, 0, 2, 2, 0, 2)),
+                          ('c4B', (0, 255, 0, 255) * 4))
+        vertex_list = batch.add(2, GL_POINTS, None,
+                                ('v2i', (7, 7, 6, 7)),
+                                ('c3B', (0, 0, 255) * 2))
+        self.rasterizer.draw_batch(batch)
+        self.assertEqual(self.rasterizer.get_pixel(1, 1), (0, 255, 0, 255))
+        self.assertEqual(self.rasterizer.get_pixel(6, 7), (0, 0, 255, 255))
+
+        self.rasterizer.clear()
+        self.rasterizer.draw_vertex_list(vertex_list, GL_POINTS)
+        self.assertEqual(self.rasterizer.get_pixel(1, 1), (0, 0, 0, 0))
+        self.assertEqual(self.rasterizer.get_pixel(7, 7), (0, 0, 255, 255))
+
+
+class RasterTextureTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.image = ImageData(2, 2, 'RGBA', bytes((
+            255, 0, 0, 255, 0, 255, 0, 255,
+            0, 0, 255, 255, 255, 255, 255, 0)))
+
+    def test_create_for_image(self):
+        texture = RasterTexture.create_for_image(self.image)
+        self.assertEqual(texture.get_image_data().get_data('RGBA', 8),
+                         self.image.get_data('RGBA', 8))
+        rgb = ImageData(1, 1, 'RGB', b'\x01\x02\x03')
+        self.assertEqual(bytes(RasterTexture.create_for_image(rgb).data),
+                         b'\x01\x02\x03\xff')
+
+    def test_blit_into_region(self):
+        texture = RasterTexture.create(4, 4)
+        texture.get_region(2, 2, 2, 2).blit_into(self.image, 0, 0, 0)
+        data = texture.get_image_data().get_data('RGBA', 16)
+        self.assertEqual(data[40:48], bytes((255, 0, 0, 255, 0, 255, 0, 255)))
+        self.assertEqual(data[:40], bytes(40))
+
+    def test_sprites(self):
+        texture = RasterTexture.create_for_image(self.image)
+        batch = graphics.Batch()
+        sprites = [Sprite(texture, x=1, y=1, batch=batch),
+                   Sprite(texture.get_region(0, 0, 1, 2), x=5, y=5,
+                          batch=batch)]
+        sprites[1].opacity = 128
+
+        rasterizer = Rasterizer(8, 8)
+        rasterizer.clear((0, 0, 0, 255))
+        rasterizer.draw_batch(batch)
+        self.assertEqual(rasterizer.get_pixel(1, 1), (255, 0, 0, 255))
+        self.assertEqual(rasterizer.get_pixel(2, 1), (0, 255, 0, 255))
+        self.assertEqual(rasterizer.get_pixel(1, 2), (0, 0, 255, 255))
+        self.assertEqual(rasterizer.get_pixel(2, 2), (0, 0, 0, 255))
+        self.assertEqual(rasterizer.get_pixel(5, 5), (128, 0, 0, 191))
+        self.assertEqual(rasterizer.get_pixel(5, 6), (0, 0, 128, 191))
+        self.assertEqual(rasterizer.get_pixel(6, 5), (0, 0, 0, 255))
+
+    def test_label(self):
+        batch = graphics.Batch()
+        with mock.patch.object(sys.modules['pyglet.font'], 'load',
+                               return_value=Font()):
+            pyglet.text.Label('ab', x=1, y=1, color=(255, 255, 0, 255),
+                              batch=batch)
+
+        rasterizer = Rasterizer(12, 8)
+        rasterizer.draw_batch(batch)
+        self.assertEqual(coverage(rasterizer), [
+            '............',
+            '.####.####..',
+            '.####.####..',
+            '.####.####..',
+            '.####.####..',
+            '.####.####..',
+            '.####.####..',
+            '............'])
+        self.assertEqual(rasterizer.get_pixel(1, 1), (255, 255, 0, 255))
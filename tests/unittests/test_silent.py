@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+import mock
+
+import pyglet
+pyglet.options['shadow_window'] = False
+
+from pyglet.media import MediaEvent, SourceGroup
+from pyglet.media.drivers import silent
+from pyglet.media.procedural import Silence
+
+
+class SilentWorkerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatched = []
+        self.lock = threading.Lock()
+        patcher = mock.patch.object(MediaEvent, '_sync_dispatch_to_player',
+                                    autospec=True,
+                                    side_effect=self._record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.driver = silent.create_audio_driver()
+
+    def _record(self, event, player):
+        with self.lock:
+            self.dispatched.append((player, event.event))
+
+    def create_player(self, duration):
+        source = Silence(duration)
+        group = SourceGroup(source.audio_format, None)
+        group.queue(source)
+        player = object()
+        audio_player = self.driver.create_audio_player(group, player)
+        self.addCleanup(audio_player.delete)
+        return player, audio_player
+
+    def wait_for(self, condition, timeout=5.):
+        end = time.time() + timeout
+        while not condition() and time.time() < end:
+            time.sleep(0.01)
+        return condition()
+
+    def test_shared_worker(self):
+        threads = threading.active_count()
+        players = [self.create_player(0.05)[1] for _ in range(50)]
+        self.assertTrue(threading.active_count() <= threads + 1)
+        for audio_player in players:
+            self.assertIs(audio_player._worker, players[0]._worker)
+
+    def test_eos_dispatched(self):
+        players = [self.create_player(0.05) for _ in range(20)]
+        for _, audio_player in players:
+            audio_player.play()
+
+        expected = {(player, 'on_eos') for player, _ in players}
+        self.assertTrue(self.wait_for(
+            lambda: expected <= set(self.dispatched)))
+
+        for _, audio_player in players:
+            self.assertTrue(audio_player.max_service_latency >= 0)
+
+    def test_paused_player_not_serviced(self):
+        player, audio_player = self.create_player(0.05)
+        time.sleep(0.3)
+        self.assertEqual(self.dispatched, [])
+
+        audio_player.play()
+        self.assertTrue(self.wait_for(
+            lambda: (player, 'on_eos') in self.dispatched))
+
+    def test_deleted_player_not_serviced(self):
+        player, audio_player = self.create_player(0.05)
+        audio_player.delete()
+        audio_player.play()
+        with audio_player._worker.condition:
+            self.assertNotIn(audio_player, audio_player._worker._entries)
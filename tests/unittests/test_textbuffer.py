@@ -0,0 +1,98 @@
+import random
+import unittest
+
+from pyglet.text.document import UnformattedDocument
+from pyglet.text.textbuffer import TextBuffer
+
+
+def paragraph_start(text, pos):
+    for i in range(min(pos, len(text) - 1), -1, -1):
+        if text[i] in '\n\u2029':
+            return pos if i == pos else i + 1
+    return 0
+
+
+def paragraph_end(text, pos):
+    for i in range(pos, len(text)):
+        if text[i] in '\n\u2029':
+            return i + 1
+    return len(text)
+
+
+class SmallTextBuffer(TextBuffer):
+    chunk_size = 4
+
+
+class TextBufferTestCase(unittest.TestCase):
+
+    def check(self, buffer, text):
+        self.assertEqual(len(buffer), len(text))
+        self.assertEqual(buffer.text, text)
+        self.assertEqual(buffer.get_paragraph_count(),
+                         text.count('\n') + text.count('\u2029'))
+        for pos in range(len(text) + 1):
+            self.assertEqual(buffer.get_paragraph_start(pos),
+                             paragraph_start(text, pos))
+            self.assertEqual(buffer.get_paragraph_end(pos),
+                             paragraph_end(text, pos))
+
+    def test_empty(self):
+        buffer = TextBuffer()
+        self.check(buffer, '')
+        self.assertEqual(buffer.get_text(0, 10), '')
+
+    def test_split(self):
+        text = 'first line\nsecond\u2029\nthird paragraph'
+        buffer = SmallTextBuffer(text)
+        self.check(buffer, text)
+        for start in range(len(text) + 1):
+            for end in range(start, len(text) + 2):
+                self.assertEqual(buffer.get_text(start, end),
+                                 text[start:end])
+
+    def test_random_edits(self):
+        rng = random.Random(0)
+        buffer = SmallTextBuffer()
+        text = ''
+        for _ in range(500):
+            if text and rng.random() < 0.4:
+                start = rng.randint(0, len(text))
+                end = rng.randint(start, len(text))
+                buffer.delete(start, end)
+                text = text[:start] + text[end:]
+            else:
+                pos = rng.randint(0, len(text))
+                insert = ''.join(rng.choice('ab \n\u2029')
+                                 for _ in range(rng.randint(0, 12)))
+                buffer.insert(pos, insert)
+                text = text[:pos] + insert + text[pos:]
+            start = rng.randint(0, len(text))
+            self.assertEqual(buffer.get_text(start, start + 5),
+                             text[start:start + 5])
+        self.check(buffer, text)
+
+    def test_delete_everything(self):
+        buffer = SmallTextBuffer('one\ntwo\nthree')
+        buffer.delete(0, len(buffer))
+        self.check(buffer, '')
+        buffer.insert(0, 'four')
+        self.check(buffer, 'four')
+
+
+class DocumentTextTestCase(unittest.TestCase):
+
+    def test_edits(self):
+        document = UnformattedDocument('hello\nworld')
+        document.insert_text(5, ', there')
+        document.delete_text(0, 1)
+        self.assertEqual(document.text, 'ello, there\nworld')
+        self.assertEqual(document.text_length, 17)
+        self.assertEqual(document.get_text(7, 11), 'here')
+        self.assertEqual(document.get_paragraph_start(14), 12)
+        self.assertEqual(document.get_paragraph_end(3), 12)
+
+    def test_set_text(self):
+        document = UnformattedDocument('hello')
+        document.text = 'goodbye'
+        self.assertEqual(document.text, 'goodbye')
+        self.assertEqual(document.text_length, 7)
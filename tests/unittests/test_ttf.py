@@ -0,0 +1,44 @@
+import unittest
+from os.path import abspath, dirname, join
+
+from pyglet.font.ttf import TruetypeInfo
+
+font_path = abspath(join(dirname(__file__),
+                         '../interactive/font/oterh/action_man.ttf'))
+
+
+class TruetypeInfoTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.info = TruetypeInfo(font_path)
+        self.addCleanup(self.info.close)
+
+    def test_names(self):
+        self.assertEqual(self.info.get_name('family'), 'Action Man')
+
+    def test_glyph_index(self):
+        character_map = self.info.get_character_map()
+        self.assertTrue(character_map)
+        for i in range(0x10000):
+            c = chr(i)
+            self.assertEqual(self.info.get_glyph_index(c),
+                             character_map.get(c, 0))
+        self.assertEqual(self.info.get_glyph_index('\U0001f600'), 0)
+
+    def test_glyph_kerning(self):
+        kernings = self.info.get_glyph_kernings()
+        self.assertTrue(kernings)
+        for (left, right), value in kernings.items():
+            self.assertEqual(self.info.get_glyph_kerning(left, right), value)
+            self.assertEqual(self.info.get_glyph_kerning(right + 1000, left),
+                             0)
+
+    def test_character_kerning(self):
+        for (left, right), value in \
+                self.info.get_character_kernings().items():
+            self.assertEqual(self.info.get_character_kerning(left, right),
+                             value)
+
+    def test_advance(self):
+        for c, advance in self.info.get_character_advances().items():
+            self.assertEqual(self.info.get_character_advance(c), advance)